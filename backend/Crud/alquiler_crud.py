@@ -1,5 +1,6 @@
 # --- Archivo: Crud/alquiler_crud.py ---
 
+import logging
 from orm_base import ORMBase
 from clases.alquiler import Alquiler
 
@@ -8,14 +9,35 @@ from clases.alquiler import Alquiler
 from Crud.cliente_crud import ClienteCRUD
 from Crud.empleado_crud import EmpleadoCRUD
 from Crud.vehiculo_crud import VehiculoCRUD
+from Crud.reserva_crud import ReservaCRUD
+from Crud.mantenimiento_crud import MantenimientoCRUD
 from datetime import date
 
+logger = logging.getLogger(__name__)
+
 class AlquilerCRUD(ORMBase):
     tabla = "ALQUILER"
     campos = ["fecha_inicio", "fecha_fin", "costo_total", "fecha_registro", 
               "id_empleado", "patente", "id_cliente"]
     clave_primaria = "id_alquiler"
 
+    # Exportación CSV/XLSX (ver ORMBase.iterar_exportacion)
+    select_exportacion = """
+        SELECT a.id_alquiler, a.fecha_inicio, a.fecha_fin, a.costo_total, a.fecha_registro,
+               a.id_cliente, c.nombre || ' ' || c.apellido, c.dni,
+               a.patente, v.marca, v.modelo,
+               a.id_empleado, e.nombre || ' ' || e.apellido
+        FROM ALQUILER a
+        LEFT JOIN CLIENTE c ON c.id_cliente = a.id_cliente
+        LEFT JOIN VEHICULO v ON v.patente = a.patente
+        LEFT JOIN EMPLEADO e ON e.id_empleado = a.id_empleado"""
+    columnas_exportacion = ["id_alquiler", "fecha_inicio", "fecha_fin", "costo_total", "fecha_registro",
+                            "id_cliente", "cliente", "dni_cliente", "patente", "marca", "modelo",
+                            "id_empleado", "empleado"]
+    fecha_exportacion = "a.fecha_inicio"
+    # Disponibilidad (ver indice_ocupacion.py)
+    intervalo_ocupacion = ("fecha_inicio", "fecha_fin")
+
     def __init__(self):
         super().__init__()
         # --- ¡CAMBIO 2: Crear instancias de los otros DAOs! ---
@@ -25,13 +47,20 @@ class AlquilerCRUD(ORMBase):
         self.vehiculo_dao = VehiculoCRUD()
 
     # --- ¡CAMBIO 3: El Método Ensamblador (MEJOR PRÁCTICA)! ---
-    def _build_alquiler(self, tupla):
+    def _build_alquiler(self, tupla, cliente=None, empleado=None, vehiculo=None):
         """
         Método privado para "ensamblar" un objeto Alquiler COMPLETO
         a partir de una tupla de la BDD.
+        Si ya tenemos cliente/empleado/vehiculo (ej. vienen del JOIN),
+        se usan directamente y no se vuelven a buscar.
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         try:
             # 1. Extraer los datos simples y las claves foráneas
@@ -55,17 +84,21 @@ class AlquilerCRUD(ORMBase):
             id_cliente = tupla[7]
 
             # 3. Usamos los otros DAOs para obtener los OBJETOS completos
-            cliente = self.cliente_dao.buscar_por_id(id_cliente)
-            empleado = self.empleado_dao.buscar_por_id(id_empleado)
-            # (Asegúrate que tu VehiculoCRUD.buscar_por_id acepte una 'patente' o ajústalo)
-            vehiculo = self.vehiculo_dao.buscar_por_id(patente) 
+            if cliente is None:
+                cliente = self.cliente_dao.buscar_por_id(id_cliente)
+            if empleado is None:
+                empleado = self.empleado_dao.buscar_por_id(id_empleado)
+            if vehiculo is None:
+                vehiculo = self.vehiculo_dao.buscar_por_id(patente)
 
             if not cliente or not empleado or not vehiculo:
-                print(f"Error de integridad de datos en Alquiler ID: {id_alquiler}. Objeto no ensamblado.")
+                logger.error("Error de integridad de datos en Alquiler. Objeto no ensamblado.",
+                             extra={"id_alquiler": id_alquiler})
                 return None
 
             # 4. Ensamblar y devolver el objeto Alquiler con los tipos correctos
-            return Alquiler(
+            # (carga de confianza: un alquiler guardado puede tener fechas pasadas)
+            return self._registrar_entidad(tupla[0], Alquiler.desde_bd(
                 id_alquiler=id_alquiler,
                 fecha_inicio=fecha_inicio,   # <-- Ahora es un objeto `date`
                 fecha_fin=fecha_fin,         # <-- Ahora es un objeto `date`
@@ -74,16 +107,60 @@ class AlquilerCRUD(ORMBase):
                 empleado=empleado, 
                 vehiculo=vehiculo,  
                 cliente=cliente     
-            )
+            ))
         except (ValueError, TypeError) as e:
             # Captura errores si el formato de fecha en la BDD es incorrecto
-            print(f"Error al convertir tipos en _build_alquiler: {e}")
+            logger.error("Error al convertir tipos en _build_alquiler.",
+                         extra={"id_alquiler": tupla[0], "error": str(e)})
             return None
         except Exception as e:
-            print(f"Error ensamblando alquiler: {e}")
+            logger.error("Error ensamblando alquiler.", extra={"id_alquiler": tupla[0], "error": str(e)})
             return None
     # -----------------------------------------------
 
+    # --- Lectura con JOIN: Alquiler + Cliente + Empleado + Vehiculo en UNA consulta ---
+    _SQL_JOIN = """
+        SELECT {a}, {c}, {e}, {v}
+        FROM ALQUILER a
+        JOIN CLIENTE c ON c.id_cliente = a.id_cliente
+        JOIN EMPLEADO e ON e.id_empleado = a.id_empleado
+        JOIN VEHICULO v ON v.patente = a.patente
+    """
+
+    def _sql_select_join(self):
+        return self._sql("select_join", lambda: self._SQL_JOIN.format(
+            a=self.columnas_sql("a"),
+            c=ClienteCRUD.columnas_sql("c"),
+            e=EmpleadoCRUD.columnas_sql("e"),
+            v=VehiculoCRUD.columnas_sql("v"),
+        ))
+
+    def _sql_join(self, condicion=""):
+        """ 'condicion' es un WHERE con marcadores (?), nunca con valores. """
+        return self._sql(("join", condicion), lambda: (
+            f"{self._sql_select_join()} {condicion} ORDER BY a.{self.clave_primaria}"))
+
+    def _build_desde_join(self, fila):
+        """
+        Ensambla un Alquiler a partir de una fila del JOIN.
+        La fila trae, en orden, las columnas de ALQUILER, CLIENTE, EMPLEADO y VEHICULO.
+        """
+        fin_a = 1 + len(self.campos)
+        fin_c = fin_a + 1 + len(ClienteCRUD.campos)
+        fin_e = fin_c + 1 + len(EmpleadoCRUD.campos)
+        return self._build_alquiler(
+            fila[:fin_a],
+            cliente=self.cliente_dao._build_cliente(fila[fin_a:fin_c]),
+            empleado=self.empleado_dao._build_empleado(fila[fin_c:fin_e]),
+            vehiculo=self.vehiculo_dao._build_vehiculo(fila[fin_e:]),
+        )
+
+    def _listar_con_join(self, condicion="", parametros=()):
+        """ Ejecuta el JOIN y retorna la LISTA DE OBJETOS Alquiler (sin los que fallen). """
+        filas = self._consultar(self._sql_join(condicion), parametros)
+        alquileres = (self._build_desde_join(f) for f in filas)
+        return [a for a in alquileres if a]
+
     def crear_alquiler(self, alquiler: Alquiler):
         # (Tu código aquí está perfecto, ya extrae los IDs para insertar)
         valores = [
@@ -97,25 +174,122 @@ class AlquilerCRUD(ORMBase):
         ]
         return self.insertar(valores)
 
+    # Ocupan el vehículo: otro alquiler (sin contar el mismo, al modificarlo),
+    # un mantenimiento o una reserva de OTRO cliente
+    @classmethod
+    def _sql_ocupado(cls):
+        return cls._sql("ocupado", lambda: (
+            f"{cls.sql_solapamiento(f'{cls.clave_primaria} IS NOT :id_alquiler')} "
+            f"OR {MantenimientoCRUD.sql_solapamiento()} "
+            f"OR {ReservaCRUD.sql_solapamiento('id_cliente != :id_cliente')}"))
+
+    @staticmethod
+    def _parametros(alquiler: Alquiler):
+        return {
+            "id_alquiler": alquiler.id_alquiler,
+            "desde": alquiler.fecha_inicio,
+            "hasta": alquiler.fecha_fin,
+            "costo_total": alquiler.costo_total,
+            "fecha_registro": alquiler.fecha_registro,
+            "id_empleado": alquiler.empleado.id_empleado,
+            "patente": alquiler.vehiculo.patente,
+            "id_cliente": alquiler.cliente.id_cliente,
+        }
+
+    def vehiculo_ocupado(self, alquiler: Alquiler):
+        """
+        True si el vehículo del alquiler ya está ocupado en sus fechas (ver
+        _sql_ocupado). Es solo una lectura: sirve para descartar rápido, sin
+        tomar el lock de escritura; el chequeo que vale es el de crear_si_libre().
+        """
+        sql = self._sql("vehiculo_ocupado", lambda: f"SELECT {self._sql_ocupado()}")
+        return bool(self._consultar(sql, self._parametros(alquiler), una=True)[0])
+
+    def crear_si_libre(self, alquiler: Alquiler):
+        """
+        Inserta el alquiler SOLO si el vehículo no está ocupado en esas fechas
+        (ver _sql_ocupado): el chequeo y el INSERT son una sola sentencia, en
+        una transacción BEGIN IMMEDIATE (o en la que ya esté abierta: abrirla
+        con inmediata=True).
+        Retorna el id nuevo, o None si el vehículo estaba ocupado.
+        """
+        sql = self._sql("crear_si_libre", lambda: f"""
+            INSERT INTO {self.tabla} ({', '.join(self.campos)})
+            SELECT :desde, :hasta, :costo_total, :fecha_registro, :id_empleado, :patente, :id_cliente
+            WHERE NOT ({self._sql_ocupado()})
+            RETURNING {self.clave_primaria}
+        """)
+        with self.conexion.transaccion(inmediata=True):
+            fila = self._ejecutar(sql, self._parametros(alquiler)).fetchone()
+        if fila is None:
+            return None
+        alquiler.id_alquiler = fila[0]
+        self._registrar_entidad(fila[0], alquiler)
+        return fila[0]
+
+    def actualizar_si_libre(self, alquiler: Alquiler):
+        """
+        Como actualizar_alquiler(), pero SOLO si con los datos nuevos el vehículo
+        no queda ocupado dos veces (sin contar el mismo alquiler; ver _sql_ocupado).
+        Retorna False si no se guardó (vehículo ocupado o el alquiler no existe).
+        """
+        sql = self._sql("actualizar_si_libre", lambda: f"""
+            UPDATE {self.tabla}
+            SET fecha_inicio = :desde, fecha_fin = :hasta, costo_total = :costo_total,
+                fecha_registro = :fecha_registro, id_empleado = :id_empleado,
+                patente = :patente, id_cliente = :id_cliente
+            WHERE {self.clave_primaria} = :id_alquiler
+              AND NOT ({self._sql_ocupado()})
+        """)
+        with self.conexion.transaccion(inmediata=True):
+            cursor = self._ejecutar(sql, self._parametros(alquiler))
+        self._descartar_de_mapa(alquiler.id_alquiler)
+        return cursor.rowcount == 1
+
     # --- ¡ARREGLADO! ---
     def listar_alquileres(self):
-        """ Retorna una LISTA DE OBJETOS Alquiler. """
-        tuplas = self.obtener_todos()
-        # Usamos list comprehension y el ensamblador
-        return [self._build_alquiler(t) for t in tuplas if self._build_alquiler(t)]
+        """ Retorna una LISTA DE OBJETOS Alquiler (una sola consulta con JOIN). """
+        return self._listar_con_join()
+
+    def listar_pagina(self, **opciones):
+        """
+        Retorna (LISTA DE OBJETOS Alquiler, cursor siguiente o None), con el mismo JOIN.
+        Opciones: limite, despues, filtros, orden (ver ORMBase.obtener_pagina).
+        """
+        filas, cursor = self._paginar(self._sql_select_join(), alias="a", **opciones)
+        alquileres = (self._build_desde_join(f) for f in filas)
+        return [a for a in alquileres if a], cursor
+
+    def iterar(self, id_cliente=None):
+        """ Generador de OBJETOS Alquiler (mismo JOIN) leídos de a lotes, opcionalmente de un cliente. """
+        if id_cliente is None:
+            lotes = self.iterar_filas(self._sql_join())
+        else:
+            lotes = self.iterar_filas(self._sql_join("WHERE a.id_cliente = ?"), (id_cliente,))
+        return self._iterar_objetos(lotes, self._build_desde_join)
 
     # --- ¡ARREGLADO! ---
     def buscar_por_id(self, id_alquiler):
         """ Retorna UN OBJETO Alquiler o None. """
-        tupla = self.obtener_por_id(id_alquiler)
-        return self._build_alquiler(tupla)
+        existente = self._entidad_cargada(id_alquiler)
+        if existente is not None:
+            return existente
+        alquileres = self._listar_con_join(f"WHERE a.{self.clave_primaria} = ?", (id_alquiler,))
+        return alquileres[0] if alquileres else None
+
+    def buscar_guardado(self, id_alquiler):
+        """
+        Retorna UN OBJETO Alquiler recién leído de la base (sin pasar por el
+        mapa de identidad), o None. Dentro de una transacción BEGIN IMMEDIATE
+        es la fila vigente: nadie más puede cambiarla hasta el commit.
+        """
+        self._descartar_de_mapa(id_alquiler)
+        return self.buscar_por_id(id_alquiler)
 
     # --- ¡ARREGLADO! ---
     def buscar_por_cliente(self, id_cliente):
-        """ Retorna una LISTA DE OBJETOS Alquiler. """
-        condicion = f"id_cliente = {id_cliente}"
-        tuplas = self.obtener_por_condicion(condicion)
-        return [self._build_alquiler(t) for t in tuplas if self._build_alquiler(t)]
+        """ Retorna una LISTA DE OBJETOS Alquiler (una sola consulta con JOIN). """
+        return self._listar_con_join("WHERE a.id_cliente = ?", (id_cliente,))
     
 # --- Archivo: Crud/alquiler_crud.py (¡CORREGIDO!) ---
 
@@ -1,6 +1,9 @@
+import logging
 from clases.cliente import Cliente
 from orm_base import ORMBase
 
+logger = logging.getLogger(__name__)
+
 class ClienteCRUD(ORMBase):
     tabla = "CLIENTE"
     campos = ["nombre", "apellido", "dni", "direccion", "telefono", "email"]
@@ -17,33 +20,28 @@ class ClienteCRUD(ORMBase):
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         # Asume que tu ORMBase devuelve la tupla con la clave primaria al inicio
         # (id_cliente, nombre, apellido, dni, direccion, telefono, email)
         try:
-            return Cliente(
-                id_cliente=tupla[0],
-                nombre=tupla[1],
-                apellido=tupla[2],
-                dni=tupla[3],
-                direccion=tupla[4],
-                telefono=tupla[5],
-                email=tupla[6]
-            )
-        except IndexError:
+            # Carga de confianza: los datos de la BDD ya fueron validados al guardarse
+            return self._registrar_entidad(tupla[0], Cliente.desde_bd(*tupla))
+        except (IndexError, TypeError):
             # Error por si la tupla no es la esperada
-            print(f"Error: La tupla {tupla} no coincide con la estructura de Cliente.")
+            logger.error("La tupla no coincide con la estructura de Cliente.", extra={"tupla": tupla})
             return None
     
 
     # Verificar si ya existe un cliente con el mismo DNI o email
     def existe_duplicado(self, dni, email):
         sql = f"SELECT COUNT(*) FROM {self.tabla} WHERE dni=? OR email=?"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (dni, email))
-            cantidad = cursor.fetchone()[0]
-            return cantidad > 0
+        cantidad = self._consultar(sql, (dni, email), una=True)[0]
+        return cantidad > 0
 
     # Crear un nuevo cliente
     def crear_cliente(self, cliente: Cliente):
@@ -58,6 +56,38 @@ class ClienteCRUD(ORMBase):
             cliente.email
         ])
 
+    # Crear muchos clientes en una sola transacción
+    def crear_clientes_lote(self, clientes):
+        """
+        Inserta muchos clientes en UNA transacción.
+        Los duplicados (DNI o email ya existentes, o repetidos dentro del lote)
+        se reportan como error y no se insertan.
+        Retorna (insertados, errores) con errores = [(indice, mensaje), ...].
+        """
+        dnis_usados, emails_usados = set(), set()
+        for inicio in range(0, len(clientes), 500):
+            chunk = clientes[inicio:inicio + 500]
+            marcadores = ",".join(["?"] * len(chunk))
+            sql = f"SELECT dni, email FROM {self.tabla} WHERE dni IN ({marcadores}) OR email IN ({marcadores})"
+            for dni, email in self._consultar(sql, [c.dni for c in chunk] + [c.email for c in chunk]):
+                dnis_usados.add(dni)
+                emails_usados.add(email)
+
+        filas, indices, errores = [], [], []
+        for indice, cliente in enumerate(clientes):
+            if cliente.dni in dnis_usados or cliente.email in emails_usados:
+                errores.append((indice, "Ya existe un cliente con el mismo DNI o email."))
+                continue
+            dnis_usados.add(cliente.dni)
+            emails_usados.add(cliente.email)
+            filas.append((cliente.nombre, cliente.apellido, cliente.dni,
+                          cliente.direccion, cliente.telefono, cliente.email))
+            indices.append(indice)
+
+        insertados, errores_bd = self.insertar_lote(filas)
+        errores += [(indices[i], mensaje) for i, mensaje in errores_bd]
+        return insertados, sorted(errores)
+
     # Listar todos los clientes existentes
     def listar_clientes(self):
         """ Retorna una LISTA DE OBJETOS Cliente. """
@@ -67,6 +97,19 @@ class ClienteCRUD(ORMBase):
         # 2. "Ensamblamos" cada tupla en un objeto Cliente
         return [self._build_cliente(tupla) for tupla in tuplas]
 
+    def listar_pagina(self, **opciones):
+        """
+        Retorna (LISTA DE OBJETOS Cliente, cursor siguiente o None).
+        Opciones: limite, despues, filtros, orden (ver ORMBase.obtener_pagina).
+        """
+        tuplas, cursor = self.obtener_pagina(**opciones)
+        objetos = (self._build_cliente(t) for t in tuplas)
+        return [o for o in objetos if o], cursor
+
+    def iterar(self):
+        """ Generador de OBJETOS Cliente leídos de a lotes (para respuestas en streaming). """
+        return self._iterar_objetos(self.iterar_filas(), self._build_cliente)
+
     def buscar_por_id(self, id_cliente):
         """ Retorna UN OBJETO Cliente o None. """
         # 1. Obtenemos la tupla cruda
@@ -83,16 +126,12 @@ class ClienteCRUD(ORMBase):
             FROM {self.tabla}
             WHERE nombre LIKE ? OR apellido LIKE ? OR dni = ?
         """
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            patron = f"%{valor_busqueda}%"
-            cursor.execute(sql, (patron, patron, valor_busqueda))
-            
-            # 1. Obtenemos las tuplas crudas
-            tuplas = cursor.fetchall()
-            
-            # 2. "Ensamblamos" cada tupla en un objeto Cliente
-            return [self._build_cliente(tupla) for tupla in tuplas]
+        patron = f"%{valor_busqueda}%"
+        # 1. Obtenemos las tuplas crudas
+        tuplas = self._consultar(sql, (patron, patron, valor_busqueda))
+
+        # 2. "Ensamblamos" cada tupla en un objeto Cliente
+        return [self._build_cliente(tupla) for tupla in tuplas]
 
     # Actualizar un cliente existente
     def actualizar_cliente(self, cliente: Cliente):
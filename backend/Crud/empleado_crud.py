@@ -1,6 +1,9 @@
+import logging
 from orm_base import ORMBase
 from clases.empleado import Empleado 
 
+logger = logging.getLogger(__name__)
+
 class EmpleadoCRUD(ORMBase):
     tabla = "EMPLEADO"
     campos = ["nombre", "apellido", "dni", "puesto", "id_supervisor"]
@@ -16,30 +19,26 @@ class EmpleadoCRUD(ORMBase):
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         # El ORMBase.obtener_... devuelve (pk, campo1, campo2, ...)
         # (id_empleado, nombre, apellido, dni, puesto, id_supervisor)
         try:
-            return Empleado(
-                id_empleado=tupla[0],
-                nombre=tupla[1],
-                apellido=tupla[2],
-                dni=tupla[3],
-                puesto=tupla[4],
-                id_supervisor=tupla[5]
-            )
+            # Carga de confianza: los datos de la BDD ya fueron validados al guardarse
+            return self._registrar_entidad(tupla[0], Empleado.desde_bd(*tupla))
         except Exception as e:
-            print(f"Error al ensamblar Empleado desde tupla {tupla}: {e}")
+            logger.error("Error al ensamblar Empleado.", extra={"tupla": tupla, "error": str(e)})
             return None
 
     # Verificar si existe un empleado con el mismo DNI
     def existe_duplicado(self, dni):
         sql = f"SELECT COUNT(*) FROM {self.tabla} WHERE dni=?"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (dni,))
-            cantidad = cursor.fetchone()[0]
-            return cantidad > 0
+        cantidad = self._consultar(sql, (dni,), una=True)[0]
+        return cantidad > 0
 
     # Crear un nuevo empleado
     def crear_empleado(self, empleado: Empleado):
@@ -59,6 +58,15 @@ class EmpleadoCRUD(ORMBase):
         tuplas = self.obtener_todos()
         return [self._build_empleado(t) for t in tuplas if self._build_empleado(t)]
 
+    def listar_pagina(self, **opciones):
+        """
+        Retorna (LISTA DE OBJETOS Empleado, cursor siguiente o None).
+        Opciones: limite, despues, filtros, orden (ver ORMBase.obtener_pagina).
+        """
+        tuplas, cursor = self.obtener_pagina(**opciones)
+        objetos = (self._build_empleado(t) for t in tuplas)
+        return [o for o in objetos if o], cursor
+
     # --- ¡ARREGLADO! ---
     def buscar_por_id(self, id_empleado):
         """ Retorna UN OBJETO Empleado o None. """
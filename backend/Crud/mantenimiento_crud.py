@@ -1,15 +1,30 @@
 # --- Archivo: Crud/mantenimiento_crud.py ---
 
+import logging
 from orm_base import ORMBase
 from clases.mantenimiento import Mantenimiento
 from Crud.vehiculo_crud import VehiculoCRUD # Necesitamos la "fábrica" de Vehiculos
 from datetime import date
 
+logger = logging.getLogger(__name__)
+
 class MantenimientoCRUD(ORMBase):
     tabla = "MANTENIMIENTO"
     campos = ["patente", "fecha_inicio", "fecha_fin", "tipo_servicio", "costo"]
     clave_primaria = "id_mantenimiento"
 
+    # Exportación CSV/XLSX (ver ORMBase.iterar_exportacion)
+    select_exportacion = """
+        SELECT m.id_mantenimiento, m.patente, v.marca, v.modelo,
+               m.fecha_inicio, m.fecha_fin, m.tipo_servicio, m.costo
+        FROM MANTENIMIENTO m
+        LEFT JOIN VEHICULO v ON v.patente = m.patente"""
+    columnas_exportacion = ["id_mantenimiento", "patente", "marca", "modelo",
+                            "fecha_inicio", "fecha_fin", "tipo_servicio", "costo"]
+    fecha_exportacion = "m.fecha_inicio"
+    # Disponibilidad (ver indice_ocupacion.py)
+    intervalo_ocupacion = ("fecha_inicio", "fecha_fin")
+
     def __init__(self):
         super().__init__()
         # El DAO de Mantenimiento necesita el DAO de Vehiculo para "ensamblar"
@@ -22,6 +37,11 @@ class MantenimientoCRUD(ORMBase):
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         try:
             # 1. El ORMBase devuelve (pk, campo1, campo2, ...)
@@ -37,20 +57,22 @@ class MantenimientoCRUD(ORMBase):
             vehiculo = self.vehiculo_dao.buscar_por_id(patente)
             if not vehiculo:
                 # El vehículo fue borrado, es un dato huérfano
-                print(f"Error de integridad: No se encontró Vehiculo {patente} para Mantenimiento {id_mantenimiento}")
+                logger.error("Error de integridad: no se encontró el Vehiculo del Mantenimiento.",
+                             extra={"id_mantenimiento": id_mantenimiento, "patente": patente})
                 return None
 
             # 3. Ensamblamos el Mantenimiento
-            return Mantenimiento(
+            # (carga de confianza: sin volver a validar)
+            return self._registrar_entidad(tupla[0], Mantenimiento.desde_bd(
                 id_mantenimiento=id_mantenimiento,
                 fecha_inicio=fecha_inicio,
                 fecha_fin=fecha_fin,
                 tipo_servicio=tipo_servicio,
                 costo=costo,
                 vehiculo=vehiculo # Pasamos el objeto Vehiculo completo
-            )
+            ))
         except Exception as e:
-            print(f"Error ensamblando Mantenimiento {tupla[0]}: {e}")
+            logger.error("Error ensamblando Mantenimiento.", extra={"id_mantenimiento": tupla[0], "error": str(e)})
             return None
     # -----------------------------------------------
 
@@ -75,6 +97,19 @@ class MantenimientoCRUD(ORMBase):
         tuplas = self.obtener_todos()
         return [self._build_mantenimiento(t) for t in tuplas if self._build_mantenimiento(t)]
 
+    def listar_pagina(self, **opciones):
+        """
+        Retorna (LISTA DE OBJETOS Mantenimiento, cursor siguiente o None).
+        Opciones: limite, despues, filtros, orden (ver ORMBase.obtener_pagina).
+        """
+        tuplas, cursor = self.obtener_pagina(**opciones)
+        objetos = (self._build_mantenimiento(t) for t in tuplas)
+        return [o for o in objetos if o], cursor
+
+    def iterar(self):
+        """ Generador de OBJETOS Mantenimiento leídos de a lotes (para respuestas en streaming). """
+        return self._iterar_objetos(self.iterar_filas(), self._build_mantenimiento)
+
     def buscar_por_id(self, id_mantenimiento):
         """ Retorna UN OBJETO Mantenimiento o None. """
         tupla = self.obtener_por_id(id_mantenimiento)
@@ -82,8 +117,7 @@ class MantenimientoCRUD(ORMBase):
     
     def buscar_por_patente(self, patente):
         """ Retorna una LISTA de Mantenimientos para un vehículo. """
-        condicion = f"patente = '{patente}'" # Cuidado con la Inyección SQL si no confías en la patente
-        tuplas = self.obtener_por_condicion(condicion)
+        tuplas = self.consulta().donde("patente", patente).todas()
         return [self._build_mantenimiento(t) for t in tuplas if self._build_mantenimiento(t)]
 
     def actualizar_mantenimiento(self, mantenimiento: Mantenimiento):
@@ -1,15 +1,29 @@
 # --- Archivo: Crud/multa_crud.py ---
 
+import logging
 from orm_base import ORMBase
 from clases.multa import MultaDano
 from Crud.alquiler_crud import AlquilerCRUD # ¡Necesitamos la fábrica de Alquileres!
 from datetime import date
 
+logger = logging.getLogger(__name__)
+
 class MultaCRUD(ORMBase):
     tabla = "MULTA_DANO"
     campos = ["id_alquiler", "descripcion", "monto", "fecha_incidente"]
     clave_primaria = "id_multa"
 
+    # Exportación CSV/XLSX (ver ORMBase.iterar_exportacion)
+    select_exportacion = """
+        SELECT m.id_multa, m.fecha_incidente, m.descripcion, m.monto,
+               m.id_alquiler, a.patente, a.id_cliente, c.nombre || ' ' || c.apellido
+        FROM MULTA_DANO m
+        LEFT JOIN ALQUILER a ON a.id_alquiler = m.id_alquiler
+        LEFT JOIN CLIENTE c ON c.id_cliente = a.id_cliente"""
+    columnas_exportacion = ["id_multa", "fecha_incidente", "descripcion", "monto",
+                            "id_alquiler", "patente", "id_cliente", "cliente"]
+    fecha_exportacion = "m.fecha_incidente"
+
     def __init__(self):
         super().__init__()
         # El DAO de Multa necesita el DAO de Alquiler para "ensamblar"
@@ -22,6 +36,11 @@ class MultaCRUD(ORMBase):
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         try:
             # 1. El ORMBase devuelve (pk, campo1, campo2, ...)
@@ -37,19 +56,21 @@ class MultaCRUD(ORMBase):
             alquiler_obj = self.alquiler_dao.buscar_por_id(id_alquiler)
             
             if not alquiler_obj:
-                print(f"Error de integridad: No se encontró Alquiler {id_alquiler} para Multa {id_multa}")
+                logger.error("Error de integridad: no se encontró el Alquiler de la Multa.",
+                             extra={"id_multa": id_multa, "id_alquiler": id_alquiler})
                 return None
 
             # 3. Ensamblamos la Multa
-            return MultaDano(
+            # (carga de confianza: sin volver a validar)
+            return self._registrar_entidad(tupla[0], MultaDano.desde_bd(
                 id_multa=id_multa,
                 descripcion=descripcion,
                 monto=monto,
                 fecha_incidente=fecha_incidente,
                 alquiler=alquiler_obj # Pasamos el objeto completo
-            )
+            ))
         except Exception as e:
-            print(f"Error ensamblando Multa {tupla[0]}: {e}")
+            logger.error("Error ensamblando Multa.", extra={"id_multa": tupla[0], "error": str(e)})
             return None
     # -----------------------------------------------
 
@@ -72,12 +93,9 @@ class MultaCRUD(ORMBase):
             JOIN ALQUILER a ON m.id_alquiler = a.id_alquiler
             WHERE a.id_cliente = ?
         """
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (id_cliente,))
-            tuplas = cursor.fetchall()
-            # Usamos el ensamblador
-            return [self._build_multa(t) for t in tuplas if self._build_multa(t)]
+        tuplas = self._consultar(sql, (id_cliente,))
+        # Usamos el ensamblador
+        return [self._build_multa(t) for t in tuplas if self._build_multa(t)]
     
     # --- ¡ARREGLADO! ---
     def buscar_por_patente(self, patente: str):
@@ -88,12 +106,9 @@ class MultaCRUD(ORMBase):
             JOIN ALQUILER a ON m.id_alquiler = a.id_alquiler
             WHERE a.patente = ?
         """
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (patente,))
-            tuplas = cursor.fetchall()
-            # Usamos el ensamblador
-            return [self._build_multa(t) for t in tuplas if self._build_multa(t)]
+        tuplas = self._consultar(sql, (patente,))
+        # Usamos el ensamblador
+        return [self._build_multa(t) for t in tuplas if self._build_multa(t)]
     
     # --- ¡ARREGLADO! ---
     def buscar_por_id(self, id_multa: int):
@@ -0,0 +1,51 @@
+# --- Archivo: Crud/reporte_archivo_crud.py ---
+#
+# Metadatos de los archivos de reportes (tabla REPORTE_ARCHIVO).
+# Lo usa almacen_reportes.py para aplicar el presupuesto de disco.
+
+from orm_base import ORMBase
+
+
+class ReporteArchivoCRUD(ORMBase):
+    tabla = "REPORTE_ARCHIVO"
+    campos = ["tipo", "parametros", "bytes", "render_ms", "creado_en", "ultimo_acceso", "accesos", "orden"]
+    clave_primaria = "nombre"
+
+    def __init__(self):
+        super().__init__()
+
+    # 'orden' del LRU: el siguiente al más reciente, o el anterior al más
+    # viejo. Se calcula dentro del INSERT/UPDATE: dos altas o descargas
+    # simultáneas (aunque sean de otro proceso) nunca reciben el mismo.
+    _ORDEN_ULTIMO = "(SELECT COALESCE(MAX(orden), 0) + 1 FROM {tabla})"
+    _ORDEN_PRIMERO = "(SELECT COALESCE(MIN(orden), 1) - 1 FROM {tabla})"
+
+    def registrar(self, nombre, tipo, parametros, tamano, render_ms, ahora, reciente=True):
+        """
+        Alta (o reemplazo, si se volvió a escribir el mismo archivo) de un reporte.
+        reciente=False lo anota como el menos usado (ej. un archivo suelto viejo).
+        """
+        # La pk es el nombre del archivo: va en el INSERT.
+        sql = self._sql(("registrar", reciente), lambda: (
+            f"INSERT OR REPLACE INTO {self.tabla} ({self.clave_primaria}, {', '.join(self.campos)}) "
+            f"VALUES ({', '.join(['?'] * len(self.campos))}, "
+            f"{(self._ORDEN_ULTIMO if reciente else self._ORDEN_PRIMERO).format(tabla=self.tabla)})"))
+        self._ejecutar(sql, (nombre, tipo, parametros, tamano, render_ms, ahora, ahora, 0))
+
+    def tocar(self, nombre, ahora):
+        """ Anota una descarga (pasa a ser el más reciente). Retorna False si el reporte no está registrado. """
+        sql = self._sql("tocar", lambda: (
+            f"UPDATE {self.tabla} SET ultimo_acceso = ?, accesos = accesos + 1, "
+            f"orden = {self._ORDEN_ULTIMO.format(tabla=self.tabla)} "
+            f"WHERE {self.clave_primaria} = ?"))
+        return self._ejecutar(sql, (ahora, nombre)).rowcount > 0
+
+    def listar_por_acceso(self):
+        """ LISTA de (nombre, bytes, creado_en, ultimo_acceso), del menos al más recientemente usado. """
+        return (self.consulta().columnas("nombre", "bytes", "creado_en", "ultimo_acceso")
+                .ordenar("orden").todas())
+
+    def totales(self):
+        """ (cantidad de archivos, bytes en total). """
+        sql = self._sql("totales", lambda: f"SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM {self.tabla}")
+        return self._consultar(sql, una=True)
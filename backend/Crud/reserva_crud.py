@@ -1,17 +1,24 @@
 # --- Archivo: Crud/reserva_crud.py ---
 
+import logging
 from orm_base import ORMBase
 from clases.reserva import Reserva
 # ¡Necesitamos las "fábricas" de Cliente y Vehiculo!
 from Crud.cliente_crud import ClienteCRUD
 from Crud.vehiculo_crud import VehiculoCRUD
+from Crud.mantenimiento_crud import MantenimientoCRUD
+from orm_base import TAMANO_CHUNK
 from datetime import date
 
+logger = logging.getLogger(__name__)
+
 class ReservaCRUD(ORMBase):
     tabla = "RESERVA"
     campos = ["patente", "id_cliente", "fecha_reserva", 
               "fecha_inicio_deseada", "fecha_fin_deseada"]
     clave_primaria = "id_reserva"
+    # Disponibilidad (ver indice_ocupacion.py); las reservas sin patente no ocupan
+    intervalo_ocupacion = ("fecha_inicio_deseada", "fecha_fin_deseada")
 
     def __init__(self):
         super().__init__()
@@ -26,6 +33,11 @@ class ReservaCRUD(ORMBase):
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         try:
             # 1. El ORMBase devuelve (pk, campo1, campo2, ...)
@@ -40,7 +52,8 @@ class ReservaCRUD(ORMBase):
             # 2. Ensamblamos el Cliente (obligatorio)
             cliente = self.cliente_dao.buscar_por_id(id_cliente)
             if not cliente:
-                print(f"Error de integridad: No se encontró Cliente {id_cliente} para Reserva {id_reserva}")
+                logger.error("Error de integridad: no se encontró el Cliente de la Reserva.",
+                             extra={"id_reserva": id_reserva, "id_cliente": id_cliente})
                 return None
 
             # 3. Ensamblamos el Vehiculo (opcional)
@@ -50,32 +63,26 @@ class ReservaCRUD(ORMBase):
                 # No es un error de integridad si el vehículo es None,
                 # pero sí lo es si la patente existe y el vehículo fue borrado.
                 if not vehiculo:
-                     print(f"Advertencia: No se encontró Vehiculo {patente} para Reserva {id_reserva}")
+                     logger.warning("No se encontró el Vehiculo de la Reserva.",
+                                    extra={"id_reserva": id_reserva, "patente": patente})
 
             # 4. Ensamblamos la Reserva
-            return Reserva(
+            # (carga de confianza: sin validar ni marcar el vehículo)
+            return self._registrar_entidad(tupla[0], Reserva.desde_bd(
                 id_reserva=id_reserva,
                 fecha_reserva=fecha_reserva,
                 fecha_inicio_deseada=fecha_inicio,
                 fecha_fin_deseada=fecha_fin,
                 cliente=cliente,  # Pasamos el objeto Cliente
                 vehiculo=vehiculo # Pasamos el objeto Vehiculo (o None)
-            )
+            ))
         except Exception as e:
-            print(f"Error ensamblando Reserva {tupla[0]}: {e}")
+            logger.error("Error ensamblando Reserva.", extra={"id_reserva": tupla[0], "error": str(e)})
             return None
     # -----------------------------------------------
 
     def crear_reserva(self, reserva: Reserva):
-        # (Tu código está perfecto)
-        valores = [
-            reserva.vehiculo.patente if reserva.vehiculo else None,
-            reserva.cliente.id_cliente,
-            reserva.fecha_reserva,
-            reserva.fecha_inicio_deseada,
-            reserva.fecha_fin_deseada
-        ]
-        return self.insertar(valores)
+        return self.insertar(self._valores(reserva))
     
     # --- ¡ARREGLADO! ---
     def listar_reservas(self):
@@ -83,6 +90,19 @@ class ReservaCRUD(ORMBase):
         tuplas = self.obtener_todos()
         return [self._build_reserva(t) for t in tuplas if self._build_reserva(t)]
 
+    def listar_pagina(self, **opciones):
+        """
+        Retorna (LISTA DE OBJETOS Reserva, cursor siguiente o None).
+        Opciones: limite, despues, filtros, orden (ver ORMBase.obtener_pagina).
+        """
+        tuplas, cursor = self.obtener_pagina(**opciones)
+        objetos = (self._build_reserva(t) for t in tuplas)
+        return [o for o in objetos if o], cursor
+
+    def iterar(self):
+        """ Generador de OBJETOS Reserva leídos de a lotes (para respuestas en streaming). """
+        return self._iterar_objetos(self.iterar_filas(), self._build_reserva)
+
     # --- ¡ARREGLADO! ---
     def buscar_por_id(self, id_reserva):
         """ Retorna UN OBJETO Reserva o None. """
@@ -92,18 +112,114 @@ class ReservaCRUD(ORMBase):
     # --- ¡ARREGLADO! ---
     def buscar_por_cliente(self, id_cliente):
         """ Retorna una LISTA DE OBJETOS Reserva. """
-        condicion = f"id_cliente = {id_cliente}"
-        tuplas = self.obtener_por_condicion(condicion)
+        tuplas = self.consulta().donde("id_cliente", id_cliente).todas()
         return [self._build_reserva(t) for t in tuplas if self._build_reserva(t)]
     
-    def actualizar_reserva(self, reserva: Reserva):
-        # (Tu código está perfecto)
-        valores = [
+    def _valores(self, reserva: Reserva):
+        """ Los valores de 'campos', en orden. """
+        return [
             reserva.vehiculo.patente if reserva.vehiculo else None,
-            # ... (etc) ...
+            reserva.cliente.id_cliente,
+            reserva.fecha_reserva,
+            reserva.fecha_inicio_deseada,
             reserva.fecha_fin_deseada
         ]
-        self.actualizar(reserva.id_reserva, valores)
+
+    def actualizar_reserva(self, reserva: Reserva):
+        self.actualizar(reserva.id_reserva, self._valores(reserva))
+
+    # --- Reservas sin solapamientos ---
+    # Ocupan el vehículo para una reserva: un alquiler, un mantenimiento u
+    # OTRA reserva (:id_reserva es la propia al modificarla; NULL al crearla).
+    @classmethod
+    def _sql_ocupado(cls):
+        def construir():
+            from Crud.alquiler_crud import AlquilerCRUD  # (alquiler_crud importa este módulo)
+            return (f"{AlquilerCRUD.sql_solapamiento()} OR {MantenimientoCRUD.sql_solapamiento()} "
+                    f"OR {cls.sql_solapamiento(f'{cls.clave_primaria} IS NOT :id_reserva')}")
+        return cls._sql("ocupado", construir)
+
+    def _parametros(self, reserva: Reserva):
+        return {
+            "id_reserva": reserva.id_reserva,
+            "patente": reserva.vehiculo.patente if reserva.vehiculo else None,
+            "id_cliente": reserva.cliente.id_cliente,
+            "fecha_reserva": reserva.fecha_reserva,
+            "desde": reserva.fecha_inicio_deseada,
+            "hasta": reserva.fecha_fin_deseada,
+        }
+
+    def crear_si_libre(self, reserva: Reserva):
+        """
+        Inserta la reserva SOLO si su vehículo no está ocupado en esas fechas
+        (ver _sql_ocupado): chequeo e INSERT en una sola sentencia, dentro de
+        una transacción BEGIN IMMEDIATE (o de la que ya esté abierta).
+        Una reserva sin vehículo no ocupa nada: se inserta siempre.
+        Retorna el id nuevo, o None si el vehículo estaba ocupado.
+        """
+        sql = self._sql("crear_si_libre", lambda: f"""
+            INSERT INTO {self.tabla} ({', '.join(self.campos)})
+            SELECT :patente, :id_cliente, :fecha_reserva, :desde, :hasta
+            WHERE :patente IS NULL OR NOT ({self._sql_ocupado()})
+            RETURNING {self.clave_primaria}
+        """)
+        with self.conexion.transaccion(inmediata=True):
+            fila = self._ejecutar(sql, self._parametros(reserva)).fetchone()
+        return fila[0] if fila else None
+
+    def actualizar_si_libre(self, reserva: Reserva):
+        """
+        Como actualizar_reserva(), pero SOLO si con los datos nuevos el vehículo
+        no queda ocupado dos veces (sin contar la misma reserva).
+        Retorna False si no se guardó (vehículo ocupado o la reserva no existe).
+        """
+        sql = self._sql("actualizar_si_libre", lambda: f"""
+            UPDATE {self.tabla}
+            SET patente = :patente, id_cliente = :id_cliente, fecha_reserva = :fecha_reserva,
+                fecha_inicio_deseada = :desde, fecha_fin_deseada = :hasta
+            WHERE {self.clave_primaria} = :id_reserva
+              AND (:patente IS NULL OR NOT ({self._sql_ocupado()}))
+        """)
+        with self.conexion.transaccion(inmediata=True):
+            cursor = self._ejecutar(sql, self._parametros(reserva))
+        self._descartar_de_mapa(reserva.id_reserva)
+        return cursor.rowcount == 1
+
+    # --- Verificación en lote ---
+    @classmethod
+    def _sql_conflictos(cls, tamano):
+        def construir():
+            from Crud.alquiler_crud import AlquilerCRUD
+            valores = ", ".join(["(?, ?, ?, ?, ?)"] * tamano)
+            return (
+                f"WITH candidata(indice, patente, desde, hasta, id_reserva) AS (VALUES {valores}) "
+                f"{AlquilerCRUD.sql_solapadas_con('candidata')} "
+                f"UNION ALL {MantenimientoCRUD.sql_solapadas_con('candidata')} "
+                f"UNION ALL {cls.sql_solapadas_con('candidata', f't.{cls.clave_primaria} IS NOT c.id_reserva')} "
+                f"ORDER BY 1, 4")
+        return cls._sql(("conflictos", tamano), construir)
+
+    def conflictos(self, candidatas, tamano_chunk=TAMANO_CHUNK):
+        """
+        'candidatas': LISTA de (patente, desde, hasta, id_reserva o None), fechas
+        ISO; id_reserva es la reserva que se está modificando (no choca consigo).
+        Retorna una LISTA paralela: para cada candidata, los (tabla, id, inicio,
+        fin) de ALQUILER, MANTENIMIENTO y RESERVA que se le pisan, por inicio.
+        Una sola consulta por cada 'tamano_chunk' candidatas.
+        """
+        resultado = [[] for _ in candidatas]
+        for base in range(0, len(candidatas), tamano_chunk):
+            chunk = candidatas[base:base + tamano_chunk]
+            # Se completa hasta una potencia de 2 (pocas sentencias distintas
+            # en el caché) con filas sin patente, que no se pisan con nada.
+            tamano = 1 << (len(chunk) - 1).bit_length()
+            parametros = []
+            for i, (patente, desde, hasta, id_reserva) in enumerate(chunk, start=base):
+                parametros += [i, patente, desde, hasta, id_reserva]
+            parametros += [None] * (5 * (tamano - len(chunk)))
+            for indice, tabla, clave, inicio, fin in self._consultar(self._sql_conflictos(tamano), parametros):
+                resultado[indice].append((tabla, clave, inicio, fin))
+        return resultado
 
     def eliminar_reserva(self, id_reserva):
         # (Tu código está perfecto)
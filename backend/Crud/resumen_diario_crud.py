@@ -0,0 +1,139 @@
+# --- Archivo: Crud/resumen_diario_crud.py ---
+#
+# Resumen diario de alquileres: una fila por (día de inicio, patente) con
+#   alquileres     cantidad de alquileres que empiezan ese día
+#   facturacion    suma de su costo_total
+#   dias_alquiler  suma de sus días (fecha_fin - fecha_inicio)
+# Lo mantiene AlquilerService con sumar()/restar(), en la misma transacción
+# que la escritura en ALQUILER. Los reportes por período y el ranking de
+# vehículos leen de esta tabla: un rango de días, no todo el historial.
+
+from datetime import date
+from orm_base import ORMBase
+from Crud.version_datos_crud import VersionDatosCRUD
+
+
+class ResumenDiarioCRUD(ORMBase):
+    tabla = "ALQUILER_RESUMEN_DIARIO"
+    # (La clave real es (dia, patente): no usar obtener_por_id/actualizar/eliminar)
+    campos = ["patente", "alquileres", "facturacion", "dias_alquiler"]
+    clave_primaria = "dia"
+
+    def __init__(self):
+        super().__init__()
+
+    # --- Mantenimiento incremental ---
+    @staticmethod
+    def valores_de(alquiler):
+        """ (dia, patente, costo, días) con los que un Alquiler cuenta en el resumen. """
+        return (alquiler.fecha_inicio.isoformat(), alquiler.vehiculo.patente,
+                alquiler.costo_total, (alquiler.fecha_fin - alquiler.fecha_inicio).days)
+
+    def _aplicar(self, valores, signo):
+        dia, patente, costo, dias = valores
+        sql = self._sql("aplicar", lambda: f"""
+            INSERT INTO {self.tabla} (dia, patente, alquileres, facturacion, dias_alquiler)
+            VALUES (?, ?, ?, ROUND(?, 2), ?)
+            ON CONFLICT (dia, patente) DO UPDATE SET
+                alquileres = alquileres + excluded.alquileres,
+                facturacion = ROUND(facturacion + excluded.facturacion, 2),
+                dias_alquiler = dias_alquiler + excluded.dias_alquiler
+        """)
+        self._ejecutar(sql, (dia, patente, signo, signo * costo, signo * dias))
+        if signo < 0:
+            # El día quedó sin alquileres de esa patente: la fila no hace falta
+            sql = self._sql("limpiar", lambda: (
+                f"DELETE FROM {self.tabla} WHERE dia = ? AND patente = ? AND alquileres <= 0"))
+            self._ejecutar(sql, (dia, patente))
+
+    def sumar(self, valores):
+        """ Suma un alquiler (ver valores_de()). Usar dentro de la transacción de la escritura. """
+        self._aplicar(valores, 1)
+
+    def restar(self, valores):
+        """ Resta un alquiler (ver valores_de()). Usar dentro de la transacción de la escritura. """
+        self._aplicar(valores, -1)
+
+    def reconstruir(self):
+        """
+        Vuelve a calcular todo el resumen desde ALQUILER, en una transacción.
+        Retorna la cantidad de filas (día, patente) que quedaron.
+        Sube la versión de ALQUILER (ver cache_reportes.py): los reportes en
+        caché de cualquier proceso se calcularon con el resumen anterior.
+        """
+        with self.conexion.transaccion():
+            VersionDatosCRUD().subir("ALQUILER")
+            self._ejecutar(f"DELETE FROM {self.tabla}")
+            cursor = self._ejecutar(f"""
+                INSERT INTO {self.tabla} (dia, patente, alquileres, facturacion, dias_alquiler)
+                SELECT fecha_inicio, patente, COUNT(*), ROUND(COALESCE(SUM(costo_total), 0), 2),
+                       COALESCE(SUM(CAST(julianday(fecha_fin) - julianday(fecha_inicio) AS INTEGER)), 0)
+                FROM ALQUILER
+                GROUP BY fecha_inicio, patente
+            """)
+        return cursor.rowcount
+
+    # --- Agregados para reportes ---
+    _PERIODO_MES = "CAST(strftime('%m', dia) AS INTEGER)"
+    _PERIODO_TRIMESTRE = "(CAST(strftime('%m', dia) AS INTEGER) + 2) / 3"
+
+    def resumen_por_periodo(self, anio: int, trimestral: bool = False):
+        """
+        Cantidad de alquileres y facturación de un año, agrupados por mes (1..12)
+        o trimestre (1..4) según la fecha de inicio.
+        Retorna un DICT {periodo: (cantidad, total)}; los períodos sin alquileres no aparecen.
+        Lee solo los días del año pedido (rango de la clave primaria).
+        """
+        periodo = self._PERIODO_TRIMESTRE if trimestral else self._PERIODO_MES
+        sql = self._sql(("resumen_por_periodo", trimestral), lambda: f"""
+            SELECT {periodo} AS periodo, SUM(alquileres), ROUND(SUM(facturacion), 2)
+            FROM {self.tabla}
+            WHERE dia >= ? AND dia < ?
+            GROUP BY periodo
+        """)
+        filas = self._consultar(sql, (date(anio, 1, 1).isoformat(), date(anio + 1, 1, 1).isoformat()))
+        return {periodo: (cantidad, total) for periodo, cantidad, total in filas}
+
+    def ranking_vehiculos(self, limite=None, desde=None, hasta=None):
+        """
+        Vehículos ordenados por cantidad de alquileres (desempata la patente),
+        opcionalmente solo los alquileres con fecha de inicio entre 'desde' y 'hasta' (ISO, inclusive).
+        Con 'limite', si hay más vehículos que 'limite', los primeros limite-1 van
+        solos y el resto se suma en una última fila "Otros".
+        Retorna una LISTA de (patente, marca, modelo, cantidad, otros): en las filas
+        normales otros = 0 (marca/modelo None si el vehículo ya no existe); en la
+        fila "Otros", patente/marca/modelo son None y otros = cuántos vehículos suma.
+        """
+        rango = (desde is not None, hasta is not None)
+
+        def construir():
+            condiciones = [c for c, usar in zip(("r.dia >= :desde", "r.dia <= :hasta"), rango) if usar]
+            where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+            return f"""
+                WITH conteo AS (
+                    SELECT r.patente, v.marca, v.modelo, SUM(r.alquileres) AS cantidad
+                    FROM {self.tabla} r
+                    LEFT JOIN VEHICULO v ON v.patente = r.patente
+                    {where}
+                    GROUP BY r.patente
+                ), ranking AS (
+                    SELECT *, ROW_NUMBER() OVER (ORDER BY cantidad DESC, patente) AS puesto,
+                           COUNT(*) OVER () AS vehiculos
+                    FROM conteo
+                ), corte AS (
+                    SELECT ranking.*, CASE WHEN :limite IS NULL THEN puesto
+                                           WHEN vehiculos > :limite THEN :limite - 1
+                                           ELSE :limite END AS ultimo
+                    FROM ranking
+                )
+                SELECT patente, marca, modelo, cantidad, 0 AS otros FROM corte WHERE puesto <= ultimo
+                UNION ALL
+                SELECT NULL, NULL, NULL, SUM(cantidad), COUNT(*) FROM corte WHERE puesto > ultimo
+                HAVING COUNT(*) > 0
+                ORDER BY otros, cantidad DESC, patente
+            """
+
+        sql = self._sql(("ranking_vehiculos", rango), construir)
+        parametros = {"limite": limite or None}
+        parametros.update({k: v for k, v in (("desde", desde), ("hasta", hasta)) if v is not None})
+        return self._consultar(sql, parametros)
@@ -0,0 +1,88 @@
+# --- Archivo: Crud/trabajo_reporte_crud.py ---
+
+import json
+import logging
+from datetime import datetime
+from orm_base import ORMBase
+from clases.trabajo_reporte import TrabajoReporte, PENDIENTE, EN_PROCESO
+
+logger = logging.getLogger(__name__)
+
+
+def _ahora():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class TrabajoReporteCRUD(ORMBase):
+    tabla = "TRABAJO_REPORTE"
+    campos = ["tipo", "parametros", "estado", "url", "error", "codigo_error", "creado_en", "actualizado_en"]
+    clave_primaria = "id_trabajo"
+
+    def __init__(self):
+        super().__init__()
+
+    def _build_trabajo(self, tupla):
+        if not tupla:
+            return None
+        try:
+            return TrabajoReporte.desde_bd(*tupla)
+        except Exception as e:
+            logger.error("Error ensamblando TrabajoReporte.", extra={"id_trabajo": tupla[0], "error": str(e)})
+            return None
+
+    def crear_trabajo(self, trabajo: TrabajoReporte):
+        # La pk no es autoincremental (es un uuid): va en el INSERT.
+        sql = self._sql("crear", lambda: (
+            f"INSERT INTO {self.tabla} ({self.clave_primaria}, {', '.join(self.campos)}) "
+            f"VALUES ({', '.join(['?'] * (len(self.campos) + 1))})"))
+        self._ejecutar(sql, (
+            trabajo.id_trabajo, trabajo.tipo, json.dumps(trabajo.parametros), trabajo.estado,
+            trabajo.url, trabajo.error, trabajo.codigo_error, trabajo.creado_en, trabajo.actualizado_en))
+        return trabajo.id_trabajo
+
+    def buscar_por_id(self, id_trabajo):
+        """ Retorna UN OBJETO TrabajoReporte o None. """
+        return self._build_trabajo(self.obtener_por_id(id_trabajo))
+
+    def buscar_abandonados(self, antes_de):
+        """
+        Trabajos sin terminar (PENDIENTE o EN_PROCESO) cuya última
+        actualización es anterior a 'antes_de' (ISO): el proceso que los
+        tenía dejó de latir (ver latir()). LISTA DE OBJETOS, del más viejo al más nuevo.
+        """
+        tuplas = (self.consulta().en("estado", [PENDIENTE, EN_PROCESO])
+                  .donde("actualizado_en", antes_de, "<").ordenar("creado_en").todas())
+        return [t for t in map(self._build_trabajo, tuplas) if t]
+
+    def latir(self, ids_trabajo):
+        """
+        Renueva actualizado_en de los trabajos que este proceso todavía tiene
+        en curso, así los demás procesos no los toman por abandonados.
+        """
+        sql = self._sql("latir", lambda: (
+            f"UPDATE {self.tabla} SET actualizado_en = ? "
+            f"WHERE {self.clave_primaria} = ? AND estado IN (?, ?)"))
+        ahora = _ahora()
+        self._ejecutar(sql, [(ahora, id_trabajo, PENDIENTE, EN_PROCESO) for id_trabajo in ids_trabajo],
+                       muchos=True)
+
+    def actualizar_estado(self, id_trabajo, estado, url=None, error=None, codigo_error=None):
+        sql = self._sql("estado", lambda: (
+            f"UPDATE {self.tabla} SET estado = ?, url = ?, error = ?, codigo_error = ?, actualizado_en = ? "
+            f"WHERE {self.clave_primaria} = ?"))
+        self._ejecutar(sql, (estado, url, error, codigo_error, _ahora(), id_trabajo))
+
+    def reclamar(self, trabajo: TrabajoReporte):
+        """
+        Marca 'trabajo' como EN_PROCESO solo si en la base sigue igual que
+        cuando se leyó (mismo estado y misma fecha de actualización).
+        Retorna True si este proceso se quedó con el trabajo; False si otro
+        ya lo reclamó o lo terminó.
+        """
+        # Con microsegundos: dos reclamos del mismo segundo no dejan la misma fecha
+        sql = self._sql("reclamar", lambda: (
+            f"UPDATE {self.tabla} SET estado = ?, actualizado_en = ? "
+            f"WHERE {self.clave_primaria} = ? AND estado = ? AND actualizado_en IS ?"))
+        cursor = self._ejecutar(sql, (EN_PROCESO, datetime.now().isoformat(timespec="microseconds"),
+                                      trabajo.id_trabajo, trabajo.estado, trabajo.actualizado_en))
+        return cursor.rowcount == 1
@@ -1,8 +1,11 @@
 # --- Archivo: Crud/usuario_crud.py ---
 
+import logging
 from clases.usuario import Usuario
 from orm_base import ORMBase
 
+logger = logging.getLogger(__name__)
+
 class UsuarioCRUD(ORMBase):
     """
     Clase responsable de realizar las operaciones CRUD (y "ensamblaje")
@@ -11,6 +14,9 @@ class UsuarioCRUD(ORMBase):
     tabla = "USUARIO"
     campos = ["nombre_usuario", "contraseña", "rol", "id_cliente", "id_empleado"]
     clave_primaria = "id_usuario"
+    # ¡Nunca se filtra ni se ordena por la contraseña!
+    campos_filtrables = ["id_usuario", "nombre_usuario", "rol", "id_cliente", "id_empleado"]
+    campos_ordenables = campos_filtrables
 
     def __init__(self):
         super().__init__()
@@ -22,40 +28,32 @@ class UsuarioCRUD(ORMBase):
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         # (id_usuario, nombre_usuario, contraseña, rol, id_cliente, id_empleado)
         try:
-            return Usuario(
-                id_usuario=tupla[0],
-                nombre_usuario=tupla[1],
-                contraseña=tupla[2],
-                rol=tupla[3],
-                id_cliente=tupla[4],
-                id_empleado=tupla[5]
-            )
+            # Carga de confianza: los datos de la BDD ya fueron validados al guardarse
+            return self._registrar_entidad(tupla[0], Usuario.desde_bd(*tupla))
         except Exception as e:
-            print(f"Error ensamblando Usuario: {e}")
+            logger.error("Error ensamblando Usuario.", extra={"id_usuario": tupla[0], "error": str(e)})
             return None
     # -----------------------------------------------
 
     def existe_usuario(self, nombre_usuario: str) -> bool:
         # (Tu código está perfecto)
         sql = f"SELECT COUNT(*) FROM {self.tabla} WHERE nombre_usuario=?"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (nombre_usuario,))
-            cantidad = cursor.fetchone()[0]
-            return cantidad > 0
+        cantidad = self._consultar(sql, (nombre_usuario,), una=True)[0]
+        return cantidad > 0
 
     # --- ¡ARREGLADO! ---
     def buscar_por_nombre(self, nombre_usuario: str):
         """ Retorna UN OBJETO Usuario o None. """
-        sql = f"SELECT {self.clave_primaria}, {', '.join(self.campos)} FROM {self.tabla} WHERE nombre_usuario = ?"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (nombre_usuario,))
-            tupla = cursor.fetchone()
-            return self._build_usuario(tupla) # Usamos el ensamblador
+        tupla = self.consulta().donde("nombre_usuario", nombre_usuario).primera()
+        return self._build_usuario(tupla) # Usamos el ensamblador
 
     def crear_usuario(self, usuario: Usuario):
         # (Tu código está perfecto)
@@ -75,6 +73,15 @@ class UsuarioCRUD(ORMBase):
         tuplas = self.obtener_todos()
         return [self._build_usuario(t) for t in tuplas if self._build_usuario(t)]
 
+    def listar_pagina(self, **opciones):
+        """
+        Retorna (LISTA DE OBJETOS Usuario, cursor siguiente o None).
+        Opciones: limite, despues, filtros, orden (ver ORMBase.obtener_pagina).
+        """
+        tuplas, cursor = self.obtener_pagina(**opciones)
+        objetos = (self._build_usuario(t) for t in tuplas)
+        return [o for o in objetos if o], cursor
+
     # --- ¡ARREGLADO! ---
     def buscar_por_id(self, id_usuario: int):
         """ Retorna UN OBJETO Usuario o None. """
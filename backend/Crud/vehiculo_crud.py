@@ -1,8 +1,11 @@
 # --- Archivo: Crud/vehiculo_crud.py ---
 
+import logging
 from orm_base import ORMBase
 from clases.vehiculo import Vehiculo # ¡Importamos la clase!
 
+logger = logging.getLogger(__name__)
+
 class VehiculoCRUD(ORMBase):
     tabla = "VEHICULO"
     campos = ["marca", "modelo", "anio", "precio_diario", "estado"]
@@ -18,20 +21,26 @@ class VehiculoCRUD(ORMBase):
         """
         if not tupla:
             return None
+
+        # Si ya se ensambló en esta unidad de trabajo, la reutilizamos
+        existente = self._entidad_cargada(tupla[0])
+        if existente is not None:
+            return existente
         
         # El ORMBase.obtener_... devuelve (pk, campo1, campo2, ...)
         # (patente, marca, modelo, anio, precio_diario, estado)
         try:
-            return Vehiculo(
-                patente=tupla[0],
-                marca=tupla[1],
-                modelo=tupla[2],
-                anio=int(tupla[3]), # Aseguramos el tipo
-                precio_diario=float(tupla[4]), # Aseguramos el tipo
-                estado=tupla[5]
-            )
+            # Carga de confianza: sin volver a validar la patente con regex
+            return self._registrar_entidad(tupla[0], Vehiculo.desde_bd(
+                tupla[0],
+                tupla[1],
+                tupla[2],
+                int(tupla[3]), # Aseguramos el tipo
+                float(tupla[4]), # Aseguramos el tipo
+                tupla[5]
+            ))
         except Exception as e:
-            print(f"Error al ensamblar Vehiculo desde tupla {tupla}: {e}")
+            logger.error("Error al ensamblar Vehiculo.", extra={"tupla": tupla, "error": str(e)})
             return None
 
     # --- ¡Polimorfismo / Sobreescritura! ---
@@ -41,33 +50,94 @@ class VehiculoCRUD(ORMBase):
         # El ORMBase.insertar() es para claves autoincrementales.
         # Hacemos una inserción manual.
         try:
-            with self.conexion.conectar() as conn:
-                cursor = conn.cursor()
-                sql = f"""
-                    INSERT INTO {self.tabla} (patente, marca, modelo, anio, precio_diario, estado) 
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """
-                valores = (
-                    vehiculo.patente, # Usamos el getter
-                    vehiculo.marca,
-                    vehiculo.modelo,
-                    vehiculo.anio,
-                    vehiculo.precio_diario,
-                    vehiculo.estado
-                )
-                cursor.execute(sql, valores)
-                conn.commit()
-                return vehiculo.patente # Retornamos la patente como confirmación
+            sql = f"""
+                INSERT INTO {self.tabla} (patente, marca, modelo, anio, precio_diario, estado) 
+                VALUES (?, ?, ?, ?, ?, ?)
+            """
+            valores = (
+                vehiculo.patente, # Usamos el getter
+                vehiculo.marca,
+                vehiculo.modelo,
+                vehiculo.anio,
+                vehiculo.precio_diario,
+                vehiculo.estado
+            )
+            self._ejecutar(sql, valores)
+            return vehiculo.patente # Retornamos la patente como confirmación
         except Exception as e:
             # Podría fallar si la patente (PK) ya existe
             raise ValueError(f"Error al insertar vehículo (patente duplicada?): {e}")
 
+    # --- Operaciones en lote ---
+    def crear_vehiculos_lote(self, vehiculos):
+        """
+        Inserta muchos vehículos en UNA transacción.
+        Retorna (insertados, errores) con errores = [(indice, mensaje), ...].
+        """
+        filas = [(v.patente, v.marca, v.modelo, v.anio, v.precio_diario, v.estado)
+                 for v in vehiculos]
+        return self.insertar_lote(filas, columnas=[self.clave_primaria, *self.campos])
+
+    def actualizar_vehiculos_lote(self, vehiculos):
+        """ Igual que actualizar_vehiculo, pero para muchos vehículos en UNA transacción. """
+        cambios = [(v.patente, [v.marca, v.modelo, v.anio, v.precio_diario, v.estado])
+                   for v in vehiculos]
+        return self.actualizar_lote(cambios)
+
+    def buscar_por_patentes(self, patentes):
+        """ Retorna un DICT {patente: OBJETO Vehiculo} con una sola consulta. """
+        patentes = list(patentes)
+        if not patentes:
+            return {}
+        tuplas = self.consulta().en(self.clave_primaria, patentes).todas()
+        vehiculos = (self._build_vehiculo(t) for t in tuplas)
+        return {v.patente: v for v in vehiculos if v}
+
+    def buscar_por_filtros(self, marca=None, precio_min=None, precio_max=None):
+        """
+        Retorna una LISTA DE OBJETOS Vehiculo ordenada por patente, opcionalmente
+        de una marca (sin distinguir mayúsculas) y/o en un rango de precio diario.
+        """
+        consulta = self.consulta()
+        if marca:
+            consulta.donde("marca", marca, "NOCASE")
+        if precio_min is not None:
+            consulta.donde("precio_diario", precio_min, ">=")
+        if precio_max is not None:
+            consulta.donde("precio_diario", precio_max, "<=")
+        vehiculos = (self._build_vehiculo(t) for t in consulta.ordenar(self.clave_primaria).todas())
+        return [v for v in vehiculos if v]
+
+    def tarifas(self, patentes=None):
+        """
+        Tuplas (patente, marca, precio_diario) ordenadas por patente: solo las
+        columnas que hacen falta para cotizar, sin armar objetos Vehiculo.
+        Con 'patentes', solo esas.
+        """
+        consulta = self.consulta().columnas(self.clave_primaria, "marca", "precio_diario")
+        if patentes is not None:
+            consulta.en(self.clave_primaria, list(patentes))
+        return consulta.ordenar(self.clave_primaria).todas()
+
     # --- ¡ARREGLADO! ---
     def listar_vehiculos(self):
         """ Retorna una LISTA DE OBJETOS Vehiculo. """
         tuplas = self.obtener_todos() 
         return [self._build_vehiculo(t) for t in tuplas if self._build_vehiculo(t)]
 
+    def listar_pagina(self, **opciones):
+        """
+        Retorna (LISTA DE OBJETOS Vehiculo, cursor siguiente o None).
+        Opciones: limite, despues, filtros, orden (ver ORMBase.obtener_pagina).
+        """
+        tuplas, cursor = self.obtener_pagina(**opciones)
+        objetos = (self._build_vehiculo(t) for t in tuplas)
+        return [o for o in objetos if o], cursor
+
+    def iterar(self):
+        """ Generador de OBJETOS Vehiculo leídos de a lotes (para respuestas en streaming). """
+        return self._iterar_objetos(self.iterar_filas(), self._build_vehiculo)
+
     # --- ¡ARREGLADO! ---
     def buscar_por_id(self, patente: str):
         """ Retorna UN OBJETO Vehiculo o None. """
@@ -84,5 +154,12 @@ class VehiculoCRUD(ORMBase):
         ]
         self.actualizar(vehiculo.patente, valores)
 
+    def actualizar_estado(self, patente: str, estado: str):
+        """ Cambia solo el 'estado' (sin reescribir el resto de la fila). """
+        sql = self._sql("actualizar_estado", lambda: (
+            f"UPDATE {self.tabla} SET estado = ? WHERE {self.clave_primaria} = ?"))
+        self._ejecutar(sql, (estado, patente))
+        self._descartar_de_mapa(patente)
+
     def eliminar_vehiculo(self, patente: str):
         self.eliminar(patente)
\ No newline at end of file
@@ -0,0 +1,36 @@
+# --- Archivo: Crud/version_datos_crud.py ---
+#
+# Versión de datos por tabla (tabla VERSION_DATOS, migración 0008).
+# La suben los triggers de cada escritura, o subir() para lo que los
+# triggers no ven (ej. reconstruir el resumen diario). La lee
+# cache_reportes.py en cada pedido de reporte, por eso pasa por ORMBase como
+# el resto de las consultas (queda en los histogramas y en el log de
+# consultas lentas).
+
+from orm_base import ORMBase
+
+
+class VersionDatosCRUD(ORMBase):
+    tabla = "VERSION_DATOS"
+    campos = ["version"]
+    clave_primaria = "tabla"
+
+    def __init__(self):
+        super().__init__()
+
+    def leer(self, tablas=None):
+        """ {tabla: versión} de todas las tablas, o solo de 'tablas' (0 si no tiene fila). """
+        consulta = self.consulta().columnas("tabla", "version")
+        if tablas is None:
+            return dict(consulta.todas())
+        leidas = dict(consulta.en("tabla", tablas).todas())
+        return {tabla: leidas.get(tabla, 0) for tabla in tablas}
+
+    def subir(self, *tablas):
+        """
+        Sube la versión de 'tablas' a mano (los reportes en caché que las leían
+        quedan viejos en todos los procesos). Usar dentro de la transacción de la escritura.
+        """
+        sql = self._sql("subir", lambda: (
+            f"UPDATE {self.tabla} SET version = version + 1 WHERE {self.clave_primaria} = ?"))
+        self._ejecutar(sql, [(tabla,) for tabla in tablas], muchos=True)
@@ -0,0 +1,160 @@
+# --- Archivo: almacen_reportes.py ---
+#
+# Almacén de los archivos de reportes (static/reportes).
+# Cada reporte que se dibuja queda anotado en la tabla REPORTE_ARCHIVO con
+# sus parámetros, su tamaño y cuánto tardó en generarse. Después de cada
+# alta se aplica el presupuesto de disco:
+#   - se borran los reportes creados hace más de REPORTES_MAX_DIAS días,
+#   - y, si la carpeta sigue pesando más de REPORTES_MAX_MB, los menos
+#     usados recientemente (LRU: por el orden de la última descarga).
+# Los archivos se descargan por GET /reportes/archivos/<nombre> (ver app.py),
+# que anota el acceso y responde con ETag, Cache-Control y rangos (206).
+#
+# Configuración por variables de entorno:
+#   REPORTES_MAX_MB     tamaño máximo de la carpeta (por defecto 200)
+#   REPORTES_MAX_DIAS   antigüedad máxima de un reporte (por defecto 7)
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from Crud.reporte_archivo_crud import ReporteArchivoCRUD
+
+logger = logging.getLogger(__name__)
+
+CARPETA = os.path.join("static", "reportes")
+MAXIMO_BYTES = int(float(os.environ.get("REPORTES_MAX_MB", 200)) * 2**20)
+MAXIMO_DIAS = float(os.environ.get("REPORTES_MAX_DIAS", 7))
+# Un nombre de archivo nunca se reutiliza para otro contenido (lleva fecha y
+# hora): el navegador lo puede guardar sin volver a preguntar.
+SEGUNDOS_CACHE_NAVEGADOR = 24 * 60 * 60
+
+_lock = threading.Lock()
+_lock_presupuesto = threading.Lock()   # una limpieza a la vez
+_contadores = {"registrados": 0, "descargas": 0, "desalojados": 0}
+
+
+def _ahora():
+    return datetime.now().isoformat(timespec="milliseconds")
+
+
+def _contar(nombre, cantidad=1):
+    with _lock:
+        _contadores[nombre] += cantidad
+
+
+def url_descarga(url):
+    """ 'static/reportes/x.pdf' -> 'reportes/archivos/x.pdf' (la ruta que sirve app.py). """
+    return f"reportes/archivos/{os.path.basename(url)}" if url else None
+
+
+def registrar(url, tipo=None, parametros=None, segundos=None):
+    """
+    Anota el reporte recién escrito en 'url' y aplica el presupuesto de disco.
+    Si falla (ej. base sin migrar) solo se registra en el log: el reporte ya está.
+    """
+    nombre = os.path.basename(url)
+    try:
+        tamano = os.path.getsize(os.path.join(CARPETA, nombre))
+        ReporteArchivoCRUD().registrar(
+            nombre, tipo,
+            None if parametros is None else json.dumps(parametros, sort_keys=True, default=str),
+            tamano, None if segundos is None else round(segundos * 1000), _ahora())
+        _contar("registrados")
+        aplicar_presupuesto(proteger=nombre)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"No se pudo registrar el reporte {nombre}: {e}")
+
+
+def aplicar_presupuesto(proteger=None):
+    """
+    Borra los reportes vencidos y, de los restantes, los menos usados hasta
+    entrar en MAXIMO_BYTES. Nunca borra 'proteger' (el que se acaba de crear).
+    Los archivos de la carpeta que no estaban anotados (ej. de antes de este
+    almacén) se anotan con la fecha del archivo.
+    Retorna la LISTA de nombres borrados.
+    """
+    with _lock_presupuesto:
+        dao = ReporteArchivoCRUD()
+        try:
+            en_disco = {e.name: e for e in os.scandir(CARPETA) if e.is_file()}
+        except FileNotFoundError:
+            en_disco = {}
+
+        registrados = dao.listar_por_acceso()
+        anotados = {fila[0] for fila in registrados}
+        for nombre in anotados - en_disco.keys():
+            dao.eliminar(nombre)
+        # Del más nuevo al más viejo: cada uno queda primero en el LRU
+        sueltos = sorted(((en_disco[n].stat(), n) for n in en_disco.keys() - anotados),
+                         key=lambda par: par[0].st_mtime, reverse=True)
+        for datos, nombre in sueltos:
+            fecha = datetime.fromtimestamp(datos.st_mtime).isoformat(timespec="milliseconds")
+            dao.registrar(nombre, None, None, datos.st_size, None, fecha, reciente=False)
+        if anotados != en_disco.keys():
+            registrados = dao.listar_por_acceso()
+
+        vencimiento = (datetime.now() - timedelta(days=MAXIMO_DIAS)).isoformat(timespec="milliseconds")
+        total = sum(fila[1] for fila in registrados)
+        desalojar = []
+        for nombre, tamano, creado_en, _ in registrados:
+            if nombre != proteger and (creado_en < vencimiento or total > MAXIMO_BYTES):
+                desalojar.append(nombre)
+                total -= tamano
+
+    for nombre in desalojar:
+        borrar(nombre)
+    _contar("desalojados", len(desalojar))
+    if desalojar:
+        logger.info(f"Presupuesto de reportes: {len(desalojar)} archivos borrados.")
+    return desalojar
+
+
+def borrar(url):
+    """ Borra el archivo del reporte y su registro. """
+    nombre = os.path.basename(url)
+    try:
+        os.remove(os.path.join(CARPETA, nombre))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"No se pudo borrar el reporte {nombre}: {e}")
+        return
+    try:
+        ReporteArchivoCRUD().eliminar(nombre)
+    except sqlite3.Error as e:
+        logger.warning(f"No se pudo borrar el registro del reporte {nombre}: {e}")
+
+
+def ruta_para_descargar(nombre):
+    """
+    Retorna la ruta absoluta del reporte 'nombre' y anota la descarga (LRU),
+    o None si no existe. 'nombre' es solo el nombre del archivo, sin carpetas.
+    """
+    if not nombre or nombre != os.path.basename(nombre) or nombre.startswith("."):
+        return None
+    ruta = os.path.abspath(os.path.join(CARPETA, nombre))
+    if not os.path.isfile(ruta):
+        return None
+    try:
+        ReporteArchivoCRUD().tocar(nombre, _ahora())
+    except sqlite3.Error as e:
+        logger.warning(f"No se pudo anotar la descarga del reporte {nombre}: {e}")
+    _contar("descargas")
+    return ruta
+
+
+def estadisticas():
+    """ Archivos y bytes anotados, límites del presupuesto y contadores del proceso. """
+    archivos, total = ReporteArchivoCRUD().totales()
+    with _lock:
+        return {
+            **_contadores,
+            "archivos": archivos,
+            "bytes": total,
+            "maximo_bytes": MAXIMO_BYTES,
+            "maximo_dias": MAXIMO_DIAS,
+        }
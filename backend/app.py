@@ -1,14 +1,5 @@
-from flask import Flask, jsonify, request
-from servicios.cliente_service import ClienteService
-from servicios.empleado_service import EmpleadoService
-from servicios.vehiculo_service import VehiculoService
-from servicios.alquiler_service import AlquilerService
-from servicios.reserva_service import ReservaService
-from servicios.multa_service import MultaService
-from servicios.mantenimiento_service import MantenimientoService
+from flask import Flask, jsonify, request, g, Response, send_file, stream_with_context
 from flask_cors import CORS
-# agg para reportes
-from servicios.reporte_service import ReporteService #
 from datetime import datetime # Necesario para los reportes de año
 from servicios.excepciones import (
     ErrorDeAplicacion, 
@@ -19,22 +10,145 @@ from servicios.excepciones import (
     ClienteNoEncontradoError,
 
 )
-from servicios.usuario_service import UsuarioService
+from conexion import ConexionDB
+from mapa_identidad import iniciar_unidad_de_trabajo, finalizar_unidad_de_trabajo
+from orm_base import LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+from migraciones import aplicar_migraciones
+from instrumentacion import configurar_logging, estadisticas
+import almacen_reportes
+import cache_reportes
+import indice_ocupacion
+from perezoso import Perezoso
+
+configurar_logging()
 
 app = Flask(__name__)
 CORS(app)
 
-# --- Instancias de Servicios ---
-servicio_cliente = ClienteService()
-servicio_empleado = EmpleadoService()
-servicio_vehiculo = VehiculoService()
-servicio_alquiler = AlquilerService()
-servicio_reserva = ReservaService()
-servicio_multa = MultaService()
+# Al arrancar, llevamos el esquema a la última versión (solo corre lo pendiente).
+aplicar_migraciones()
+
+# Cada request es una "unidad de trabajo": las entidades que se cargan
+# durante el request se ensamblan una sola vez (ver mapa_identidad.py).
+@app.before_request
+def abrir_unidad_de_trabajo():
+    g.token_unidad_de_trabajo = iniciar_unidad_de_trabajo()
+
+@app.teardown_request
+def cerrar_unidad_de_trabajo(exc):
+    token = g.pop("token_unidad_de_trabajo", None)
+    if token is not None:
+        finalizar_unidad_de_trabajo(token)
+
+# Al terminar cada request, la conexión del hilo vuelve al pool
+# (no se cierra: la reutiliza el próximo request).
+@app.teardown_appcontext
+def liberar_conexion(exc):
+    ConexionDB.liberar()
 
-servicio_reporte = ReporteService() #
-servicio_mantenimiento = MantenimientoService()
-servicio_usuario = UsuarioService() #
+# --- Instancias de Servicios ---
+# Se crean (e importan) con su primer uso, no al arrancar: ver perezoso.py.
+# El de reportes, además, carga pandas/matplotlib recién al dibujar.
+servicio_cliente = Perezoso("servicios.cliente_service", "ClienteService")
+servicio_empleado = Perezoso("servicios.empleado_service", "EmpleadoService")
+servicio_vehiculo = Perezoso("servicios.vehiculo_service", "VehiculoService")
+servicio_alquiler = Perezoso("servicios.alquiler_service", "AlquilerService")
+servicio_reserva = Perezoso("servicios.reserva_service", "ReservaService")
+servicio_multa = Perezoso("servicios.multa_service", "MultaService")
+
+servicio_reporte = Perezoso("servicios.reporte_service", "ReporteService") # agg para reportes
+servicio_mantenimiento = Perezoso("servicios.mantenimiento_service", "MantenimientoService")
+servicio_usuario = Perezoso("servicios.usuario_service", "UsuarioService") #
+servicio_trabajos = Perezoso("servicios.trabajo_reporte_service", "TrabajoReporteService")
+servicio_exportacion = Perezoso("servicios.exportacion_service", "ExportacionService")
+servicio_cotizacion = Perezoso("servicios.cotizacion_service", "CotizacionService")
+servicio_calendario = Perezoso("servicios.calendario_service", "CalendarioService")
+
+
+# --- Paginación por cursor en los listados ---
+# Ej: GET /vehiculos?limit=20&orden=-precio_diario&marca=Ford
+#     GET /vehiculos?limit=20&after=<next_cursor de la página anterior>
+# Los demás parámetros son filtros por igualdad (solo columnas permitidas).
+# Sin 'limit' ni 'after' se mantiene la respuesta de siempre (la lista completa).
+# Los parámetros de control (paginación, streaming, formato) no son filtros.
+PARAMETROS_PAGINACION = ("limit", "after", "orden", "stream", "formato")
+
+def _opciones_paginacion():
+    """
+    Retorna las opciones de paginación del request, o None si no se pidió paginar.
+    Levanta: DatosInvalidosError si 'limit' no es un entero entre 1 y LIMITE_MAXIMO.
+    """
+    args = request.args
+    if "limit" not in args and "after" not in args:
+        return None
+    limite = args.get("limit", LIMITE_POR_DEFECTO)
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        raise DatosInvalidosError(f"'limit' debe ser un entero: '{limite}'.")
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise DatosInvalidosError(f"'limit' debe estar entre 1 y {LIMITE_MAXIMO}.")
+    return {
+        "limite": limite,
+        "despues": args.get("after") or None,
+        "orden": args.get("orden") or None,
+        "filtros": {k: v for k, v in args.items() if k not in PARAMETROS_PAGINACION},
+    }
+
+def _respuesta_pagina(servicio, opciones):
+    objetos, cursor = servicio.listar_pagina(opciones)
+    return jsonify({"datos": [o.a_dict() for o in objetos], "next_cursor": cursor}), 200
+
+
+# --- Respuestas en streaming para listados grandes ---
+# Ej: GET /alquileres?stream=1                      -> arreglo JSON enviado de a partes
+#     GET /alquileres  (Accept: application/x-ndjson) -> un objeto JSON por línea
+# Las filas se leen de a lotes (fetchmany) y se serializan a medida que salen,
+# sin armar la lista completa de objetos ni de diccionarios.
+def _quiere_stream():
+    return request.args.get("stream") == "1" or _quiere_ndjson()
+
+def _quiere_ndjson():
+    return "application/x-ndjson" in request.headers.get("Accept", "")
+
+def _respuesta_stream(objetos):
+    """ 'objetos' es un iterable perezoso de entidades con a_dict(). """
+    ndjson = _quiere_ndjson()
+
+    def generar():
+        try:
+            if ndjson:
+                for objeto in objetos:
+                    yield app.json.dumps(objeto.a_dict()) + "\n"
+                return
+            yield "["
+            separador = ""
+            for objeto in objetos:
+                yield separador + app.json.dumps(objeto.a_dict())
+                separador = ","
+            yield "]"
+        except Exception as e:
+            # Ya se enviaron los headers (200): solo podemos cortar la respuesta.
+            # Se relanza para que el servidor aborte la conexión y el cliente
+            # vea el error (un arreglo sin ']' o un NDJSON que termina "bien" no avisa).
+            app.logger.error(f"Error durante el streaming: {e}")
+            raise
+
+    mimetype = "application/x-ndjson" if ndjson else "application/json"
+    # stream_with_context mantiene vivo el request (conexión y mapa de
+    # identidad) hasta que el generador termina.
+    return Response(stream_with_context(generar()), mimetype=mimetype)
+
+
+# --- Altas/modificaciones en lote ---
+# El body es una lista JSON; todo se guarda en UNA transacción.
+# 201/200 si no hubo errores, 207 si falló alguna fila, 400 si no se guardó ninguna.
+def _respuesta_lote(resultado, clave, status_ok):
+    if not resultado["errores"]:
+        return jsonify(resultado), status_ok
+    if resultado[clave] == 0:
+        return jsonify(resultado), 400
+    return jsonify(resultado), 207
 
 
 # --- Ruta raíz ---
@@ -43,6 +157,31 @@ def principal():
     return "TP-DAO-2025"
 
 
+# --- Métricas de la capa de datos (ver instrumentacion.py) ---
+# Ej: GET /diagnostico/consultas?top=10
+# Histograma de tiempos por DAO y las sentencias SQL con más tiempo acumulado.
+@app.route("/diagnostico/consultas", methods=["GET"])
+def diagnostico_consultas():
+    return jsonify(estadisticas(top=request.args.get("top", type=int, default=20))), 200
+
+
+# --- Caché de reportes (ver cache_reportes.py) ---
+# Ej: GET /diagnostico/reportes
+# Aciertos/fallos del caché, reportes guardados y versión de datos por tabla,
+# más el almacén de archivos ("almacen": archivos, bytes y límites).
+@app.route("/diagnostico/reportes", methods=["GET"])
+def diagnostico_reportes():
+    return jsonify({**cache_reportes.estadisticas(), "almacen": almacen_reportes.estadisticas()}), 200
+
+
+# --- Índice de disponibilidad (ver indice_ocupacion.py) ---
+# Ej: GET /diagnostico/ocupacion
+# Si ya se armó, cuántos vehículos y períodos ocupados (fusionados) tiene.
+@app.route("/diagnostico/ocupacion", methods=["GET"])
+def diagnostico_ocupacion():
+    return jsonify(indice_ocupacion.estadisticas()), 200
+
+
 
 # --- Archivo: app.py ---
 
@@ -148,6 +287,12 @@ def eliminar_multa(id_multa):
 @app.route("/clientes", methods=["GET"])
 def listar_clientes():
     try:
+        opciones = _opciones_paginacion()
+        if opciones is not None:
+            return _respuesta_pagina(servicio_cliente, opciones)
+        if _quiere_stream():
+            return _respuesta_stream(servicio_cliente.iterar())
+
         # 1. El servicio retorna una LISTA DE OBJETOS [Cliente, Cliente, ...]
         clientes = servicio_cliente.listar_clientes()
         
@@ -157,6 +302,9 @@ def listar_clientes():
         # 3. Retornamos el JSON y el código de estado 200 OK
         return jsonify(clientes_json), 200
     
+    except DatosInvalidosError as e:
+        # Filtro, orden o cursor inválidos
+        return jsonify({"error": str(e)}), 400
     except ErrorDeCliente as e:
         # Error genérico (ej. falla de BDD)
         return jsonify({"error": str(e)}), 500
@@ -200,6 +348,19 @@ def crear_cliente():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/clientes/lote", methods=["POST"])
+def crear_clientes_lote():
+    try:
+        resultado = servicio_cliente.crear_clientes_lote(request.get_json(silent=True))
+        return _respuesta_lote(resultado, "creados", 201)
+
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except ErrorDeCliente as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/clientes/<int:id_cliente>", methods=["PUT"])
 def actualizar_cliente(id_cliente):
     try:
@@ -248,9 +409,16 @@ def eliminar_cliente(id_cliente):
 @app.route("/empleados", methods=["GET"])
 def listar_empleados():
     try:
+        opciones = _opciones_paginacion()
+        if opciones is not None:
+            return _respuesta_pagina(servicio_empleado, opciones)
+
         empleados = servicio_empleado.listar_empleados()
         # Usamos .a_dict() que ya existe en la clase Empleado
         return jsonify([e.a_dict() for e in empleados]), 200
+    except DatosInvalidosError as e:
+        # Filtro, orden o cursor inválidos
+        return jsonify({"error": str(e)}), 400
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
 
@@ -316,9 +484,53 @@ def eliminar_empleado(id_empleado):
 @app.route("/vehiculos", methods=["GET"])
 def listar_vehiculos():
     try:
+        opciones = _opciones_paginacion()
+        if opciones is not None:
+            return _respuesta_pagina(servicio_vehiculo, opciones)
+        if _quiere_stream():
+            return _respuesta_stream(servicio_vehiculo.iterar())
+
         vehiculos = servicio_vehiculo.listar_vehiculos()
         # Usamos .a_dict() que ya existe en la clase Vehiculo
         return jsonify([v.a_dict() for v in vehiculos]), 200
+    except DatosInvalidosError as e:
+        # Filtro, orden o cursor inválidos
+        return jsonify({"error": str(e)}), 400
+    except ErrorDeAplicacion as e:
+        return jsonify({"error": str(e)}), 500
+
+# Vehículos libres (sin alquileres, reservas ni mantenimientos) en un rango
+# de fechas, ambas inclusive. Ver indice_ocupacion.py.
+# Ej: GET /vehiculos/disponibles?desde=2025-11-01&hasta=2025-11-05
+#     GET /vehiculos/disponibles?desde=2025-11-01&hasta=2025-11-05&marca=Ford&precio_max=50000
+#     GET /vehiculos/disponibles?desde=2025-11-01&hasta=2025-11-05&id_cliente=7
+#     (con id_cliente, las reservas de ese cliente no cuentan: lo que puede alquilar)
+@app.route("/vehiculos/disponibles", methods=["GET"])
+def listar_vehiculos_disponibles():
+    try:
+        vehiculos = servicio_vehiculo.listar_disponibles(
+            request.args.get("desde"),
+            request.args.get("hasta"),
+            marca=request.args.get("marca") or None,
+            precio_min=request.args.get("precio_min"),
+            precio_max=request.args.get("precio_max"),
+            id_cliente=request.args.get("id_cliente"),
+        )
+        return jsonify([v.a_dict() for v in vehiculos]), 200
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
+    except ErrorDeAplicacion as e:
+        return jsonify({"error": str(e)}), 500
+
+# Calendario de ocupación de la flota en un mes (ver servicios/calendario_service.py).
+# Ej: GET /flota/calendario?mes=2025-11
+# Por vehículo, tramos [estado, días, estado, días, ...] con los códigos de "estados".
+@app.route("/flota/calendario", methods=["GET"])
+def calendario_flota():
+    try:
+        return jsonify(servicio_calendario.calendario_mes(request.args.get("mes"))), 200
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
 
@@ -349,6 +561,26 @@ def crear_vehiculo():
         # Error del DAO (patente duplicada)
         return jsonify({"error": str(e)}), 500
 
+@app.route("/vehiculos/lote", methods=["POST"])
+def crear_vehiculos_lote():
+    try:
+        resultado = servicio_vehiculo.crear_vehiculos_lote(request.get_json(silent=True))
+        return _respuesta_lote(resultado, "creados", 201)
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
+    except ErrorDeAplicacion as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/vehiculos/lote", methods=["PUT"])
+def actualizar_vehiculos_lote():
+    try:
+        resultado = servicio_vehiculo.actualizar_vehiculos_lote(request.get_json(silent=True))
+        return _respuesta_lote(resultado, "actualizados", 200)
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
+    except ErrorDeAplicacion as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/vehiculos/<string:patente>", methods=["PUT"])
 def actualizar_vehiculo(patente):
     try:
@@ -390,6 +622,12 @@ def gestionar_alquileres():
     - Si no, lista todos los alquileres.
     """
     try:
+        opciones = _opciones_paginacion()
+        if opciones is not None:
+            return _respuesta_pagina(servicio_alquiler, opciones)
+        if _quiere_stream():
+            return _respuesta_stream(servicio_alquiler.iterar(request.args.get('id_cliente', type=int)))
+
         # Revisa si el query param 'id_cliente' fue enviado
         id_cliente = request.args.get('id_cliente', type=int)
         
@@ -405,6 +643,9 @@ def gestionar_alquileres():
         alquileres_json = [alquiler.a_dict() for alquiler in alquileres]
         return jsonify(alquileres_json), 200
 
+    except DatosInvalidosError as e:
+        # Filtro, orden o cursor inválidos
+        return jsonify({"error": str(e)}), 400
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
     except Exception as e:
@@ -428,6 +669,20 @@ def obtener_alquiler(id_alquiler):
         return jsonify({"error": str(e)}), 500
 
 
+# Cotiza muchos alquileres de una vez (días x precio diario del vehículo).
+# Body: [{"patente": "AB123CD", "fecha_inicio": "2025-11-01", "fecha_fin": "2025-11-05"},
+#        {"marca": "Ford", "precio_max": 60, "fecha_inicio": ..., "fecha_fin": ...}, ...]
+# 200 con {"cotizaciones": [...], "errores": [...]}; 400 si no llega una lista.
+@app.route("/cotizaciones", methods=["POST"])
+def cotizar_alquileres():
+    try:
+        resultado = servicio_cotizacion.cotizar(request.get_json(silent=True))
+        return jsonify(resultado), 200
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
+    except ErrorDeAplicacion as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/alquileres", methods=["POST"])
 def crear_alquiler():
     try:
@@ -473,6 +728,10 @@ def actualizar_alquiler(id_alquiler):
     except DatosInvalidosError as e:
         return jsonify({"error": str(e)}), 400
     
+    except ErrorDeLogicaDeNegocio as e:
+        # Con las fechas nuevas el vehículo queda ocupado dos veces
+        return jsonify({"error": str(e)}), 409
+    
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
 
@@ -503,8 +762,31 @@ def eliminar_alquiler(id_alquiler):
 @app.route("/reservas", methods=["GET"])
 def listar_reservas():
     try:
+        opciones = _opciones_paginacion()
+        if opciones is not None:
+            return _respuesta_pagina(servicio_reserva, opciones)
+        if _quiere_stream():
+            return _respuesta_stream(servicio_reserva.iterar())
+
         reservas = servicio_reserva.listar_reservas()
         return jsonify([r.a_dict() for r in reservas]), 200
+    except DatosInvalidosError as e:
+        # Filtro, orden o cursor inválidos
+        return jsonify({"error": str(e)}), 400
+    except ErrorDeAplicacion as e:
+        return jsonify({"error": str(e)}), 500
+
+# Chequea muchas reservas candidatas de una vez, sin guardarlas.
+# Body: [{"patente": "AB123CD", "fecha_inicio_deseada": "2025-11-01",
+#         "fecha_fin_deseada": "2025-11-05", "id_reserva": 7 (opcional)}, ...]
+# 200 con {"resultados": [...], "errores": [...]}; 400 si no llega una lista.
+@app.route("/reservas/verificar", methods=["POST"])
+def verificar_reservas():
+    try:
+        resultado = servicio_reserva.verificar_reservas(request.get_json(silent=True))
+        return jsonify(resultado), 200
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
 
@@ -531,6 +813,9 @@ def crear_reserva():
     except (DatosInvalidosError, RecursoNoEncontradoError) as e:
         # Error (fechas mal, cliente o vehiculo no existe)
         return jsonify({"error": str(e)}), 400
+    except ErrorDeLogicaDeNegocio as e:
+        # El vehículo ya está ocupado en esas fechas
+        return jsonify({"error": str(e)}), 409
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
 
@@ -548,6 +833,8 @@ def actualizar_reserva(id_reserva):
         return jsonify({"error": str(e)}), 404
     except DatosInvalidosError as e:
         return jsonify({"error": str(e)}), 400
+    except ErrorDeLogicaDeNegocio as e:
+        return jsonify({"error": str(e)}), 409
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
 
@@ -574,14 +861,18 @@ def eliminar_reserva(id_reserva):
 @app.route("/reportes/alquileres_por_cliente/<int:cliente_id>", methods=["GET"])
 def reporte_alquileres_por_cliente(cliente_id):
     try:
-        archivo_path = servicio_reporte.generar_reporte_alquileres_por_cliente(cliente_id, formato="pdf")
+        formato = request.args.get('formato', type=str, default='pdf')  # pdf | excel
+        archivo_path = servicio_reporte.generar_reporte_alquileres_por_cliente(cliente_id, formato=formato)
         
         # Éxito: Devolvemos un JSON simple con la información
         return jsonify({
-            "mensaje": f"Reporte PDF generado para el cliente {cliente_id}",
-            "path": archivo_path
+            "mensaje": f"Reporte {formato.upper()} generado para el cliente {cliente_id}",
+            "path": archivo_path,
+            "descarga": almacen_reportes.url_descarga(archivo_path)
         }), 200
     
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
     except RecursoNoEncontradoError as e:
         # Error: Devolvemos solo la clave "error"
         return jsonify({"error": str(e)}), 404
@@ -592,13 +883,17 @@ def reporte_alquileres_por_cliente(cliente_id):
 def reporte_vehiculos_mas_alquilados():
     try:
         limite = request.args.get('limite', type=int, default=5)
-        archivo_path = servicio_reporte.generar_reporte_vehiculos_mas_alquilados(limite=limite) 
+        archivo_path = servicio_reporte.generar_reporte_vehiculos_mas_alquilados(
+            limite=limite, desde=request.args.get('desde'), hasta=request.args.get('hasta'))
         
         return jsonify({
             "mensaje": f"Reporte de vehículos más alquilados (Top {limite}) generado.",
-            "path": archivo_path
+            "path": archivo_path,
+            "descarga": almacen_reportes.url_descarga(archivo_path)
         }), 200
     
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
     except RecursoNoEncontradoError as e:
          return jsonify({"error": str(e)}), 404
     except Exception as e:
@@ -612,7 +907,8 @@ def reporte_facturacion_mensual():
         
         return jsonify({
             "mensaje": f"Reporte de facturación mensual para {anio} generado.",
-            "path": archivo_path
+            "path": archivo_path,
+            "descarga": almacen_reportes.url_descarga(archivo_path)
         }), 200
     
     except DatosInvalidosError as e:
@@ -635,7 +931,8 @@ def reporte_alquileres_por_periodo():
         
         return jsonify({
             "mensaje": f"Reporte de alquileres por período ({frecuencia}) para {anio} generado.",
-            "path": archivo_path
+            "path": archivo_path,
+            "descarga": almacen_reportes.url_descarga(archivo_path)
         }), 200
     
     except DatosInvalidosError as e:
@@ -646,6 +943,57 @@ def reporte_alquileres_por_periodo():
         return jsonify({"error": f"Error del servidor al generar reporte: {e}"}), 500
     
 # --- Ruta para Reporte de Cliente (¡!) ---
+# --- Reportes en segundo plano (ver servicios/trabajo_reporte_service.py) ---
+# POST /reportes/jobs  {"tipo": "facturacion_mensual", "parametros": {"anio": 2025}}
+#   -> 202 con el trabajo ("id_trabajo", "estado": "pendiente")
+# GET  /reportes/jobs/<id_trabajo>
+#   -> "estado": pendiente | en_proceso | terminado (con "url" y "descarga") | error (con "error")
+# Tipos: alquileres_por_cliente, alquileres_por_periodo, facturacion_mensual,
+#        vehiculos_mas_alquilados (los parámetros son los del método del servicio).
+def _trabajo_con_descarga(trabajo):
+    datos = trabajo.a_dict()
+    datos["descarga"] = almacen_reportes.url_descarga(trabajo.url)
+    return datos
+
+@app.route("/reportes/jobs", methods=["POST"])
+def encolar_reporte():
+    datos = request.get_json(silent=True) or {}
+    try:
+        trabajo = servicio_trabajos.encolar(datos.get("tipo"), datos.get("parametros"))
+        return jsonify(_trabajo_con_descarga(trabajo)), 202
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
+    except ErrorDeLogicaDeNegocio as e:
+        return jsonify({"error": str(e)}), 429
+    except Exception as e:
+        return jsonify({"error": f"Error del servidor al encolar reporte: {e}"}), 500
+
+@app.route("/reportes/jobs/<id_trabajo>", methods=["GET"])
+def consultar_trabajo_reporte(id_trabajo):
+    try:
+        trabajo = servicio_trabajos.consultar(id_trabajo)
+        return jsonify(_trabajo_con_descarga(trabajo)), 200
+    except RecursoNoEncontradoError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": f"Error del servidor al consultar el reporte: {e}"}), 500
+
+# --- Descarga de reportes (ver almacen_reportes.py) ---
+# GET /reportes/archivos/<nombre>  (el campo "descarga" de las respuestas de arriba)
+# ETag + If-None-Match (304), Cache-Control y Range (206) los resuelve send_file.
+@app.route("/reportes/archivos/<nombre>", methods=["GET"])
+def descargar_reporte(nombre):
+    ruta = almacen_reportes.ruta_para_descargar(nombre)
+    if ruta is None:
+        return jsonify({"error": f"El reporte '{nombre}' no existe o ya fue borrado. Vuelva a generarlo."}), 404
+    respuesta = send_file(ruta, conditional=True, etag=True,
+                          max_age=almacen_reportes.SEGUNDOS_CACHE_NAVEGADOR)
+    # Los reportes tienen datos de clientes: que no los guarden proxies compartidos
+    respuesta.cache_control.public = False
+    respuesta.cache_control.private = True
+    respuesta.cache_control.immutable = True
+    return respuesta
+
 @app.route("/reportes/cliente/<int:id_cliente>", methods=["GET"])
 def generar_reporte_cliente_route(id_cliente):
     """
@@ -657,7 +1005,8 @@ def generar_reporte_cliente_route(id_cliente):
         ruta_archivo = servicio_reporte.generar_reporte_alquileres_por_cliente(id_cliente)       
         return jsonify({
             "mensaje": f"Reporte del cliente {id_cliente} generado con éxito.", 
-            "ruta_archivo": ruta_archivo 
+            "ruta_archivo": ruta_archivo,
+            "descarga": almacen_reportes.url_descarga(ruta_archivo)
         }), 200
         
     except RecursoNoEncontradoError as e:
@@ -668,9 +1017,44 @@ def generar_reporte_cliente_route(id_cliente):
         return jsonify({"error": str(e)}), 500
     except Exception as e:
         # Otros errores inesperados.
-        print(f"Error al generar reporte de cliente: {e}")
+        app.logger.exception(f"Error al generar reporte de cliente: {e}")
         return jsonify({"error": "Error interno del servidor al generar reporte."}), 500
 
+# =============================
+#     EXPORTACIONES CSV / XLSX
+# =============================
+# GET /exportes/alquileres?formato=xlsx&desde=2025-01-01&hasta=2025-12-31
+# GET /exportes/multas  |  GET /exportes/mantenimientos   (formato=csv por defecto)
+# El archivo se envía de a partes mientras se lee la base (ver exportacion_service.py).
+@app.route("/exportes/<string:entidad>", methods=["GET"])
+def exportar_datos(entidad):
+    try:
+        nombre, mimetype, partes = servicio_exportacion.exportar(
+            entidad,
+            formato=request.args.get('formato', 'csv'),
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta'),
+        )
+    except DatosInvalidosError as e:
+        return jsonify({"error": str(e)}), 400
+    except RecursoNoEncontradoError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": f"Error del servidor al exportar: {e}"}), 500
+
+    def generar():
+        try:
+            yield from partes
+        except Exception as e:
+            # Ya se enviaron los headers (200): se vuelve a levantar para que el
+            # servidor corte la transferencia y el cliente no reciba un archivo
+            # truncado como si estuviera completo.
+            app.logger.error(f"Error durante la exportación de {entidad}: {e}")
+            raise
+
+    return Response(stream_with_context(generar()), mimetype=mimetype,
+                    headers={"Content-Disposition": f'attachment; filename="{nombre}"'})
+
 # (Asegúrate de que 'servicio_mantenimiento = MantenimientoService()' esté instanciado arriba)
 
 # =============================
@@ -685,6 +1069,12 @@ def listar_mantenimientos():
     Ej: GET /mantenimientos?patente=ABC123
     """
     try:
+        opciones = _opciones_paginacion()
+        if opciones is not None:
+            return _respuesta_pagina(servicio_mantenimiento, opciones)
+        if _quiere_stream():
+            return _respuesta_stream(servicio_mantenimiento.iterar())
+
         patente = request.args.get('patente')
         if patente:
             mantenimientos = servicio_mantenimiento.buscar_por_vehiculo(patente)
@@ -693,6 +1083,9 @@ def listar_mantenimientos():
         
         return jsonify([m.a_dict() for m in mantenimientos]), 200
     
+    except DatosInvalidosError as e:
+        # Filtro, orden o cursor inválidos
+        return jsonify({"error": str(e)}), 400
     except RecursoNoEncontradoError as e: # Si la patente no existe
         return jsonify({"error": str(e)}), 404
     except ErrorDeAplicacion as e:
@@ -764,9 +1157,16 @@ def eliminar_mantenimiento(id_mantenimiento):
 def listar_usuarios():
     """ Lista todos los usuarios (solo para admin, probablemente) """
     try:
+        opciones = _opciones_paginacion()
+        if opciones is not None:
+            return _respuesta_pagina(servicio_usuario, opciones)
+
         usuarios = servicio_usuario.listar_usuarios()
         # .a_dict() oculta todas las contraseñas
         return jsonify([u.a_dict() for u in usuarios]), 200
+    except DatosInvalidosError as e:
+        # Filtro, orden o cursor inválidos
+        return jsonify({"error": str(e)}), 400
     except ErrorDeAplicacion as e:
         return jsonify({"error": str(e)}), 500
 
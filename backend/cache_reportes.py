@@ -0,0 +1,167 @@
+# --- Archivo: cache_reportes.py ---
+#
+# Caché de reportes ya generados.
+# La clave de cada reporte es un hash de:
+#   - el tipo de reporte,
+#   - sus parámetros,
+#   - la "versión de datos" de cada tabla que lee.
+# Si se pide dos veces el mismo reporte y esas tablas no cambiaron, se
+# devuelve la URL del PDF que ya está en disco, en vez de volver a dibujarlo.
+#
+# Las versiones están en la tabla VERSION_DATOS (migración 0008): triggers
+# las suben dentro de la transacción de cada escritura, así que valen para
+# TODOS los procesos (varios workers web) y no solo para el que escribió.
+# Un reporte guardado con una versión vieja no vuelve a encontrarse (su clave
+# cambió) y se descarta, con su archivo, la próxima vez que se calcula una
+# clave en ese proceso.
+# Los servicios además llaman a datos_modificados("ALQUILER", ...) después de
+# escribir: descarta enseguida los reportes de ESTE proceso que leían esas
+# tablas (sin esperar a la próxima clave).
+# Los archivos en sí los administra almacen_reportes.py (que también puede
+# borrarlos por el presupuesto de disco: buscar() lo tiene en cuenta).
+# Las entradas viven en memoria: al reiniciar el proceso el caché arranca vacío.
+
+import hashlib
+import json
+import os
+import threading
+
+import almacen_reportes
+from Crud.version_datos_crud import VersionDatosCRUD
+
+_lock = threading.Lock()
+_entradas = {}          # clave -> {"url", "ruta", "versiones"}
+_generando = {}         # clave -> [Lock, cuántos lo usan] (un solo render por clave a la vez)
+_contadores = {"aciertos": 0, "fallos": 0, "invalidadas": 0}
+
+
+def _leer_versiones(tablas=None):
+    """ {tabla: versión} desde VERSION_DATOS (todas, o solo 'tablas'). """
+    return VersionDatosCRUD().leer(tablas)
+
+
+def _descartar(claves):
+    """ Saca esas entradas y borra sus archivos. """
+    with _lock:
+        rutas = [_entradas.pop(clave)["ruta"] for clave in claves if clave in _entradas]
+        _contadores["invalidadas"] += len(rutas)
+    for ruta in rutas:
+        almacen_reportes.borrar(ruta)
+
+
+def version_datos(*tablas):
+    """
+    Retorna {tabla: versión} de las tablas pedidas (la de la base, compartida
+    entre procesos) y descarta los reportes de este proceso que leían una
+    versión anterior de alguna de ellas.
+    """
+    versiones = _leer_versiones(tablas)
+    with _lock:
+        viejas = [clave for clave, entrada in _entradas.items()
+                  if any(versiones.get(t, v) != v for t, v in entrada["versiones"].items())]
+    if viejas:
+        _descartar(viejas)
+    return versiones
+
+
+def datos_modificados(*tablas):
+    """
+    Descarta ya los reportes en caché de este proceso que leían esas tablas
+    (sus PDFs quedaron desactualizados). La versión compartida la suben los
+    triggers de VERSION_DATOS: una tabla nueva que lea algún reporte cacheado
+    necesita los suyos (ver migración 0008).
+    """
+    with _lock:
+        viejas = [clave for clave, entrada in _entradas.items()
+                  if not entrada["versiones"].keys().isdisjoint(tablas)]
+    _descartar(viejas)
+
+
+def clave_reporte(tipo, parametros, tablas):
+    """
+    Retorna (clave, versiones) del reporte para la versión ACTUAL de 'tablas'.
+    La versión se toma antes de generar: si alguien escribe mientras se
+    dibuja, el reporte ya nació viejo y guardar() lo descarta.
+    """
+    versiones = version_datos(*tablas)
+    contenido = json.dumps([tipo, parametros, versiones], sort_keys=True, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest(), versiones
+
+
+def buscar(clave):
+    """ Retorna la URL del reporte en caché (si su archivo sigue en disco), o None. """
+    with _lock:
+        entrada = _entradas.get(clave)
+    if entrada is None:
+        return None
+    if not os.path.exists(entrada["ruta"]):
+        # Lo borró el presupuesto de disco: hay que volver a generarlo
+        with _lock:
+            if _entradas.get(clave) is entrada:
+                del _entradas[clave]
+        return None
+    with _lock:
+        _contadores["aciertos"] += 1
+    return entrada["url"]
+
+
+def guardar(clave, versiones, url):
+    """ Guarda un reporte recién generado (cuenta como fallo del caché). """
+    vigente = _leer_versiones(tuple(versiones)) == versiones
+    with _lock:
+        _contadores["fallos"] += 1
+        if vigente:
+            _entradas[clave] = {"url": url, "ruta": os.path.join(almacen_reportes.CARPETA, os.path.basename(url)), "versiones": dict(versiones)}
+
+
+def obtener_o_generar(tipo, parametros, tablas, generar):
+    """
+    Retorna la URL del reporte (tipo, parametros) para la versión actual de
+    'tablas'. Si no está en caché, llama a generar() (que dibuja el PDF y
+    retorna su URL) y la guarda. Las excepciones de generar() no se cachean.
+    """
+    clave, versiones = clave_reporte(tipo, parametros, tablas)
+
+    # Dos pedidos iguales a la vez: el segundo espera y aprovecha el primero.
+    # El lock de la clave se saca de _generando recién cuando nadie lo usa ni
+    # lo espera: si no, un tercero crearía otro y dibujaría en paralelo.
+    with _lock:
+        generando = _generando.get(clave)
+        if generando is None:
+            generando = _generando[clave] = [threading.Lock(), 0]
+        generando[1] += 1
+    try:
+        with generando[0]:
+            url = buscar(clave)
+            if url is None:
+                url = generar()
+                guardar(clave, versiones, url)
+            return url
+    finally:
+        with _lock:
+            generando[1] -= 1
+            if generando[1] == 0:
+                del _generando[clave]
+
+
+def estadisticas():
+    """ Retorna los contadores de aciertos/fallos y cuántos reportes hay en caché. """
+    versiones = _leer_versiones()
+    with _lock:
+        consultas = _contadores["aciertos"] + _contadores["fallos"]
+        return {
+            **_contadores,
+            "tasa_aciertos": round(_contadores["aciertos"] / consultas, 3) if consultas else 0.0,
+            "entradas": len(_entradas),
+            "generando": len(_generando),
+            "versiones": versiones,
+        }
+
+
+def reiniciar():
+    """ Vacía el caché y los contadores (no borra archivos). """
+    with _lock:
+        _entradas.clear()
+        _generando.clear()
+        for nombre in _contadores:
+            _contadores[nombre] = 0
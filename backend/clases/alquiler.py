@@ -8,6 +8,10 @@ if TYPE_CHECKING:
     from .multa import MultaDano
 
 class Alquiler:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("id_alquiler", "fecha_inicio", "fecha_fin", "_costo_total", "fecha_registro",
+                 "cliente", "empleado", "vehiculo", "_multas")
+
     def __init__(self, id_alquiler: int, fecha_inicio: date, fecha_fin: date,
                  costo_total: float, fecha_registro: date,
                  cliente: "Cliente", empleado: "Empleado", vehiculo: "Vehiculo"):
@@ -30,11 +34,38 @@ class Alquiler:
         self.vehiculo = vehiculo
 
         # Relaciones
-        self.multas: List["MultaDano"] = []
+        self._multas = None
         cliente.agregar_alquiler(self)
         empleado.agregar_alquiler(self)
         vehiculo.agregar_alquiler(self)
         vehiculo.marcar_no_disponible()
+
+    @classmethod
+    def desde_bd(cls, id_alquiler, fecha_inicio, fecha_fin, costo_total, fecha_registro,
+                 cliente, empleado, vehiculo):
+        """
+        Carga de confianza para los DAOs. A diferencia de __init__ (que es para
+        un alquiler NUEVO): no exige fechas futuras (un alquiler ya guardado
+        puede ser pasado), no agrega el alquiler a las listas del cliente,
+        empleado y vehículo, y no cambia el estado del vehículo (el de la BD manda).
+        """
+        alquiler = cls.__new__(cls)
+        alquiler.id_alquiler = id_alquiler
+        alquiler.fecha_inicio = fecha_inicio
+        alquiler.fecha_fin = fecha_fin
+        alquiler._costo_total = costo_total
+        alquiler.fecha_registro = fecha_registro
+        alquiler.cliente = cliente
+        alquiler.empleado = empleado
+        alquiler.vehiculo = vehiculo
+        alquiler._multas = None
+        return alquiler
+
+    @property
+    def multas(self) -> List["MultaDano"]:
+        if self._multas is None:
+            self._multas = []
+        return self._multas
     
     # Propiedades con validación
     @property
@@ -6,6 +6,10 @@ if TYPE_CHECKING:
     from .reserva import Reserva
 
 class Cliente:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("id_cliente", "nombre", "apellido", "_dni", "direccion", "_telefono", "_email",
+                 "_reservas", "_alquileres")
+
     def __init__(self, id_cliente: int, nombre: str, apellido: str, dni: str,
                  direccion: str, telefono: str, email: str):
         
@@ -17,9 +21,35 @@ class Cliente:
         self.telefono = telefono
         self.email = email
 
-        # Relaciones
-        self.reservas: List["Reserva"] = []
-        self.alquileres: List["Alquiler"] = []
+        # Relaciones: las listas se crean recién al usarlas
+        self._reservas = None
+        self._alquileres = None
+
+    @classmethod
+    def desde_bd(cls, id_cliente, nombre, apellido, dni, direccion, telefono, email):
+        """ Carga de confianza para los DAOs: sin volver a validar DNI, email ni teléfono. """
+        cliente = cls.__new__(cls)
+        cliente.id_cliente = id_cliente
+        cliente.nombre = nombre
+        cliente.apellido = apellido
+        cliente._dni = dni
+        cliente.direccion = direccion
+        cliente._telefono = telefono
+        cliente._email = email
+        cliente._reservas = cliente._alquileres = None
+        return cliente
+
+    @property
+    def reservas(self) -> List["Reserva"]:
+        if self._reservas is None:
+            self._reservas = []
+        return self._reservas
+
+    @property
+    def alquileres(self) -> List["Alquiler"]:
+        if self._alquileres is None:
+            self._alquileres = []
+        return self._alquileres
 
     # Propiedades con validación
     @property
@@ -5,6 +5,9 @@ if TYPE_CHECKING:
     from .alquiler import Alquiler
 
 class Empleado:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("id_empleado", "nombre", "_apellido", "_dni", "_puesto", "id_supervisor", "_alquileres")
+
     def __init__(self, id_empleado: int, nombre: str, apellido: str,
                  dni: str, puesto: str, id_supervisor: Optional[int] = None):
         
@@ -15,8 +18,27 @@ class Empleado:
         self.puesto = puesto
         self.id_supervisor = id_supervisor # FK autorreferenciada (empleado-supervisor)
 
-        # Relaciones
-        self.alquileres: List["Alquiler"] = []
+        # Relaciones: la lista se crea recién al usarla
+        self._alquileres = None
+
+    @classmethod
+    def desde_bd(cls, id_empleado, nombre, apellido, dni, puesto, id_supervisor):
+        """ Carga de confianza para los DAOs: sin volver a validar. """
+        empleado = cls.__new__(cls)
+        empleado.id_empleado = id_empleado
+        empleado.nombre = nombre
+        empleado._apellido = apellido
+        empleado._dni = dni
+        empleado._puesto = puesto
+        empleado.id_supervisor = id_supervisor
+        empleado._alquileres = None
+        return empleado
+
+    @property
+    def alquileres(self) -> List["Alquiler"]:
+        if self._alquileres is None:
+            self._alquileres = []
+        return self._alquileres
     
     # Propiedades con validación
     @property
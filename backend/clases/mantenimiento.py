@@ -5,6 +5,9 @@ if TYPE_CHECKING:
     from .vehiculo import Vehiculo
 
 class Mantenimiento:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("id_mantenimiento", "fecha_inicio", "fecha_fin", "_tipo_servicio", "_costo", "vehiculo")
+
     def __init__(self, id_mantenimiento: int, fecha_inicio: date, fecha_fin: date,
                  tipo_servicio: str, costo: float, vehiculo: "Vehiculo"):
 
@@ -22,6 +25,18 @@ class Mantenimiento:
         # Relación bidireccional
         vehiculo.agregar_mantenimiento(self)
 
+    @classmethod
+    def desde_bd(cls, id_mantenimiento, fecha_inicio, fecha_fin, tipo_servicio, costo, vehiculo):
+        """ Carga de confianza para los DAOs: sin validar y sin tocar las listas del vehículo. """
+        mantenimiento = cls.__new__(cls)
+        mantenimiento.id_mantenimiento = id_mantenimiento
+        mantenimiento.fecha_inicio = fecha_inicio
+        mantenimiento.fecha_fin = fecha_fin
+        mantenimiento._tipo_servicio = tipo_servicio
+        mantenimiento._costo = costo
+        mantenimiento.vehiculo = vehiculo
+        return mantenimiento
+
     # Propiedades con validación
     @property
     def tipo_servicio(self):
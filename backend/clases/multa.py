@@ -5,6 +5,9 @@ if TYPE_CHECKING:
     from .alquiler import Alquiler
 
 class MultaDano:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("id_multa", "_descripcion", "_monto", "fecha_incidente", "alquiler")
+
     def __init__(self, id_multa: int, descripcion: str, monto: float,
                  fecha_incidente: date, alquiler: "Alquiler"):
 
@@ -20,6 +23,17 @@ class MultaDano:
 
         # Relaciones
         alquiler.agregar_multa(self)
+
+    @classmethod
+    def desde_bd(cls, id_multa, descripcion, monto, fecha_incidente, alquiler):
+        """ Carga de confianza para los DAOs: sin validar y sin tocar las multas del alquiler. """
+        multa = cls.__new__(cls)
+        multa.id_multa = id_multa
+        multa._descripcion = descripcion
+        multa._monto = monto
+        multa.fecha_incidente = fecha_incidente
+        multa.alquiler = alquiler
+        return multa
     
     # Propiedades con validación
     @property
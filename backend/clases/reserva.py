@@ -6,6 +6,10 @@ if TYPE_CHECKING:
     from .vehiculo import Vehiculo
 
 class Reserva:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("id_reserva", "fecha_reserva", "fecha_inicio_deseada", "fecha_fin_deseada",
+                 "cliente", "vehiculo")
+
     def __init__(self, id_reserva: int, fecha_reserva: date,
                  fecha_inicio_deseada: date, fecha_fin_deseada: date,
                  cliente: "Cliente", vehiculo: Optional["Vehiculo"] = None):
@@ -30,10 +34,26 @@ class Reserva:
         if vehiculo:
             vehiculo.agregar_reserva(self)
             vehiculo.marcar_no_disponible()
-        
-        # Representación legible
-        def __repr__(self):
-            return f"Reserva {self.id_reserva} - Cliente {self.cliente.nombre} {self.cliente.apellido}"
+
+    @classmethod
+    def desde_bd(cls, id_reserva, fecha_reserva, fecha_inicio_deseada, fecha_fin_deseada,
+                 cliente, vehiculo=None):
+        """
+        Carga de confianza para los DAOs: sin validar, sin tocar las listas del
+        cliente/vehículo y sin cambiar el estado del vehículo (el de la BD manda).
+        """
+        reserva = cls.__new__(cls)
+        reserva.id_reserva = id_reserva
+        reserva.fecha_reserva = fecha_reserva
+        reserva.fecha_inicio_deseada = fecha_inicio_deseada
+        reserva.fecha_fin_deseada = fecha_fin_deseada
+        reserva.cliente = cliente
+        reserva.vehiculo = vehiculo
+        return reserva
+
+    # Representación legible
+    def __repr__(self):
+        return f"Reserva {self.id_reserva} - Cliente {self.cliente.nombre} {self.cliente.apellido}"
 
     def a_dict(self):
         return {
@@ -0,0 +1,67 @@
+import json
+
+# Estados posibles de un trabajo
+PENDIENTE = "pendiente"
+EN_PROCESO = "en_proceso"
+TERMINADO = "terminado"
+ERROR = "error"
+
+
+class TrabajoReporte:
+    """ Un pedido de reporte que se genera en segundo plano. """
+    # Los atributos son las columnas de TRABAJO_REPORTE: con __slots__, un nombre
+    # mal escrito en desde_bd() o en el servicio falla en vez de crear otro atributo.
+    __slots__ = ("id_trabajo", "tipo", "parametros", "estado", "url", "error",
+                 "codigo_error", "creado_en", "actualizado_en")
+
+    def __init__(self, id_trabajo: str, tipo: str, parametros: dict, creado_en: str):
+        if not tipo:
+            raise ValueError("El tipo de reporte es obligatorio.")
+        if not isinstance(parametros, dict):
+            raise ValueError("Los parámetros del reporte deben ser un objeto JSON.")
+
+        self.id_trabajo = id_trabajo
+        self.tipo = tipo
+        self.parametros = parametros
+        self.estado = PENDIENTE
+        self.url = None
+        self.error = None
+        self.codigo_error = None
+        self.creado_en = creado_en
+        self.actualizado_en = creado_en
+
+    @classmethod
+    def desde_bd(cls, id_trabajo, tipo, parametros, estado, url, error, codigo_error,
+                 creado_en, actualizado_en):
+        """ Carga de confianza para los DAOs: sin validar ('parametros' llega como JSON). """
+        trabajo = cls.__new__(cls)
+        trabajo.id_trabajo = id_trabajo
+        trabajo.tipo = tipo
+        trabajo.parametros = json.loads(parametros)
+        trabajo.estado = estado
+        trabajo.url = url
+        trabajo.error = error
+        trabajo.codigo_error = codigo_error
+        trabajo.creado_en = creado_en
+        trabajo.actualizado_en = actualizado_en
+        return trabajo
+
+    @property
+    def finalizado(self):
+        return self.estado in (TERMINADO, ERROR)
+
+    def __repr__(self):
+        return f"TrabajoReporte {self.id_trabajo} ({self.tipo}) - {self.estado}"
+
+    def a_dict(self):
+        return {
+            "id_trabajo": self.id_trabajo,
+            "tipo": self.tipo,
+            "parametros": self.parametros,
+            "estado": self.estado,
+            "url": self.url,
+            "error": self.error,
+            "codigo_error": self.codigo_error,
+            "creado_en": self.creado_en,
+            "actualizado_en": self.actualizado_en,
+        }
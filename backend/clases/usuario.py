@@ -1,6 +1,9 @@
 import re
 
 class Usuario:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("id_usuario", "_nombre_usuario", "_contraseña", "rol", "id_cliente", "id_empleado")
+
     def __init__(self, id_usuario: int, nombre_usuario: str, contraseña: str,
         rol: str, id_cliente: int = None, id_empleado: int = None):
         
@@ -23,6 +26,18 @@ class Usuario:
         self.id_cliente = id_cliente
         self.id_empleado = id_empleado
 
+    @classmethod
+    def desde_bd(cls, id_usuario, nombre_usuario, contraseña, rol, id_cliente=None, id_empleado=None):
+        """ Carga de confianza para los DAOs: sin volver a validar. """
+        usuario = cls.__new__(cls)
+        usuario.id_usuario = id_usuario
+        usuario._nombre_usuario = nombre_usuario
+        usuario._contraseña = contraseña
+        usuario.rol = rol
+        usuario.id_cliente = id_cliente
+        usuario.id_empleado = id_empleado
+        return usuario
+
     # Propiedades con validación
     @property
     def nombre_usuario(self):
@@ -9,6 +9,10 @@ if TYPE_CHECKING:
     from .alquiler import Alquiler
 
 class Vehiculo:
+    # __slots__: sin __dict__ por instancia (menos memoria al cargar miles de filas)
+    __slots__ = ("_patente", "marca", "modelo", "anio", "precio_diario", "estado",
+                 "_reservas", "_alquileres", "_mantenimientos")
+
     def __init__(self, patente: str, marca: str, modelo: str, anio: int,
                  precio_diario: float, estado: str = "Disponible"):
         
@@ -19,10 +23,44 @@ class Vehiculo:
         self.precio_diario = precio_diario
         self.estado = estado
 
-        # Relaciones (Composición)
-        self.reservas: List["Reserva"] = []
-        self.alquileres: List["Alquiler"] = []
-        self.mantenimientos: List["Mantenimiento"] = []
+        # Relaciones (Composición): las listas se crean recién al usarlas
+        self._reservas = None
+        self._alquileres = None
+        self._mantenimientos = None
+
+    @classmethod
+    def desde_bd(cls, patente, marca, modelo, anio, precio_diario, estado):
+        """
+        Carga de confianza para los DAOs: los datos ya fueron validados al
+        guardarse, así que no se vuelven a validar (sin regex de la patente).
+        """
+        vehiculo = cls.__new__(cls)
+        vehiculo._patente = patente
+        vehiculo.marca = marca
+        vehiculo.modelo = modelo
+        vehiculo.anio = anio
+        vehiculo.precio_diario = precio_diario
+        vehiculo.estado = estado
+        vehiculo._reservas = vehiculo._alquileres = vehiculo._mantenimientos = None
+        return vehiculo
+
+    @property
+    def reservas(self) -> List["Reserva"]:
+        if self._reservas is None:
+            self._reservas = []
+        return self._reservas
+
+    @property
+    def alquileres(self) -> List["Alquiler"]:
+        if self._alquileres is None:
+            self._alquileres = []
+        return self._alquileres
+
+    @property
+    def mantenimientos(self) -> List["Mantenimiento"]:
+        if self._mantenimientos is None:
+            self._mantenimientos = []
+        return self._mantenimientos
 
     # --- Propiedad 'patente' con validación ---
     @property
@@ -1,4 +1,5 @@
-import sqlite3, os
+import sqlite3, os, threading
+from contextlib import contextmanager
 
 # Subimos un nivel: de /servicios a /backend
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -6,10 +7,175 @@ BASE_DIR = os.path.join(BASE_DIR, "backend")
 DB_PATH = os.path.join(BASE_DIR, "bd_alquiler_vehiculos.db")
 DB_PATH = DB_PATH.replace('\\', "/")
 
-class ConexionDB:
-    def __init__(self, nombre_bd=DB_PATH):
+# PRAGMAs que se aplican UNA sola vez, al abrir cada conexión física.
+# - WAL: los lectores no bloquean al escritor (y viceversa).
+# - synchronous=NORMAL: seguro con WAL y evita un fsync por commit.
+# - cache_size negativo = KiB (aprox. 64 MB de caché de páginas).
+# - mmap_size: lecturas vía memoria mapeada (256 MB).
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -64000),
+    ("mmap_size", 268435456),
+    ("temp_store", "MEMORY"),
+)
+
+# Cantidad máxima de conexiones ociosas que guardamos por base de datos.
+MAX_CONEXIONES_LIBRES = 8
+
+# Sentencias preparadas que cada conexión mantiene (por texto SQL).
+# Los DAOs arman cada texto una sola vez (ver consulta.py), así que entran todas.
+SENTENCIAS_EN_CACHE = 256
+
+
+class _PoolConexiones:
+    """
+    Pool de conexiones para UNA base de datos.
+    Cada hilo "toma" una conexión y la conserva hasta que llama a liberar()
+    (en Flask, al terminar el request). Las conexiones liberadas se reutilizan
+    en vez de cerrarse, así que viven mientras viva el proceso.
+    """
+
+    def __init__(self, nombre_bd, max_libres=MAX_CONEXIONES_LIBRES):
         self.nombre_bd = nombre_bd
+        self.max_libres = max_libres
+        self._libres = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Un escritor a la vez por proceso en transaccion(inmediata=True)
+        self.lock_escritura = threading.Lock()
+
+    def _abrir(self):
+        # check_same_thread=False: la conexión puede pasar de un hilo a otro
+        # a través del pool, pero nunca la usan dos hilos a la vez.
+        conn = sqlite3.connect(self.nombre_bd, check_same_thread=False,
+                               cached_statements=SENTENCIAS_EN_CACHE)
+        for pragma, valor in PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}={valor}")
+        return conn
+
+    def obtener(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with self._lock:
+                conn = self._libres.pop() if self._libres else None
+            if conn is None:
+                conn = self._abrir()
+            self._local.conn = conn
+        return conn
+
+    def en_transaccion(self):
+        return getattr(self._local, "transaccion", False)
+
+    def liberar(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        self._local.transaccion = False
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._libres) < self.max_libres:
+                self._libres.append(conn)
+                return
+        conn.close()
+
+    def cerrar_todas(self):
+        with self._lock:
+            libres, self._libres = self._libres, []
+        for conn in libres:
+            conn.close()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+
+class ConexionDB:
+    # Un pool por archivo de base de datos, compartido por todos los DAOs.
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, nombre_bd=None):
+        # Se resuelve en tiempo de ejecución para que los scripts puedan
+        # apuntar 'conexion.DB_PATH' a una copia de la base.
+        self.nombre_bd = nombre_bd or DB_PATH
+
+    def _pool(self):
+        pool = ConexionDB._pools.get(self.nombre_bd)
+        if pool is None:
+            with ConexionDB._pools_lock:
+                pool = ConexionDB._pools.setdefault(self.nombre_bd, _PoolConexiones(self.nombre_bd))
+        return pool
 
     def conectar(self):
-        print(f"[DEBUG] Conectando a la base de datos: {self.nombre_bd}")
-        return sqlite3.connect(self.nombre_bd)
+        """
+        Retorna la conexión persistente del hilo actual.
+        Se puede seguir usando como 'with self.conexion.conectar() as conn:'
+        (el 'with' hace commit/rollback, pero NO cierra la conexión).
+        """
+        return self._pool().obtener()
+
+    @contextmanager
+    def transaccion(self, inmediata=False):
+        """
+        Agrupa varias escrituras (de uno o más DAOs) en UNA transacción del
+        hilo actual: commit si el bloque termina bien, rollback si levanta.
+        Mientras está abierta, ORMBase._consultar/_ejecutar usan esta conexión
+        y no hacen commit (ver transaccion_actual()).
+        Una transacción anidada se suma a la de afuera.
+            with ConexionDB().transaccion():
+                dao_a.insertar(...)
+                dao_b.actualizar(...)
+        inmediata=True abre con BEGIN IMMEDIATE: toma el lock de escritura al
+        empezar, así lo que se lee adentro (ej. "¿está libre?") no puede
+        cambiar antes del commit. Los demás escritores esperan (hasta el
+        timeout de la conexión) en vez de fallar a mitad de camino.
+        Dentro del proceso, además, esperan en un threading.Lock: sqlite hace
+        esperar a los bloqueados con pausas de 1, 2, 5, 10... ms, mucho más
+        que lo que dura una escritura corta.
+        """
+        pool = self._pool()
+        conn = pool.obtener()
+        if pool.en_transaccion():
+            yield conn
+            return
+        if inmediata:
+            pool.lock_escritura.acquire()
+        try:
+            conn.execute("BEGIN IMMEDIATE" if inmediata else "BEGIN")
+            pool._local.transaccion = True
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                pool._local.transaccion = False
+        finally:
+            if inmediata:
+                pool.lock_escritura.release()
+
+    def transaccion_actual(self):
+        """ La conexión de la transacción abierta en este hilo, o None. """
+        pool = ConexionDB._pools.get(self.nombre_bd)
+        if pool is not None and pool.en_transaccion():
+            return pool.obtener()
+        return None
+
+    @classmethod
+    def liberar(cls):
+        """ Devuelve al pool las conexiones tomadas por el hilo actual. """
+        for pool in list(cls._pools.values()):
+            pool.liberar()
+
+    @classmethod
+    def cerrar_todas(cls):
+        """ Cierra todas las conexiones (ej. al terminar un script o un test). """
+        with cls._pools_lock:
+            pools, cls._pools = cls._pools, {}
+        for pool in pools.values():
+            pool.cerrar_todas()
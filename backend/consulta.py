@@ -0,0 +1,143 @@
+# --- Archivo: consulta.py ---
+#
+# Constructor de consultas parametrizadas para los DAOs.
+#   dao.consulta().donde("patente", patente).ordenar("-fecha_inicio").limite(10).todas()
+# Los valores SIEMPRE viajan como parámetros (?), nunca dentro del texto SQL,
+# y las columnas se validan contra las del DAO. Como el texto solo depende de
+# la "forma" de la consulta (no de los valores), se arma una vez y se guarda
+# en un caché por clase DAO: sqlite reutiliza la sentencia ya preparada.
+
+import threading
+from typing import Any, Iterable, Optional
+
+# "NOCASE": igualdad sin distinguir mayúsculas (COLLATE NOCASE). A diferencia
+# de LIKE, un '%' o '_' en el valor no funciona como comodín.
+OPERADORES = ("=", "!=", "<", "<=", ">", ">=", "LIKE", "NOCASE")
+
+# (clase DAO, clave) -> texto SQL
+_CACHE_SQL = {}
+_cache_lock = threading.Lock()
+
+
+def sql_cacheado(clase, clave, construir):
+    """ Retorna el SQL guardado para (clase, clave); si no existe lo arma con construir(). """
+    sql = _CACHE_SQL.get((clase, clave))
+    if sql is None:
+        sql = construir()
+        with _cache_lock:
+            _CACHE_SQL.setdefault((clase, clave), sql)
+    return sql
+
+
+def _tamano_in(cantidad):
+    """
+    Cantidad de marcadores para un IN: la siguiente potencia de 2.
+    Así 3, 4 o 5 valores no generan tres textos distintos (y tres sentencias
+    preparadas distintas); los huecos se rellenan repitiendo el último valor.
+    """
+    tamano = 1
+    while tamano < cantidad:
+        tamano *= 2
+    return tamano
+
+
+class Consulta:
+    """ SELECT parametrizado sobre la tabla de un DAO (ver ORMBase.consulta()). """
+
+    def __init__(self, dao):
+        self._dao = dao
+        self._clase = type(dao)
+        self._tabla = dao.tabla
+        self._permitidas = [dao.clave_primaria, *dao.campos]
+        self._proyeccion = tuple(self._permitidas)
+        self._condiciones = []   # (campo, operador, cantidad de marcadores)
+        self._parametros = []
+        self._orden = []         # (campo, descendente)
+        self._limite = None
+
+    def _validar(self, campo):
+        if campo not in self._permitidas:
+            raise ValueError(f"Columna desconocida para {self._tabla}: '{campo}'.")
+        return campo
+
+    # --- Partes de la consulta (todas retornan self, para encadenar) ---
+    def columnas(self, *campos: str) -> "Consulta":
+        """ Proyección: solo estas columnas (por defecto, la pk y todos los campos). """
+        self._proyeccion = tuple(self._validar(c) for c in campos)
+        return self
+
+    def donde(self, campo: str, valor: Any, operador: str = "=") -> "Consulta":
+        if operador not in OPERADORES:
+            raise ValueError(f"Operador no permitido: '{operador}'.")
+        self._condiciones.append((self._validar(campo), operador, 1))
+        self._parametros.append(valor)
+        return self
+
+    def en(self, campo: str, valores: Iterable[Any]) -> "Consulta":
+        valores = list(valores)
+        if not valores:
+            # 'IN ()' no es SQL válido: una lista vacía no matchea nada.
+            self._condiciones.append((self._validar(campo), "IN", 0))
+            return self
+        tamano = _tamano_in(len(valores))
+        self._condiciones.append((self._validar(campo), "IN", tamano))
+        self._parametros.extend(valores + [valores[-1]] * (tamano - len(valores)))
+        return self
+
+    def entre(self, campo: str, desde: Any, hasta: Any) -> "Consulta":
+        self._condiciones.append((self._validar(campo), "BETWEEN", 2))
+        self._parametros.extend([desde, hasta])
+        return self
+
+    def ordenar(self, *campos: str) -> "Consulta":
+        """ Campos de orden; "-campo" = descendente (igual que en la paginación). """
+        for campo in campos:
+            self._orden.append((self._validar(campo.lstrip("-")), campo.startswith("-")))
+        return self
+
+    def limite(self, cantidad: Optional[int]) -> "Consulta":
+        self._limite = None if cantidad is None else int(cantidad)
+        return self
+
+    # --- Armado del SQL ---
+    def _forma(self):
+        return (self._proyeccion, tuple(self._condiciones), tuple(self._orden), self._limite is not None)
+
+    def _armar_sql(self):
+        sql = f"SELECT {', '.join(self._proyeccion)} FROM {self._tabla}"
+        partes = []
+        for campo, operador, cantidad in self._condiciones:
+            if operador == "IN":
+                partes.append(f"{campo} IN ({', '.join(['?'] * cantidad)})" if cantidad else "0")
+            elif operador == "BETWEEN":
+                partes.append(f"{campo} BETWEEN ? AND ?")
+            elif operador == "NOCASE":
+                partes.append(f"{campo} = ? COLLATE NOCASE")
+            else:
+                partes.append(f"{campo} {operador} ?")
+        if partes:
+            sql += " WHERE " + " AND ".join(partes)
+        if self._orden:
+            sql += " ORDER BY " + ", ".join(f"{c} {'DESC' if d else 'ASC'}" for c, d in self._orden)
+        if self._limite is not None:
+            sql += " LIMIT ?"
+        return sql
+
+    def sql(self):
+        """ Retorna (texto_sql, parametros). El texto sale del caché de la clase DAO. """
+        texto = sql_cacheado(self._clase, ("consulta", self._forma()), self._armar_sql)
+        parametros = list(self._parametros)
+        if self._limite is not None:
+            parametros.append(self._limite)
+        return texto, parametros
+
+    # --- Ejecución ---
+    def todas(self):
+        """ Retorna una lista de tuplas. """
+        texto, parametros = self.sql()
+        return self._dao._consultar(texto, parametros)
+
+    def primera(self):
+        """ Retorna la primera tupla, o None. """
+        texto, parametros = self.sql()
+        return self._dao._consultar(texto, parametros, una=True)
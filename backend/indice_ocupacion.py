@@ -0,0 +1,170 @@
+# --- Archivo: indice_ocupacion.py ---
+#
+# Índice en memoria de los períodos en que cada vehículo está ocupado:
+# alquilado (ALQUILER), reservado (RESERVA con patente) o en mantenimiento
+# (MANTENIMIENTO). Responde "¿qué vehículos están libres entre D1 y D2?"
+# sin recorrer esas tablas.
+#
+# Por patente se guardan los intervalos FUSIONADOS (sin solapes) y ordenados,
+# como dos tuplas paralelas (inicios, fines) de fechas ISO. Como no se
+# solapan, los fines también quedan ordenados: alcanza con una búsqueda
+# binaria (bisect) para saber si [D1, D2] toca alguno. O(log k) por vehículo,
+# con k = períodos de ese vehículo, en vez de leer todo el historial.
+# Los rangos son de días completos, con las dos puntas incluidas.
+#
+# Las reservas de un cliente no le impiden a ESE cliente alquilar el vehículo
+# (la misma regla que AlquilerCRUD._sql_ocupado): por eso cada patente guarda
+# también los períodos "firmes" (alquileres y mantenimientos, fusionados) y
+# sus reservas con el cliente, que solo se miran cuando se pregunta por un
+# cliente y el vehículo está ocupado.
+#
+# Se arma con el primer uso (una consulta por tabla). Los servicios llaman
+# a ocupacion_modificada(patente, ...) DESPUÉS de confirmar cada escritura
+# en esas tablas: se vuelven a leer solo esas patentes.
+# Vive en la memoria del proceso (como cache_reportes): si otro proceso
+# escribe en la base, usar reconstruir().
+
+import bisect
+import heapq
+import threading
+from datetime import date
+
+_lock = threading.Lock()
+_intervalos = None      # patente -> (inicios, fines, firmes, reservas), o None si todavía no se armó
+_SIN_PERIODOS = ((), (), ((), ()), ())
+
+
+def _fuentes():
+    # Import diferido: los DAOs se cargan recién cuando se arma el índice
+    from Crud.alquiler_crud import AlquilerCRUD
+    from Crud.reserva_crud import ReservaCRUD
+    from Crud.mantenimiento_crud import MantenimientoCRUD
+    return (AlquilerCRUD(), ReservaCRUD(), MantenimientoCRUD())
+
+
+def _fusionar(filas):
+    """ (patente, inicio, fin) ordenadas por patente e inicio -> {patente: (inicios, fines)} sin solapes. """
+    resultado = {}
+    actual, inicios, fines = None, [], []
+    for patente, inicio, fin in filas:
+        if patente != actual:
+            if actual is not None:
+                resultado[actual] = (tuple(inicios), tuple(fines))
+            actual, inicios, fines = patente, [], []
+        if fines and inicio <= fines[-1]:
+            # Se solapa con el anterior: se extiende
+            if fin > fines[-1]:
+                fines[-1] = fin
+        else:
+            inicios.append(inicio)
+            fines.append(fin)
+    if actual is not None:
+        resultado[actual] = (tuple(inicios), tuple(fines))
+    return resultado
+
+
+def _leer(patentes=None):
+    """ {patente: (inicios, fines, firmes, reservas)} con los períodos de las tres tablas. """
+    alquiler_dao, reserva_dao, mantenimiento_dao = _fuentes()
+    alquileres = alquiler_dao.intervalos_ocupacion(patentes)
+    mantenimientos = mantenimiento_dao.intervalos_ocupacion(patentes)
+    reservas = reserva_dao.intervalos_ocupacion(patentes, extra="id_cliente")
+    # Las listas vienen ordenadas por (patente, inicio): un solo merge
+    todos = _fusionar(heapq.merge(alquileres, mantenimientos, (r[:3] for r in reservas)))
+    firmes = _fusionar(heapq.merge(alquileres, mantenimientos))
+    por_patente = {}
+    for patente, inicio, fin, id_cliente in reservas:
+        por_patente.setdefault(patente, []).append((inicio, fin, id_cliente))
+    return {patente: (inicios, fines, firmes.get(patente, ((), ())), tuple(por_patente.get(patente, ())))
+            for patente, (inicios, fines) in todos.items()}
+
+
+def _indice():
+    global _intervalos
+    intervalos = _intervalos
+    if intervalos is None:
+        with _lock:
+            if _intervalos is None:
+                _intervalos = _leer()
+            intervalos = _intervalos
+    return intervalos
+
+
+def _iso(valor):
+    return valor.isoformat() if isinstance(valor, date) else valor
+
+
+def _toca(inicios, fines, desde, hasta):
+    """ True si algún intervalo (fusionados y ordenados) toca [desde, hasta]. """
+    # El último período que empieza antes de 'hasta' (o ese mismo día)...
+    i = bisect.bisect_right(inicios, hasta) - 1
+    # ...es el único que puede terminar después de 'desde'
+    return i >= 0 and fines[i] >= desde
+
+
+def ocupado(patente, desde, hasta, id_cliente=None):
+    """
+    True si el vehículo tiene algún período que toca [desde, hasta] (date o ISO).
+    Con 'id_cliente', las reservas de ese cliente no cuentan (ver AlquilerCRUD._sql_ocupado).
+    """
+    desde, hasta = _iso(desde), _iso(hasta)
+    inicios, fines, firmes, reservas = _indice().get(patente, _SIN_PERIODOS)
+    if not _toca(inicios, fines, desde, hasta):
+        return False
+    if id_cliente is None or _toca(*firmes, desde, hasta):
+        return True
+    # Solo lo ocupan reservas: ¿alguna es de otro cliente?
+    return any(inicio <= hasta and fin >= desde and cliente is not None and cliente != id_cliente
+               for inicio, fin, cliente in reservas)
+
+
+def libres(patentes, desde, hasta, id_cliente=None):
+    """ Las 'patentes' (en el mismo orden) sin ningún período en [desde, hasta] (ver ocupado()). """
+    return [p for p in patentes if not ocupado(p, desde, hasta, id_cliente)]
+
+
+def periodos(patente):
+    """ LISTA de (inicio, fin) ISO, ya fusionados, en que el vehículo está ocupado. """
+    inicios, fines, _, _ = _indice().get(patente, _SIN_PERIODOS)
+    return list(zip(inicios, fines))
+
+
+def ocupacion_modificada(*patentes):
+    """
+    Vuelve a leer los períodos de esas patentes (llamar después del commit).
+    Si el índice todavía no se armó, no hace nada: se arma completo al usarlo.
+    """
+    patentes = {p for p in patentes if p}
+    if not patentes:
+        return
+    # Con el lock tomado mientras se lee: dos escrituras seguidas no pueden
+    # dejar guardada la lectura más vieja. Los lectores no toman el lock:
+    # cada patente se reemplaza de una vez (una tupla nueva).
+    with _lock:
+        if _intervalos is None:
+            return
+        nuevos = _leer(sorted(patentes))
+        for patente in patentes:
+            if patente in nuevos:
+                _intervalos[patente] = nuevos[patente]
+            else:
+                _intervalos.pop(patente, None)
+
+
+def reconstruir():
+    """ Descarta el índice: se vuelve a armar completo con el próximo uso. """
+    global _intervalos
+    with _lock:
+        _intervalos = None
+
+
+def estadisticas():
+    """ Vehículos y períodos en el índice (None si todavía no se armó). """
+    intervalos = _intervalos
+    if intervalos is None:
+        return {"armado": False}
+    return {
+        "armado": True,
+        "vehiculos": len(intervalos),
+        "periodos": sum(len(periodos[0]) for periodos in list(intervalos.values())),
+    }
@@ -0,0 +1,172 @@
+# --- Archivo: instrumentacion.py ---
+#
+# Métricas de la capa de datos.
+# ORMBase llama a registrar_consulta() por cada sentencia que ejecuta, con su
+# texto, duración y cantidad de filas. Con eso se arman:
+#   - un histograma de tiempos por DAO,
+#   - totales por texto SQL (para encontrar las consultas "calientes"),
+#   - el log de consultas lentas (con su EXPLAIN QUERY PLAN).
+#
+# Configuración por variables de entorno:
+#   CONSULTA_LENTA_MS  umbral del log de consultas lentas (por defecto 100 ms)
+#   LOG_FORMATO        "json" para un objeto JSON por línea, o "texto" (por defecto)
+#   LOG_NIVEL          nivel de logging (por defecto INFO)
+
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+
+logger = logging.getLogger("datos")
+logger_lentas = logging.getLogger("datos.lentas")
+
+# Límites superiores (en ms) de los "baldes" del histograma; el último es +inf.
+LIMITES_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+umbral_lenta_ms = float(os.environ.get("CONSULTA_LENTA_MS", 100))
+
+_lock = threading.Lock()
+_por_dao = {}
+_por_sentencia = {}
+_planes = {}  # sql -> plan ya capturado (se explica una sola vez por texto)
+
+
+class Histograma:
+    """ Cantidad de consultas por rango de duración, más total y máximo. """
+
+    def __init__(self):
+        self.baldes = [0] * (len(LIMITES_MS) + 1)
+        self.cantidad = 0
+        self.total_ms = 0.0
+        self.maximo_ms = 0.0
+        self.filas = 0
+
+    def agregar(self, duracion_ms, filas):
+        posicion = len(LIMITES_MS)
+        for i, limite in enumerate(LIMITES_MS):
+            if duracion_ms <= limite:
+                posicion = i
+                break
+        self.baldes[posicion] += 1
+        self.cantidad += 1
+        self.total_ms += duracion_ms
+        self.maximo_ms = max(self.maximo_ms, duracion_ms)
+        self.filas += filas
+
+    def a_dict(self):
+        # Lista (no dict) para que el orden de los baldes sobreviva al JSON.
+        limites = list(LIMITES_MS) + [None]
+        return {
+            "cantidad": self.cantidad,
+            "total_ms": round(self.total_ms, 3),
+            "promedio_ms": round(self.total_ms / self.cantidad, 3) if self.cantidad else 0.0,
+            "maximo_ms": round(self.maximo_ms, 3),
+            "filas": self.filas,
+            "histograma": [{"hasta_ms": l, "cantidad": n} for l, n in zip(limites, self.baldes)],
+        }
+
+
+@lru_cache(maxsize=1024)
+def _normalizar(sql):
+    """ Colapsa espacios y saltos de línea (los DAOs arman SQL multilínea). """
+    return " ".join(sql.split())
+
+
+def _plan(conn, sql, parametros):
+    """ EXPLAIN QUERY PLAN de la sentencia (se captura una vez por texto SQL). """
+    plan = _planes.get(sql)
+    if plan is None and conn is not None:
+        try:
+            plan = [fila[3] for fila in conn.execute("EXPLAIN QUERY PLAN " + sql, parametros)]
+        except Exception as e:
+            plan = [f"(no se pudo obtener el plan: {e})"]
+        _planes[sql] = plan
+    return plan
+
+
+def registrar_consulta(origen, sql, parametros, duracion, filas, conn=None):
+    """
+    Registra una sentencia ejecutada.
+    origen: nombre del DAO; duracion: en segundos; filas: leídas o afectadas.
+    'conn' se usa solo para pedir el plan si la consulta fue lenta.
+    """
+    duracion_ms = duracion * 1000
+    sql = _normalizar(sql)
+    with _lock:
+        _por_dao.setdefault(origen, Histograma()).agregar(duracion_ms, filas)
+        _por_sentencia.setdefault(sql, Histograma()).agregar(duracion_ms, filas)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Consulta", extra={"dao": origen, "sql": sql,
+                                        "duracion_ms": round(duracion_ms, 3), "filas": filas})
+    if duracion_ms >= umbral_lenta_ms:
+        logger_lentas.warning("Consulta lenta", extra={
+            "dao": origen,
+            "sql": sql,
+            "duracion_ms": round(duracion_ms, 3),
+            "filas": filas,
+            "plan": _plan(conn, sql, parametros),
+        })
+
+
+def estadisticas(top=20):
+    """ Retorna las métricas acumuladas: por DAO y las 'top' sentencias por tiempo total. """
+    with _lock:
+        por_dao = {dao: h.a_dict() for dao, h in sorted(_por_dao.items())}
+        sentencias = sorted(_por_sentencia.items(), key=lambda par: par[1].total_ms, reverse=True)
+        calientes = [{"sql": sql, **h.a_dict()} for sql, h in sentencias[:top]]
+    return {"umbral_lenta_ms": umbral_lenta_ms, "por_dao": por_dao, "sentencias": calientes}
+
+
+def reiniciar():
+    with _lock:
+        _por_dao.clear()
+        _por_sentencia.clear()
+        _planes.clear()
+
+
+# --- Logging estructurado ---
+_CAMPOS_ESTANDAR = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class FormatoJSON(logging.Formatter):
+    """ Un objeto JSON por línea: nivel, logger, mensaje y los campos de 'extra'. """
+
+    def format(self, registro):
+        datos = {
+            "momento": self.formatTime(registro),
+            "nivel": registro.levelname,
+            "logger": registro.name,
+            "mensaje": registro.getMessage(),
+        }
+        datos.update({k: v for k, v in vars(registro).items() if k not in _CAMPOS_ESTANDAR})
+        if registro.exc_info:
+            datos["excepcion"] = self.formatException(registro.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    """ Formato legible; los campos de 'extra' se agregan como clave=valor. """
+
+    def format(self, registro):
+        texto = super().format(registro)
+        extras = {k: v for k, v in vars(registro).items() if k not in _CAMPOS_ESTANDAR}
+        if extras:
+            texto += " | " + " ".join(f"{k}={v}" for k, v in extras.items())
+        return texto
+
+
+def configurar_logging():
+    """ Configura el logger raíz una sola vez (formato según LOG_FORMATO). """
+    raiz = logging.getLogger()
+    if getattr(raiz, "_configurado_por_instrumentacion", False):
+        return
+    manejador = logging.StreamHandler()
+    if os.environ.get("LOG_FORMATO", "texto").lower() == "json":
+        manejador.setFormatter(FormatoJSON())
+    else:
+        manejador.setFormatter(FormatoTexto("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    raiz.addHandler(manejador)
+    raiz.setLevel(os.environ.get("LOG_NIVEL", "INFO").upper())
+    raiz._configurado_por_instrumentacion = True
@@ -0,0 +1,74 @@
+# --- Archivo: mapa_identidad.py ---
+#
+# Mapa de identidad ("identity map") para la capa de datos.
+# Dentro de una "unidad de trabajo" (un request de Flask, o un bloque
+# 'with unidad_de_trabajo():' en un script) cada fila se carga y cada
+# entidad se ensambla UNA sola vez: si 500 alquileres apuntan a 10
+# vehículos, se construyen 10 objetos Vehiculo, no 500.
+
+import contextvars
+from contextlib import contextmanager
+
+
+class MapaIdentidad:
+    """ Guarda filas crudas y entidades ya ensambladas, por (tabla, clave). """
+
+    def __init__(self):
+        self._filas = {}
+        self._entidades = {}
+
+    def obtener_fila(self, tabla, clave):
+        return self._filas.get((tabla, clave))
+
+    def registrar_fila(self, tabla, clave, fila):
+        self._filas[(tabla, clave)] = fila
+
+    def obtener(self, tabla, clave):
+        return self._entidades.get((tabla, clave))
+
+    def registrar(self, tabla, clave, entidad):
+        self._entidades[(tabla, clave)] = entidad
+
+    def descartar(self, tabla, clave):
+        """ Olvida una fila/entidad (se llama al actualizarla o eliminarla). """
+        self._filas.pop((tabla, clave), None)
+        self._entidades.pop((tabla, clave), None)
+
+    def __len__(self):
+        return len(self._entidades)
+
+
+_mapa_actual = contextvars.ContextVar("mapa_identidad", default=None)
+
+
+def mapa_actual():
+    """ Retorna el MapaIdentidad activo, o None si no hay unidad de trabajo. """
+    return _mapa_actual.get()
+
+
+def iniciar_unidad_de_trabajo():
+    """ Activa un mapa nuevo. Retorna el token para finalizar_unidad_de_trabajo(). """
+    return _mapa_actual.set(MapaIdentidad())
+
+
+def finalizar_unidad_de_trabajo(token):
+    _mapa_actual.reset(token)
+
+
+@contextmanager
+def unidad_de_trabajo():
+    """
+    Para scripts:
+        with unidad_de_trabajo():
+            alquileres = servicio.listar_alquileres()
+    Si ya hay una unidad activa, se reutiliza.
+    """
+    mapa = _mapa_actual.get()
+    if mapa is not None:
+        yield mapa
+        return
+    token = iniciar_unidad_de_trabajo()
+    try:
+        yield _mapa_actual.get()
+    finally:
+        finalizar_unidad_de_trabajo(token)
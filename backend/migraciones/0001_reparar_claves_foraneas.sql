@@ -0,0 +1,45 @@
+-- ALQUILER apuntaba a "EMPLEADO_old" (tabla que ya no existe) y
+-- MANTENIMIENTO a "" (ninguna tabla). SQLite no permite cambiar una FK
+-- con ALTER TABLE, así que se reconstruyen ambas tablas conservando los datos.
+
+CREATE TABLE "ALQUILER_nuevo" (
+	"id_alquiler"	INTEGER,
+	"fecha_inicio"	DATE,
+	"fecha_fin"	DATE,
+	"costo_total"	DECIMAL(10,2),
+	"fecha_registro"	DATE,
+	"id_empleado"	INTEGER,
+	"patente"	VARCHAR(20),
+	"id_cliente"	INTEGER,
+	PRIMARY KEY("id_alquiler"),
+	FOREIGN KEY("id_cliente") REFERENCES "CLIENTE"("id_cliente"),
+	FOREIGN KEY("id_empleado") REFERENCES "EMPLEADO"("id_empleado"),
+	FOREIGN KEY("patente") REFERENCES "VEHICULO"("patente")
+);
+
+INSERT INTO "ALQUILER_nuevo"
+	(id_alquiler, fecha_inicio, fecha_fin, costo_total, fecha_registro, id_empleado, patente, id_cliente)
+SELECT id_alquiler, fecha_inicio, fecha_fin, costo_total, fecha_registro, id_empleado, patente, id_cliente
+FROM "ALQUILER";
+
+DROP TABLE "ALQUILER";
+ALTER TABLE "ALQUILER_nuevo" RENAME TO "ALQUILER";
+
+CREATE TABLE "MANTENIMIENTO_nuevo" (
+	"id_mantenimiento"	INTEGER,
+	"patente"	VARCHAR(20),
+	"fecha_inicio"	DATE,
+	"fecha_fin"	DATE,
+	"tipo_servicio"	VARCHAR(255),
+	"costo"	DECIMAL(10,2),
+	PRIMARY KEY("id_mantenimiento"),
+	FOREIGN KEY("patente") REFERENCES "VEHICULO"("patente")
+);
+
+INSERT INTO "MANTENIMIENTO_nuevo"
+	(id_mantenimiento, patente, fecha_inicio, fecha_fin, tipo_servicio, costo)
+SELECT id_mantenimiento, patente, fecha_inicio, fecha_fin, tipo_servicio, costo
+FROM "MANTENIMIENTO";
+
+DROP TABLE "MANTENIMIENTO";
+ALTER TABLE "MANTENIMIENTO_nuevo" RENAME TO "MANTENIMIENTO";
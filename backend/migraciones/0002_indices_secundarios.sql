@@ -0,0 +1,12 @@
+-- Índices para las columnas por las que filtran/unen los DAOs:
+--   AlquilerCRUD.buscar_por_cliente        -> ALQUILER(id_cliente)
+--   MultaCRUD.buscar_por_patente           -> ALQUILER(patente, fecha_inicio)
+--   MultaCRUD.buscar_por_id_cliente / JOIN -> MULTA_DANO(id_alquiler)
+--   ReservaCRUD (disponibilidad)           -> RESERVA(patente, fecha_inicio_deseada)
+--   MantenimientoCRUD.buscar_por_patente   -> MANTENIMIENTO(patente)
+
+CREATE INDEX IF NOT EXISTS "idx_alquiler_cliente" ON "ALQUILER"("id_cliente");
+CREATE INDEX IF NOT EXISTS "idx_alquiler_patente_inicio" ON "ALQUILER"("patente", "fecha_inicio");
+CREATE INDEX IF NOT EXISTS "idx_multa_alquiler" ON "MULTA_DANO"("id_alquiler");
+CREATE INDEX IF NOT EXISTS "idx_reserva_patente_inicio" ON "RESERVA"("patente", "fecha_inicio_deseada");
+CREATE INDEX IF NOT EXISTS "idx_mantenimiento_patente" ON "MANTENIMIENTO"("patente");
@@ -0,0 +1,6 @@
+-- Los reportes por período agregan un año de alquileres con
+--   WHERE fecha_inicio >= ? AND fecha_inicio < ? GROUP BY mes/trimestre
+-- Con este índice (que además cubre costo_total) SQLite lee solo el rango del
+-- año pedido, sin tocar la tabla: el costo no depende del historial total.
+
+CREATE INDEX IF NOT EXISTS "idx_alquiler_fecha_inicio" ON "ALQUILER"("fecha_inicio", "costo_total");
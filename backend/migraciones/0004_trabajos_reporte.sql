@@ -0,0 +1,18 @@
+-- Cola de trabajos de reportes (ver servicios/trabajo_reporte_service.py).
+-- El estado se guarda en la base (no en memoria) para que un reinicio del
+-- servidor no pierda los trabajos: los pendientes se vuelven a encolar.
+
+CREATE TABLE IF NOT EXISTS "TRABAJO_REPORTE" (
+	"id_trabajo"	VARCHAR(32),
+	"tipo"	VARCHAR(50) NOT NULL,
+	"parametros"	TEXT NOT NULL,
+	"estado"	VARCHAR(20) NOT NULL,
+	"url"	TEXT,
+	"error"	TEXT,
+	"codigo_error"	INTEGER,
+	"creado_en"	TEXT NOT NULL,
+	"actualizado_en"	TEXT NOT NULL,
+	PRIMARY KEY("id_trabajo")
+);
+
+CREATE INDEX IF NOT EXISTS "idx_trabajo_reporte_estado" ON "TRABAJO_REPORTE"("estado");
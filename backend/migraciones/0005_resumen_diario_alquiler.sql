@@ -0,0 +1,23 @@
+-- Resumen diario de alquileres (ver Crud/resumen_diario_crud.py).
+-- Una fila por (día de inicio, patente) con la cantidad de alquileres, lo
+-- facturado y los días alquilados. AlquilerService lo mantiene en la misma
+-- transacción que cada alta/modificación/baja de ALQUILER, y los reportes
+-- por período y de vehículos leen de acá: un rango chico de esta tabla en
+-- vez de todo el historial de alquileres.
+-- Si alguna vez se desincroniza: python3 -m scripts.reconstruir_resumen_diario
+
+CREATE TABLE IF NOT EXISTS "ALQUILER_RESUMEN_DIARIO" (
+	"dia"	DATE NOT NULL,
+	"patente"	VARCHAR(20) NOT NULL,
+	"alquileres"	INTEGER NOT NULL DEFAULT 0,
+	"facturacion"	DECIMAL(10,2) NOT NULL DEFAULT 0,
+	"dias_alquiler"	INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY("dia", "patente")
+) WITHOUT ROWID;
+
+-- Carga inicial con el historial existente
+INSERT OR REPLACE INTO "ALQUILER_RESUMEN_DIARIO" ("dia", "patente", "alquileres", "facturacion", "dias_alquiler")
+SELECT fecha_inicio, patente, COUNT(*), ROUND(COALESCE(SUM(costo_total), 0), 2),
+       COALESCE(SUM(CAST(julianday(fecha_fin) - julianday(fecha_inicio) AS INTEGER)), 0)
+FROM "ALQUILER"
+GROUP BY fecha_inicio, patente;
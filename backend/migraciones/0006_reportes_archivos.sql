@@ -0,0 +1,19 @@
+-- Archivos de reportes generados (ver almacen_reportes.py).
+-- Una fila por archivo en static/reportes: con qué parámetros se generó,
+-- cuánto pesa, cuánto tardó en dibujarse y cuándo se descargó por última
+-- vez. Con esto se borran los más viejos / menos usados para que la
+-- carpeta no crezca sin límite.
+
+CREATE TABLE IF NOT EXISTS "REPORTE_ARCHIVO" (
+	"nombre"	VARCHAR(255),
+	"tipo"	VARCHAR(50),
+	"parametros"	TEXT,
+	"bytes"	INTEGER NOT NULL,
+	"render_ms"	INTEGER,
+	"creado_en"	TEXT NOT NULL,
+	"ultimo_acceso"	TEXT NOT NULL,
+	"accesos"	INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY("nombre")
+);
+
+CREATE INDEX IF NOT EXISTS "idx_reporte_archivo_acceso" ON "REPORTE_ARCHIVO"("ultimo_acceso");
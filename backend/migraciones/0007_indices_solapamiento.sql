@@ -0,0 +1,9 @@
+-- Chequeo de solapamiento al crear un alquiler (ORMBase.sql_solapamiento):
+--   WHERE patente = ? AND fin >= :desde AND +inicio <= :hasta
+-- Con (patente, fin) SQLite lee solo los períodos de ese vehículo que
+-- terminan después de la fecha pedida (los vigentes y futuros), no todo su
+-- historial como pasaría con (patente, inicio). Incluye el inicio: no toca la tabla.
+
+CREATE INDEX IF NOT EXISTS "idx_alquiler_patente_fin" ON "ALQUILER"("patente", "fecha_fin", "fecha_inicio");
+CREATE INDEX IF NOT EXISTS "idx_reserva_patente_fin" ON "RESERVA"("patente", "fecha_fin_deseada", "fecha_inicio_deseada");
+CREATE INDEX IF NOT EXISTS "idx_mantenimiento_patente_fin" ON "MANTENIMIENTO"("patente", "fecha_fin", "fecha_inicio");
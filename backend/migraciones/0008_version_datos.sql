@@ -0,0 +1,39 @@
+-- Versión de datos por tabla, compartida por todos los procesos (ver
+-- cache_reportes.py). Los triggers la suben DENTRO de la misma transacción
+-- que cada escritura: un worker que escribe invalida los reportes en caché
+-- de todos los demás, sin depender de la memoria de cada proceso.
+-- (Son por fila: un lote de N filas la sube N veces; solo importa que cambie.)
+
+CREATE TABLE IF NOT EXISTS "VERSION_DATOS" (
+	"tabla"	VARCHAR(50),
+	"version"	INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY("tabla")
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO "VERSION_DATOS" ("tabla", "version") VALUES ('ALQUILER', 0), ('VEHICULO', 0);
+
+CREATE TRIGGER IF NOT EXISTS "trg_version_alquiler_insert" AFTER INSERT ON "ALQUILER"
+BEGIN
+	UPDATE "VERSION_DATOS" SET "version" = "version" + 1 WHERE "tabla" = 'ALQUILER';
+END;
+CREATE TRIGGER IF NOT EXISTS "trg_version_alquiler_update" AFTER UPDATE ON "ALQUILER"
+BEGIN
+	UPDATE "VERSION_DATOS" SET "version" = "version" + 1 WHERE "tabla" = 'ALQUILER';
+END;
+CREATE TRIGGER IF NOT EXISTS "trg_version_alquiler_delete" AFTER DELETE ON "ALQUILER"
+BEGIN
+	UPDATE "VERSION_DATOS" SET "version" = "version" + 1 WHERE "tabla" = 'ALQUILER';
+END;
+
+CREATE TRIGGER IF NOT EXISTS "trg_version_vehiculo_insert" AFTER INSERT ON "VEHICULO"
+BEGIN
+	UPDATE "VERSION_DATOS" SET "version" = "version" + 1 WHERE "tabla" = 'VEHICULO';
+END;
+CREATE TRIGGER IF NOT EXISTS "trg_version_vehiculo_update" AFTER UPDATE ON "VEHICULO"
+BEGIN
+	UPDATE "VERSION_DATOS" SET "version" = "version" + 1 WHERE "tabla" = 'VEHICULO';
+END;
+CREATE TRIGGER IF NOT EXISTS "trg_version_vehiculo_delete" AFTER DELETE ON "VEHICULO"
+BEGIN
+	UPDATE "VERSION_DATOS" SET "version" = "version" + 1 WHERE "tabla" = 'VEHICULO';
+END;
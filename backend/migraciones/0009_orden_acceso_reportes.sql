@@ -0,0 +1,17 @@
+-- Orden de uso de los reportes (ver almacen_reportes.py).
+-- "ultimo_acceso" tiene milisegundos: dos descargas del mismo milisegundo
+-- empataban y el LRU desempataba por nombre. "orden" es un contador que
+-- cada alta o descarga pone en MAX(orden) + 1 (en la misma sentencia, así
+-- que no se repite aunque escriban varios procesos): el menor es el menos
+-- usado recientemente.
+
+ALTER TABLE "REPORTE_ARCHIVO" ADD COLUMN "orden" INTEGER NOT NULL DEFAULT 0;
+
+-- Los ya anotados conservan el orden que tenían
+UPDATE "REPORTE_ARCHIVO" SET "orden" = (
+	SELECT COUNT(*) FROM "REPORTE_ARCHIVO" AS otro
+	WHERE (otro."ultimo_acceso", otro."nombre") <= ("REPORTE_ARCHIVO"."ultimo_acceso", "REPORTE_ARCHIVO"."nombre")
+);
+
+DROP INDEX IF EXISTS "idx_reporte_archivo_acceso";
+CREATE INDEX IF NOT EXISTS "idx_reporte_archivo_orden" ON "REPORTE_ARCHIVO"("orden");
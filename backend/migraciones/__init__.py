@@ -0,0 +1,119 @@
+# --- Archivo: migraciones/__init__.py ---
+#
+# Migraciones versionadas del esquema.
+# Cada archivo 'NNNN_descripcion.sql' de esta carpeta es UNA migración; el
+# número es su versión. Las versiones aplicadas se guardan en 'schema_version',
+# así que aplicar_migraciones() solo ejecuta las que faltan (y se puede llamar
+# en cada arranque sin efectos secundarios).
+#
+# Uso desde consola (cd backend):
+#   python3 -m migraciones            -> aplica las pendientes
+#   python3 -m migraciones estado     -> muestra aplicadas y pendientes
+
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+import conexion
+
+CARPETA_MIGRACIONES = os.path.dirname(os.path.abspath(__file__))
+_PATRON_ARCHIVO = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+_SQL_TABLA_VERSION = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version      INTEGER PRIMARY KEY,
+    nombre       VARCHAR(255) NOT NULL,
+    aplicada_en  TEXT NOT NULL
+)
+"""
+
+
+def listar_migraciones(carpeta=CARPETA_MIGRACIONES):
+    """ Retorna [(version, nombre, ruta), ...] ordenada por versión. """
+    migraciones = []
+    for archivo in os.listdir(carpeta):
+        coincidencia = _PATRON_ARCHIVO.match(archivo)
+        if coincidencia:
+            version, nombre = coincidencia.groups()
+            migraciones.append((int(version), nombre, os.path.join(carpeta, archivo)))
+    migraciones.sort()
+    versiones = [m[0] for m in migraciones]
+    if len(versiones) != len(set(versiones)):
+        raise RuntimeError("Hay dos migraciones con el mismo número de versión.")
+    return migraciones
+
+
+def _sentencias(script):
+    """ Separa un script .sql en sentencias completas (respeta ';' dentro de strings). """
+    actual = ""
+    for linea in script.splitlines(keepends=True):
+        actual += linea
+        if sqlite3.complete_statement(actual):
+            yield actual.strip()
+            actual = ""
+    resto = [l for l in actual.splitlines() if l.strip() and not l.strip().startswith("--")]
+    if resto:
+        raise ValueError(f"Sentencia SQL incompleta al final del script: {actual.strip()[:80]}")
+
+
+def _versiones_aplicadas(conn):
+    return {fila[0] for fila in conn.execute("SELECT version FROM schema_version")}
+
+
+def _abrir(nombre_bd):
+    # Conexión propia (no la del pool): las migraciones necesitan
+    # foreign_keys=OFF para reconstruir tablas, y se cierra al terminar.
+    conn = sqlite3.connect(nombre_bd or conexion.DB_PATH, timeout=30)
+    conn.execute("PRAGMA foreign_keys=OFF")
+    conn.execute(_SQL_TABLA_VERSION)
+    conn.commit()
+    return conn
+
+
+def estado(nombre_bd=None, carpeta=CARPETA_MIGRACIONES):
+    """ Retorna (aplicadas, pendientes) como listas de (version, nombre). """
+    conn = _abrir(nombre_bd)
+    try:
+        aplicadas = set(_versiones_aplicadas(conn))
+    finally:
+        conn.close()
+    migraciones = listar_migraciones(carpeta)
+    return ([(v, n) for v, n, _ in migraciones if v in aplicadas],
+            [(v, n) for v, n, _ in migraciones if v not in aplicadas])
+
+
+def aplicar_migraciones(nombre_bd=None, carpeta=CARPETA_MIGRACIONES):
+    """
+    Aplica, en orden, las migraciones que todavía no figuran en schema_version.
+    Cada migración corre en su propia transacción (BEGIN IMMEDIATE): si falla,
+    se deshace completa y no se marca como aplicada.
+    Retorna la lista de (version, nombre) aplicadas en esta llamada.
+    """
+    conn = _abrir(nombre_bd)
+    aplicadas_ahora = []
+    try:
+        for version, nombre, ruta in listar_migraciones(carpeta):
+            with open(ruta, encoding="utf-8") as archivo:
+                script = archivo.read()
+
+            # BEGIN IMMEDIATE toma el lock de escritura: si dos procesos
+            # arrancan a la vez, el segundo espera y vuelve a chequear.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if version in _versiones_aplicadas(conn):
+                    conn.rollback()
+                    continue
+                for sentencia in _sentencias(script):
+                    conn.execute(sentencia)
+                conn.execute(
+                    "INSERT INTO schema_version (version, nombre, aplicada_en) VALUES (?, ?, ?)",
+                    (version, nombre, datetime.now().isoformat(timespec="seconds")))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            aplicadas_ahora.append((version, nombre))
+    finally:
+        conn.close()
+    return aplicadas_ahora
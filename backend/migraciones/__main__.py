@@ -0,0 +1,35 @@
+# Pasos para ejecutar las migraciones a mano:
+# cd backend
+# python3 -m migraciones            -> aplica las pendientes
+# python3 -m migraciones estado     -> muestra aplicadas y pendientes
+
+import sys
+
+from migraciones import aplicar_migraciones, estado
+
+
+def main():
+    comando = sys.argv[1] if len(sys.argv) > 1 else "aplicar"
+
+    if comando == "estado":
+        aplicadas, pendientes = estado()
+        for version, nombre in aplicadas:
+            print(f"✅ {version:04d} {nombre}")
+        for version, nombre in pendientes:
+            print(f"⏳ {version:04d} {nombre} (pendiente)")
+        return
+
+    if comando == "aplicar":
+        aplicadas = aplicar_migraciones()
+        if not aplicadas:
+            print("El esquema ya está al día.")
+        for version, nombre in aplicadas:
+            print(f"✅ Aplicada {version:04d} {nombre}")
+        return
+
+    print(f"Comando desconocido: {comando}. Usar 'aplicar' o 'estado'.")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
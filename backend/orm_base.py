@@ -1,54 +1,449 @@
+import base64
+import json
+import sqlite3
+import time
 from conexion import ConexionDB
+from consulta import Consulta, sql_cacheado
+from instrumentacion import registrar_consulta
+from mapa_identidad import mapa_actual, iniciar_unidad_de_trabajo, finalizar_unidad_de_trabajo
+
+# --- Paginación por cursor (keyset) ---
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 500
+
+# Filas por fetchmany() al recorrer una tabla entera (streaming)
+TAMANO_LOTE = 500
+
+# Filas por executemany() en las operaciones en lote
+TAMANO_CHUNK = 500
+
+
+def codificar_cursor(valores):
+    """ Cursor opaco para el cliente: los valores de la clave de orden de la última fila. """
+    return base64.urlsafe_b64encode(json.dumps(valores).encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(cursor):
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido.")
+    if not isinstance(valores, list):
+        raise ValueError("Cursor inválido.")
+    return valores
+
 
 class ORMBase:
     tabla = None
     campos = []
     clave_primaria = "id"
+    # Columnas permitidas para filtrar/ordenar en obtener_pagina().
+    # None = la clave primaria y todos los campos.
+    campos_filtrables = None
+    campos_ordenables = None
 
     def __init__(self):
         self.conexion = ConexionDB()
 
+    # --- SQL armado UNA vez por clase DAO (ver consulta.py) ---
+    @classmethod
+    def _sql(cls, clave, construir):
+        return sql_cacheado(cls, clave, construir)
+
+    @classmethod
+    def _sql_select(cls):
+        """ 'SELECT pk, campos... FROM tabla' """
+        return cls._sql("select", lambda: f"SELECT {cls.clave_primaria}, {', '.join(cls.campos)} FROM {cls.tabla}")
+
+    def consulta(self):
+        """
+        Constructor de consultas parametrizadas sobre esta tabla.
+        Ej: self.consulta().donde("patente", patente).ordenar("-fecha_inicio").todas()
+        """
+        return Consulta(self)
+
+    # --- Ejecución medida (ver instrumentacion.py) ---
+    # Todo el SQL de los DAOs pasa por acá: se registra texto, duración y filas.
+    def _consultar(self, sql, parametros=(), una=False, conn=None):
+        """
+        Ejecuta un SELECT y retorna la lista de tuplas (o UNA tupla/None si una=True).
+        Si se pasa 'conn' se usa esa conexión (ej. dentro de una transacción abierta).
+        """
+        inicio = time.perf_counter()
+        if conn is None:
+            conn = self.conexion.transaccion_actual()
+        if conn is None:
+            with self.conexion.conectar() as conn:
+                cursor = conn.execute(sql, parametros)
+                resultado = cursor.fetchone() if una else cursor.fetchall()
+        else:
+            cursor = conn.execute(sql, parametros)
+            resultado = cursor.fetchone() if una else cursor.fetchall()
+        filas = (0 if resultado is None else 1) if una else len(resultado)
+        registrar_consulta(type(self).__name__, sql, parametros, time.perf_counter() - inicio, filas, conn)
+        return resultado
+
+    def _ejecutar(self, sql, parametros=(), conn=None, muchos=False):
+        """
+        Ejecuta un INSERT/UPDATE/DELETE (executemany si muchos=True) y retorna el cursor.
+        Sin 'conn' hace commit al terminar; con 'conn' (o dentro de
+        ConexionDB.transaccion()) queda dentro de esa transacción.
+        """
+        inicio = time.perf_counter()
+        ejecutar = "executemany" if muchos else "execute"
+        if conn is None:
+            conn = self.conexion.transaccion_actual()
+        if conn is None:
+            with self.conexion.conectar() as conn:
+                cursor = getattr(conn, ejecutar)(sql, parametros)
+        else:
+            cursor = getattr(conn, ejecutar)(sql, parametros)
+        ejemplo = (parametros[0] if parametros else ()) if muchos else parametros
+        registrar_consulta(type(self).__name__, sql, ejemplo, time.perf_counter() - inicio,
+                           max(cursor.rowcount, 0), conn)
+        return cursor
+
+    @classmethod
+    def columnas_sql(cls, alias):
+        """ Lista de columnas (pk primero) calificada con un alias, para JOINs. """
+        return ", ".join(f"{alias}.{c}" for c in [cls.clave_primaria, *cls.campos])
+
+    # --- Mapa de identidad (ver mapa_identidad.py) ---
+    def _entidad_cargada(self, clave):
+        """ Retorna la entidad ya ensamblada en esta unidad de trabajo, o None. """
+        mapa = mapa_actual()
+        return mapa.obtener(self.tabla, clave) if mapa is not None else None
+
+    def _registrar_entidad(self, clave, entidad):
+        """ Guarda la entidad recién ensamblada y la retorna. """
+        mapa = mapa_actual()
+        if mapa is not None and entidad is not None:
+            mapa.registrar(self.tabla, clave, entidad)
+        return entidad
+
+    def _descartar_de_mapa(self, clave):
+        mapa = mapa_actual()
+        if mapa is not None:
+            mapa.descartar(self.tabla, clave)
+
+    # --- Paginación, filtros y orden ---
+    @classmethod
+    def _columnas_permitidas(cls, lista):
+        return [cls.clave_primaria, *cls.campos] if lista is None else lista
+
+    def _paginar(self, sql_select, limite=LIMITE_POR_DEFECTO, despues=None,
+                 filtros=None, orden=None, alias=None):
+        """
+        Agrega a 'sql_select' (un SELECT sin WHERE/ORDER, con la pk y los campos
+        de esta tabla como primeras columnas) los filtros por igualdad, el orden
+        y la condición de cursor. Retorna (filas, cursor_siguiente o None).
+        El orden siempre desempata por la clave primaria, así el cursor es estable
+        y cada página es un rango del índice (no un OFFSET que crece).
+        """
+        prefijo = f"{alias}." if alias else ""
+        columnas = [self.clave_primaria, *self.campos]
+        limite = max(1, min(int(limite or LIMITE_POR_DEFECTO), LIMITE_MAXIMO))
+
+        condiciones, parametros = [], []
+        filtrables = self._columnas_permitidas(self.campos_filtrables)
+        for campo, valor in (filtros or {}).items():
+            if campo not in filtrables:
+                raise ValueError(f"No se puede filtrar por '{campo}'.")
+            condiciones.append(f"{prefijo}{campo} = ?")
+            parametros.append(valor)
+
+        descendente = bool(orden) and orden.startswith("-")
+        campo_orden = orden.lstrip("-") if orden else self.clave_primaria
+        if campo_orden not in self._columnas_permitidas(self.campos_ordenables):
+            raise ValueError(f"No se puede ordenar por '{campo_orden}'.")
+        claves = [campo_orden, self.clave_primaria] if campo_orden != self.clave_primaria else [campo_orden]
+        claves_sql = [f"{prefijo}{c}" for c in claves]
+
+        if despues:
+            valores = decodificar_cursor(despues)
+            if len(valores) != len(claves):
+                raise ValueError("Cursor inválido.")
+            operador = "<" if descendente else ">"
+            if len(claves) == 1:
+                condiciones.append(f"{claves_sql[0]} {operador} ?")
+                parametros.extend(valores)
+            else:
+                condiciones.append(self._condicion_cursor(*claves_sql, *valores, operador, descendente))
+                parametros.extend(v for v in valores if v is not None)
+
+        sentido = "DESC" if descendente else "ASC"
+        sql = sql_select
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY " + ", ".join(f"{c} {sentido}" for c in claves_sql) + " LIMIT ?"
+        parametros.append(limite + 1) # Una fila de más para saber si hay otra página
+
+        filas = self._consultar(sql, parametros)
+
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            posiciones = [columnas.index(c) for c in claves]
+            siguiente = codificar_cursor([filas[-1][i] for i in posiciones])
+        return filas, siguiente
+
+    @staticmethod
+    def _condicion_cursor(campo_sql, pk_sql, valor, pk, operador, descendente):
+        """
+        Filas posteriores al cursor (valor, pk) en 'ORDER BY campo, pk'.
+        SQLite ordena los NULL primero en ASC y últimos en DESC, y
+        (NULL, pk) > (?, ?) nunca es verdadero: sin este caso aparte, ordenar
+        por una columna con NULLs cortaba la paginación en la primera página.
+        """
+        if valor is None:
+            condicion = f"({campo_sql} IS NULL AND {pk_sql} {operador} ?)"
+            if not descendente:
+                condicion += f" OR {campo_sql} IS NOT NULL"
+        else:
+            condicion = f"({campo_sql}, {pk_sql}) {operador} (?, ?)"
+            if descendente:
+                condicion += f" OR {campo_sql} IS NULL"
+        return f"({condicion})"
+
+    def obtener_pagina(self, limite=LIMITE_POR_DEFECTO, despues=None, filtros=None, orden=None):
+        """
+        Una página de tuplas. 'orden' es un campo (ej. "marca") o "-campo" para descendente.
+        Retorna (tuplas, cursor_siguiente o None).
+        """
+        return self._paginar(self._sql_select(), limite, despues, filtros, orden)
+
+    # --- Lectura por lotes (streaming) ---
+    def iterar_filas(self, sql=None, parametros=(), tamano_lote=TAMANO_LOTE):
+        """
+        Ejecuta la consulta YA y retorna un generador de lotes de tuplas
+        (fetchmany), así nunca tenemos la tabla entera en memoria.
+        Por defecto recorre toda la tabla ordenada por la clave primaria.
+        """
+        if sql is None:
+            sql = self._sql("iterar", lambda: f"{self._sql_select()} ORDER BY {self.clave_primaria}")
+        conn = self.conexion.conectar()
+        inicio = time.perf_counter()
+        cursor = conn.execute(sql, parametros)
+        medicion = {"duracion": time.perf_counter() - inicio, "filas": 0}
+
+        def lotes():
+            try:
+                while True:
+                    inicio = time.perf_counter()
+                    filas = cursor.fetchmany(tamano_lote)
+                    medicion["duracion"] += time.perf_counter() - inicio
+                    if not filas:
+                        break
+                    medicion["filas"] += len(filas)
+                    yield filas
+            finally:
+                cursor.close()
+                # Se registra al terminar (o abandonar) el recorrido:
+                # la duración es solo la de sqlite, sin lo que tarda quien consume.
+                registrar_consulta(type(self).__name__, sql, parametros,
+                                   medicion["duracion"], medicion["filas"], conn)
+        return lotes()
+
+    def _iterar_objetos(self, lotes, ensamblar):
+        """
+        Ensambla los objetos lote por lote. Cada lote usa su propio mapa de
+        identidad, así la memoria queda acotada al tamaño del lote.
+        """
+        for lote in lotes:
+            token = iniciar_unidad_de_trabajo()
+            try:
+                objetos = [o for o in map(ensamblar, lote) if o]
+            finally:
+                finalizar_unidad_de_trabajo(token)
+            yield from objetos
+
+    # --- Exportación (filas crudas, ver servicios/exportacion_service.py) ---
+    # Cada DAO exportable define el SELECT (pk primero, con los JOINs que
+    # hagan falta), los encabezados y la columna de fecha para filtrar.
+    select_exportacion = None
+    columnas_exportacion = None
+    fecha_exportacion = None
+
+    def iterar_exportacion(self, desde=None, hasta=None, tamano_lote=TAMANO_LOTE):
+        """
+        Lotes de tuplas de select_exportacion, en orden de clave primaria y
+        sin ensamblar objetos. 'desde'/'hasta' (ISO, inclusive) filtran por
+        fecha_exportacion.
+        """
+        if self.select_exportacion is None:
+            raise ValueError(f"{self.tabla} no se puede exportar.")
+        rango = (desde is not None, hasta is not None)
+
+        def construir():
+            condiciones = [c for c, usar in zip((f"{self.fecha_exportacion} >= ?",
+                                                  f"{self.fecha_exportacion} <= ?"), rango) if usar]
+            where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+            return f"{self.select_exportacion}{where} ORDER BY 1"
+
+        sql = self._sql(("exportacion", rango), construir)
+        parametros = tuple(v for v in (desde, hasta) if v is not None)
+        return self.iterar_filas(sql, parametros, tamano_lote)
+
+    # --- Períodos en que una fila ocupa un vehículo (ver indice_ocupacion.py) ---
+    # (columna de inicio, columna de fin) de las tablas con 'patente' que
+    # ocupan el vehículo en un rango de fechas (ALQUILER, RESERVA, MANTENIMIENTO).
+    intervalo_ocupacion = None
+
+    def intervalos_ocupacion(self, patentes=None, desde=None, hasta=None, extra=None):
+        """
+        Retorna una LISTA de (patente, inicio, fin) (fechas ISO, ambas inclusive),
+        ordenada por patente e inicio. Opcional: solo esas 'patentes' y/o solo
+        los períodos que se solapan con [desde, hasta]. Sin las filas sin patente.
+        Con 'extra' (el nombre de una columna), cada tupla la suma al final.
+        """
+        if self.intervalo_ocupacion is None:
+            raise ValueError(f"{self.tabla} no ocupa vehículos.")
+        inicio, fin = self.intervalo_ocupacion
+        consulta = self.consulta().columnas("patente", inicio, fin, *([extra] if extra else []))
+        if patentes is not None:
+            consulta.en("patente", patentes)
+        if desde is not None:
+            consulta.donde(fin, desde, ">=")
+        if hasta is not None:
+            consulta.donde(inicio, hasta, "<=")
+        filas = consulta.ordenar("patente", inicio).todas()
+        return [f for f in filas if f[0] is not None and f[1] is not None and f[2] is not None]
+
+    @classmethod
+    def sql_solapamiento(cls, condicion=""):
+        """
+        'EXISTS (...)': alguna fila de esta tabla ocupa :patente en [:desde, :hasta]
+        (parámetros con nombre). 'condicion' agrega un AND (ej. excluir una fila).
+        Recorre el índice (patente, fin) desde :desde (ver migración 0007); el
+        '+' delante del inicio evita que SQLite elija el índice (patente, inicio),
+        que leería todo el historial del vehículo.
+        """
+        inicio, fin = cls.intervalo_ocupacion
+        return cls._sql(("solapamiento", condicion), lambda: (
+            f"EXISTS (SELECT 1 FROM {cls.tabla} WHERE patente = :patente "
+            f"AND {fin} >= :desde AND +{inicio} <= :hasta{f' AND {condicion}' if condicion else ''})"))
+
+    @classmethod
+    def sql_solapadas_con(cls, candidatas, condicion=""):
+        """
+        SELECT (c.indice, tabla, pk, inicio, fin) de las filas de esta tabla que
+        se pisan con cada fila 'c' de 'candidatas' (tabla o CTE con columnas
+        indice, patente, desde, hasta). Mismo recorrido de índice que
+        sql_solapamiento(); 'condicion' puede usar 't' y 'c'.
+        """
+        inicio, fin = cls.intervalo_ocupacion
+        return cls._sql(("solapadas_con", candidatas, condicion), lambda: (
+            f"SELECT c.indice, '{cls.tabla}', t.{cls.clave_primaria}, t.{inicio}, t.{fin} "
+            f"FROM {candidatas} c JOIN {cls.tabla} t ON t.patente = c.patente "
+            f"AND t.{fin} >= c.desde AND +t.{inicio} <= c.hasta{f' AND {condicion}' if condicion else ''}"))
+
+    # --- Operaciones en lote (UNA transacción, executemany por chunks) ---
+    def _ejecutar_lote(self, conn, sql, parametros, indices, tamano_chunk):
+        """
+        Ejecuta 'sql' con executemany por chunks dentro de la transacción abierta.
+        Si un chunk falla, se deshace (SAVEPOINT) y se reintenta fila por fila
+        para saber exactamente qué filas fallaron.
+        Retorna (filas_ok, errores) con errores = [(indice, mensaje), ...].
+        """
+        ok, errores = 0, []
+        for inicio in range(0, len(parametros), tamano_chunk):
+            chunk = parametros[inicio:inicio + tamano_chunk]
+            conn.execute("SAVEPOINT chunk")
+            try:
+                self._ejecutar(sql, chunk, conn=conn, muchos=True)
+                ok += len(chunk)
+            except sqlite3.DatabaseError:
+                conn.execute("ROLLBACK TO chunk")
+                for indice, fila in zip(indices[inicio:inicio + tamano_chunk], chunk):
+                    try:
+                        self._ejecutar(sql, fila, conn=conn)
+                        ok += 1
+                    except sqlite3.DatabaseError as e:
+                        errores.append((indice, str(e)))
+            conn.execute("RELEASE chunk")
+        return ok, errores
+
+    def insertar_lote(self, filas, columnas=None, tamano_chunk=TAMANO_CHUNK):
+        """
+        Inserta muchas filas en una sola transacción (un solo commit).
+        'columnas' por defecto son self.campos (pk autoincremental).
+        Retorna (insertadas, errores) con errores = [(indice_fila, mensaje), ...].
+        """
+        columnas = tuple(columnas or self.campos)
+        sql = self._sql(("insertar", columnas), lambda: (
+            f"INSERT INTO {self.tabla} ({','.join(columnas)}) VALUES ({','.join(['?'] * len(columnas))})"))
+        filas = [tuple(f) for f in filas]
+        with self.conexion.transaccion() as conn:
+            return self._ejecutar_lote(conn, sql, filas, list(range(len(filas))), tamano_chunk)
+
+    def actualizar_lote(self, cambios, tamano_chunk=TAMANO_CHUNK):
+        """
+        Actualiza muchas filas en una sola transacción.
+        'cambios' es una lista de (id_valor, valores) con valores en el orden de self.campos.
+        Retorna (actualizadas, errores) con errores = [(indice, mensaje), ...];
+        un id que no existe también se reporta como error.
+        """
+        sql = self._sql_update()
+        cambios = list(cambios)
+        with self.conexion.transaccion() as conn:
+            existentes = set()
+            for inicio in range(0, len(cambios), tamano_chunk):
+                ids = [id_valor for id_valor, _ in cambios[inicio:inicio + tamano_chunk]]
+                texto, parametros = (self.consulta().columnas(self.clave_primaria)
+                                     .en(self.clave_primaria, ids).sql())
+                existentes.update(fila[0] for fila in self._consultar(texto, parametros, conn=conn))
+
+            errores, parametros, indices = [], [], []
+            for indice, (id_valor, valores) in enumerate(cambios):
+                if id_valor not in existentes:
+                    errores.append((indice, f"No existe {self.clave_primaria}={id_valor}."))
+                    continue
+                parametros.append((*valores, id_valor))
+                indices.append(indice)
+            ok, errores_bd = self._ejecutar_lote(conn, sql, parametros, indices, tamano_chunk)
+
+        for id_valor, _ in cambios:
+            self._descartar_de_mapa(id_valor)
+        return ok, sorted(errores + errores_bd)
+
+    @classmethod
+    def _sql_update(cls):
+        return cls._sql("actualizar", lambda: (
+            f"UPDATE {cls.tabla} SET {', '.join(f'{campo}=?' for campo in cls.campos)} "
+            f"WHERE {cls.clave_primaria} = ?"))
+
     def insertar(self, valores):
-        placeholders = ",".join(["?"] * len(valores))
-        sql = f"INSERT INTO {self.tabla} ({','.join(self.campos)}) VALUES ({placeholders})"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, valores)
-            conn.commit()
-            return cursor.lastrowid
+        sql = self._sql(("insertar", len(valores)), lambda: (
+            f"INSERT INTO {self.tabla} ({','.join(self.campos)}) VALUES ({','.join(['?'] * len(valores))})"))
+        return self._ejecutar(sql, valores).lastrowid
 
     def obtener_todos(self):
-        sql = f"SELECT {self.clave_primaria}, {', '.join(self.campos)} FROM {self.tabla}"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            return cursor.fetchall()
+        return self._consultar(self._sql_select())
 
     def obtener_por_id(self, id_valor):
-        sql = f"SELECT {self.clave_primaria}, {', '.join(self.campos)} FROM {self.tabla} WHERE {self.clave_primaria} = ?"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (id_valor,))
-            return cursor.fetchone()
-
-    def obtener_por_condicion(self, condicion):
-        sql = f"SELECT {self.clave_primaria}, {', '.join(self.campos)} FROM {self.tabla} WHERE {condicion}"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            return cursor.fetchall()
+        mapa = mapa_actual()
+        if mapa is not None:
+            fila = mapa.obtener_fila(self.tabla, id_valor)
+            if fila is not None:
+                return fila
+        sql = self._sql("por_id", lambda: f"{self._sql_select()} WHERE {self.clave_primaria} = ?")
+        fila = self._consultar(sql, (id_valor,), una=True)
+        if mapa is not None and fila is not None:
+            mapa.registrar_fila(self.tabla, id_valor, fila)
+        return fila
+
+    def obtener_por_condicion(self, condicion, parametros=()):
+        """
+        WHERE libre. ¡Los valores van en 'parametros' (con ?), nunca dentro de
+        'condicion'! Para casos simples preferir self.consulta().
+        """
+        return self._consultar(f"{self._sql_select()} WHERE {condicion}", parametros)
 
     def actualizar(self, id_valor, valores):
-        asignaciones = ", ".join([f"{campo}=?" for campo in self.campos])
-        sql = f"UPDATE {self.tabla} SET {asignaciones} WHERE {self.clave_primaria} = ?"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (*valores, id_valor))
-            conn.commit()
+        self._ejecutar(self._sql_update(), (*valores, id_valor))
+        self._descartar_de_mapa(id_valor)
 
     def eliminar(self, id_valor):
-        sql = f"DELETE FROM {self.tabla} WHERE {self.clave_primaria} = ?"
-        with self.conexion.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (id_valor,))
-            conn.commit()
+        sql = self._sql("eliminar", lambda: f"DELETE FROM {self.tabla} WHERE {self.clave_primaria} = ?")
+        self._ejecutar(sql, (id_valor,))
+        self._descartar_de_mapa(id_valor)
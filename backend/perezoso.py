@@ -0,0 +1,41 @@
+# --- Archivo: perezoso.py ---
+#
+# Objetos que se crean con su primer uso.
+#   servicio_reporte = Perezoso("servicios.reporte_service", "ReporteService")
+# Ni el módulo se importa ni la clase se instancia hasta que alguien usa un
+# atributo (ej. servicio_reporte.generar_reporte_...). Así cada proceso paga
+# solo por los servicios que realmente usa, y no al arrancar.
+
+import importlib
+import threading
+
+
+class Perezoso:
+    __slots__ = ("_modulo", "_clase", "_instancia", "_lock")
+
+    def __init__(self, modulo: str, clase: str):
+        self._modulo = modulo
+        self._clase = clase
+        self._instancia = None
+        self._lock = threading.Lock()
+
+    def obtener(self):
+        """ Retorna la instancia real (la crea la primera vez, una sola vez aunque haya varios hilos). """
+        if self._instancia is None:
+            with self._lock:
+                if self._instancia is None:
+                    clase = getattr(importlib.import_module(self._modulo), self._clase)
+                    self._instancia = clase()
+        return self._instancia
+
+    @property
+    def creado(self):
+        return self._instancia is not None
+
+    def __getattr__(self, nombre):
+        # Solo se llega acá con atributos que no son de Perezoso: los del servicio.
+        return getattr(self.obtener(), nombre)
+
+    def __repr__(self):
+        estado = "creado" if self.creado else "sin crear"
+        return f"Perezoso({self._modulo}.{self._clase}, {estado})"
@@ -0,0 +1,65 @@
+# Pasos para ejecutar el benchmark:
+# cd backend
+# python3 -m scripts.benchmark_conexiones [cantidad_requests]
+#
+# Compara requests/seg de GET /alquileres abriendo una conexión nueva por
+# cada llamada al ORM (comportamiento anterior) contra el pool persistente.
+# Trabaja sobre una COPIA de la base, así no modifica el archivo original.
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import conexion
+from conexion import ConexionDB
+
+
+def _conectar_sin_pool(self):
+    """ Réplica del ConexionDB.conectar() original: una conexión por llamada. """
+    return sqlite3.connect(self.nombre_bd)
+
+
+def medir(cliente, cantidad):
+    cliente.get("/alquileres")  # calentamiento
+    inicio = time.perf_counter()
+    for _ in range(cantidad):
+        resp = cliente.get("/alquileres")
+        assert resp.status_code == 200, resp.data
+    return cantidad / (time.perf_counter() - inicio)
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    carpeta = tempfile.mkdtemp(prefix="bench_conexiones_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+
+    # Importamos la app DESPUÉS de redirigir la base.
+    from app import app
+    cliente = app.test_client()
+
+    conectar_original = ConexionDB.conectar
+    try:
+        ConexionDB.conectar = _conectar_sin_pool
+        antes = medir(cliente, cantidad)
+    finally:
+        ConexionDB.conectar = conectar_original
+
+    despues = medir(cliente, cantidad)
+    ConexionDB.cerrar_todas()
+    shutil.rmtree(carpeta, ignore_errors=True)
+
+    print("===== 🚀 BENCHMARK: GET /alquileres =====")
+    print(f"Requests por medición: {cantidad}")
+    print(f"Sin pool (conexión por llamada): {antes:8.1f} req/s")
+    print(f"Con pool + PRAGMAs:              {despues:8.1f} req/s")
+    print(f"Mejora: x{despues / antes:.2f}")
+
+
+if __name__ == "__main__":
+    main()
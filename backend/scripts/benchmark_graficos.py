@@ -0,0 +1,106 @@
+# Pasos para ejecutar el benchmark:
+# cd backend
+# python3 -m scripts.benchmark_graficos [reportes_por_hilo]
+#
+# Reportes por segundo dibujando los cuatro tipos de gráfico de los reportes
+# (líneas, barras, torta y una tabla de 2 páginas) en 1 y en 4 hilos del
+# MISMO proceso:
+#   - "pyplot": como antes (plt.subplots / plt.close y rcParams globales).
+#     pyplot no es seguro entre hilos: con 4 hilos hay que dibujar de a uno (lock).
+#   - "Figure": servicios/graficos.py y pdf_tabla.py, cada hilo con su propia
+#     Figure, sin lock.
+# Los datos se generan en memoria: se mide solo el dibujo y el PDF.
+# (El render de matplotlib no suelta el GIL: 4 hilos no rinden 4 veces más,
+# pero los pedidos dejan de hacer fila detrás de un lock.)
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from servicios.reporte_service import ReporteService, MESES, _cargar_graficos, COLOR_PRINCIPAL
+
+_cargar_graficos()
+from servicios import graficos
+from servicios.pdf_tabla import EscritorTablaPDF
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+CONTEO = [3, 5, 2, 8, 13, 7, 4, 9, 11, 6, 2, 10]
+FACTURACION = [c * 1234.5 for c in CONTEO]
+VEHICULOS = [f"Toyota Corolla\n(AB{i:03d}CD)" for i in range(5)] + ["Otros (12)"]
+CANTIDADES = [40, 31, 25, 20, 18, 90]
+FILAS_TABLA = [(i, "01/03/2025", "05/03/2025", f"AB{i:03d}CD", "Toyota Corolla", 12345.5, 3, "28/02/2025")
+               for i in range(60)]
+
+_lock_pyplot = threading.Lock()
+
+
+def _guardar_pyplot(fig, ruta):
+    with PdfPages(ruta) as pdf:
+        pdf.savefig(fig, bbox_inches="tight", facecolor="white")
+    plt.close(fig)
+
+
+def con_pyplot(tipo, ruta):
+    with _lock_pyplot:
+        if tipo == "lineas":
+            fig, ax = plt.subplots(figsize=(12, 6))
+            ax.plot(MESES, CONTEO, marker="o", linewidth=3, color=COLOR_PRINCIPAL)
+        elif tipo == "barras":
+            fig, ax = plt.subplots(figsize=(11, 6))
+            ax.bar_label(ax.bar(MESES, FACTURACION, color=COLOR_PRINCIPAL), fmt="$ {:,.0f}")
+        elif tipo == "torta":
+            fig, ax = plt.subplots(figsize=(10, 8))
+            ax.pie(CANTIDADES, labels=VEHICULOS, autopct="%1.1f%%")
+        else:
+            fig, ax = plt.subplots(figsize=(11.7, 8.3))
+            ax.axis("off")
+            ax.table(cellText=[list(map(str, f)) for f in FILAS_TABLA[:30]],
+                     colLabels=ReporteService.COLUMNAS_ALQUILERES, loc="center")
+        ax.set_title(tipo.upper(), fontsize=18, color=COLOR_PRINCIPAL)
+        _guardar_pyplot(fig, ruta)
+
+
+def con_figure(tipo, ruta):
+    if tipo == "lineas":
+        figura = graficos.grafico_lineas("LINEAS", MESES, CONTEO, "Cantidad de alquileres")
+    elif tipo == "barras":
+        figura = graficos.grafico_barras("BARRAS", MESES, FACTURACION, "Facturación ($)", "$ {:,.0f}")
+    elif tipo == "torta":
+        figura = graficos.grafico_torta("TORTA", VEHICULOS, CANTIDADES)
+    else:
+        with EscritorTablaPDF(ruta, "TABLA", ReporteService.COLUMNAS_ALQUILERES) as tabla:
+            tabla.agregar_filas(FILAS_TABLA)
+        return
+    graficos.guardar_pdf(figura, ruta)
+
+
+def medir(funcion, hilos, por_hilo, carpeta):
+    """ Retorna reportes por segundo dibujando hilos * por_hilo reportes (los 4 tipos, rotando). """
+    tipos = ("lineas", "barras", "torta", "tabla")
+    pedidos = [(tipos[i % 4], os.path.join(carpeta, f"r{i}.pdf")) for i in range(hilos * por_hilo)]
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        list(pool.map(lambda pedido: funcion(*pedido), pedidos))
+    segundos = time.perf_counter() - inicio
+    for _, ruta in pedidos:
+        os.remove(ruta)
+    return len(pedidos) / segundos
+
+
+def main():
+    por_hilo = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    print("===== 🚀 BENCHMARK: REPORTES POR SEGUNDO (1 Y 4 HILOS) =====")
+    with tempfile.TemporaryDirectory() as carpeta:
+        medir(con_figure, 1, 4, carpeta)  # calentamiento (fuentes, caches de matplotlib)
+        medir(con_pyplot, 1, 4, carpeta)
+        for nombre, funcion in (("pyplot (con lock)", con_pyplot), ("Figure (sin lock)", con_figure)):
+            resultados = [medir(funcion, hilos, por_hilo, carpeta) for hilos in (1, 4)]
+            print(f"{nombre}:  1 hilo {resultados[0]:6.1f} rep/s   4 hilos {resultados[1]:6.1f} rep/s")
+
+
+if __name__ == "__main__":
+    main()
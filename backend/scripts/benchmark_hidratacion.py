@@ -0,0 +1,77 @@
+# Pasos para ejecutar el benchmark:
+# cd backend
+# python3 -m scripts.benchmark_hidratacion [cantidad_filas]
+#
+# Mide tiempo y memoria de convertir N filas (por defecto 100.000) de VEHICULO
+# y CLIENTE en objetos:
+#   - "Antes": constructor con validación (regex) y objetos con __dict__ y
+#     listas de relación vacías, como eran las clases antes de __slots__.
+#   - "Ahora": Clase.desde_bd(), la carga de confianza que usan los DAOs.
+# Las filas se generan en memoria: se mide solo la hidratación, no el SQL.
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from clases.cliente import Cliente
+from clases.vehiculo import Vehiculo
+
+
+# Réplicas de las clases anteriores: una subclase sin __slots__ vuelve a
+# tener __dict__, y el __init__ crea las listas vacías como antes.
+class VehiculoAnterior(Vehiculo):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reservas_ = []
+        self.alquileres_ = []
+        self.mantenimientos_ = []
+
+
+class ClienteAnterior(Cliente):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reservas_ = []
+        self.alquileres_ = []
+
+
+def filas_vehiculos(cantidad):
+    return [(f"AB{i:05d}", "Toyota", "Corolla", 2020, 50.0, "Disponible") for i in range(cantidad)]
+
+
+def filas_clientes(cantidad):
+    return [(i, "Ana", "Pérez", f"{30000000 + i}", "Calle 123", "3511234567", f"ana{i}@mail.com")
+            for i in range(cantidad)]
+
+
+def medir(fabrica, filas):
+    """ Retorna (segundos, bytes) de construir un objeto por fila. """
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    objetos = [fabrica(*fila) for fila in filas]
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return segundos, pico
+
+
+def comparar(nombre, filas, antes, ahora):
+    t_antes, m_antes = medir(antes, filas)
+    t_ahora, m_ahora = medir(ahora, filas)
+    print(f"\n----- {nombre} ({len(filas)} filas) -----")
+    print(f"Antes (validación + __dict__): {t_antes * 1000:8.1f} ms  {m_antes / 2**20:7.1f} MB")
+    print(f"Ahora (desde_bd + __slots__):  {t_ahora * 1000:8.1f} ms  {m_ahora / 2**20:7.1f} MB")
+    print(f"Mejora: x{t_antes / t_ahora:.2f} en tiempo, x{m_antes / m_ahora:.2f} en memoria")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print("===== 🚀 BENCHMARK: HIDRATACIÓN DE FILAS =====")
+    comparar("Vehiculo", filas_vehiculos(cantidad), VehiculoAnterior, Vehiculo.desde_bd)
+    comparar("Cliente", filas_clientes(cantidad), ClienteAnterior, Cliente.desde_bd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Pasos para ejecutar el benchmark:
+# cd backend
+# python3 -m scripts.benchmark_pdf_tabla [filas ...]
+#
+# Compara, para N filas (por defecto 100, 300 y 600), el tiempo y el pico de
+# memoria de escribir la tabla de alquileres de un cliente en PDF:
+#   - "Antes": una sola figura con UN ax.table de N filas (como era el reporte).
+#   - "Ahora": EscritorTablaPDF, de a páginas y reutilizando la plantilla.
+# Las filas se generan en memoria: se mide solo el armado del PDF.
+# El tiempo se mide sin tracemalloc (lo hace mucho más lento) y la memoria en
+# una segunda corrida.
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from servicios.reporte_service import ReporteService, _cargar_graficos
+
+_cargar_graficos()
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+from servicios.pdf_tabla import EscritorTablaPDF
+
+COLUMNAS = ReporteService.COLUMNAS_ALQUILERES
+
+
+def filas(cantidad):
+    for i in range(cantidad):
+        yield (i + 1, "01/03/2025", "05/03/2025", f"AB{i % 900:03d}CD", "Toyota Corolla",
+               12345.5, 3, "28/02/2025")
+
+
+def antes(ruta, cantidad):
+    fig, ax = plt.subplots(figsize=(11.7, 8.3))
+    ax.axis("off")
+    tabla = ax.table(cellText=[list(map(str, f)) for f in filas(cantidad)], colLabels=COLUMNAS,
+                     cellLoc="center", loc="center")
+    tabla.auto_set_font_size(False)
+    tabla.set_fontsize(9)
+    tabla.scale(1, 1.2)
+    with PdfPages(ruta) as pdf:
+        pdf.savefig(fig, bbox_inches="tight", facecolor="white")
+    plt.close(fig)
+
+
+def ahora(ruta, cantidad):
+    with EscritorTablaPDF(ruta, "REPORTE DE ALQUILERES - CLIENTE 1", COLUMNAS) as tabla:
+        tabla.agregar_filas(filas(cantidad))
+
+
+def medir(funcion, cantidad):
+    """ Retorna (segundos, bytes de pico, tamaño del archivo). """
+    ruta = tempfile.mktemp(suffix=".pdf")
+    inicio = time.perf_counter()
+    funcion(ruta, cantidad)
+    segundos = time.perf_counter() - inicio
+    tamano = os.path.getsize(ruta)
+
+    tracemalloc.start()
+    funcion(ruta, cantidad)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    os.remove(ruta)
+    return segundos, pico, tamano
+
+
+def main():
+    cantidades = [int(a) for a in sys.argv[1:]] or [100, 300, 600]
+    print("===== 🚀 BENCHMARK: TABLA DE ALQUILERES EN PDF =====")
+    medir(ahora, 10)  # calentamiento (fuentes, caches de matplotlib)
+    for cantidad in cantidades:
+        print(f"\n----- {cantidad} filas -----")
+        for nombre, funcion in (("Antes (1 figura)  ", antes), ("Ahora (paginado)  ", ahora)):
+            segundos, pico, tamano = medir(funcion, cantidad)
+            print(f"{nombre}: {segundos * 1000:8.0f} ms  {pico / 2**20:7.1f} MB pico  {tamano / 1024:7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
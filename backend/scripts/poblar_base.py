@@ -19,8 +19,8 @@ def generar_datos_prueba_avanzados():
         {"nombre": "Ana", "apellido": "Fernández", "dni": "40123459", "direccion": "Calle Falsa 125", "telefono": "12345681", "email": "ana@example.com"},
     ]
     # Evitamos duplicar cliente 1 (Agustín)
-    for c in clientes:
-        print(cliente_svc.crear_cliente(c))
+    # Una sola transacción para todo el lote (los duplicados se reportan, no cortan)
+    print(cliente_svc.crear_clientes_lote(clientes))
 
     # --- EMPLEADOS ---
     empleados = [
@@ -39,8 +39,7 @@ def generar_datos_prueba_avanzados():
         {"patente": "DDD444", "marca": "Chevrolet", "modelo": "Onix", "anio": 2022, "precio_diario": 55.0},
         {"patente": "EEE555", "marca": "Volkswagen", "modelo": "Golf", "anio": 2018, "precio_diario": 45.0},
     ]
-    for v in vehiculos:
-        print(vehiculo_svc.crear_vehiculo(v))
+    print(vehiculo_svc.crear_vehiculos_lote(vehiculos))
 
     # --- ALQUILERES ALEATORIOS ---
     todos_clientes = [1, 2, 3, 4]  # IDs de clientes (1=Agustín, 2,3,4 creados)
@@ -0,0 +1,25 @@
+# Pasos para reconstruir el resumen diario de alquileres:
+# cd backend
+# python3 -m scripts.reconstruir_resumen_diario
+#
+# Vuelve a calcular ALQUILER_RESUMEN_DIARIO desde la tabla ALQUILER (en una
+# transacción). Normalmente no hace falta: AlquilerService lo mantiene al
+# día. Sirve si se cargaron alquileres por fuera del servicio (ej. a mano
+# en la base) o para verificar que el resumen está bien.
+
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+from Crud.resumen_diario_crud import ResumenDiarioCRUD
+
+
+def main():
+    aplicar_migraciones()
+    try:
+        filas = ResumenDiarioCRUD().reconstruir()
+        print(f"✅ Resumen diario reconstruido: {filas} filas (día, patente)")
+    finally:
+        ConexionDB.cerrar_todas()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_almacen_reportes
+#
+# Almacén de reportes (sobre una COPIA de la base y una carpeta temporal):
+# - cada reporte generado queda anotado con parámetros, tamaño y tiempo de render,
+# - el presupuesto borra los vencidos y, por tamaño, los menos usados (LRU),
+# - los archivos sueltos de la carpeta se anotan (y se borran si vencieron),
+# - GET /reportes/archivos/<nombre> responde con ETag (304), Cache-Control y Range (206).
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import traceback
+from datetime import datetime, timedelta
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+import almacen_reportes
+
+
+def escribir(nombre, tamano):
+    with open(os.path.join(almacen_reportes.CARPETA, nombre), "wb") as archivo:
+        archivo.write(os.urandom(tamano))
+    return f"static/reportes/{nombre}"
+
+
+def anotados():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return {fila[0]: fila[1:] for fila in bd.execute(
+            "SELECT nombre, tipo, parametros, bytes, render_ms, accesos FROM REPORTE_ARCHIVO")}
+
+
+def vaciar():
+    for nombre in os.listdir(almacen_reportes.CARPETA):
+        os.remove(os.path.join(almacen_reportes.CARPETA, nombre))
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        bd.execute("DELETE FROM REPORTE_ARCHIVO")
+
+
+def test_metadatos_de_un_reporte():
+    print("\n===== 🗂️ TEST: METADATOS DE UN REPORTE GENERADO =====")
+    from servicios.reporte_service import ReporteService
+    try:
+        url = ReporteService().generar_reporte_facturacion_mensual(2025)
+        tipo, parametros, tamano, render_ms, accesos = anotados()[os.path.basename(url)]
+        assert tipo == "facturacion_mensual", tipo
+        assert json.loads(parametros) == {"anio": 2025}, parametros
+        assert tamano == os.path.getsize(os.path.join(almacen_reportes.CARPETA, os.path.basename(url)))
+        assert render_ms is not None and render_ms >= 0 and accesos == 0
+        print(f"✅ {os.path.basename(url)}: {tamano} bytes, {render_ms} ms de render")
+    except Exception as e:
+        print(f"❌ Error en los metadatos: {e}")
+        traceback.print_exc()
+
+
+def test_presupuesto():
+    print("\n===== 🧹 TEST: PRESUPUESTO DE DISCO (EDAD Y LRU) =====")
+    vaciar()
+    maximo_original = almacen_reportes.MAXIMO_BYTES
+    ahora_original = almacen_reportes._ahora
+    almacen_reportes.MAXIMO_BYTES = 3000
+    try:
+        # Un archivo suelto (de antes del almacén) con fecha vieja: se anota y vence
+        viejo = escribir("suelto_viejo.pdf", 100)
+        hace_un_mes = (datetime.now() - timedelta(days=30)).timestamp()
+        os.utime(viejo.replace("static/reportes", almacen_reportes.CARPETA), (hace_un_mes, hace_un_mes))
+        # Todo lo que sigue en el mismo milisegundo: el LRU no puede depender de la hora
+        ahora = almacen_reportes._ahora()
+        almacen_reportes._ahora = lambda: ahora
+        for nombre in ("a.pdf", "b.pdf", "c.pdf"):
+            almacen_reportes.registrar(escribir(nombre, 1000), "prueba", {"nombre": nombre}, 0.01)
+        assert set(anotados()) == {"a.pdf", "b.pdf", "c.pdf"}, anotados()
+        print("✅ El archivo suelto vencido se anotó y se borró")
+
+        # 'a' es el más viejo, pero se descarga: el menos usado pasa a ser 'b'
+        assert almacen_reportes.ruta_para_descargar("a.pdf") is not None
+        almacen_reportes.registrar(escribir("d.pdf", 1000), "prueba", {"nombre": "d.pdf"}, 0.01)
+        almacen_reportes._ahora = ahora_original
+        quedan = set(os.listdir(almacen_reportes.CARPETA))
+        assert quedan == {"a.pdf", "c.pdf", "d.pdf"} == set(anotados()), quedan
+        assert anotados()["a.pdf"][4] == 1
+        print("✅ Al pasarse del tamaño se borró el menos usado (b), no el más viejo (a), aun en el mismo milisegundo")
+
+        # El recién creado nunca se borra, aunque solo él ya supere el límite
+        almacen_reportes.registrar(escribir("grande.pdf", 5000), "prueba", None, 0.01)
+        assert set(os.listdir(almacen_reportes.CARPETA)) == {"grande.pdf"}, os.listdir(almacen_reportes.CARPETA)
+        print("✅ Un reporte más grande que el límite se conserva (y desaloja a los demás)")
+
+        # Borrado a mano: la próxima limpieza quita su registro
+        os.remove(os.path.join(almacen_reportes.CARPETA, "grande.pdf"))
+        almacen_reportes.aplicar_presupuesto()
+        assert anotados() == {}, anotados()
+        print("✅ Los registros de archivos que ya no existen se limpian")
+    except Exception as e:
+        print(f"❌ Error en el presupuesto: {e}")
+        traceback.print_exc()
+    finally:
+        almacen_reportes.MAXIMO_BYTES = maximo_original
+        almacen_reportes._ahora = ahora_original
+
+
+def test_ruta_de_descarga():
+    print("\n===== 📥 TEST: GET /reportes/archivos/<nombre> =====")
+    from app import app
+    cliente = app.test_client()
+    vaciar()
+    try:
+        almacen_reportes.registrar(escribir("descarga.pdf", 4096), "prueba", None, 0.01)
+        contenido = open(os.path.join(almacen_reportes.CARPETA, "descarga.pdf"), "rb").read()
+
+        respuesta = cliente.get("/reportes/archivos/descarga.pdf")
+        assert respuesta.status_code == 200 and respuesta.data == contenido, respuesta.status_code
+        etag = respuesta.headers["ETag"]
+        cache = respuesta.headers["Cache-Control"]
+        assert "private" in cache and "immutable" in cache and "public" not in cache, cache
+        assert respuesta.headers["Accept-Ranges"] == "bytes"
+        print(f"✅ 200 con ETag {etag} y Cache-Control '{cache}'")
+
+        respuesta = cliente.get("/reportes/archivos/descarga.pdf", headers={"If-None-Match": etag})
+        assert respuesta.status_code == 304 and not respuesta.data, respuesta.status_code
+        print("✅ If-None-Match con el mismo ETag: 304 sin cuerpo")
+
+        respuesta = cliente.get("/reportes/archivos/descarga.pdf", headers={"Range": "bytes=100-199"})
+        assert respuesta.status_code == 206 and respuesta.data == contenido[100:200], respuesta.status_code
+        assert respuesta.headers["Content-Range"] == f"bytes 100-199/{len(contenido)}"
+        print("✅ Range: 206 con los 100 bytes pedidos")
+
+        assert anotados()["descarga.pdf"][4] == 3, anotados()
+        print("✅ Cada descarga queda anotada (LRU)")
+
+        for nombre in ("no_existe.pdf", "..%2Fapp.py", ".gitignore"):
+            respuesta = cliente.get(f"/reportes/archivos/{nombre}")
+            assert respuesta.status_code == 404, (nombre, respuesta.status_code)
+        print("✅ Archivos inexistentes o fuera de la carpeta: 404")
+    except Exception as e:
+        print(f"❌ Error en la descarga: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_almacen_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    almacen_reportes.CARPETA = os.path.join(carpeta, "reportes")
+    os.makedirs(almacen_reportes.CARPETA)
+    from servicios.reporte_service import ReporteService
+    ReporteService.REPORTES_DIR = almacen_reportes.CARPETA
+    try:
+        test_metadatos_de_un_reporte()
+        test_presupuesto()
+        test_ruta_de_descarga()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
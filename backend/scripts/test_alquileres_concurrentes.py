@@ -0,0 +1,282 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_alquileres_concurrentes [hilos] [pedidos_por_hilo]
+#
+# Alta de alquileres con varios hilos a la vez (sobre una COPIA de la base).
+# Se compara AlquilerService.crear_alquiler (BEGIN IMMEDIATE + INSERT ...
+# WHERE NOT EXISTS (solapamiento) ... RETURNING, sin volver a leer el
+# alquiler) con una réplica del camino anterior: "verificar y después
+# escribir", con el chequeo fuera de la transacción y la relectura al final.
+# - Con pedidos que se pisan sobre pocos vehículos: tiene que haber CERO
+#   alquileres superpuestos (el camino anterior deja algunos).
+# - Con pedidos que no se pisan: alquileres por segundo de cada camino.
+# - PUT /alquileres con fechas que se pisan: 409, también con dos PUT a la vez.
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from datetime import date, timedelta
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+from cache_reportes import datos_modificados
+import indice_ocupacion
+
+PATENTES = ["CON001", "CON002", "CON003", "CON004"]
+
+SOLAPADOS = """
+    SELECT COUNT(*) FROM ALQUILER a
+    JOIN ALQUILER b ON b.patente = a.patente AND b.id_alquiler > a.id_alquiler
+                   AND b.fecha_inicio <= a.fecha_fin AND b.fecha_fin >= a.fecha_inicio
+    WHERE a.patente LIKE 'CON%'
+"""
+
+
+def preparar_vehiculos(patentes):
+    """ Vehículos de prueba sin ningún alquiler (se vacían entre corridas). """
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        bd.execute("DELETE FROM ALQUILER WHERE patente LIKE 'CON%'")
+        bd.execute("DELETE FROM ALQUILER_RESUMEN_DIARIO WHERE patente LIKE 'CON%'")
+        bd.executemany(
+            "INSERT OR IGNORE INTO VEHICULO (patente, marca, modelo, anio, precio_diario, estado) "
+            "VALUES (?, 'Prueba', 'Concurrente', 2024, 100, 'Disponible')",
+            [(p,) for p in patentes])
+    # Índice armado desde ya: durante la prueba se actualiza con cada alta
+    indice_ocupacion.reconstruir()
+    indice_ocupacion.periodos(patentes[0])
+
+
+def ids_cliente_empleado():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return (bd.execute("SELECT MIN(id_cliente) FROM CLIENTE").fetchone()[0],
+                bd.execute("SELECT MIN(id_empleado) FROM EMPLEADO").fetchone()[0])
+
+
+def pedido(patente, inicio, dias):
+    id_cliente, id_empleado = ids_cliente_empleado()
+    return {"id_cliente": id_cliente, "id_empleado": id_empleado, "patente": patente,
+            "fecha_inicio": inicio.isoformat(), "fecha_fin": (inicio + timedelta(days=dias)).isoformat()}
+
+
+def pedidos_que_se_pisan(numero, cantidad):
+    """ Al azar: 4 vehículos, 60 días, de 1 a 5 días cada uno. """
+    azar = random.Random(numero)
+    base = date.today() + timedelta(days=365)
+    return [pedido(azar.choice(PATENTES), base + timedelta(days=azar.randrange(60)), azar.randrange(1, 6))
+            for _ in range(cantidad)]
+
+
+def pedidos_sin_conflictos(numero, cantidad):
+    """ Un vehículo por hilo y períodos seguidos: todos se pueden crear. """
+    base = date.today() + timedelta(days=365)
+    return [pedido(f"CON{100 + numero}", base + timedelta(days=3 * k), 1) for k in range(cantidad)]
+
+
+def crear_verificando_antes(servicio, datos):
+    """ Réplica del camino anterior: chequeo y escritura separados, y relectura al final. """
+    from clases.alquiler import Alquiler
+    from servicios.cotizacion_service import costo_alquiler
+    from servicios.excepciones import ErrorDeLogicaDeNegocio
+    cliente = servicio.cliente_dao.buscar_por_id(datos["id_cliente"])
+    vehiculo = servicio.vehiculo_dao.buscar_por_id(datos["patente"])
+    empleado = servicio.empleado_dao.buscar_por_id(datos["id_empleado"])
+    inicio, fin = date.fromisoformat(datos["fecha_inicio"]), date.fromisoformat(datos["fecha_fin"])
+    alquiler = Alquiler(None, inicio, fin, costo_alquiler(vehiculo.precio_diario, inicio, fin),
+                        date.today(), cliente, empleado, vehiculo)
+    if servicio.alquiler_dao.vehiculo_ocupado(alquiler):
+        raise ErrorDeLogicaDeNegocio("El vehículo no está disponible.")
+    with servicio.alquiler_dao.conexion.transaccion():
+        nuevo_id = servicio.alquiler_dao.crear_alquiler(alquiler)
+        servicio.resumen_dao.sumar(servicio.resumen_dao.valores_de(alquiler))
+        vehiculo.marcar_no_disponible()
+        servicio.vehiculo_dao.actualizar_vehiculo(vehiculo)
+    datos_modificados("ALQUILER", "VEHICULO")
+    indice_ocupacion.ocupacion_modificada(vehiculo.patente)
+    return servicio.alquiler_dao.buscar_por_id(nuevo_id)
+
+
+def crear_con_el_servicio(servicio, datos):
+    return servicio.crear_alquiler(datos)
+
+
+def correr(crear, hilos, armar_pedidos, cantidad):
+    """ Cada hilo hace sus pedidos. Retorna (creados, rechazados, errores, segundos). """
+    from servicios.alquiler_service import AlquilerService
+    from servicios.excepciones import ErrorDeLogicaDeNegocio
+    contadores = {"creados": 0, "rechazados": 0, "errores": []}
+    lock = threading.Lock()
+    largada = threading.Barrier(hilos + 1)
+
+    def trabajar(numero):
+        servicio = AlquilerService()
+        lista = armar_pedidos(numero, cantidad)
+        largada.wait()
+        try:
+            for datos in lista:
+                try:
+                    crear(servicio, datos)
+                    resultado = "creados"
+                except ErrorDeLogicaDeNegocio:
+                    resultado = "rechazados"
+                except Exception as e:
+                    with lock:
+                        contadores["errores"].append(repr(e))
+                    continue
+                with lock:
+                    contadores[resultado] += 1
+        finally:
+            ConexionDB.liberar()
+
+    trabajadores = [threading.Thread(target=trabajar, args=(n,)) for n in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    largada.wait()
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.join()
+    return contadores["creados"], contadores["rechazados"], contadores["errores"], time.perf_counter() - inicio
+
+
+def solapados():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return bd.execute(SOLAPADOS).fetchone()[0]
+
+
+def test_sin_alquileres_superpuestos(hilos, cantidad):
+    print(f"\n===== 🏁 TEST: {hilos} HILOS x {cantidad} PEDIDOS QUE SE PISAN =====")
+    try:
+        preparar_vehiculos(PATENTES)
+        creados, rechazados, errores, _ = correr(crear_verificando_antes, hilos, pedidos_que_se_pisan, cantidad)
+        dobles_antes = solapados()
+        print(f"   Verificar y después escribir: {creados} creados, {rechazados} rechazados, "
+              f"{dobles_antes} superpuestos")
+
+        preparar_vehiculos(PATENTES)
+        creados, rechazados, errores, _ = correr(crear_con_el_servicio, hilos, pedidos_que_se_pisan, cantidad)
+        print(f"   AlquilerService:              {creados} creados, {rechazados} rechazados, "
+              f"{solapados()} superpuestos")
+        assert not errores, errores[:3]
+        assert creados + rechazados == hilos * cantidad
+        assert solapados() == 0
+        print("✅ Ningún vehículo quedó alquilado dos veces en las mismas fechas")
+
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            en_alquiler = bd.execute(
+                "SELECT COUNT(*), ROUND(SUM(costo_total), 2) FROM ALQUILER WHERE patente LIKE 'CON%'").fetchone()
+            # Costo del servidor: días x precio diario (100)
+            esperado = bd.execute(
+                "SELECT ROUND(SUM(MAX(julianday(fecha_fin) - julianday(fecha_inicio), 1) * 100), 2) "
+                "FROM ALQUILER WHERE patente LIKE 'CON%'").fetchone()[0]
+            en_resumen = bd.execute(
+                "SELECT SUM(alquileres), ROUND(SUM(facturacion), 2) FROM ALQUILER_RESUMEN_DIARIO "
+                "WHERE patente LIKE 'CON%'").fetchone()
+            periodos = bd.execute(
+                "SELECT patente, fecha_inicio, fecha_fin FROM ALQUILER WHERE patente LIKE 'CON%'").fetchall()
+        assert en_alquiler == en_resumen == (creados, esperado), (en_alquiler, en_resumen, esperado)
+        print(f"✅ El resumen diario suma los mismos {creados} alquileres")
+
+        assert all(indice_ocupacion.ocupado(p, i, f) for p, i, f in periodos)
+        print("✅ El índice de ocupación tiene todos los alquileres creados")
+    except Exception as e:
+        print(f"❌ Error con pedidos que se pisan: {e}")
+        traceback.print_exc()
+
+
+def test_alquileres_por_segundo(hilos, cantidad):
+    print(f"\n===== ⏱️ TEST: {hilos} HILOS x {cantidad} PEDIDOS SIN CONFLICTOS =====")
+    patentes = [f"CON{100 + n}" for n in range(hilos)]
+    try:
+        tasas = {}
+        for nombre, crear in (("Verificar y después escribir", crear_verificando_antes),
+                              ("AlquilerService", crear_con_el_servicio)):
+            preparar_vehiculos(patentes)
+            creados, _, errores, segundos = correr(crear, hilos, pedidos_sin_conflictos, cantidad)
+            assert not errores and creados == hilos * cantidad, (creados, errores[:3])
+            tasas[nombre] = creados / segundos
+            print(f"   {nombre + ':':30s}{tasas[nombre]:8.1f} alquileres/s")
+        antes, ahora = tasas.values()
+        print(f"✅ Todos creados; {ahora / antes:.2f}x alquileres/s")
+    except Exception as e:
+        print(f"❌ Error midiendo alquileres por segundo: {e}")
+        traceback.print_exc()
+
+
+def test_modificar_fechas():
+    print("\n===== ✏️ TEST: PUT /alquileres CON FECHAS QUE SE PISAN =====")
+    from app import app
+    cliente = app.test_client()
+    try:
+        preparar_vehiculos(PATENTES)
+        base = date.today() + timedelta(days=500)
+        primero = cliente.post("/alquileres", json=pedido(PATENTES[0], base, 2)).json
+        segundo = cliente.post("/alquileres", json=pedido(PATENTES[0], base + timedelta(days=10), 2)).json
+
+        respuesta = cliente.put(f"/alquileres/{segundo['id_alquiler']}",
+                                json={"fecha_inicio": (base + timedelta(days=2)).isoformat()})
+        assert respuesta.status_code == 409, (respuesta.status_code, respuesta.json)
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            guardado = bd.execute("SELECT fecha_inicio FROM ALQUILER WHERE id_alquiler = ?",
+                                  (segundo["id_alquiler"],)).fetchone()[0]
+        assert guardado == segundo["fecha_inicio"], guardado
+        respuesta = cliente.put(f"/alquileres/{segundo['id_alquiler']}",
+                                json={"fecha_inicio": (base + timedelta(days=3)).isoformat()})
+        assert respuesta.status_code == 200, respuesta.json
+        print("✅ PUT que pisa otro alquiler del vehículo: 409 (sin cambios); al día siguiente: 200")
+
+        # Un rango invertido (fin antes que inicio) no solapa con nada: se rechaza antes
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            fila_antes = bd.execute("SELECT fecha_inicio, fecha_fin, costo_total FROM ALQUILER "
+                                    "WHERE id_alquiler = ?", (segundo["id_alquiler"],)).fetchone()
+        respuesta = cliente.put(f"/alquileres/{segundo['id_alquiler']}", json={"fecha_fin": base.isoformat()})
+        assert respuesta.status_code == 400, (respuesta.status_code, respuesta.json)
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            fila = bd.execute("SELECT fecha_inicio, fecha_fin, costo_total FROM ALQUILER "
+                              "WHERE id_alquiler = ?", (segundo["id_alquiler"],)).fetchone()
+        assert fila == fila_antes, (fila, fila_antes)
+        print(f"✅ PUT con la fecha de fin antes que la de inicio: 400 ({respuesta.json['error']})")
+
+        # Dos PUT a la vez que se mueven al mismo hueco: pasa uno solo
+        hueco = (base + timedelta(days=20)).isoformat(), (base + timedelta(days=22)).isoformat()
+        barrera, codigos = threading.Barrier(2), []
+
+        def mover(id_alquiler):
+            barrera.wait()
+            with app.test_client() as otro:
+                codigos.append(otro.put(f"/alquileres/{id_alquiler}",
+                                        json={"fecha_inicio": hueco[0], "fecha_fin": hueco[1]}).status_code)
+
+        hilos = [threading.Thread(target=mover, args=(a["id_alquiler"],)) for a in (primero, segundo)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        assert sorted(codigos) == [200, 409] and solapados() == 0, codigos
+        assert not indice_ocupacion.libres([PATENTES[0]], date.fromisoformat(hueco[0]), date.fromisoformat(hueco[1]))
+        print("✅ Dos PUT simultáneos al mismo hueco: 200 y 409, ningún vehículo alquilado dos veces")
+    except Exception as e:
+        print(f"❌ Error modificando fechas: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    carpeta = tempfile.mkdtemp(prefix="test_alquileres_concurrentes_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    try:
+        test_sin_alquileres_superpuestos(hilos, cantidad)
+        test_alquileres_por_segundo(hilos, cantidad)
+        test_modificar_fechas()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
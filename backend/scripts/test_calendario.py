@@ -0,0 +1,140 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_calendario [vehiculos]
+#
+# Calendario de ocupación de la flota (sobre una COPIA de la base, a la que
+# se le agregan 'vehiculos' vehículos con alquileres, reservas y
+# mantenimientos al azar):
+# - GET /flota/calendario?mes=AAAA-MM da, vehículo por vehículo y día por
+#   día, el mismo estado que recorrer los períodos en Python,
+# - los tramos suman los días del mes y "por_dia" cuenta lo mismo,
+# - responde dentro del presupuesto (PRESUPUESTO_CALENDARIO_MS, por defecto 500),
+# - 'mes' faltante o inválido: 400.
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import traceback
+from datetime import date, timedelta
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+
+PRESUPUESTO_MS = float(os.environ.get("PRESUPUESTO_CALENDARIO_MS", 500))
+MES = "2026-02"
+
+# (código de estado, SQL) en orden de prioridad: el último que cubre un día gana
+PERIODOS = [
+    (1, "SELECT patente, fecha_inicio_deseada, fecha_fin_deseada FROM RESERVA WHERE patente IS NOT NULL"),
+    (2, "SELECT patente, fecha_inicio, fecha_fin FROM ALQUILER"),
+    (3, "SELECT patente, fecha_inicio, fecha_fin FROM MANTENIMIENTO"),
+]
+
+
+def agregar_flota(cantidad, semilla=25):
+    """ 'cantidad' vehículos con unos 10 alquileres, 2 reservas y 1 mantenimiento cada uno. """
+    azar = random.Random(semilla)
+    base = date(2025, 10, 1)
+
+    def periodo(largo_maximo):
+        inicio = base + timedelta(days=azar.randrange(240))
+        return inicio.isoformat(), (inicio + timedelta(days=azar.randrange(largo_maximo))).isoformat()
+
+    patentes = [f"CAL{n:04d}" for n in range(cantidad)]
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        id_cliente = bd.execute("SELECT MIN(id_cliente) FROM CLIENTE").fetchone()[0]
+        id_empleado = bd.execute("SELECT MIN(id_empleado) FROM EMPLEADO").fetchone()[0]
+        bd.executemany("INSERT INTO VEHICULO (patente, marca, modelo, anio, precio_diario, estado) "
+                       "VALUES (?, 'Prueba', 'Calendario', 2024, 100, 'Disponible')", [(p,) for p in patentes])
+        bd.executemany("INSERT INTO ALQUILER (fecha_inicio, fecha_fin, costo_total, fecha_registro, "
+                       "id_cliente, id_empleado, patente) VALUES (?, ?, 100, '2025-01-01', ?, ?, ?)",
+                       [(*periodo(8), id_cliente, id_empleado, p) for p in patentes for _ in range(10)])
+        bd.executemany("INSERT INTO RESERVA (patente, id_cliente, fecha_reserva, fecha_inicio_deseada, "
+                       "fecha_fin_deseada) VALUES (?, ?, '2025-01-01', ?, ?)",
+                       [(p, id_cliente, *periodo(10)) for p in patentes for _ in range(2)])
+        bd.executemany("INSERT INTO MANTENIMIENTO (patente, fecha_inicio, fecha_fin, tipo_servicio, costo) "
+                       "VALUES (?, ?, ?, 'Service', 100)", [(p, *periodo(5)) for p in patentes])
+
+
+def calendario_en_python(mes):
+    """ {patente: [estado por día]} recorriendo cada período día por día. """
+    anio, numero = map(int, mes.split("-"))
+    primero = date(anio, numero, 1)
+    dias = ((primero + timedelta(days=31)).replace(day=1) - primero).days
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        estados = {p: [0] * dias for (p,) in bd.execute("SELECT patente FROM VEHICULO")}
+        for codigo, sql in PERIODOS:
+            for patente, inicio, fin in bd.execute(sql):
+                if patente not in estados:
+                    continue
+                desde = max((date.fromisoformat(inicio) - primero).days, 0)
+                hasta = min((date.fromisoformat(fin) - primero).days, dias - 1)
+                for dia in range(desde, hasta + 1):
+                    estados[patente][dia] = codigo
+    return estados
+
+
+def expandir(tramos):
+    dias = []
+    for i in range(0, len(tramos), 2):
+        dias += [tramos[i]] * tramos[i + 1]
+    return dias
+
+
+def test_calendario(cantidad):
+    print(f"\n===== 🗓️ TEST: GET /flota/calendario ({cantidad} VEHÍCULOS MÁS) =====")
+    from app import app
+    cliente = app.test_client()
+    try:
+        agregar_flota(cantidad)
+        cliente.get(f"/flota/calendario?mes={MES}")  # importa NumPy
+        inicio = time.perf_counter()
+        respuesta = cliente.get(f"/flota/calendario?mes={MES}")
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        assert respuesta.status_code == 200, respuesta.json
+        calendario = respuesta.json
+        assert (calendario["desde"], calendario["hasta"], calendario["dias"]) == ("2026-02-01", "2026-02-28", 28)
+
+        esperado = calendario_en_python(MES)
+        assert [v["patente"] for v in calendario["vehiculos"]] == sorted(esperado)
+        assert all(sum(v["tramos"][1::2]) == 28 for v in calendario["vehiculos"])
+        distintos = [v["patente"] for v in calendario["vehiculos"] if expandir(v["tramos"]) != esperado[v["patente"]]]
+        assert not distintos, distintos[:5]
+        ocupados = sum(len(v["tramos"]) > 2 or v["tramos"][0] != 0 for v in calendario["vehiculos"])
+        print(f"✅ {len(esperado)} vehículos ({ocupados} con algún día ocupado): "
+              f"mismos estados que día por día en Python")
+
+        for codigo, estado in enumerate(calendario["estados"]):
+            if codigo:
+                por_dia = [sum(fila[d] == codigo for fila in esperado.values()) for d in range(28)]
+                assert calendario["por_dia"][estado] == por_dia, estado
+        print("✅ Los tramos suman 28 días y 'por_dia' cuenta lo mismo")
+
+        assert milisegundos <= PRESUPUESTO_MS, f"{milisegundos:.0f} ms > {PRESUPUESTO_MS:.0f} ms"
+        print(f"✅ {milisegundos:.0f} ms, {len(respuesta.data) // 1024} KB (presupuesto {PRESUPUESTO_MS:.0f} ms)")
+
+        for consulta in ("", "?mes=2026", "?mes=2026-13", "?mes=2026-02-01", "?mes=febrero"):
+            assert cliente.get(f"/flota/calendario{consulta}").status_code == 400, consulta
+        print("✅ 'mes' faltante o inválido: 400")
+    except Exception as e:
+        print(f"❌ Error en el calendario: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    carpeta = tempfile.mkdtemp(prefix="test_calendario_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    try:
+        test_calendario(cantidad)
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
@@ -0,0 +1,155 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_cotizaciones
+#
+# Cotizaciones (sobre una COPIA de la base):
+# - POST /cotizaciones da, para miles de pedidos, el mismo importe que
+#   costo_alquiler() uno por uno, y los filtros cotizan los mismos vehículos
+#   que VehiculoCRUD.buscar_por_filtros,
+# - responde dentro del presupuesto (PRESUPUESTO_COTIZACION_MS, por defecto 250),
+# - POST /alquileres guarda el costo calculado, no el que manda el cliente,
+#   y PUT /alquileres lo vuelve a calcular si cambian las fechas.
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import traceback
+from datetime import date, timedelta
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+
+PRESUPUESTO_MS = float(os.environ.get("PRESUPUESTO_COTIZACION_MS", 250))
+CANTIDAD = 5000
+
+
+def flota():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return dict(bd.execute("SELECT patente, precio_diario FROM VEHICULO"))
+
+
+def pedidos_al_azar(patentes, cantidad, semilla=24):
+    azar = random.Random(semilla)
+    base = date(2026, 1, 1)
+    for _ in range(cantidad):
+        inicio = base + timedelta(days=azar.randrange(365))
+        fin = inicio + timedelta(days=azar.randrange(30))
+        yield {"patente": azar.choice(patentes).lower(), "fecha_inicio": inicio.isoformat(),
+               "fecha_fin": fin.isoformat()}
+
+
+def test_importes():
+    print("\n===== 💲 TEST: POST /cotizaciones =====")
+    from app import app
+    from servicios.cotizacion_service import costo_alquiler, dias_cobrados
+    from Crud.vehiculo_crud import VehiculoCRUD
+    cliente = app.test_client()
+    try:
+        precios = flota()
+        pedidos = list(pedidos_al_azar(sorted(precios), CANTIDAD))
+        cliente.post("/cotizaciones", json=pedidos[:1])  # importa NumPy
+        inicio = time.perf_counter()
+        respuesta = cliente.post("/cotizaciones", json=pedidos)
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        assert respuesta.status_code == 200, respuesta.json
+        cotizaciones = respuesta.json["cotizaciones"]
+        assert not respuesta.json["errores"] and len(cotizaciones) == CANTIDAD
+        distintas = []
+        for pedido, cotizacion in zip(pedidos, cotizaciones):
+            desde = date.fromisoformat(pedido["fecha_inicio"])
+            hasta = date.fromisoformat(pedido["fecha_fin"])
+            patente = pedido["patente"].upper()
+            esperada = (patente, dias_cobrados(desde, hasta), costo_alquiler(precios[patente], desde, hasta))
+            if (cotizacion["patente"], cotizacion["dias"], cotizacion["costo_total"]) != esperada:
+                distintas.append((cotizacion, esperada))
+        assert not distintas, distintas[:3]
+        print(f"✅ {CANTIDAD} cotizaciones iguales a costo_alquiler() una por una")
+        assert milisegundos <= PRESUPUESTO_MS, f"{milisegundos:.0f} ms > {PRESUPUESTO_MS:.0f} ms"
+        print(f"✅ {milisegundos:.0f} ms (presupuesto {PRESUPUESTO_MS:.0f} ms)")
+
+        marca = VehiculoCRUD().listar_vehiculos()[0].marca
+        valores = sorted(precios.values())
+        filtros = [{"marca": marca.upper()}, {"precio_min": valores[1], "precio_max": valores[-2]}, {}]
+        pedido = [{**f, "fecha_inicio": "2026-03-01", "fecha_fin": "2026-03-04"} for f in filtros]
+        cotizaciones = cliente.post("/cotizaciones", json=pedido).json["cotizaciones"]
+        for indice, f in enumerate(filtros):
+            esperadas = [v.patente for v in VehiculoCRUD().buscar_por_filtros(
+                f.get("marca"), f.get("precio_min"), f.get("precio_max"))]
+            obtenidas = [c["patente"] for c in cotizaciones if c["indice"] == indice]
+            assert obtenidas == esperadas, (f, obtenidas, esperadas)
+        assert all(c["dias"] == 3 for c in cotizaciones)
+        print(f"✅ Filtros de marca ({marca}), de precio y sin filtro: los mismos vehículos que buscar_por_filtros")
+
+        pedido = [
+            {"patente": "NOEXISTE", "fecha_inicio": "2026-03-01", "fecha_fin": "2026-03-02"},
+            {"patente": pedidos[0]["patente"], "fecha_inicio": "2026-03-05", "fecha_fin": "2026-03-01"},
+            {"patente": pedidos[0]["patente"], "fecha_inicio": "2026-03-01", "fecha_fin": "2026-03-01"},
+            {"patente": pedidos[0]["patente"]},
+        ]
+        resultado = cliente.post("/cotizaciones", json=pedido).json
+        assert [e["indice"] for e in resultado["errores"]] == [0, 1, 3], resultado["errores"]
+        assert [(c["indice"], c["dias"]) for c in resultado["cotizaciones"]] == [(2, 1)]
+        print("✅ Patente inexistente, fechas invertidas o faltantes como errores; un solo día se cobra como uno")
+
+        for body in ([], {"patente": "AAA111"}, None):
+            assert cliente.post("/cotizaciones", json=body).status_code == 400
+        print("✅ Sin una lista de pedidos: 400")
+    except Exception as e:
+        print(f"❌ Error en las cotizaciones: {e}")
+        traceback.print_exc()
+
+
+def test_alquiler_con_costo_del_servidor():
+    print("\n===== 🧾 TEST: POST Y PUT /alquileres USAN LA COTIZACIÓN =====")
+    from app import app
+    cliente = app.test_client()
+    try:
+        patente, precio = sorted(flota().items())[0]
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            id_cliente = bd.execute("SELECT MIN(id_cliente) FROM CLIENTE").fetchone()[0]
+            id_empleado = bd.execute("SELECT MIN(id_empleado) FROM EMPLEADO").fetchone()[0]
+        desde = date.today() + timedelta(days=3000)
+        datos = {"id_cliente": id_cliente, "id_empleado": id_empleado, "patente": patente,
+                 "fecha_inicio": desde.isoformat(), "fecha_fin": (desde + timedelta(days=4)).isoformat()}
+        cotizacion = cliente.post("/cotizaciones", json=[datos]).json["cotizaciones"][0]
+
+        respuesta = cliente.post("/alquileres", json={**datos, "costo_total": 0.01})
+        assert respuesta.status_code == 201, respuesta.json
+        assert respuesta.json["costo_total"] == cotizacion["costo_total"] == precio * 4, respuesta.json
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            guardado = bd.execute("SELECT costo_total FROM ALQUILER WHERE id_alquiler = ?",
+                                  (respuesta.json["id_alquiler"],)).fetchone()[0]
+        assert guardado == cotizacion["costo_total"]
+        print(f"✅ Se guardó ${guardado} (4 días x ${precio}), no los $0.01 que mandó el cliente")
+
+        id_alquiler = respuesta.json["id_alquiler"]
+        respuesta = cliente.put(f"/alquileres/{id_alquiler}", json={"costo_total": 0.01})
+        assert respuesta.status_code == 200 and respuesta.json["costo_total"] == precio * 4, respuesta.json
+        respuesta = cliente.put(f"/alquileres/{id_alquiler}", json={
+            "fecha_fin": (desde + timedelta(days=6)).isoformat(), "costo_total": 0.01})
+        assert respuesta.status_code == 200 and respuesta.json["costo_total"] == precio * 6, respuesta.json
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            guardado = bd.execute("SELECT costo_total FROM ALQUILER WHERE id_alquiler = ?", (id_alquiler,)).fetchone()[0]
+        assert guardado == precio * 6, guardado
+        print(f"✅ PUT: el costo_total del cliente se ignora; con 6 días se recotiza a ${guardado}")
+    except Exception as e:
+        print(f"❌ Error creando el alquiler: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_cotizaciones_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    try:
+        test_importes()
+        test_alquiler_con_costo_del_servidor()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
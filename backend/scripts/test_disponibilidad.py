@@ -0,0 +1,241 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_disponibilidad
+#
+# Disponibilidad de vehículos (sobre una COPIA de la base):
+# - el índice de ocupación responde lo mismo que una consulta directa a
+#   ALQUILER, RESERVA y MANTENIMIENTO para muchos rangos de fechas,
+# - después de crear o borrar reservas y de crear, cambiar o borrar
+#   mantenimientos el índice se actualiza,
+# - con un cliente, el índice no cuenta sus reservas: da lo mismo que el
+#   chequeo de AlquilerCRUD al crear, y el vehículo que reservó se puede elegir,
+# - GET /vehiculos/disponibles filtra por marca y precio y valida las fechas
+#   y los precios (400).
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import traceback
+from datetime import date, timedelta
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+import indice_ocupacion
+
+CONSULTA_DIRECTA = """
+    SELECT 1 FROM ALQUILER WHERE patente = :p AND fecha_inicio <= :hasta AND fecha_fin >= :desde
+    UNION ALL
+    SELECT 1 FROM RESERVA WHERE patente = :p AND fecha_inicio_deseada <= :hasta AND fecha_fin_deseada >= :desde
+    UNION ALL
+    SELECT 1 FROM MANTENIMIENTO WHERE patente = :p AND fecha_inicio <= :hasta AND fecha_fin >= :desde
+"""
+
+
+def patentes():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return [fila[0] for fila in bd.execute("SELECT patente FROM VEHICULO ORDER BY patente")]
+
+
+def libres_directo(desde, hasta):
+    """ Lo mismo que indice_ocupacion.libres, pero recorriendo las tablas. """
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return [p for p in patentes()
+                if bd.execute(CONSULTA_DIRECTA, {"p": p, "desde": desde, "hasta": hasta}).fetchone() is None]
+
+
+def rangos_al_azar(cantidad, semilla=21):
+    azar = random.Random(semilla)
+    base = date(2004, 1, 1)
+    for _ in range(cantidad):
+        desde = base + timedelta(days=azar.randrange(0, 23 * 365))
+        yield desde.isoformat(), (desde + timedelta(days=azar.randrange(0, 30))).isoformat()
+
+
+def test_indice_contra_consulta_directa():
+    print("\n===== 🗓️ TEST: ÍNDICE DE OCUPACIÓN VS. CONSULTA DIRECTA =====")
+    try:
+        indice_ocupacion.reconstruir()
+        todas = patentes()
+        rangos = list(rangos_al_azar(300))
+        # Además de los al azar, exactamente los bordes de cada alquiler
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            rangos += [(i, i) for (i,) in bd.execute("SELECT fecha_inicio FROM ALQUILER")]
+            rangos += [(f, f) for (f,) in bd.execute("SELECT fecha_fin FROM ALQUILER")]
+        distintos = [(d, h) for d, h in rangos
+                     if indice_ocupacion.libres(todas, d, h) != libres_directo(d, h)]
+        assert not distintos, distintos[:5]
+        print(f"✅ {len(rangos)} rangos: el índice coincide con la consulta directa")
+        print(f"   Índice: {indice_ocupacion.estadisticas()}")
+    except Exception as e:
+        print(f"❌ Error comparando el índice: {e}")
+        traceback.print_exc()
+
+
+def test_actualizacion_despues_de_escribir():
+    print("\n===== ✏️ TEST: EL ÍNDICE SIGUE A LAS ESCRITURAS =====")
+    from servicios.reserva_service import ReservaService
+    from servicios.mantenimiento_service import MantenimientoService
+    try:
+        indice_ocupacion.reconstruir()
+        patente = patentes()[0]
+        desde, hasta = "2031-03-10", "2031-03-12"
+        assert not indice_ocupacion.ocupado(patente, desde, hasta)  # arma el índice
+
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            id_cliente = bd.execute("SELECT MIN(id_cliente) FROM CLIENTE").fetchone()[0]
+        reservas = ReservaService()
+        reserva = reservas.crear_reserva({
+            "id_cliente": id_cliente, "patente": patente,
+            "fecha_inicio_deseada": "2031-03-11", "fecha_fin_deseada": "2031-03-20"})
+        assert indice_ocupacion.ocupado(patente, desde, hasta)
+        print(f"✅ Crear una reserva ocupa {patente}")
+
+        reservas.eliminar_reserva(reserva.id_reserva)
+        assert not indice_ocupacion.ocupado(patente, desde, hasta)
+        print("✅ Borrar la reserva la libera")
+
+        mantenimientos = MantenimientoService()
+        mantenimiento = mantenimientos.crear_mantenimiento({
+            "patente": patente, "fecha_inicio": "2031-03-01", "fecha_fin": "2031-03-10",
+            "tipo_servicio": "Service", "costo": 100})
+        assert indice_ocupacion.ocupado(patente, desde, hasta)
+        mantenimientos.actualizar_mantenimiento(mantenimiento.id_mantenimiento, {"fecha_fin": "2031-03-09"})
+        assert not indice_ocupacion.ocupado(patente, desde, hasta)
+        antes = indice_ocupacion.periodos(patente)
+        mantenimientos.eliminar_mantenimiento(mantenimiento.id_mantenimiento)
+        assert len(indice_ocupacion.periodos(patente)) == len(antes) - 1
+        assert libres_directo(desde, hasta) == indice_ocupacion.libres(patentes(), desde, hasta)
+        print("✅ Crear, acortar y borrar un mantenimiento se refleja en el índice")
+    except Exception as e:
+        print(f"❌ Error actualizando el índice: {e}")
+        traceback.print_exc()
+
+
+def test_reservas_del_cliente():
+    print("\n===== 🙋 TEST: LAS RESERVAS DEL MISMO CLIENTE NO LO OCUPAN =====")
+    from app import app
+    from Crud.alquiler_crud import AlquilerCRUD
+    cliente = app.test_client()
+    try:
+        todas = patentes()
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            uno, otro = [c for (c,) in bd.execute("SELECT id_cliente FROM CLIENTE ORDER BY id_cliente LIMIT 2")]
+            id_empleado = bd.execute("SELECT MIN(id_empleado) FROM EMPLEADO").fetchone()[0]
+            # Reservas de los dos clientes (algunas del mismo vehículo) y un mantenimiento encima de una
+            azar = random.Random(22)
+            for _ in range(40):
+                desde = date(2031, 6, 1) + timedelta(days=azar.randrange(60))
+                bd.execute("INSERT INTO RESERVA (patente, id_cliente, fecha_reserva, fecha_inicio_deseada, "
+                           "fecha_fin_deseada) VALUES (?, ?, '2031-01-01', ?, ?)",
+                           (azar.choice(todas[:4]), azar.choice((uno, otro)), desde.isoformat(),
+                            (desde + timedelta(days=azar.randrange(5))).isoformat()))
+            bd.execute("INSERT INTO MANTENIMIENTO (patente, fecha_inicio, fecha_fin, tipo_servicio, costo) "
+                       "VALUES (?, '2031-06-20', '2031-06-25', 'Service', 100)", (todas[0],))
+        indice_ocupacion.reconstruir()
+
+        dao = AlquilerCRUD()
+        sql = f"SELECT {AlquilerCRUD._sql_ocupado()}"
+        distintos = []
+        for _ in range(200):
+            desde = date(2031, 5, 25) + timedelta(days=azar.randrange(75))
+            hasta = desde + timedelta(days=azar.randrange(6))
+            for id_cliente in (uno, otro):
+                parametros = {"desde": desde.isoformat(), "hasta": hasta.isoformat(),
+                              "id_cliente": id_cliente, "id_alquiler": None}
+                esperados = [p for p in todas[:4]
+                             if not dao._consultar(sql, {**parametros, "patente": p}, una=True)[0]]
+                obtenidos = indice_ocupacion.libres(todas[:4], desde, hasta, id_cliente)
+                if obtenidos != esperados:
+                    distintos.append((desde, hasta, id_cliente, obtenidos, esperados))
+        assert not distintos, distintos[:3]
+        print("✅ 200 rangos x 2 clientes: el índice da lo mismo que el chequeo al crear un alquiler")
+
+        # El formulario: el vehículo que el cliente reservó aparece para él (y se puede alquilar)
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            bd.execute("INSERT INTO RESERVA (patente, id_cliente, fecha_reserva, fecha_inicio_deseada, "
+                       "fecha_fin_deseada) VALUES (?, ?, '2031-01-01', '2031-09-10', '2031-09-12')",
+                       (todas[5], uno))
+        indice_ocupacion.reconstruir()
+        rango = "desde=2031-09-10&hasta=2031-09-12"
+        sin_cliente = [v["patente"] for v in cliente.get(f"/vehiculos/disponibles?{rango}").json]
+        del_uno = [v["patente"] for v in cliente.get(f"/vehiculos/disponibles?{rango}&id_cliente={uno}").json]
+        del_otro = [v["patente"] for v in cliente.get(f"/vehiculos/disponibles?{rango}&id_cliente={otro}").json]
+        assert todas[5] not in sin_cliente and todas[5] in del_uno and todas[5] not in del_otro
+        respuesta = cliente.post("/alquileres", json={
+            "id_cliente": uno, "id_empleado": id_empleado, "patente": todas[5],
+            "fecha_inicio": "2031-09-10", "fecha_fin": "2031-09-12"})
+        assert respuesta.status_code == 201, respuesta.json
+        print(f"✅ {todas[5]} reservado por el cliente {uno}: solo aparece para él, y lo puede alquilar")
+
+        respuesta = cliente.get(f"/vehiculos/disponibles?{rango}&id_cliente=abc")
+        assert respuesta.status_code == 400, respuesta.status_code
+        print("✅ id_cliente que no es un número: 400")
+    except Exception as e:
+        print(f"❌ Error con las reservas del cliente: {e}")
+        traceback.print_exc()
+
+
+def test_endpoint():
+    print("\n===== 🌐 TEST: GET /vehiculos/disponibles =====")
+    from app import app
+    cliente = app.test_client()
+    try:
+        desde, hasta = "2025-11-01", "2025-11-05"
+        respuesta = cliente.get(f"/vehiculos/disponibles?desde={desde}&hasta={hasta}")
+        assert respuesta.status_code == 200, respuesta.status_code
+        assert [v["patente"] for v in respuesta.json] == libres_directo(desde, hasta), respuesta.json
+        print(f"✅ {len(respuesta.json)} vehículos libres entre {desde} y {hasta}")
+
+        # Un rango sin ningún período: está toda la flota, y los filtros la recortan
+        desde, hasta = "2040-01-01", "2040-01-31"
+        todos = cliente.get(f"/vehiculos/disponibles?desde={desde}&hasta={hasta}").json
+        assert [v["patente"] for v in todos] == patentes()
+        marca = todos[0]["marca"]
+        filtrados = cliente.get(f"/vehiculos/disponibles?desde={desde}&hasta={hasta}&marca={marca.lower()}").json
+        assert filtrados and all(v["marca"] == marca for v in filtrados), filtrados
+        precios = sorted(v["precio_diario"] for v in todos)
+        minimo, maximo = precios[1], precios[-2]
+        filtrados = cliente.get(f"/vehiculos/disponibles?desde={desde}&hasta={hasta}"
+                                f"&precio_min={minimo}&precio_max={maximo}").json
+        esperados = [v["patente"] for v in todos if minimo <= v["precio_diario"] <= maximo]
+        assert [v["patente"] for v in filtrados] == esperados, filtrados
+        print(f"✅ Filtros de marca ({marca}) y precio ({minimo} a {maximo})")
+
+        # '%' y '_' son letras, no comodines
+        for comodin in ("%25", "_", marca[:-1] + "_"):
+            respuesta = cliente.get(f"/vehiculos/disponibles?desde={desde}&hasta={hasta}&marca={comodin}")
+            assert respuesta.status_code == 200 and respuesta.json == [], (comodin, respuesta.json)
+        print("✅ '%' y '_' en la marca no funcionan como comodines")
+
+        for consulta in ("", "?desde=2025-11-01", "?desde=2025-13-01&hasta=2025-11-05",
+                         "?desde=2025-11-05&hasta=2025-11-01"):
+            respuesta = cliente.get(f"/vehiculos/disponibles{consulta}")
+            assert respuesta.status_code == 400, (consulta, respuesta.status_code)
+        print("✅ Fechas faltantes, inválidas o invertidas: 400")
+
+        for consulta in ("&precio_max=abc", "&precio_min=1,5", "&precio_min=nan", "&precio_max=inf"):
+            respuesta = cliente.get(f"/vehiculos/disponibles?desde={desde}&hasta={hasta}{consulta}")
+            assert respuesta.status_code == 400, (consulta, respuesta.status_code)
+        print("✅ Precios que no son números: 400 (no la flota sin filtrar)")
+    except Exception as e:
+        print(f"❌ Error en el endpoint: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_disponibilidad_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    try:
+        test_indice_contra_consulta_directa()
+        test_actualizacion_despues_de_escribir()
+        test_reservas_del_cliente()
+        test_endpoint()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
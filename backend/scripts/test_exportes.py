@@ -0,0 +1,176 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_exportes
+#
+# Exportaciones CSV/XLSX (sobre una COPIA de la base):
+# - el contenido coincide con la tabla y respeta el rango de fechas,
+# - el XLSX abre con openpyxl,
+# - GET /exportes/... responde en streaming con los headers correctos,
+# - con muchas filas la memoria no crece (se exporta de a lotes).
+
+import csv
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import tracemalloc
+import traceback
+
+import conexion
+from conexion import ConexionDB
+
+FILAS_MASIVAS = 100000
+
+
+def leer_csv(partes):
+    return list(csv.reader(io.StringIO(b"".join(partes).decode("utf-8-sig"))))
+
+
+def leer_xlsx(partes):
+    import openpyxl
+    libro = openpyxl.load_workbook(io.BytesIO(b"".join(partes)), read_only=True)
+    return [list(fila) for hoja in libro.worksheets for fila in hoja.iter_rows(values_only=True)]
+
+
+def test_contenido(servicio):
+    print("\n===== 📤 TEST: CONTENIDO DE LAS EXPORTACIONES =====")
+    bd = sqlite3.connect(conexion.DB_PATH)
+    try:
+        for entidad, tabla in (("alquileres", "ALQUILER"), ("multas", "MULTA_DANO"),
+                               ("mantenimientos", "MANTENIMIENTO")):
+            cantidad = bd.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+            _, _, partes = servicio.exportar(entidad, "csv")
+            filas_csv = leer_csv(partes)
+            _, _, partes = servicio.exportar(entidad, "xlsx")
+            filas_xlsx = leer_xlsx(partes)
+            assert len(filas_csv) == len(filas_xlsx) == cantidad + 1, (len(filas_csv), len(filas_xlsx), cantidad)
+            assert filas_csv[0] == filas_xlsx[0]
+            print(f"✅ {entidad}: {cantidad} filas en CSV y en XLSX")
+
+        desde, hasta = "2025-04-01", "2025-06-30"
+        esperadas = bd.execute("SELECT COUNT(*) FROM ALQUILER WHERE fecha_inicio BETWEEN ? AND ?",
+                               (desde, hasta)).fetchone()[0]
+        nombre, _, partes = servicio.exportar("alquileres", "xlsx", desde, hasta)
+        filas = leer_xlsx(partes)
+        assert len(filas) == esperadas + 1, (len(filas), esperadas)
+        assert all(desde <= fila[1] <= hasta for fila in filas[1:])
+        print(f"✅ Rango {desde}..{hasta}: {esperadas} alquileres ({nombre})")
+    except Exception as e:
+        print(f"❌ Error en el contenido: {e}")
+        traceback.print_exc()
+    finally:
+        bd.close()
+
+    for argumentos, esperado in ((("vehiculos", "csv"), "entidad desconocida"),
+                                 (("multas", "pdf"), "formato inválido"),
+                                 (("multas", "csv", "2025-13-01"), "fecha inválida"),
+                                 (("multas", "csv", "2025-06-01", "2025-01-01"), "rango invertido")):
+        try:
+            servicio.exportar(*argumentos)
+            print(f"❌ ERROR: no lanzó excepción ({esperado})")
+        except Exception as e:
+            print(f"✅ Excepción esperada ({esperado}): {e}")
+
+
+def test_endpoint():
+    print("\n===== 🌐 TEST: GET /exportes =====")
+    try:
+        from app import app
+        cliente = app.test_client()
+        respuesta = cliente.get("/exportes/alquileres?formato=xlsx&desde=2025-01-01")
+        assert respuesta.status_code == 200 and respuesta.is_streamed, respuesta.status_code
+        assert respuesta.mimetype.endswith("spreadsheetml.sheet"), respuesta.mimetype
+        assert 'filename="alquileres_2025-01-01.xlsx"' in respuesta.headers["Content-Disposition"]
+        leer_xlsx([respuesta.get_data()])
+        print(f"✅ 200 en streaming: {respuesta.headers['Content-Disposition']}")
+
+        for url, codigo in (("/exportes/multas?formato=txt", 400), ("/exportes/otros", 404)):
+            respuesta = cliente.get(url)
+            assert respuesta.status_code == codigo, (url, respuesta.status_code)
+        print("✅ Errores de parámetros: 400 / 404 antes de empezar a enviar")
+
+        # Un error a mitad del envío corta la transferencia (no queda un 200 truncado)
+        import app as modulo_app
+
+        def partes_que_fallan():
+            yield b"id_alquiler\r\n"
+            raise RuntimeError("se cortó la base")
+
+        class ExportacionQueFalla:
+            def exportar(self, entidad, **_):
+                return "alquileres.csv", "text/csv", partes_que_fallan()
+
+        original, modulo_app.servicio_exportacion = modulo_app.servicio_exportacion, ExportacionQueFalla()
+        try:
+            respuesta = cliente.get("/exportes/alquileres")
+            try:
+                respuesta.get_data()
+                assert False, "la exportación terminó como si estuviera completa"
+            except RuntimeError:
+                pass
+        finally:
+            modulo_app.servicio_exportacion = original
+        print("✅ Un error a mitad del envío corta la transferencia")
+    except Exception as e:
+        print(f"❌ Error en el endpoint: {e}")
+        traceback.print_exc()
+
+
+def test_memoria_constante(servicio):
+    print(f"\n===== 🧠 TEST: MEMORIA CON {FILAS_MASIVAS} ALQUILERES =====")
+    bd = sqlite3.connect(conexion.DB_PATH)
+    with bd:
+        base = bd.execute("SELECT fecha_inicio, fecha_fin, costo_total, fecha_registro, id_empleado, "
+                          "patente, id_cliente FROM ALQUILER LIMIT 1").fetchone()
+        bd.executemany("INSERT INTO ALQUILER (fecha_inicio, fecha_fin, costo_total, fecha_registro, "
+                       "id_empleado, patente, id_cliente) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (base for _ in range(FILAS_MASIVAS)))
+    bd.close()
+
+    for formato in ("csv", "xlsx"):
+        try:
+            tracemalloc.start()
+            _, _, partes = servicio.exportar("alquileres", formato)
+            total = sum(len(parte) for parte in partes)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Cota fija: el CSV de estas filas pesa ~10 MB y el XML del XLSX, más
+            assert pico < 4 * 2**20, (pico, total)
+            print(f"✅ {formato}: {total / 2**20:.1f} MB exportados con {pico / 2**20:.1f} MB de pico")
+        except Exception as e:
+            tracemalloc.stop()
+            print(f"❌ Error en memoria ({formato}): {e}")
+            traceback.print_exc()
+
+
+def test_reporte_excel():
+    print("\n===== 📗 TEST: REPORTE DE CLIENTE EN EXCEL =====")
+    try:
+        from servicios.reporte_service import ReporteService
+        url = ReporteService().generar_reporte_alquileres_por_cliente(cliente_id=1, formato="excel")
+        with open(url, "rb") as archivo:
+            filas = leer_xlsx([archivo.read()])
+        os.remove(url)
+        assert filas[0] == ReporteService.COLUMNAS_ALQUILERES and len(filas) > 1
+        print(f"✅ Excel con {len(filas) - 1} alquileres: {url}")
+    except Exception as e:
+        print(f"❌ Error en el reporte Excel: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_exportes_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    try:
+        from servicios.exportacion_service import ExportacionService
+        servicio = ExportacionService()
+        test_contenido(servicio)
+        test_endpoint()
+        test_reporte_excel()
+        test_memoria_constante(servicio)
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
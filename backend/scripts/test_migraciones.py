@@ -0,0 +1,132 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_migraciones
+#
+# Aplica las migraciones sobre una COPIA de la base y verifica que:
+# - quedan registradas en schema_version y no se vuelven a aplicar,
+# - las FKs rotas (EMPLEADO_old, REFERENCES "") quedaron reparadas sin perder filas,
+# - las consultas reales de los DAOs usan los índices nuevos (EXPLAIN QUERY PLAN).
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import traceback
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones, estado, listar_migraciones
+
+TABLAS = ["CLIENTE", "VEHICULO", "EMPLEADO", "ALQUILER", "MULTA_DANO", "RESERVA", "MANTENIMIENTO", "USUARIO"]
+
+
+def _contar_filas(ruta):
+    conn = sqlite3.connect(ruta)
+    try:
+        return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in TABLAS}
+    finally:
+        conn.close()
+
+
+def test_aplicar_y_versionar(ruta):
+    print("\n===== 🗂️ TEST: APLICAR MIGRACIONES =====")
+    try:
+        filas_antes = _contar_filas(ruta)
+        aplicadas = aplicar_migraciones(ruta)
+        esperadas = [(v, n) for v, n, _ in listar_migraciones()]
+        assert aplicadas == esperadas, f"Se aplicaron {aplicadas}, se esperaban {esperadas}"
+        print(f"✅ Migraciones aplicadas: {[v for v, _ in aplicadas]}")
+
+        assert aplicar_migraciones(ruta) == [], "La segunda ejecución no debería aplicar nada"
+        aplicadas_bd, pendientes = estado(ruta)
+        assert not pendientes and aplicadas_bd == esperadas
+        print("✅ Segunda ejecución: nada pendiente (schema_version al día)")
+
+        assert _contar_filas(ruta) == filas_antes, "Se perdieron filas al reconstruir tablas"
+        print(f"✅ Filas conservadas: {filas_antes}")
+    except Exception as e:
+        print(f"❌ Error aplicando migraciones: {e}")
+        traceback.print_exc()
+
+
+def test_claves_foraneas(ruta):
+    print("\n===== 🔗 TEST: CLAVES FORÁNEAS REPARADAS =====")
+    conn = sqlite3.connect(ruta)
+    try:
+        tablas = {fila[0] for fila in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for tabla in TABLAS:
+            for fk in conn.execute(f'PRAGMA foreign_key_list("{tabla}")'):
+                destino = fk[2]
+                assert destino in tablas, f"{tabla}.{fk[3]} apunta a una tabla inexistente: '{destino}'"
+        print("✅ Todas las FKs apuntan a tablas existentes")
+
+        fks_alquiler = {fk[3]: fk[2] for fk in conn.execute('PRAGMA foreign_key_list("ALQUILER")')}
+        fks_mant = {fk[3]: fk[2] for fk in conn.execute('PRAGMA foreign_key_list("MANTENIMIENTO")')}
+        assert fks_alquiler.get("id_empleado") == "EMPLEADO", fks_alquiler
+        assert fks_mant.get("patente") == "VEHICULO", fks_mant
+        print("✅ ALQUILER.id_empleado -> EMPLEADO, MANTENIMIENTO.patente -> VEHICULO")
+    except Exception as e:
+        print(f"❌ Error en FKs: {e}")
+        traceback.print_exc()
+    finally:
+        conn.close()
+
+
+def test_consultas_usan_indices():
+    print("\n===== ⚡ TEST: LOS DAOs USAN LOS ÍNDICES =====")
+    from Crud.alquiler_crud import AlquilerCRUD
+    from Crud.multa_crud import MultaCRUD
+    from Crud.mantenimiento_crud import MantenimientoCRUD
+    from Crud.resumen_diario_crud import ResumenDiarioCRUD
+
+    # Capturamos el SQL real que ejecuta cada DAO y le pedimos el plan a SQLite.
+    casos = [
+        ("AlquilerCRUD.buscar_por_cliente", lambda: AlquilerCRUD().buscar_por_cliente(1), "idx_alquiler_cliente"),
+        # (patente, fecha_inicio) o (patente, fecha_fin, ...) de la 0007: los dos empiezan por patente
+        ("MultaCRUD.buscar_por_patente", lambda: MultaCRUD().buscar_por_patente("AAA111"), "idx_alquiler_patente_"),
+        ("MultaCRUD.buscar_por_id_cliente", lambda: MultaCRUD().buscar_por_id_cliente(1), "idx_alquiler_cliente"),
+        ("MultaCRUD (JOIN por id_alquiler)", lambda: MultaCRUD().buscar_por_id_cliente(1), "idx_multa_alquiler"),
+        ("MantenimientoCRUD.buscar_por_patente", lambda: MantenimientoCRUD().buscar_por_patente("AAA111"), "idx_mantenimiento_patente"),
+        ("ResumenDiarioCRUD.resumen_por_periodo", lambda: ResumenDiarioCRUD().resumen_por_periodo(2025), "PRIMARY KEY (dia>? AND dia<?)"),
+    ]
+
+    conn = ConexionDB().conectar()
+    for nombre, llamada, indice in casos:
+        sentencias = []
+        conn.set_trace_callback(sentencias.append)
+        try:
+            llamada()
+        finally:
+            conn.set_trace_callback(None)
+
+        planes = []
+        for sql in sentencias:
+            if sql.lstrip().upper().startswith("SELECT"):
+                planes += [fila[3] for fila in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        if any(indice in paso for paso in planes):
+            print(f"✅ {nombre}: usa {indice}")
+        else:
+            print(f"❌ {nombre}: NO usa {indice}. Plan: {planes}")
+
+    # La consulta de disponibilidad por vehículo y fecha usa el índice de RESERVA.
+    plan = [fila[3] for fila in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id_reserva FROM RESERVA "
+        "WHERE patente = ? AND fecha_inicio_deseada <= ?", ("AAA111", "2025-12-31"))]
+    if any("idx_reserva_patente_inicio" in paso for paso in plan):
+        print("✅ RESERVA por patente y fecha: usa idx_reserva_patente_inicio")
+    else:
+        print(f"❌ RESERVA por patente y fecha: NO usa el índice. Plan: {plan}")
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_migraciones_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    try:
+        test_aplicar_y_versionar(copia)
+        test_claves_foraneas(copia)
+        test_consultas_usan_indices()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
@@ -0,0 +1,119 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_paginacion
+#
+# Paginación por cursor (sobre una COPIA de la base):
+# - recorrer todas las páginas devuelve cada fila una sola vez, también
+#   ordenando por columnas con NULLs (id_supervisor, id_cliente, ...),
+# - el orden de las páginas coincide con ORDER BY campo, pk de SQLite,
+# - un 'limit' inválido da 400 y los parámetros de control no son filtros.
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import traceback
+
+import conexion
+from conexion import ConexionDB
+
+# (url, clave primaria, tabla, columna de orden)
+LISTADOS = (
+    ("/empleados", "id_empleado", "EMPLEADO", "id_supervisor"),
+    ("/usuarios", "id_usuario", "USUARIO", "id_cliente"),
+    ("/usuarios", "id_usuario", "USUARIO", "id_empleado"),
+    ("/vehiculos", "patente", "VEHICULO", "marca"),
+)
+
+
+def agregar_empleados(cantidad=12):
+    """ Más empleados, con y sin supervisor, para que haya varias páginas de cada grupo. """
+    bd = sqlite3.connect(conexion.DB_PATH)
+    with bd:
+        bd.executemany("INSERT INTO EMPLEADO (nombre, apellido, dni, puesto, id_supervisor) "
+                       "VALUES (?, ?, ?, ?, ?)",
+                       [(f"Prueba{i}", "Paginación", f"9900{i:04d}", "Atención", (None, 2, 4)[i % 3])
+                        for i in range(cantidad)])
+    bd.close()
+
+
+def recorrer(cliente, url, limite, orden):
+    """ Sigue next_cursor hasta el final y retorna la lista de filas servidas. """
+    filas, cursor, paginas = [], None, 0
+    while True:
+        consulta = f"{url}?limit={limite}&orden={orden}" + (f"&after={cursor}" if cursor else "")
+        respuesta = cliente.get(consulta)
+        assert respuesta.status_code == 200, (consulta, respuesta.status_code, respuesta.get_json())
+        cuerpo = respuesta.get_json()
+        filas.extend(cuerpo["datos"])
+        cursor = cuerpo["next_cursor"]
+        paginas += 1
+        assert paginas < 1000, "la paginación no termina"
+        if not cursor:
+            return filas
+
+
+def test_recorrer_todas_las_paginas(cliente):
+    print("\n===== 📑 TEST: RECORRER TODAS LAS PÁGINAS =====")
+    bd = sqlite3.connect(conexion.DB_PATH)
+    try:
+        for url, pk, tabla, campo in LISTADOS:
+            for descendente in (False, True):
+                sentido = "DESC" if descendente else "ASC"
+                esperadas = [fila[0] for fila in bd.execute(
+                    f"SELECT {pk} FROM {tabla} ORDER BY {campo} {sentido}, {pk} {sentido}")]
+                nulos = bd.execute(f"SELECT COUNT(*) FROM {tabla} WHERE {campo} IS NULL").fetchone()[0]
+                orden = ("-" if descendente else "") + campo
+                for limite in (1, 2, 3):
+                    try:
+                        servidas = [fila[pk] for fila in recorrer(cliente, url, limite, orden)]
+                        assert servidas == esperadas, (servidas, esperadas)
+                        print(f"✅ {url}?orden={orden}&limit={limite}: {len(servidas)} de "
+                              f"{len(esperadas)} filas ({nulos} con NULL)")
+                    except Exception as e:
+                        print(f"❌ {url}?orden={orden}&limit={limite}: {e}")
+                        traceback.print_exc()
+    finally:
+        bd.close()
+
+
+def test_parametros(cliente):
+    print("\n===== 🔧 TEST: PARÁMETROS DE PAGINACIÓN =====")
+    for url in ("/empleados?limit=abc", "/empleados?limit=0", "/empleados?limit=-5",
+                "/vehiculos?limit=100000", "/vehiculos?limit=2.5"):
+        respuesta = cliente.get(url)
+        if respuesta.status_code == 400:
+            print(f"✅ {url}: 400 ({respuesta.get_json()['error']})")
+        else:
+            print(f"❌ {url}: {respuesta.status_code}, se esperaba 400")
+
+    for url in ("/empleados?limit=2&stream=1", "/vehiculos?limit=2&formato=json",
+                "/alquileres?limit=2&stream=1&id_cliente=1"):
+        respuesta = cliente.get(url)
+        cuerpo = respuesta.get_json()
+        if respuesta.status_code == 200 and "next_cursor" in cuerpo:
+            print(f"✅ {url}: 200 con {len(cuerpo['datos'])} filas")
+        else:
+            print(f"❌ {url}: {respuesta.status_code} {cuerpo}")
+
+    respuesta = cliente.get("/empleados?limit=2&nombre=Carlos")
+    if respuesta.status_code == 200 and [e["nombre"] for e in respuesta.get_json()["datos"]] == ["Carlos"]:
+        print("✅ Los demás parámetros siguen siendo filtros")
+    else:
+        print(f"❌ Filtro por nombre: {respuesta.status_code} {respuesta.get_json()}")
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_paginacion_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    try:
+        from app import app
+        agregar_empleados()
+        cliente = app.test_client()
+        test_recorrer_todas_las_paginas(cliente)
+        test_parametros(cliente)
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
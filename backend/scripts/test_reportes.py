@@ -1,10 +1,29 @@
 # Pasos para ejecutar los tests:
 # cd backend
 # python3 -m scripts.test_reportes
+#
+# Sobre una COPIA de la base, y con los archivos en una carpeta temporal.
 
 import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 import traceback
-from servicios.reporte_service import ReporteService
+from concurrent.futures import ThreadPoolExecutor
+import almacen_reportes
+import cache_reportes
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+from servicios.reporte_service import ReporteService, REPORTES
+
+def en_disco(url):
+    """ 'static/reportes/x.pdf' -> el archivo en la carpeta de reportes (la temporal del test). """
+    return os.path.join(almacen_reportes.CARPETA, os.path.basename(url))
+
 
 def test_alquileres_por_cliente():
     print("\n===== 🧾 TEST: ALQUILERES POR CLIENTE =====")
@@ -12,7 +31,7 @@ def test_alquileres_por_cliente():
 
     try:
         pdf = reporte.generar_reporte_alquileres_por_cliente(cliente_id=1, formato="pdf")
-        assert os.path.exists(pdf), "No se generó el PDF correctamente"
+        assert os.path.exists(en_disco(pdf)), "No se generó el PDF correctamente"
         print(f"✅ PDF generado correctamente: {pdf}")
     except Exception as e:
         print(f"❌ Error en PDF cliente válido: {e}")
@@ -20,7 +39,7 @@ def test_alquileres_por_cliente():
 
     try:
         excel = reporte.generar_reporte_alquileres_por_cliente(cliente_id=1, formato="excel")
-        assert os.path.exists(excel), "No se generó el Excel correctamente"
+        assert os.path.exists(en_disco(excel)), "No se generó el Excel correctamente"
         print(f"✅ Excel generado correctamente: {excel}")
     except Exception as e:
         print(f"❌ Error en Excel cliente válido: {e}")
@@ -45,7 +64,7 @@ def test_alquileres_por_periodo():
 
     try:
         pdf_mensual = reporte.generar_reporte_alquileres_por_periodo(frecuencia="M", anio=2025)
-        assert os.path.exists(pdf_mensual), "No se generó el PDF mensual correctamente"
+        assert os.path.exists(en_disco(pdf_mensual)), "No se generó el PDF mensual correctamente"
         print(f"✅ PDF mensual generado correctamente: {pdf_mensual}")
     except Exception as e:
         print(f"❌ Error en reporte mensual: {e}")
@@ -53,7 +72,7 @@ def test_alquileres_por_periodo():
 
     try:
         pdf_trimestral = reporte.generar_reporte_alquileres_por_periodo(frecuencia="Q", anio=2025)
-        assert os.path.exists(pdf_trimestral), "No se generó el PDF trimestral correctamente"
+        assert os.path.exists(en_disco(pdf_trimestral)), "No se generó el PDF trimestral correctamente"
         print(f"✅ PDF trimestral generado correctamente: {pdf_trimestral}")
     except Exception as e:
         print(f"❌ Error en reporte trimestral: {e}")
@@ -78,7 +97,7 @@ def test_facturacion_mensual():
 
     try:
         pdf = reporte.generar_reporte_facturacion_mensual(anio=2025)
-        assert os.path.exists(pdf), "No se generó el PDF correctamente"
+        assert os.path.exists(en_disco(pdf)), "No se generó el PDF correctamente"
         print(f"✅ PDF generado correctamente: {pdf}")
     except Exception as e:
         print(f"❌ Error en facturación mensual (año actual): {e}")
@@ -104,7 +123,7 @@ def test_vehiculos_mas_alquilados():
     try:
         # Caso 1: Top 3 vehículos
         pdf_top3 = reporte.generar_reporte_vehiculos_mas_alquilados(limite=3)
-        assert os.path.exists(pdf_top3), "No se generó el PDF del top 3"
+        assert os.path.exists(en_disco(pdf_top3)), "No se generó el PDF del top 3"
         print(f"✅ PDF Top 3 generado correctamente: {pdf_top3}")
     except Exception as e:
         print(f"❌ Error en top 3: {e}")
@@ -113,33 +132,171 @@ def test_vehiculos_mas_alquilados():
     try:
         # Caso 2: Todos los vehículos
         pdf_todos = reporte.generar_reporte_vehiculos_mas_alquilados()
-        assert os.path.exists(pdf_todos), "No se generó el PDF con todos los vehículos"
+        assert os.path.exists(en_disco(pdf_todos)), "No se generó el PDF con todos los vehículos"
         print(f"✅ PDF con todos los vehículos generado correctamente: {pdf_todos}")
     except Exception as e:
         print(f"❌ Error en todos los vehículos: {e}")
         traceback.print_exc()
 
     try:
-        # Caso 3: Sin datos (simulado)
-        # Forzamos una excepción eliminando temporalmente el método del servicio
-        original = reporte.alquiler_service.listar_alquileres
-        reporte.alquiler_service.listar_alquileres = lambda: {"estado": "ok", "data": []}
+        # Caso 3: Sin datos (un rango de fechas sin alquileres)
         try:
-            reporte.generar_reporte_vehiculos_mas_alquilados()
+            reporte.generar_reporte_vehiculos_mas_alquilados(desde="1990-01-01", hasta="1990-12-31")
             print("❌ ERROR: No lanzó excepción cuando no hay alquileres")
         except Exception as e:
             print(f"✅ Excepción esperada (sin datos): {e}")
-        finally:
-            reporte.alquiler_service.listar_alquileres = original
     except Exception as e:
         print(f"❌ Error al probar caso sin datos: {e}")
         traceback.print_exc()
 
+    try:
+        # Caso 4: El ranking agrupado en SQL coincide con contar los alquileres en Python
+        from collections import Counter
+        conteo = Counter(alq.vehiculo.patente for alq in reporte.alquiler_service.listar_alquileres())
+        ranking = reporte.alquiler_service.ranking_vehiculos(limite=3)
+        orden = sorted(conteo.items(), key=lambda par: (-par[1], par[0]))
+        esperado = [(p, c) for p, c in orden[:2]] + [(None, sum(c for _, c in orden[2:]))]
+        assert [(fila[0], fila[3]) for fila in ranking] == esperado, (ranking, esperado)
+        assert ranking[-1][4] == len(orden) - 2
+        print(f"✅ Ranking Top 3 (con 'Otros') igual al conteo en Python: {ranking}")
+    except Exception as e:
+        print(f"❌ Error en el ranking de vehículos: {e}")
+        traceback.print_exc()
+
+
+def test_cache_de_reportes():
+    print("\n===== 🗃️ TEST: CACHÉ DE REPORTES =====")
+    reporte = ReporteService()
+    cache_reportes.reiniciar()
+
+    try:
+        primero = reporte.generar_reporte_facturacion_mensual(anio=2025)
+        segundo = reporte.generar_reporte_facturacion_mensual(anio=2025)
+        assert primero == segundo, "El mismo pedido generó otro PDF"
+        stats = cache_reportes.estadisticas()
+        assert (stats["aciertos"], stats["fallos"]) == (1, 1), stats
+        print(f"✅ Pedido repetido servido desde el caché: {segundo}")
+
+        otro_anio = reporte.generar_reporte_alquileres_por_periodo(frecuencia="Q", anio=2025)
+        assert otro_anio != primero
+        print("✅ Otro reporte/parámetros -> otra entrada")
+
+        # Una escritura en VEHICULO no afecta a la facturación (solo lee ALQUILER)...
+        cache_reportes.datos_modificados("VEHICULO")
+        assert reporte.generar_reporte_facturacion_mensual(anio=2025) == primero
+        # ...pero una en ALQUILER la descarta (y borra el PDF viejo).
+        cache_reportes.datos_modificados("ALQUILER")
+        assert not os.path.exists(en_disco(primero)), "El PDF desactualizado no se borró"
+        nuevo = reporte.generar_reporte_facturacion_mensual(anio=2025)
+        assert os.path.exists(en_disco(nuevo))
+        print(f"✅ Cambio en ALQUILER invalida el reporte: {cache_reportes.estadisticas()}")
+
+        # Otro proceso (otra conexión, sin pasar por datos_modificados) escribe
+        # en ALQUILER: el trigger sube la versión compartida.
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            bd.execute("UPDATE ALQUILER SET costo_total = costo_total "
+                       "WHERE id_alquiler = (SELECT MIN(id_alquiler) FROM ALQUILER)")
+        despues = reporte.generar_reporte_facturacion_mensual(anio=2025)
+        assert despues != nuevo and not os.path.exists(en_disco(nuevo)), "Se sirvió un reporte de antes de la escritura"
+        print("✅ Una escritura de otro proceso también invalida el reporte")
+    except Exception as e:
+        print(f"❌ Error en el caché de reportes: {e}")
+        traceback.print_exc()
+
+
+def test_un_render_por_clave():
+    print("\n===== 🔒 TEST: UN SOLO RENDER POR CLAVE A LA VEZ =====")
+    cache_reportes.reiniciar()
+    dibujando, maximo, llamadas = [0], [0], []
+    lock = threading.Lock()
+
+    def generar():
+        # El primero falla: los que esperaban tienen que seguir de a uno
+        with lock:
+            llamadas.append(1)
+            dibujando[0] += 1
+            maximo[0] = max(maximo[0], dibujando[0])
+            numero = len(llamadas)
+        try:
+            time.sleep(0.05)
+            if numero == 1:
+                raise RuntimeError("falla a propósito")
+            url = f"static/reportes/prueba_{numero}.pdf"
+            open(en_disco(url), "wb").close()
+            return url
+        finally:
+            with lock:
+                dibujando[0] -= 1
+
+    def pedir(demora):
+        time.sleep(demora)
+        try:
+            return cache_reportes.obtener_o_generar("prueba", {}, ("ALQUILER",), generar)
+        except RuntimeError:
+            return None
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as hilos:
+            urls = list(hilos.map(pedir, [0, 0, 0, 0.06, 0.06, 0.12, 0.12, 0.2]))
+        assert maximo[0] == 1, f"{maximo[0]} renders a la vez"
+        assert len(llamadas) == 2 and urls.count(None) == 1 and len(set(urls) - {None}) == 1, (llamadas, urls)
+        assert cache_reportes.estadisticas()["generando"] == 0
+        print("✅ 8 pedidos iguales (el primer render falla): nunca dos renders a la vez, y uno solo exitoso")
+    except Exception as e:
+        print(f"❌ Error con pedidos iguales en paralelo: {e}")
+        traceback.print_exc()
+
+
+def _contenido_pdf(url):
+    # Sin la fecha de creación: es lo único que cambia entre dos dibujos iguales
+    with open(en_disco(url), "rb") as archivo:
+        return re.sub(rb"/CreationDate \([^)]*\)", b"", archivo.read())
+
+
+def test_reportes_en_paralelo():
+    print("\n===== 🧵 TEST: REPORTES DIBUJADOS EN PARALELO (4 HILOS) =====")
+    reporte = ReporteService()
+    pedidos = [("alquileres_por_periodo", {"frecuencia": "M", "anio": 2025}),
+               ("alquileres_por_periodo", {"frecuencia": "Q", "anio": 2025}),
+               ("facturacion_mensual", {"anio": 2025}),
+               ("vehiculos_mas_alquilados", {"limite": 5})] * 3
+
+    def dibujar(pedido):
+        tipo, parametros = pedido
+        generar, _, _ = REPORTES[tipo]   # sin caché: siempre dibuja
+        return generar(reporte, **parametros)
+
+    try:
+        de_a_uno = {i: _contenido_pdf(dibujar(p)) for i, p in enumerate(pedidos[:4])}
+        with ThreadPoolExecutor(max_workers=4) as hilos:
+            urls = list(hilos.map(dibujar, pedidos))
+        assert len(set(urls)) == len(urls), "Dos reportes se escribieron en el mismo archivo"
+        for i, url in enumerate(urls):
+            assert _contenido_pdf(url) == de_a_uno[i % 4], f"{url} difiere del dibujado de a uno"
+        print(f"✅ {len(urls)} reportes en 4 hilos: cada PDF es igual al dibujado de a uno")
+    except Exception as e:
+        print(f"❌ Error dibujando en paralelo: {e}")
+        traceback.print_exc()
+
 
 if __name__ == "__main__":
-    print("===== 🚀 INICIANDO TESTS DE REPORTES =====")
-    test_alquileres_por_cliente()
-    test_alquileres_por_periodo()
-    test_facturacion_mensual()
-    test_vehiculos_mas_alquilados()
-    print("\n===== ✅ TESTS FINALIZADOS =====")
\ No newline at end of file
+    carpeta = tempfile.mkdtemp(prefix="test_reportes_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)  # (como al arrancar app.py: los reportes leen el resumen diario)
+    almacen_reportes.CARPETA = ReporteService.REPORTES_DIR = os.path.join(carpeta, "reportes")
+    os.makedirs(almacen_reportes.CARPETA)
+    try:
+        print("===== 🚀 INICIANDO TESTS DE REPORTES =====")
+        test_alquileres_por_cliente()
+        test_alquileres_por_periodo()
+        test_facturacion_mensual()
+        test_vehiculos_mas_alquilados()
+        test_cache_de_reportes()
+        test_un_render_por_clave()
+        test_reportes_en_paralelo()
+        print("\n===== ✅ TESTS FINALIZADOS =====")
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
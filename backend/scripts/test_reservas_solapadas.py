@@ -0,0 +1,215 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_reservas_solapadas
+#
+# Reservas con chequeo de fechas (sobre una COPIA de la base):
+# - crear una reserva que se pisa con un alquiler, un mantenimiento u otra
+#   reserva del mismo vehículo se rechaza (409 en POST /reservas),
+# - modificar una reserva también se chequea (sin contar la misma reserva),
+# - POST /reservas/verificar devuelve los mismos choques que una consulta
+#   directa para muchas candidatas, más los choques entre ellas.
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import traceback
+from datetime import date, timedelta
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+
+CHOQUES_DIRECTOS = """
+    SELECT 'alquiler', id_alquiler, fecha_inicio, fecha_fin FROM ALQUILER
+     WHERE patente = :p AND fecha_inicio <= :hasta AND fecha_fin >= :desde
+    UNION ALL
+    SELECT 'mantenimiento', id_mantenimiento, fecha_inicio, fecha_fin FROM MANTENIMIENTO
+     WHERE patente = :p AND fecha_inicio <= :hasta AND fecha_fin >= :desde
+    UNION ALL
+    SELECT 'reserva', id_reserva, fecha_inicio_deseada, fecha_fin_deseada FROM RESERVA
+     WHERE patente = :p AND fecha_inicio_deseada <= :hasta AND fecha_fin_deseada >= :desde
+       AND id_reserva IS NOT :id
+"""
+
+
+def primer_cliente_y_patentes():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        id_cliente = bd.execute("SELECT MIN(id_cliente) FROM CLIENTE").fetchone()[0]
+        patentes = [p for (p,) in bd.execute("SELECT patente FROM VEHICULO ORDER BY patente")]
+    return id_cliente, patentes
+
+
+def choques_directos(patente, desde, hasta, id_reserva=None):
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        filas = bd.execute(CHOQUES_DIRECTOS, {"p": patente, "desde": desde, "hasta": hasta, "id": id_reserva})
+        return sorted((t, i) for t, i, _, _ in filas)
+
+
+def test_alta_y_modificacion():
+    print("\n===== 📅 TEST: RESERVAS QUE SE PISAN =====")
+    from servicios.reserva_service import ReservaService
+    from servicios.mantenimiento_service import MantenimientoService
+    from servicios.excepciones import ErrorDeLogicaDeNegocio
+    try:
+        id_cliente, patentes = primer_cliente_y_patentes()
+        patente = patentes[0]
+        reservas = ReservaService()
+
+        def reservar(desde, hasta, patente=patente):
+            return reservas.crear_reserva({"id_cliente": id_cliente, "patente": patente,
+                                           "fecha_inicio_deseada": desde, "fecha_fin_deseada": hasta})
+
+        def rechazada(funcion, *argumentos):
+            try:
+                funcion(*argumentos)
+            except ErrorDeLogicaDeNegocio:
+                return True
+            return False
+
+        # Un alquiler a futuro (las reservas no pueden empezar antes de hoy)
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            bd.execute("INSERT INTO ALQUILER (fecha_inicio, fecha_fin, costo_total, fecha_registro, "
+                       "id_cliente, id_empleado, patente) SELECT '2032-04-10', '2032-04-20', 100, "
+                       "'2032-04-01', :c, MIN(id_empleado), :p FROM EMPLEADO", {"c": id_cliente, "p": patente})
+        assert rechazada(reservar, "2032-04-20", "2032-04-22")
+        print(f"✅ Se rechaza una reserva que empieza el último día de un alquiler de {patente}")
+
+        mantenimiento = MantenimientoService().crear_mantenimiento({
+            "patente": patente, "fecha_inicio": "2032-05-01", "fecha_fin": "2032-05-03",
+            "tipo_servicio": "Service", "costo": 100})
+        assert rechazada(reservar, "2032-05-03", "2032-05-06")
+        print("✅ Se rechaza una reserva que empieza el último día de un mantenimiento")
+
+        primera = reservar("2032-05-10", "2032-05-15")
+        assert rechazada(reservar, "2032-05-01", "2032-05-10")
+        assert rechazada(reservar, "2032-05-12", "2032-05-13")
+        segunda = reservar("2032-05-16", "2032-05-20")
+        print("✅ Dos reservas del mismo vehículo no se pisan; la del día siguiente sí se crea")
+
+        otra = reservar("2032-05-10", "2032-05-15", patentes[1])
+        assert otra.vehiculo.patente == patentes[1]
+        print("✅ Las mismas fechas en otro vehículo se aceptan")
+
+        # Modificar: correrla dentro de sus propias fechas vale...
+        actualizada = reservas.actualizar_reserva(primera.id_reserva, {"fecha_fin_deseada": "2032-05-14"})
+        assert str(actualizada.fecha_fin_deseada) == "2032-05-14"
+        # ...pisar la segunda o el mantenimiento, no
+        assert rechazada(reservas.actualizar_reserva, primera.id_reserva, {"fecha_fin_deseada": "2032-05-17"})
+        assert rechazada(reservas.actualizar_reserva, primera.id_reserva, {"fecha_inicio_deseada": "2032-05-02"})
+        # ...ni pasarse a otro vehículo ocupado
+        assert rechazada(reservas.actualizar_reserva, otra.id_reserva, {"patente": patente})
+        guardada = ReservaService().buscar_reserva(primera.id_reserva)
+        assert (str(guardada.fecha_inicio_deseada), str(guardada.fecha_fin_deseada)) == ("2032-05-10", "2032-05-14")
+        assert ReservaService().buscar_reserva(otra.id_reserva).vehiculo.patente == patentes[1]
+        print("✅ Las modificaciones que se pisan se rechazan y la reserva queda como estaba")
+
+        for reserva in (primera, segunda, otra):
+            reservas.eliminar_reserva(reserva.id_reserva)
+        MantenimientoService().eliminar_mantenimiento(mantenimiento.id_mantenimiento)
+    except Exception as e:
+        print(f"❌ Error con reservas que se pisan: {e}")
+        traceback.print_exc()
+
+
+def test_verificacion_en_lote():
+    print("\n===== 📋 TEST: POST /reservas/verificar =====")
+    from app import app
+    cliente = app.test_client()
+    try:
+        _, patentes = primer_cliente_y_patentes()
+        azar = random.Random(23)
+        base = date(2024, 1, 1)
+        candidatas = []
+        for _ in range(1200):
+            desde = base + timedelta(days=azar.randrange(700))
+            candidatas.append({"patente": azar.choice(patentes), "fecha_inicio_deseada": desde.isoformat(),
+                               "fecha_fin_deseada": (desde + timedelta(days=azar.randrange(10))).isoformat()})
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            reserva = bd.execute("SELECT id_reserva, patente, fecha_inicio_deseada, fecha_fin_deseada "
+                                 "FROM RESERVA WHERE patente IS NOT NULL LIMIT 1").fetchone()
+        if reserva:
+            # Una reserva existente con sus propias fechas: no choca consigo misma
+            candidatas.append({"id_reserva": reserva[0], "patente": reserva[1],
+                               "fecha_inicio_deseada": reserva[2], "fecha_fin_deseada": reserva[3]})
+
+        respuesta = cliente.post("/reservas/verificar", json=candidatas)
+        assert respuesta.status_code == 200, respuesta.json
+        resultados = respuesta.json["resultados"]
+        assert not respuesta.json["errores"] and len(resultados) == len(candidatas)
+        distintos = []
+        for resultado, c in zip(resultados, candidatas):
+            esperado = choques_directos(c["patente"], c["fecha_inicio_deseada"],
+                                        c["fecha_fin_deseada"], c.get("id_reserva"))
+            obtenido = sorted((x["tipo"], x["id"]) for x in resultado["conflictos"] if x["tipo"] != "candidata")
+            if obtenido != esperado:
+                distintos.append((resultado["indice"], obtenido, esperado))
+        assert not distintos, distintos[:3]
+        ocupadas = sum(not r["disponible"] for r in resultados)
+        print(f"✅ {len(candidatas)} candidatas ({ocupadas} ocupadas): mismos choques que la consulta directa")
+
+        pedido = [
+            {"patente": patentes[0], "fecha_inicio_deseada": "2033-01-01", "fecha_fin_deseada": "2033-01-05"},
+            {"patente": patentes[0], "fecha_inicio_deseada": "2033-01-05", "fecha_fin_deseada": "2033-01-08"},
+            {"patente": patentes[0], "fecha_inicio_deseada": "2033-01-09", "fecha_fin_deseada": "2033-01-09"},
+            {"patente": "NOEXISTE", "fecha_inicio_deseada": "2033-01-01", "fecha_fin_deseada": "2033-01-02"},
+            {"patente": patentes[0], "fecha_inicio_deseada": "2033-01-05", "fecha_fin_deseada": "2033-01-01"},
+        ]
+        resultado = cliente.post("/reservas/verificar", json=pedido).json
+        entre_ellas = {r["indice"]: [(x["tipo"], x["id"]) for x in r["conflictos"]] for r in resultado["resultados"]}
+        assert entre_ellas == {0: [("candidata", 1)], 1: [("candidata", 0)], 2: []}, entre_ellas
+        assert [e["indice"] for e in resultado["errores"]] == [3, 4], resultado["errores"]
+        print("✅ Choques entre las mismas candidatas; patente inexistente y fechas invertidas como errores")
+
+        for body in ([], {"patente": patentes[0]}, None):
+            assert cliente.post("/reservas/verificar", json=body).status_code == 400
+        print("✅ Sin una lista de candidatas: 400")
+    except Exception as e:
+        print(f"❌ Error en la verificación en lote: {e}")
+        traceback.print_exc()
+
+
+def test_endpoints():
+    print("\n===== 🌐 TEST: POST y PUT /reservas =====")
+    from app import app
+    cliente = app.test_client()
+    try:
+        id_cliente, patentes = primer_cliente_y_patentes()
+        datos = {"id_cliente": id_cliente, "patente": patentes[0],
+                 "fecha_inicio_deseada": "2034-02-01", "fecha_fin_deseada": "2034-02-05"}
+        respuesta = cliente.post("/reservas", json=datos)
+        assert respuesta.status_code == 201, respuesta.json
+        id_reserva = respuesta.json["id_reserva"]
+        respuesta = cliente.post("/reservas", json=datos)
+        assert respuesta.status_code == 409, respuesta.status_code
+        print(f"✅ La misma reserva dos veces: 201 y 409 ({respuesta.json['error']})")
+
+        datos["fecha_inicio_deseada"], datos["fecha_fin_deseada"] = "2034-02-06", "2034-02-07"
+        id_otra = cliente.post("/reservas", json=datos).json["id_reserva"]
+        respuesta = cliente.put(f"/reservas/{id_otra}", json={"fecha_inicio_deseada": "2034-02-05"})
+        assert respuesta.status_code == 409, respuesta.status_code
+        respuesta = cliente.put(f"/reservas/{id_otra}", json={"fecha_fin_deseada": "2034-02-09"})
+        assert respuesta.status_code == 200, respuesta.json
+        print("✅ PUT que se pisa: 409; PUT que no: 200")
+
+        for id_ in (id_reserva, id_otra):
+            cliente.delete(f"/reservas/{id_}")
+    except Exception as e:
+        print(f"❌ Error en los endpoints: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_reservas_solapadas_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    try:
+        test_alta_y_modificacion()
+        test_verificacion_en_lote()
+        test_endpoints()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
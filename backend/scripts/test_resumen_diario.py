@@ -0,0 +1,219 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_resumen_diario
+#
+# Resumen diario de alquileres (sobre una COPIA de la base). Verifica que:
+# - después de crear, modificar y borrar alquileres con AlquilerService, el
+#   resumen es igual a recalcularlo desde ALQUILER,
+# - varios PUT/DELETE simultáneos del mismo alquiler no lo desincronizan,
+# - si la escritura falla a mitad, no queda ni el alquiler ni su resumen,
+# - reconstruir() lo repara (y deja viejos los reportes en caché),
+# - los agregados de los reportes coinciden con agregar ALQUILER directo.
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import traceback
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+
+PATENTE = "RES001"
+
+_SQL_DESDE_ALQUILER = """
+    SELECT fecha_inicio, patente, COUNT(*), ROUND(SUM(costo_total), 2),
+           SUM(CAST(julianday(fecha_fin) - julianday(fecha_inicio) AS INTEGER))
+    FROM ALQUILER GROUP BY fecha_inicio, patente ORDER BY 1, 2
+"""
+
+
+def resumen_guardado():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return bd.execute("SELECT dia, patente, alquileres, facturacion, dias_alquiler "
+                          "FROM ALQUILER_RESUMEN_DIARIO ORDER BY 1, 2").fetchall()
+
+
+def resumen_esperado():
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        return bd.execute(_SQL_DESDE_ALQUILER).fetchall()
+
+
+def verificar(paso):
+    guardado, esperado = resumen_guardado(), resumen_esperado()
+    assert guardado == esperado, f"{paso}: {set(guardado) ^ set(esperado)}"
+    print(f"✅ {paso}: resumen igual a recalcularlo ({len(guardado)} filas)")
+
+
+def test_mantenimiento_incremental():
+    print("\n===== 🧮 TEST: RESUMEN DIARIO INCREMENTAL =====")
+    from servicios.alquiler_service import AlquilerService
+    servicio = AlquilerService()
+    try:
+        verificar("Carga inicial (migración)")
+
+        alquiler = servicio.crear_alquiler({
+            "id_cliente": 1, "id_empleado": 1, "patente": PATENTE,
+            "fecha_inicio": "2027-01-10", "fecha_fin": "2027-01-13", "costo_total": 90.5})
+        verificar("Alta")
+
+        servicio.actualizar_alquiler(alquiler.id_alquiler, {"fecha_inicio": "2027-01-11", "costo_total": 70})
+        verificar("Modificación (cambia de día)")
+
+        servicio.eliminar_alquiler(alquiler.id_alquiler)
+        verificar("Baja")
+        assert not [f for f in resumen_guardado() if f[1] == PATENTE], "Quedó una fila vacía"
+        print("✅ La baja no deja filas en cero")
+    except Exception as e:
+        print(f"❌ Error en el mantenimiento incremental: {e}")
+        traceback.print_exc()
+
+
+def test_modificaciones_simultaneas(hilos=8):
+    print("\n===== 🔀 TEST: PUT Y DELETE SIMULTÁNEOS =====")
+    from servicios.alquiler_service import AlquilerService
+    from servicios.excepciones import RecursoNoEncontradoError
+    try:
+        alquiler = AlquilerService().crear_alquiler({
+            "id_cliente": 1, "id_empleado": 1, "patente": PATENTE,
+            "fecha_inicio": "2027-03-01", "fecha_fin": "2027-03-03"})
+        barrera = threading.Barrier(hilos)
+        errores = []
+
+        def modificar(n):
+            # Cada hilo con su servicio (como cada request de Flask)
+            try:
+                barrera.wait()
+                AlquilerService().actualizar_alquiler(
+                    alquiler.id_alquiler, {"fecha_inicio": f"2027-02-{n + 10:02d}"})
+            except Exception as e:
+                errores.append(e)
+            finally:
+                ConexionDB.liberar()
+
+        trabajadores = [threading.Thread(target=modificar, args=(n,)) for n in range(hilos)]
+        for t in trabajadores:
+            t.start()
+        for t in trabajadores:
+            t.join()
+        assert not errores, errores
+        verificar(f"{hilos} PUT simultáneos")
+
+        borrados = []
+
+        def borrar():
+            try:
+                barrera.wait()
+                borrados.append(AlquilerService().eliminar_alquiler(alquiler.id_alquiler))
+            except RecursoNoEncontradoError:
+                pass
+            finally:
+                ConexionDB.liberar()
+
+        trabajadores = [threading.Thread(target=borrar) for _ in range(hilos)]
+        for t in trabajadores:
+            t.start()
+        for t in trabajadores:
+            t.join()
+        assert borrados == [True], borrados
+        verificar(f"{hilos} DELETE simultáneos (uno solo lo borra)")
+    except Exception as e:
+        print(f"❌ Error con modificaciones simultáneas: {e}")
+        traceback.print_exc()
+
+
+def test_falla_a_mitad():
+    print("\n===== 💥 TEST: FALLA A MITAD DE LA ESCRITURA =====")
+    from servicios.alquiler_service import AlquilerService
+    servicio = AlquilerService()
+    with sqlite3.connect(conexion.DB_PATH) as bd:
+        cantidad_antes = bd.execute("SELECT COUNT(*) FROM ALQUILER").fetchone()[0]
+    resumen_antes = resumen_guardado()
+
+    def fallar(*argumentos):
+        raise sqlite3.OperationalError("falla simulada al actualizar el vehículo")
+
+    servicio.vehiculo_dao.actualizar_estado = fallar
+    try:
+        servicio.crear_alquiler({
+            "id_cliente": 1, "id_empleado": 1, "patente": PATENTE,
+            "fecha_inicio": "2027-02-10", "fecha_fin": "2027-02-12", "costo_total": 50})
+        print("❌ ERROR: no lanzó la falla simulada")
+    except Exception as e:
+        print(f"✅ Excepción esperada: {e}")
+    try:
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            cantidad = bd.execute("SELECT COUNT(*) FROM ALQUILER").fetchone()[0]
+        assert cantidad == cantidad_antes, "Quedó guardado el alquiler"
+        assert resumen_guardado() == resumen_antes, "Quedó guardado el resumen"
+        print("✅ Rollback: ni el alquiler ni el resumen quedaron guardados")
+    except Exception as e:
+        print(f"❌ Error en el rollback: {e}")
+        traceback.print_exc()
+
+
+def test_reconstruir():
+    print("\n===== 🔧 TEST: RECONSTRUIR =====")
+    from Crud.resumen_diario_crud import ResumenDiarioCRUD
+    try:
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            bd.execute("DELETE FROM ALQUILER_RESUMEN_DIARIO WHERE dia < '2025-06-01'")
+            bd.execute("UPDATE ALQUILER_RESUMEN_DIARIO SET alquileres = alquileres + 5")
+        import cache_reportes
+        version_antes = cache_reportes.version_datos("ALQUILER")["ALQUILER"]
+        filas = ResumenDiarioCRUD().reconstruir()
+        assert filas == len(resumen_esperado()), filas
+        verificar("Reconstruido tras desincronizarlo")
+        # Los reportes en caché se calcularon con el resumen anterior
+        version = cache_reportes.version_datos("ALQUILER")["ALQUILER"]
+        assert version > version_antes, (version_antes, version)
+        print(f"✅ Reconstruir sube la versión de ALQUILER ({version_antes} -> {version})")
+    except Exception as e:
+        print(f"❌ Error al reconstruir: {e}")
+        traceback.print_exc()
+
+
+def test_agregados_de_reportes():
+    print("\n===== 📊 TEST: AGREGADOS DE LOS REPORTES =====")
+    from servicios.alquiler_service import AlquilerService
+    servicio = AlquilerService()
+    try:
+        with sqlite3.connect(conexion.DB_PATH) as bd:
+            for trimestral, periodo in ((False, "CAST(strftime('%m', fecha_inicio) AS INTEGER)"),
+                                        (True, "(CAST(strftime('%m', fecha_inicio) AS INTEGER) + 2) / 3")):
+                esperado = {p: (c, t) for p, c, t in bd.execute(
+                    f"SELECT {periodo} AS p, COUNT(*), ROUND(SUM(costo_total), 2) FROM ALQUILER "
+                    "WHERE fecha_inicio LIKE '2025-%' GROUP BY p")}
+                assert servicio.resumen_por_periodo(2025, trimestral) == esperado
+            print("✅ Resumen por mes y por trimestre igual a agregar ALQUILER")
+
+            esperado = bd.execute("SELECT patente, COUNT(*) FROM ALQUILER GROUP BY patente "
+                                  "ORDER BY 2 DESC, 1").fetchall()
+        ranking = [(f[0], f[3]) for f in servicio.ranking_vehiculos()]
+        assert ranking == esperado, (ranking, esperado)
+        print("✅ Ranking de vehículos igual a agregar ALQUILER")
+    except Exception as e:
+        print(f"❌ Error en los agregados: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_resumen_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    with sqlite3.connect(copia) as bd:
+        bd.execute("INSERT INTO VEHICULO (patente, marca, modelo, anio, precio_diario, estado) "
+                   "VALUES (?, 'Fiat', 'Uno', 2015, 30, 'disponible')", (PATENTE,))
+    try:
+        test_mantenimiento_incremental()
+        test_modificaciones_simultaneas()
+        test_falla_a_mitad()
+        test_reconstruir()
+        test_agregados_de_reportes()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
@@ -0,0 +1,91 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_streaming
+#
+# Listados en streaming (sobre una COPIA de la base):
+# - ?stream=1 arma un arreglo JSON válido y Accept: application/x-ndjson
+#   un objeto por línea, con todas las filas,
+# - un error a mitad del envío corta la transferencia (no queda un 200
+#   con un arreglo sin cerrar o un NDJSON truncado que parece completo).
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import traceback
+
+import conexion
+from conexion import ConexionDB
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def test_listados(cliente):
+    print("\n===== 🌊 TEST: LISTADOS EN STREAMING =====")
+    bd = sqlite3.connect(conexion.DB_PATH)
+    try:
+        for url, tabla in (("/alquileres", "ALQUILER"), ("/vehiculos", "VEHICULO"), ("/clientes", "CLIENTE")):
+            cantidad = bd.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+            respuesta = cliente.get(f"{url}?stream=1")
+            assert respuesta.status_code == 200 and respuesta.is_streamed, respuesta.status_code
+            arreglo = json.loads(respuesta.get_data())
+            respuesta = cliente.get(url, headers=NDJSON)
+            lineas = respuesta.get_data(as_text=True).splitlines()
+            assert respuesta.mimetype == "application/x-ndjson", respuesta.mimetype
+            assert len(arreglo) == len(lineas) == cantidad, (len(arreglo), len(lineas), cantidad)
+            assert arreglo == [json.loads(linea) for linea in lineas]
+            print(f"✅ {url}: {cantidad} filas como arreglo JSON y como NDJSON")
+    except Exception as e:
+        print(f"❌ Error en los listados: {e}")
+        traceback.print_exc()
+    finally:
+        bd.close()
+
+
+def test_error_a_mitad(cliente):
+    print("\n===== 💥 TEST: ERROR A MITAD DEL STREAMING =====")
+    import app as modulo_app
+
+    class VehiculosQueFallan:
+        def __init__(self, original):
+            self.original = original
+
+        def iterar(self):
+            for i, vehiculo in enumerate(self.original.iterar()):
+                if i == 2:
+                    raise RuntimeError("se cortó la base")
+                yield vehiculo
+
+    original = modulo_app.servicio_vehiculo
+    modulo_app.servicio_vehiculo = VehiculosQueFallan(original)
+    try:
+        for nombre, headers in (("arreglo JSON", {}), ("NDJSON", NDJSON)):
+            try:
+                respuesta = cliente.get("/vehiculos?stream=1", headers=headers)
+                assert respuesta.status_code == 200 and respuesta.is_streamed, respuesta.status_code
+                try:
+                    respuesta.get_data()
+                    print(f"❌ {nombre}: la respuesta terminó como si estuviera completa")
+                except RuntimeError:
+                    print(f"✅ {nombre}: un error a mitad del envío corta la transferencia")
+            except Exception as e:
+                print(f"❌ Error en {nombre}: {e}")
+                traceback.print_exc()
+    finally:
+        modulo_app.servicio_vehiculo = original
+
+
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_streaming_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    try:
+        from app import app
+        cliente = app.test_client()
+        test_listados(cliente)
+        test_error_a_mitad(cliente)
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
@@ -0,0 +1,113 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_tiempo_arranque
+#
+# Presupuesto de tiempo de arranque: importa 'app' en un proceso nuevo con
+# 'python -X importtime' (sobre una COPIA de la base) y verifica que:
+# - pandas / matplotlib / numpy NO se importan al arrancar,
+# - ningún servicio se crea al arrancar (se crean con su primer uso),
+# - el import de 'app' entra en el presupuesto (PRESUPUESTO_ARRANQUE_MS, por defecto 800).
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import traceback
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("pandas", "matplotlib", "numpy")
+PRESUPUESTO_MS = float(os.environ.get("PRESUPUESTO_ARRANQUE_MS", 800))
+REPETICIONES = 3
+
+# Lo que corre el proceso hijo: apunta a la copia, importa app y reporta
+# qué módulos pesados quedaron cargados y qué servicios se crearon.
+_CODIGO_HIJO = """
+import sys, conexion
+conexion.DB_PATH = sys.argv[1]
+import app
+from perezoso import Perezoso
+pesados = sorted({m.split('.')[0] for m in sys.modules} & set(sys.argv[2].split(',')))
+creados = [n for n, v in vars(app).items() if isinstance(v, Perezoso) and v.creado]
+print(','.join(pesados)); print(','.join(creados))
+"""
+
+
+def importar_app(copia):
+    """ Retorna (tiempos en us por módulo, módulos pesados cargados, servicios creados). """
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CODIGO_HIJO, copia, ",".join(PESADOS)],
+        cwd=BACKEND, capture_output=True, text=True, timeout=120)
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr[-2000:])
+
+    # Formato de cada línea: "import time: <propio> | <acumulado> | <módulo>"
+    tiempos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, modulo = linea[len("import time:"):].split("|")
+        tiempos[modulo.strip()] = int(acumulado)
+    pesados, creados = (proceso.stdout.splitlines() + ["", ""])[:2]
+    return tiempos, [p for p in pesados.split(",") if p], [c for c in creados.split(",") if c]
+
+
+def test_presupuesto_de_arranque(copia):
+    print("\n===== ⏱️ TEST: TIEMPO DE ARRANQUE (import app) =====")
+    try:
+        # Nos quedamos con la mejor de varias corridas (la primera calienta el disco)
+        corridas = [importar_app(copia) for _ in range(REPETICIONES)]
+        tiempos, pesados, creados = min(corridas, key=lambda c: c[0].get("app", float("inf")))
+
+        if pesados:
+            print(f"❌ Se importan al arrancar: {pesados}")
+        else:
+            print(f"✅ {', '.join(PESADOS)}: no se importan al arrancar")
+
+        if creados:
+            print(f"❌ Servicios creados al arrancar: {creados}")
+        else:
+            print("✅ Ningún servicio se crea al arrancar")
+
+        total_ms = tiempos["app"] / 1000
+        mas_lentos = sorted(tiempos.items(), key=lambda par: par[1], reverse=True)[1:6]
+        detalle = ", ".join(f"{m} {us / 1000:.0f} ms" for m, us in mas_lentos)
+        if total_ms <= PRESUPUESTO_MS:
+            print(f"✅ import app: {total_ms:.0f} ms (presupuesto {PRESUPUESTO_MS:.0f} ms)")
+        else:
+            print(f"❌ import app: {total_ms:.0f} ms, supera el presupuesto de {PRESUPUESTO_MS:.0f} ms")
+        print(f"   Más pesados: {detalle}")
+    except Exception as e:
+        print(f"❌ Error midiendo el arranque: {e}")
+        traceback.print_exc()
+
+
+def test_reporte_carga_graficos():
+    print("\n===== 📈 TEST: MATPLOTLIB SE CARGA CON EL PRIMER REPORTE =====")
+    try:
+        from servicios.reporte_service import ReporteService
+        assert "matplotlib" not in sys.modules, "matplotlib ya estaba importado"
+        url = ReporteService().generar_reporte_facturacion_mensual(anio=2025)
+        assert "matplotlib" in sys.modules, "No se cargó matplotlib"
+        # Los gráficos se arman sin pyplot (servicios/graficos.py) y pandas no se usa
+        assert "matplotlib.pyplot" not in sys.modules and "pandas" not in sys.modules
+        os.remove(url)
+        print("✅ Se importó recién al dibujar el primer reporte (sin pyplot ni pandas)")
+    except Exception as e:
+        print(f"❌ Error en la carga diferida de gráficos: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    import conexion
+    from conexion import ConexionDB
+    carpeta = tempfile.mkdtemp(prefix="test_arranque_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    try:
+        test_presupuesto_de_arranque(copia)
+        test_reporte_carga_graficos()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
@@ -0,0 +1,199 @@
+# Pasos para ejecutar los tests:
+# cd backend
+# python3 -m scripts.test_trabajos_reportes
+#
+# Encola reportes en el pool de procesos (sobre una COPIA de la base) y verifica:
+# - que terminan con su URL, o con el error y el código HTTP que correspondan,
+# - que un parámetro mal tipado da 400 al encolar (sin crear el trabajo),
+# - que un trabajo que quedó "pendiente" (servidor reiniciado) se reanuda,
+# - y que uno que otro proceso vivo tiene en curso (late) no se reanuda.
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import conexion
+from conexion import ConexionDB
+from migraciones import aplicar_migraciones
+
+
+def esperar(servicio, id_trabajo, segundos=60):
+    limite = time.time() + segundos
+    while time.time() < limite:
+        trabajo = servicio.consultar(id_trabajo)
+        if trabajo.finalizado:
+            return trabajo
+        time.sleep(0.2)
+    raise TimeoutError(f"El trabajo {id_trabajo} no terminó en {segundos} s")
+
+
+def test_encolar_y_consultar():
+    print("\n===== ⏳ TEST: REPORTES EN SEGUNDO PLANO =====")
+    from servicios.trabajo_reporte_service import TrabajoReporteService
+    servicio = TrabajoReporteService(procesos=2)
+    try:
+        inicio = time.perf_counter()
+        ok = servicio.encolar("facturacion_mensual", {"anio": 2025})
+        sin_datos = servicio.encolar("alquileres_por_cliente", {"cliente_id": 9999})
+        mal = servicio.encolar("alquileres_por_periodo", {"frecuencia": "M", "anio": 2999})
+        print(f"✅ Encolar no espera al render: {(time.perf_counter() - inicio) * 1000:.1f} ms para 3 trabajos")
+
+        terminado = esperar(servicio, ok.id_trabajo)
+        assert terminado.estado == "terminado" and os.path.exists(terminado.url), terminado.a_dict()
+        print(f"✅ Reporte terminado: {terminado.url}")
+
+        for encolado, codigo in ((sin_datos, 404), (mal, 400)):
+            trabajo = esperar(servicio, encolado.id_trabajo)
+            assert trabajo.estado == "error" and trabajo.codigo_error == codigo, trabajo.a_dict()
+        print("✅ Errores del reporte quedan guardados con su código (404, 400)")
+
+        # "2025" (texto) se convierte a 2025: es el mismo reporte
+        repetido = servicio.encolar("facturacion_mensual", {"anio": "2025"})
+        assert repetido.estado == "terminado" and repetido.url == terminado.url, repetido.a_dict()
+        assert repetido.parametros == {"anio": 2025}, repetido.parametros
+        print("✅ Un reporte ya generado sale del caché sin pasar por el pool")
+    except Exception as e:
+        print(f"❌ Error en reportes en segundo plano: {e}")
+        traceback.print_exc()
+    finally:
+        servicio.cerrar()
+
+
+def test_parametros_invalidos():
+    print("\n===== 🚫 TEST: PARÁMETROS INVÁLIDOS AL ENCOLAR =====")
+    from app import app
+    bd = sqlite3.connect(conexion.DB_PATH)
+    cliente = app.test_client()
+    try:
+        antes = bd.execute("SELECT COUNT(*) FROM TRABAJO_REPORTE").fetchone()[0]
+        for tipo, parametros, motivo in (
+                ("inexistente", {}, "tipo desconocido"),
+                ("facturacion_mensual", {}, "falta 'anio'"),
+                ("facturacion_mensual", {"anio": "dos mil"}, "anio no numérico"),
+                ("facturacion_mensual", {"anio": 2025.5}, "anio decimal"),
+                ("facturacion_mensual", {"anio": True}, "anio booleano"),
+                ("alquileres_por_cliente", {"cliente_id": "1", "formato": "word"}, "formato desconocido"),
+                ("alquileres_por_cliente", {"cliente_id": 0}, "cliente_id no positivo"),
+                ("alquileres_por_periodo", {"frecuencia": "X"}, "frecuencia desconocida"),
+                ("vehiculos_mas_alquilados", {"limite": "cinco"}, "limite no numérico"),
+                ("vehiculos_mas_alquilados", {"desde": "2025-13-01"}, "fecha inválida"),
+                ("vehiculos_mas_alquilados", {"hasta": 20250101}, "fecha como número")):
+            respuesta = cliente.post("/reportes/jobs", json={"tipo": tipo, "parametros": parametros})
+            if respuesta.status_code == 400:
+                print(f"✅ 400 ({motivo}): {respuesta.get_json()['error']}")
+            else:
+                print(f"❌ {motivo}: {respuesta.status_code} {respuesta.get_json()}")
+        despues = bd.execute("SELECT COUNT(*) FROM TRABAJO_REPORTE").fetchone()[0]
+        if despues == antes:
+            print("✅ Ningún parámetro inválido creó un trabajo")
+        else:
+            print(f"❌ Se crearon {despues - antes} trabajos con parámetros inválidos")
+    except Exception as e:
+        print(f"❌ Error validando parámetros: {e}")
+        traceback.print_exc()
+    finally:
+        bd.close()
+
+
+def test_reanudar_pendientes():
+    print("\n===== 🔁 TEST: REANUDAR TRABAJOS TRAS UN REINICIO =====")
+    from clases.trabajo_reporte import TrabajoReporte
+    from Crud.trabajo_reporte_crud import TrabajoReporteCRUD
+    from servicios.trabajo_reporte_service import TrabajoReporteService
+
+    # Un trabajo que quedó "en_proceso" cuando se cortó el servidor anterior
+    huerfano = TrabajoReporte("huerfano", "alquileres_por_periodo", {"frecuencia": "Q", "anio": 2025},
+                              datetime.now().isoformat(timespec="seconds"))
+    TrabajoReporteCRUD().crear_trabajo(huerfano)
+    TrabajoReporteCRUD().actualizar_estado("huerfano", "en_proceso")
+    envejecer("huerfano", minutos=5)
+
+    servicio = TrabajoReporteService(procesos=1)  # "servidor nuevo"
+    try:
+        trabajo = esperar(servicio, "huerfano")
+        assert trabajo.estado == "terminado", trabajo.a_dict()
+        print(f"✅ Trabajo reanudado y terminado: {trabajo.url}")
+
+        # Dos procesos que leyeron el mismo trabajo pendiente: lo reclama uno solo
+        otro = TrabajoReporte("pendiente", "alquileres_por_periodo", {"frecuencia": "M", "anio": 2025},
+                              datetime.now().isoformat(timespec="seconds"))
+        TrabajoReporteCRUD().crear_trabajo(otro)
+        leido_a = TrabajoReporteCRUD().buscar_por_id("pendiente")
+        leido_b = TrabajoReporteCRUD().buscar_por_id("pendiente")
+        assert TrabajoReporteCRUD().reclamar(leido_a) and not TrabajoReporteCRUD().reclamar(leido_b)
+        print("✅ Un trabajo pendiente que leyeron dos procesos lo reclama uno solo")
+    except Exception as e:
+        print(f"❌ Error al reanudar trabajos: {e}")
+        traceback.print_exc()
+    finally:
+        servicio.cerrar()
+
+
+def envejecer(id_trabajo, minutos):
+    """ Simula que el trabajo no se actualiza hace 'minutos'. """
+    antes = (datetime.now() - timedelta(minutes=minutos)).isoformat(timespec="seconds")
+    bd = sqlite3.connect(conexion.DB_PATH)
+    with bd:
+        bd.execute("UPDATE TRABAJO_REPORTE SET actualizado_en = ? WHERE id_trabajo = ?", (antes, id_trabajo))
+    bd.close()
+
+
+def test_no_reanudar_trabajos_vivos():
+    print("\n===== 💓 TEST: NO REANUDAR TRABAJOS DE OTRO PROCESO VIVO =====")
+    from clases.trabajo_reporte import TrabajoReporte
+    from Crud.trabajo_reporte_crud import TrabajoReporteCRUD
+    from servicios.trabajo_reporte_service import TrabajoReporteService
+
+    # "Proceso A": tiene el trabajo en curso y late cada 0.2 s
+    proceso_a = TrabajoReporteService(procesos=1, latido=0.2, vencimiento=1)
+    proceso_b = TrabajoReporteService(procesos=1, latido=0.2, vencimiento=1)
+    try:
+        vivo = TrabajoReporte("vivo", "facturacion_mensual", {"anio": 2025},
+                              datetime.now().isoformat(timespec="seconds"))
+        TrabajoReporteCRUD().crear_trabajo(vivo)
+        TrabajoReporteCRUD().actualizar_estado("vivo", "en_proceso")
+        envejecer("vivo", minutos=5)
+        proceso_a._en_curso.add("vivo")
+        proceso_a._obtener_pool()
+        time.sleep(0.6)
+
+        reanudados = proceso_b.reanudar_pendientes()
+        estado = TrabajoReporteCRUD().buscar_por_id("vivo").estado
+        assert reanudados == 0 and estado == "en_proceso", (reanudados, estado)
+        print("✅ Un trabajo que otro proceso tiene en curso (y late) no se reanuda")
+
+        # "Se cae" A: deja de latir y, pasado el vencimiento, B lo reanuda
+        proceso_a.cerrar()
+        proceso_a._en_curso.discard("vivo")
+        time.sleep(2.2)
+        assert proceso_b.reanudar_pendientes() >= 1  # (también el "pendiente" reclamado arriba)
+        trabajo = esperar(proceso_b, "vivo")
+        assert trabajo.estado == "terminado", trabajo.a_dict()
+        print(f"✅ Cuando deja de latir, otro proceso lo reanuda: {trabajo.url}")
+    except Exception as e:
+        print(f"❌ Error con trabajos de otro proceso: {e}")
+        traceback.print_exc()
+    finally:
+        proceso_a.cerrar()
+        proceso_b.cerrar()
+
+
+# (El guard es obligatorio: los procesos del pool vuelven a importar este módulo)
+if __name__ == "__main__":
+    carpeta = tempfile.mkdtemp(prefix="test_trabajos_")
+    copia = os.path.join(carpeta, "bd.db")
+    shutil.copy(conexion.DB_PATH, copia)
+    conexion.DB_PATH = copia
+    aplicar_migraciones(copia)
+    try:
+        test_encolar_y_consultar()
+        test_parametros_invalidos()
+        test_reanudar_pendientes()
+        test_no_reanudar_trabajos_vivos()
+    finally:
+        ConexionDB.cerrar_todas()
+        shutil.rmtree(carpeta, ignore_errors=True)
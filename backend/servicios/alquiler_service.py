@@ -4,6 +4,10 @@ from Crud.alquiler_crud import AlquilerCRUD
 from Crud.cliente_crud import ClienteCRUD
 from Crud.empleado_crud import EmpleadoCRUD
 from Crud.vehiculo_crud import VehiculoCRUD
+from Crud.resumen_diario_crud import ResumenDiarioCRUD
+from cache_reportes import datos_modificados
+import indice_ocupacion
+from servicios.cotizacion_service import costo_alquiler
 # Importamos las excepciones
 from .excepciones import RecursoNoEncontradoError, DatosInvalidosError, ErrorDeLogicaDeNegocio, ErrorDeAplicacion
 
@@ -14,6 +18,7 @@ class AlquilerService:
         self.cliente_dao = ClienteCRUD()
         self.empleado_dao = EmpleadoCRUD()
         self.vehiculo_dao = VehiculoCRUD()
+        self.resumen_dao = ResumenDiarioCRUD()
 
     def crear_alquiler(self, datos):
         """
@@ -32,37 +37,57 @@ class AlquilerService:
             vehiculo = self.vehiculo_dao.buscar_por_id(patente)
             if not vehiculo:
                 raise RecursoNoEncontradoError(f"Vehículo con patente {patente} no encontrado.")
-            
-            # Lógica de negocio: ¿Está disponible el vehículo?
-            if vehiculo.estado.lower() != 'disponible':
-                 raise ErrorDeLogicaDeNegocio(f"El vehículo {patente} no está disponible.")
+            # (Si está libre en esas fechas se decide al insertar, en el paso 3)
 
             id_empleado = datos.get('id_empleado')
             empleado = self.empleado_dao.buscar_por_id(id_empleado)
             if not empleado:
                 raise RecursoNoEncontradoError(f"Empleado con ID {id_empleado} no encontrado.")
 
-            # 2. Crear el objeto Alquiler (esto valida fechas y costo)
+            # 2. Crear el objeto Alquiler (esto valida las fechas). El costo
+            # lo calcula el servidor con el precio diario del vehículo: el
+            # 'costo_total' que mande el cliente no se usa.
+            fecha_inicio = date.fromisoformat(datos.get('fecha_inicio'))
+            fecha_fin = date.fromisoformat(datos.get('fecha_fin'))
             alquiler = Alquiler(
                 id_alquiler=None,
-                fecha_inicio=date.fromisoformat(datos.get('fecha_inicio')),
-                fecha_fin=date.fromisoformat(datos.get('fecha_fin')),
-                costo_total=float(datos.get('costo_total', 0.0)),
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                costo_total=costo_alquiler(vehiculo.precio_diario, fecha_inicio, fecha_fin),
                 fecha_registro=date.today(),
                 cliente=cliente,
                 empleado=empleado,
                 vehiculo=vehiculo
             )
             
-            # 3. Guardar el alquiler
-            nuevo_id = self.alquiler_dao.crear_alquiler(alquiler)
-            
-            # 4. Lógica de negocio: Actualizar el estado del vehículo
-            vehiculo.marcar_no_disponible() # (Asumo que tienes un método así)
-            self.vehiculo_dao.actualizar_vehiculo(vehiculo)
-            
-            # 5. Retornar el objeto completo recién creado
-            return self.alquiler_dao.buscar_por_id(nuevo_id)
+            # Descarte rápido, con una lectura (sin tomar el lock de escritura).
+            # El chequeo que vale es el del paso 3.
+            if self.alquiler_dao.vehiculo_ocupado(alquiler):
+                raise ErrorDeLogicaDeNegocio(
+                    f"El vehículo {patente} no está disponible entre "
+                    f"{alquiler.fecha_inicio} y {alquiler.fecha_fin}.")
+
+            # 3. Guardar el alquiler, su parte del resumen diario y el nuevo
+            # estado del vehículo en UNA transacción BEGIN IMMEDIATE: toma el
+            # lock de escritura al empezar, así dos pedidos simultáneos por el
+            # mismo vehículo no pueden pasar los dos el chequeo de fechas.
+            with self.alquiler_dao.conexion.transaccion(inmediata=True):
+                # Chequeo de solapamiento + INSERT ... RETURNING en una sentencia
+                if self.alquiler_dao.crear_si_libre(alquiler) is None:
+                    raise ErrorDeLogicaDeNegocio(
+                        f"El vehículo {patente} no está disponible entre "
+                        f"{alquiler.fecha_inicio} y {alquiler.fecha_fin}.")
+                self.resumen_dao.sumar(self.resumen_dao.valores_de(alquiler))
+
+                # 4. Lógica de negocio: Actualizar el estado del vehículo
+                vehiculo.marcar_no_disponible()
+                self.vehiculo_dao.actualizar_estado(vehiculo.patente, vehiculo.estado)
+            datos_modificados("ALQUILER", "VEHICULO")
+            indice_ocupacion.ocupacion_modificada(vehiculo.patente)
+
+            # 5. Retornar el objeto recién creado (ya tiene su id y sus partes:
+            # no hace falta volver a leerlo)
+            return alquiler
         
         except (ValueError, TypeError, KeyError) as e:
             # Atrapa errores de formato de fecha, float, o datos faltantes
@@ -95,6 +120,26 @@ class AlquilerService:
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al listar alquileres: {e}")
 
+    def listar_pagina(self, opciones):
+        """
+        Lista una página de alquileres (paginación por cursor, filtros y orden).
+        Retorna: (lista de objetos Alquiler, cursor siguiente o None).
+        Levanta: DatosInvalidosError si el filtro, el orden o el cursor no son válidos.
+        """
+        try:
+            return self.alquiler_dao.listar_pagina(**opciones)
+        except ValueError as e:
+            raise DatosInvalidosError(str(e))
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar alquileres: {e}")
+
+    def iterar(self, id_cliente=None):
+        """ Retorna: Un generador de alquileres, leídos de a lotes (para streaming). """
+        try:
+            return self.alquiler_dao.iterar(id_cliente)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar alquileres: {e}")
+
     def buscar_por_cliente(self, id_cliente):
         """ Retorna: Una lista de alquileres para un cliente. """
         try:
@@ -103,29 +148,74 @@ class AlquilerService:
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al buscar alquileres por cliente: {e}")
 
+    def resumen_por_periodo(self, anio, trimestral=False):
+        """
+        Retorna: {periodo: (cantidad, total)} del año, por mes o por trimestre.
+        (Se lee del resumen diario; ver ResumenDiarioCRUD.resumen_por_periodo)
+        """
+        try:
+            return self.resumen_dao.resumen_por_periodo(anio, trimestral)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al resumir alquileres de {anio}: {e}")
+
+    def ranking_vehiculos(self, limite=None, desde=None, hasta=None):
+        """
+        Retorna: [(patente, marca, modelo, cantidad, otros), ...] de más a menos alquilado,
+        con los que pasan de 'limite' sumados en una fila "Otros".
+        (Se lee del resumen diario; ver ResumenDiarioCRUD.ranking_vehiculos)
+        """
+        try:
+            return self.resumen_dao.ranking_vehiculos(limite, desde, hasta)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al calcular el ranking de vehículos: {e}")
+
     def actualizar_alquiler(self, id_alquiler, datos):
         """
         Actualiza un alquiler.
         Retorna: El objeto Alquiler actualizado.
-        Levanta: RecursoNoEncontradoError, DatosInvalidosError.
+        Levanta: RecursoNoEncontradoError, DatosInvalidosError,
+                 ErrorDeLogicaDeNegocio (el vehículo ya está ocupado en las fechas nuevas).
         """
         try:
-            # 1. Usamos nuestro propio método para asegurar que existe
-            alquiler = self.buscar_alquiler(id_alquiler) 
-
-            # 2. Actualizamos los campos permitidos
-            # Esto respeta el Encapsulamiento[cite: 212, 215], no dejamos que se cambie el cliente o el vehículo.
-            if 'fecha_inicio' in datos:
-                alquiler.fecha_inicio = date.fromisoformat(datos['fecha_inicio'])
-            if 'fecha_fin' in datos:
-                alquiler.fecha_fin = date.fromisoformat(datos['fecha_fin'])
-            if 'costo_total' in datos:
-                alquiler.costo_total = float(datos['costo_total'])
-            
-            # (Aquí podríamos re-validar la lógica de fechas si fuera necesario)
+            # 1. Se lee y se guarda en UNA transacción BEGIN IMMEDIATE: el
+            # resumen diario resta lo que había en la base en ese momento (si
+            # se leyera antes, dos PUT simultáneos restarían dos veces lo mismo).
+            with self.alquiler_dao.conexion.transaccion(inmediata=True):
+                alquiler = self.alquiler_dao.buscar_guardado(id_alquiler)
+                if not alquiler:
+                    raise RecursoNoEncontradoError(f"Alquiler con ID {id_alquiler} no encontrado.")
+                antes = self.resumen_dao.valores_de(alquiler)
+                fechas_antes = (alquiler.fecha_inicio, alquiler.fecha_fin)
+
+                # 2. Actualizamos los campos permitidos
+                # Esto respeta el Encapsulamiento[cite: 212, 215], no dejamos que se cambie el cliente o el vehículo.
+                if 'fecha_inicio' in datos:
+                    alquiler.fecha_inicio = date.fromisoformat(datos['fecha_inicio'])
+                if 'fecha_fin' in datos:
+                    alquiler.fecha_fin = date.fromisoformat(datos['fecha_fin'])
+                # La misma regla que el constructor de Alquiler al crear: un rango
+                # invertido no solapa con nada y se cotizaría como un día.
+                if alquiler.fecha_fin < alquiler.fecha_inicio:
+                    raise DatosInvalidosError("La fecha de fin no puede ser anterior a la fecha de inicio.")
+                # El costo no se toma del cliente (igual que al crear): si
+                # cambian las fechas, se vuelve a cotizar con el precio diario.
+                if (alquiler.fecha_inicio, alquiler.fecha_fin) != fechas_antes:
+                    alquiler.costo_total = costo_alquiler(
+                        alquiler.vehiculo.precio_diario, alquiler.fecha_inicio, alquiler.fecha_fin)
 
-            # 3. Guardamos
-            self.alquiler_dao.actualizar_alquiler(alquiler)
+                # 3. Guardamos (el alquiler y el resumen diario, juntos). Si
+                # cambian las fechas rige la misma regla que al crear: el chequeo
+                # de solapamiento y el UPDATE son una sola sentencia.
+                if (alquiler.fecha_inicio, alquiler.fecha_fin) == fechas_antes:
+                    self.alquiler_dao.actualizar_alquiler(alquiler)
+                elif not self.alquiler_dao.actualizar_si_libre(alquiler):
+                    raise ErrorDeLogicaDeNegocio(
+                        f"El vehículo {alquiler.vehiculo.patente} no está disponible entre "
+                        f"{alquiler.fecha_inicio} y {alquiler.fecha_fin}.")
+                self.resumen_dao.restar(antes)
+                self.resumen_dao.sumar(self.resumen_dao.valores_de(alquiler))
+            datos_modificados("ALQUILER")
+            indice_ocupacion.ocupacion_modificada(alquiler.vehiculo.patente)
             return alquiler
         
         except (ValueError, TypeError) as e:
@@ -141,17 +231,26 @@ class AlquilerService:
         Levanta: RecursoNoEncontradoError.
         """
         try:
-            # 1. Aseguramos que existe
-            alquiler = self.buscar_alquiler(id_alquiler) 
+            # 1. Aseguramos que existe, leyéndolo DENTRO de la transacción
+            # (BEGIN IMMEDIATE): se resta del resumen lo que estaba guardado,
+            # y si dos pedidos lo borran a la vez, el segundo ya no lo encuentra.
+            with self.alquiler_dao.conexion.transaccion(inmediata=True):
+                alquiler = self.alquiler_dao.buscar_guardado(id_alquiler)
+                if not alquiler:
+                    raise RecursoNoEncontradoError(f"Alquiler con ID {id_alquiler} no encontrado.")
 
-            # 2. Lógica de negocio: ¿Deberíamos volver a poner el auto "disponible"?
-            # ¡SÍ! Si borramos el alquiler, el auto debe volver a estar disponible.
-            vehiculo = alquiler.vehiculo
-            vehiculo.marcar_disponible() # (Asumo que tienes este método)
-            self.vehiculo_dao.actualizar_vehiculo(vehiculo)
+                # 2. Lógica de negocio: ¿Deberíamos volver a poner el auto "disponible"?
+                # ¡SÍ! Si borramos el alquiler, el auto debe volver a estar disponible.
+                # (Todo en UNA transacción, junto con el resumen diario)
+                vehiculo = alquiler.vehiculo
+                vehiculo.marcar_disponible() # (Asumo que tienes este método)
+                self.vehiculo_dao.actualizar_estado(vehiculo.patente, vehiculo.estado)
 
-            # 3. Ahora sí, eliminamos el alquiler
-            self.alquiler_dao.eliminar_alquiler(id_alquiler)
+                # 3. Ahora sí, eliminamos el alquiler
+                self.alquiler_dao.eliminar_alquiler(id_alquiler)
+                self.resumen_dao.restar(self.resumen_dao.valores_de(alquiler))
+            datos_modificados("VEHICULO", "ALQUILER")
+            indice_ocupacion.ocupacion_modificada(vehiculo.patente)
             return True
 
         except Exception as e:
@@ -0,0 +1,114 @@
+# --- Archivo: servicios/calendario_service.py ---
+#
+# Calendario de ocupación de la flota para un mes:
+#   GET /flota/calendario?mes=2025-11
+# Una matriz vehículos x días (NumPy, uint8) con el estado de cada día:
+# 0 libre, 1 reservado, 2 alquilado, 3 mantenimiento (si se pisan, gana el
+# mayor). Se llena con los períodos del mes de las tres tablas (tres
+# consultas de columnas sueltas, ver ORMBase.intervalos_ocupacion), sin
+# armar objetos Alquiler/Reserva/Mantenimiento ni recorrer día por día:
+# cada tabla marca sus períodos en un arreglo de diferencias (+1 el día que
+# empieza, -1 el siguiente al que termina) y una suma acumulada por fila
+# da los días cubiertos.
+#
+# La respuesta va comprimida por tramos (run-length): por vehículo, una lista
+# plana [estado, días, estado, días, ...] que suma los días del mes.
+
+import calendar
+from datetime import date
+import numpy as np
+from Crud.vehiculo_crud import VehiculoCRUD
+from Crud.alquiler_crud import AlquilerCRUD
+from Crud.reserva_crud import ReservaCRUD
+from Crud.mantenimiento_crud import MantenimientoCRUD
+from servicios.excepciones import ErrorDeAplicacion, DatosInvalidosError
+
+ESTADOS = ["libre", "reservado", "alquilado", "mantenimiento"]
+
+
+class CalendarioService:
+    def __init__(self):
+        self.vehiculo_dao = VehiculoCRUD()
+        # (código de estado, DAO), de menor a mayor prioridad
+        self.fuentes = [(1, ReservaCRUD()), (2, AlquilerCRUD()), (3, MantenimientoCRUD())]
+
+    @staticmethod
+    def _rango_del_mes(mes):
+        """ 'AAAA-MM' -> (primer día, último día). """
+        try:
+            anio, numero = (int(parte) for parte in mes.split("-"))
+            return date(anio, numero, 1), date(anio, numero, calendar.monthrange(anio, numero)[1])
+        except (AttributeError, TypeError, ValueError):
+            raise DatosInvalidosError("El parámetro 'mes' debe tener el formato AAAA-MM.")
+
+    def _cubiertos(self, dao, patentes, primero, ultimo):
+        """ Matriz bool vehículos x días: True donde algún período de 'dao' ocupa el vehículo. """
+        dias = ultimo.day
+        filas = dao.intervalos_ocupacion(desde=primero.isoformat(), hasta=ultimo.isoformat())
+        cubiertos = np.zeros((len(patentes), dias + 1), dtype=np.int32)
+        if not filas:
+            return cubiertos[:, :dias] > 0
+        periodo_patentes, inicios, fines = zip(*filas)
+        # Fila de cada período (las patentes vienen ordenadas, como 'patentes')
+        periodo_patentes = np.array(periodo_patentes)
+        fila = np.searchsorted(patentes, periodo_patentes)
+        fila = np.minimum(fila, len(patentes) - 1)
+        existe = patentes[fila] == periodo_patentes
+        # Días desde el primero del mes, recortados al mes
+        base = np.datetime64(primero, "D")
+        inicio = (np.array(inicios, dtype="datetime64[D]") - base).astype(np.int64).clip(0, dias - 1)
+        fin = (np.array(fines, dtype="datetime64[D]") - base).astype(np.int64).clip(0, dias - 1)
+        fila, inicio, fin = fila[existe], inicio[existe], fin[existe]
+        np.add.at(cubiertos, (fila, inicio), 1)
+        np.add.at(cubiertos, (fila, fin + 1), -1)
+        return np.cumsum(cubiertos, axis=1)[:, :dias] > 0
+
+    @staticmethod
+    def _tramos(matriz):
+        """ Por fila, la lista plana [estado, largo, estado, largo, ...] de sus tramos. """
+        vehiculos, dias = matriz.shape
+        plana = matriz.ravel()
+        # Empieza un tramo donde cambia el estado o donde empieza una fila
+        comienzos = np.ones(plana.size, dtype=bool)
+        comienzos[1:] = plana[1:] != plana[:-1]
+        comienzos[::dias] = True
+        posiciones = np.flatnonzero(comienzos)
+        largos = np.diff(np.append(posiciones, plana.size))
+        pares = np.column_stack((plana[posiciones], largos)).ravel().tolist()
+        # Dónde empiezan los tramos de cada fila (en 'pares', de a dos)
+        cortes = (np.searchsorted(posiciones, np.arange(vehiculos + 1) * dias) * 2).tolist()
+        return [pares[cortes[v]:cortes[v + 1]] for v in range(vehiculos)]
+
+    def calendario_mes(self, mes):
+        """
+        Ocupación de toda la flota en el mes 'mes' (AAAA-MM).
+        Retorna: {"mes", "desde", "hasta", "dias", "estados",
+                  "vehiculos": [{"patente", "tramos": [estado, días, ...]}, ...],
+                  "por_dia": {"reservado": [...], "alquilado": [...], "mantenimiento": [...]}}
+        Levanta: DatosInvalidosError si 'mes' no es AAAA-MM.
+        """
+        primero, ultimo = self._rango_del_mes(mes)
+        dias = ultimo.day
+        try:
+            patentes = np.array([p for (p,) in self.vehiculo_dao.consulta()
+                                 .columnas(self.vehiculo_dao.clave_primaria)
+                                 .ordenar(self.vehiculo_dao.clave_primaria).todas()])
+            matriz = np.zeros((len(patentes), dias), dtype=np.uint8)
+            if len(patentes):
+                for codigo, dao in self.fuentes:
+                    matriz[self._cubiertos(dao, patentes, primero, ultimo)] = codigo
+            tramos = self._tramos(matriz) if len(patentes) else []
+            por_dia = {estado: (matriz == codigo).sum(axis=0).tolist()
+                       for codigo, estado in enumerate(ESTADOS) if codigo}
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al armar el calendario: {e}")
+
+        return {
+            "mes": f"{primero.year:04d}-{primero.month:02d}",
+            "desde": primero.isoformat(),
+            "hasta": ultimo.isoformat(),
+            "dias": dias,
+            "estados": ESTADOS,
+            "vehiculos": [{"patente": p, "tramos": t} for p, t in zip(patentes.tolist(), tramos)],
+            "por_dia": por_dia,
+        }
@@ -9,6 +9,22 @@ class ClienteService:
         # Correcto: El servicio "tiene un" DAO. Esto es Composición (Capítulo 9).
         self.dao = ClienteCRUD()
 
+    def _cliente_desde_datos(self, datos):
+        """ Arma un objeto Cliente (sin ID) a partir de un dict del request. """
+        # Validar que los datos mínimos estén presentes
+        if not datos.get('nombre') or not datos.get('dni'):
+            raise DatosInvalidosError("El nombre y el DNI son obligatorios.")
+
+        return Cliente(
+            id_cliente=None,
+            nombre=datos.get('nombre', '').strip(),
+            apellido=datos.get('apellido', '').strip(),
+            dni=datos.get('dni', '').strip(),
+            direccion=datos.get('direccion', '').strip(),
+            telefono=datos.get('telefono', '').strip(),
+            email=datos.get('email', '').strip()
+        )
+
     def crear_cliente(self, datos):
         """
         Crea un nuevo cliente.
@@ -17,19 +33,7 @@ class ClienteService:
                  ErrorDeCliente si ocurre un error en la BDD.
         """
         try:
-            # Validar que los datos mínimos estén presentes
-            if not datos.get('nombre') or not datos.get('dni'):
-                raise DatosInvalidosError("El nombre y el DNI son obligatorios.")
-
-            cliente = Cliente(
-                id_cliente=None,
-                nombre=datos.get('nombre', '').strip(),
-                apellido=datos.get('apellido', '').strip(),
-                dni=datos.get('dni', '').strip(),
-                direccion=datos.get('direccion', '').strip(),
-                telefono=datos.get('telefono', '').strip(),
-                email=datos.get('email', '').strip()
-            )
+            cliente = self._cliente_desde_datos(datos)
             
             # Asumimos que el DAO levanta un ValueError o similar si hay un
             # problema de validación (como un DNI duplicado).
@@ -45,6 +49,38 @@ class ClienteService:
             # Capturamos un error genérico del DAO
             raise ErrorDeCliente(f"Error al crear cliente: {e}")
 
+    def crear_clientes_lote(self, lista_datos):
+        """
+        Crea muchos clientes en UNA transacción.
+        Las filas inválidas o duplicadas no cortan el lote: se reportan por índice.
+        Retorna: {"creados": n, "errores": [{"indice": i, "error": "..."}, ...]}
+        Levanta: DatosInvalidosError si no se recibe una lista con datos.
+                 ErrorDeCliente si ocurre un error en la BDD.
+        """
+        if not isinstance(lista_datos, list) or not lista_datos:
+            raise DatosInvalidosError("Se esperaba una lista de clientes no vacía.")
+
+        clientes, indices, errores = [], [], []
+        for indice, datos in enumerate(lista_datos):
+            try:
+                clientes.append(self._cliente_desde_datos(datos))
+                indices.append(indice)
+            except DatosInvalidosError as e:
+                errores.append((indice, str(e)))
+            except (ValueError, TypeError, AttributeError) as e:
+                errores.append((indice, f"Datos inválidos: {e}"))
+
+        try:
+            creados, errores_bd = self.dao.crear_clientes_lote(clientes)
+        except Exception as e:
+            raise ErrorDeCliente(f"Error al crear clientes: {e}")
+
+        errores += [(indices[i], mensaje) for i, mensaje in errores_bd]
+        return {
+            "creados": creados,
+            "errores": [{"indice": i, "error": m} for i, m in sorted(errores)],
+        }
+
     def listar_clientes(self):
         """
         Retorna: Una lista de objetos Cliente.
@@ -55,6 +91,26 @@ class ClienteService:
         except Exception as e:
             raise ErrorDeCliente(f"Error al listar clientes: {e}")
 
+    def listar_pagina(self, opciones):
+        """
+        Lista una página de clientes (paginación por cursor, filtros y orden).
+        Retorna: (lista de objetos Cliente, cursor siguiente o None).
+        Levanta: DatosInvalidosError si el filtro, el orden o el cursor no son válidos.
+        """
+        try:
+            return self.dao.listar_pagina(**opciones)
+        except ValueError as e:
+            raise DatosInvalidosError(str(e))
+        except Exception as e:
+            raise ErrorDeCliente(f"Error al listar clientes: {e}")
+
+    def iterar(self):
+        """ Retorna: Un generador de clientes, leídos de a lotes (para streaming). """
+        try:
+            return self.dao.iterar()
+        except Exception as e:
+            raise ErrorDeCliente(f"Error al listar clientes: {e}")
+
     def buscar_cliente(self, id_cliente):
         """
         Retorna: El objeto Cliente encontrado.
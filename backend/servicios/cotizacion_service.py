@@ -0,0 +1,153 @@
+# --- Archivo: servicios/cotizacion_service.py ---
+#
+# Cotizaciones de alquiler: días cobrados x precio_diario del vehículo.
+#   POST /cotizaciones
+#   [{"patente": "AB123CD", "fecha_inicio": "2025-11-01", "fecha_fin": "2025-11-05"},
+#    {"marca": "Ford", "precio_max": 60, "fecha_inicio": "2025-11-01", "fecha_fin": "2025-11-05"}]
+# Un pedido con 'patente' cotiza ese vehículo; uno sin 'patente' cotiza todos
+# los que cumplen sus filtros (marca, precio_min, precio_max).
+#
+# Los pedidos se pasan a arreglos de NumPy (fechas y fila del vehículo) y
+# todos los importes salen de unas pocas operaciones sobre esos arreglos.
+# Se cuenta en CENTAVOS enteros: costo_alquiler() (una sola cotización, sin
+# NumPy, la usa AlquilerService al crear) da exactamente el mismo importe.
+# NumPy se importa recién con la primera cotización en lote, no al arrancar.
+
+from datetime import date
+from Crud.vehiculo_crud import VehiculoCRUD
+from servicios.excepciones import ErrorDeAplicacion, DatosInvalidosError
+
+# Tope de filas de respuesta (los filtros pueden multiplicar los pedidos)
+MAX_COTIZACIONES = 100_000
+
+
+def dias_cobrados(fecha_inicio: date, fecha_fin: date) -> int:
+    """ Días entre las dos fechas; un alquiler de un solo día se cobra como uno. """
+    return max((fecha_fin - fecha_inicio).days, 1)
+
+
+def costo_alquiler(precio_diario: float, fecha_inicio: date, fecha_fin: date) -> float:
+    """ Importe de UN alquiler (el mismo cálculo que CotizacionService.cotizar). """
+    return round(precio_diario * 100) * dias_cobrados(fecha_inicio, fecha_fin) / 100
+
+
+class CotizacionService:
+    def __init__(self):
+        self.vehiculo_dao = VehiculoCRUD()
+
+    @staticmethod
+    def _pedido(datos):
+        """ La patente (str) o el filtro (marca en minúsculas, precio_min, precio_max). """
+        patente = datos.get('patente')
+        if patente is not None:
+            if not isinstance(patente, str) or not patente.strip():
+                raise ValueError("La patente no puede estar vacía.")
+            return patente.strip().upper()
+        marca = datos.get('marca')
+        precio_min, precio_max = datos.get('precio_min'), datos.get('precio_max')
+        return (marca.strip().lower() if marca else None,
+                None if precio_min is None else float(precio_min),
+                None if precio_max is None else float(precio_max))
+
+    def cotizar(self, lista_datos):
+        """
+        Cotiza muchos alquileres de una vez.
+        Retorna: {"cotizaciones": [{"indice", "patente", "dias", "precio_diario",
+                                    "costo_total"}, ...] (ordenadas por índice),
+                  "errores": [{"indice": i, "error": "..."}, ...]}
+        Levanta: DatosInvalidosError si no se recibe una lista con datos o si
+                 los filtros piden más de MAX_COTIZACIONES cotizaciones.
+        """
+        if not isinstance(lista_datos, list) or not lista_datos:
+            raise DatosInvalidosError("Se esperaba una lista de cotizaciones no vacía.")
+
+        # 1. Validar cada pedido (fechas y patente o filtro)
+        indices, inicios, fines, pedidos, errores = [], [], [], [], []
+        for indice, datos in enumerate(lista_datos):
+            try:
+                inicio = date.fromisoformat(datos['fecha_inicio'])
+                fin = date.fromisoformat(datos['fecha_fin'])
+                if fin < inicio:
+                    raise ValueError("La fecha de fin no puede ser anterior a la de inicio.")
+                pedidos.append(self._pedido(datos))
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                errores.append((indice, f"Datos inválidos: {e}"))
+                continue
+            indices.append(indice)
+            # Ordinales (días desde el año 1): enteros que NumPy convierte rápido
+            inicios.append(inicio.toordinal())
+            fines.append(fin.toordinal())
+
+        try:
+            import numpy as np
+
+            # 2. Tarifas: toda la flota si hay filtros, si no solo las patentes pedidas
+            hay_filtros = any(not isinstance(p, str) for p in pedidos)
+            tarifas = self.vehiculo_dao.tarifas(None if hay_filtros else {p for p in pedidos})
+            flota, marcas, precios = (list(columna) for columna in zip(*tarifas)) if tarifas else ([], [], [])
+            fila_de = {patente: fila for fila, patente in enumerate(flota)}
+            precios = np.array(precios, dtype=np.float64)
+            centavos = np.rint(precios * 100).astype(np.int64)
+            marcas = np.array([m.lower() for m in marcas], dtype=object)
+
+            # 3. Una fila por (pedido, vehículo): los pedidos con patente van
+            # juntos; los filtros se evalúan una vez por filtro distinto.
+            pedido_patente, vehiculo_patente = [], []
+            pedido_filtro, vehiculo_filtro = [], []
+            por_filtro = {}
+            for k, pedido in enumerate(pedidos):
+                if isinstance(pedido, str):
+                    fila = fila_de.get(pedido)
+                    if fila is None:
+                        errores.append((indices[k], f"Vehículo con patente {pedido} no encontrado."))
+                    else:
+                        pedido_patente.append(k)
+                        vehiculo_patente.append(fila)
+                    continue
+                filas = por_filtro.get(pedido)
+                if filas is None:
+                    marca, precio_min, precio_max = pedido
+                    cumple = np.ones(len(flota), dtype=bool)
+                    if marca:
+                        cumple &= marcas == marca
+                    if precio_min is not None:
+                        cumple &= precios >= precio_min
+                    if precio_max is not None:
+                        cumple &= precios <= precio_max
+                    filas = por_filtro[pedido] = np.flatnonzero(cumple)
+                pedido_filtro.append(np.full(len(filas), k, dtype=np.intp))
+                vehiculo_filtro.append(filas)
+
+            total = len(pedido_patente) + sum(len(filas) for filas in vehiculo_filtro)
+            if total > MAX_COTIZACIONES:
+                raise DatosInvalidosError(
+                    f"Se pidieron {total} cotizaciones; el máximo es {MAX_COTIZACIONES}.")
+            pedido = np.concatenate([np.array(pedido_patente, dtype=np.intp), *pedido_filtro])
+            vehiculo = np.concatenate([np.array(vehiculo_patente, dtype=np.intp), *vehiculo_filtro])
+            orden = np.argsort(pedido, kind="stable")
+            pedido, vehiculo = pedido[orden], vehiculo[orden]
+
+            # 4. Importes: días (por pedido) x centavos (por vehículo), todo junto
+            dias = np.maximum(np.array(fines, dtype=np.int64) - np.array(inicios, dtype=np.int64), 1)
+            dias_fila = dias[pedido]
+            costos = centavos[vehiculo] * dias_fila / 100
+
+            columnas = zip(
+                np.array(indices, dtype=np.intp)[pedido].tolist(),
+                np.array(flota, dtype=object)[vehiculo].tolist(),
+                dias_fila.tolist(),
+                precios[vehiculo].tolist(),
+                costos.tolist(),
+            )
+        except ErrorDeAplicacion:
+            raise
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al cotizar: {e}")
+
+        return {
+            "cotizaciones": [
+                {"indice": i, "patente": p, "dias": d, "precio_diario": precio, "costo_total": costo}
+                for i, p, d, precio, costo in columnas
+            ],
+            "errores": [{"indice": i, "error": m} for i, m in sorted(errores)],
+        }
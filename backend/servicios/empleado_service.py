@@ -50,6 +50,19 @@ class EmpleadoService:
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al listar empleados: {e}")
 
+    def listar_pagina(self, opciones):
+        """
+        Lista una página de empleados (paginación por cursor, filtros y orden).
+        Retorna: (lista de objetos Empleado, cursor siguiente o None).
+        Levanta: DatosInvalidosError si el filtro, el orden o el cursor no son válidos.
+        """
+        try:
+            return self.dao.listar_pagina(**opciones)
+        except ValueError as e:
+            raise DatosInvalidosError(str(e))
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar empleados: {e}")
+
     def buscar_empleado(self, id_empleado):
         """
         Busca un empleado por ID.
@@ -0,0 +1,170 @@
+# --- Archivo: servicios/escritores_tabla.py ---
+#
+# Tablas en CSV y XLSX, escritas de a partes.
+# Reciben los encabezados y un iterable de LOTES de filas (tuplas, como los
+# que da ORMBase.iterar_filas) y retornan un generador de bytes: cada lote
+# se convierte y se entrega enseguida, así se puede mandar directo en la
+# respuesta HTTP (o a un archivo) sin tener el resultado entero en memoria.
+#
+#   for parte in generar_xlsx(["id", "monto"], dao.iterar_exportacion()):
+#       archivo.write(parte)
+#
+# El XLSX se arma "a mano" (un ZIP con unos pocos XML): openpyxl, aun en modo
+# write_only, necesita el archivo terminado antes de poder enviarlo.
+
+import csv
+import io
+import math
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+MIME_CSV = "text/csv; charset=utf-8"
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Máximo de filas de una hoja de Excel (1.048.576) menos el encabezado.
+# Si hay más filas, siguen en otra hoja con el mismo encabezado.
+FILAS_POR_HOJA = 1048575
+
+
+# --- CSV ---
+def generar_csv(columnas, lotes):
+    """ Generador de bytes UTF-8 de un CSV (con BOM, así Excel respeta los acentos). """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write("\ufeff")
+    escritor.writerow(columnas)
+    for lote in lotes:
+        escritor.writerows(lote)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+# --- XLSX ---
+_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_NS_HOJA = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_NS_DOC = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# Caracteres de control que XML no admite (romperían el archivo)
+_INVALIDOS_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _Salida:
+    """
+    Destino del ZipFile que solo acumula lo escrito hasta que lo retiramos.
+    No tiene seek() ni tell(): zipfile lo detecta y escribe en modo "stream"
+    (tamaños y CRC después de cada archivo, en un data descriptor).
+    """
+
+    def __init__(self):
+        self.partes = []
+
+    def write(self, datos):
+        self.partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        datos = b"".join(self.partes)
+        self.partes = []
+        return datos
+
+
+def _celda(valor):
+    if valor is None:
+        return "<c/>"
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor):
+        return f"<c><v>{valor!r}</v></c>"
+    texto = escape(_INVALIDOS_XML.sub("", str(valor)))
+    espacio = ' xml:space="preserve"' if texto != texto.strip() else ""
+    return f'<c t="inlineStr"><is><t{espacio}>{texto}</t></is></c>'
+
+
+def _fila(numero, valores):
+    return f'<row r="{numero}">{"".join(map(_celda, valores))}</row>'
+
+
+def generar_xlsx(columnas, lotes, nombre_hoja="Datos"):
+    """ Generador de bytes de un libro XLSX con una hoja (o más, si no entra en una). """
+    salida = _Salida()
+    libro = zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED)
+    encabezado = _fila(1, columnas)
+    hojas = 0
+    hoja = None
+    numero = 0
+
+    def abrir_hoja():
+        nonlocal hojas, numero
+        hojas += 1
+        numero = 1
+        # Una hoja tiene a lo sumo FILAS_POR_HOJA filas, así que su XML queda
+        # lejos del límite de 2 GiB de un archivo del ZIP sin zip64.
+        archivo = libro.open(f"xl/worksheets/sheet{hojas}.xml", "w")
+        archivo.write(f'{_XML}<worksheet xmlns="{_NS_HOJA}"><sheetData>{encabezado}'.encode("utf-8"))
+        return archivo
+
+    def cerrar_hoja(archivo):
+        archivo.write(b"</sheetData></worksheet>")
+        archivo.close()
+
+    try:
+        hoja = abrir_hoja()
+        for lote in lotes:
+            partes = []
+            for valores in lote:
+                if numero > FILAS_POR_HOJA:
+                    hoja.write("".join(partes).encode("utf-8"))
+                    partes = []
+                    cerrar_hoja(hoja)
+                    hoja = abrir_hoja()
+                numero += 1
+                partes.append(_fila(numero, valores))
+            hoja.write("".join(partes).encode("utf-8"))
+            datos = salida.retirar()
+            if datos:
+                yield datos
+        cerrar_hoja(hoja)
+        hoja = None
+
+        # El resto del paquete va al final: recién ahora sabemos cuántas hojas hay.
+        nombres = [nombre_hoja if i == 1 else f"{nombre_hoja} ({i})" for i in range(1, hojas + 1)]
+        libro.writestr("xl/workbook.xml", (
+            f'{_XML}<workbook xmlns="{_NS_HOJA}" xmlns:r="{_NS_DOC}"><sheets>'
+            + "".join(f'<sheet name="{escape(n)}" sheetId="{i}" r:id="rId{i}"/>'
+                      for i, n in enumerate(nombres, 1))
+            + "</sheets></workbook>"))
+        libro.writestr("xl/_rels/workbook.xml.rels", (
+            f'{_XML}<Relationships xmlns="{_NS_RELS}">'
+            + "".join(f'<Relationship Id="rId{i}" Type="{_NS_DOC}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                      for i in range(1, hojas + 1))
+            + "</Relationships>"))
+        libro.writestr("_rels/.rels", (
+            f'{_XML}<Relationships xmlns="{_NS_RELS}">'
+            f'<Relationship Id="rId1" Type="{_NS_DOC}/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>"))
+        libro.writestr("[Content_Types].xml", (
+            f'{_XML}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for i in range(1, hojas + 1))
+            + "</Types>"))
+        libro.close()
+        yield salida.retirar()
+    finally:
+        # Si el consumidor abandona a mitad (ej. se cortó la descarga),
+        # cerramos lo abierto sin completar el archivo.
+        if hoja is not None:
+            try:
+                hoja.close()
+            except Exception:
+                pass
@@ -0,0 +1,73 @@
+# --- Archivo: servicios/exportacion_service.py ---
+#
+# Exportación de datos crudos en CSV o XLSX.
+#   GET /exportes/<entidad>?formato=csv|xlsx&desde=AAAA-MM-DD&hasta=AAAA-MM-DD
+# Las filas salen del cursor de sqlite de a lotes (fetchmany) y se escriben
+# directo en la respuesta: sin objetos del dominio ni DataFrames, así la
+# memoria no depende de la cantidad de filas exportadas.
+
+from datetime import date
+from Crud.alquiler_crud import AlquilerCRUD
+from Crud.multa_crud import MultaCRUD
+from Crud.mantenimiento_crud import MantenimientoCRUD
+from servicios.escritores_tabla import generar_csv, generar_xlsx, MIME_CSV, MIME_XLSX
+from servicios.excepciones import (
+    ErrorDeAplicacion,
+    RecursoNoEncontradoError,
+    DatosInvalidosError,
+)
+
+# formato -> (tipo MIME, generador)
+FORMATOS = {
+    "csv": (MIME_CSV, generar_csv),
+    "xlsx": (MIME_XLSX, generar_xlsx),
+}
+
+
+class ExportacionService:
+    def __init__(self):
+        # entidad (como en la URL) -> DAO que la exporta
+        self.daos = {
+            "alquileres": AlquilerCRUD(),
+            "multas": MultaCRUD(),
+            "mantenimientos": MantenimientoCRUD(),
+        }
+
+    @staticmethod
+    def _validar_fecha(valor, nombre):
+        if not valor:
+            return None
+        try:
+            return date.fromisoformat(valor).isoformat()
+        except (TypeError, ValueError):
+            raise DatosInvalidosError(f"'{nombre}' debe ser una fecha AAAA-MM-DD.")
+
+    def exportar(self, entidad, formato="csv", desde=None, hasta=None):
+        """
+        Prepara la exportación de 'entidad' (alquileres, multas, mantenimientos).
+        La consulta se ejecuta acá (los errores salen antes de responder); las
+        filas se leen a medida que se consume el generador.
+        Retorna: (nombre de archivo, tipo MIME, generador de bytes).
+        Levanta: RecursoNoEncontradoError, DatosInvalidosError.
+        """
+        dao = self.daos.get(entidad)
+        if dao is None:
+            raise RecursoNoEncontradoError(
+                f"No se puede exportar '{entidad}'. Opciones: {', '.join(self.daos)}.")
+        formato = (formato or "csv").lower()
+        if formato not in FORMATOS:
+            raise DatosInvalidosError(f"Formato no soportado. Use {' o '.join(FORMATOS)}.")
+        desde = self._validar_fecha(desde, "desde")
+        hasta = self._validar_fecha(hasta, "hasta")
+        if desde and hasta and desde > hasta:
+            raise DatosInvalidosError("'desde' no puede ser posterior a 'hasta'.")
+
+        try:
+            lotes = dao.iterar_exportacion(desde, hasta)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al exportar {entidad}: {e}")
+
+        mimetype, generar = FORMATOS[formato]
+        rango = "_".join(f for f in (desde, hasta) if f)
+        nombre = f"{entidad}{'_' + rango if rango else ''}.{formato}"
+        return nombre, mimetype, generar(dao.columnas_exportacion, lotes)
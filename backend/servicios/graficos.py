@@ -0,0 +1,115 @@
+# --- Archivo: servicios/graficos.py ---
+#
+# Gráficos de los reportes (líneas, barras y torta) sin pyplot.
+# Cada llamada arma su PROPIA Figure con su propio lienzo Agg: no hay figura
+# "actual" ni estado global compartido, así varios hilos pueden dibujar
+# reportes a la vez en el mismo proceso.
+# Los estilos (tamaño, título, ejes, serie) están en las PLANTILLAS de abajo:
+# se arman una vez, son de solo lectura y los comparten todos los reportes.
+#
+#   figura = grafico_barras("TÍTULO", ["Ene", "Feb"], [10, 20], "Facturación ($)")
+#   guardar_pdf(figura, ruta)
+#
+# Importa matplotlib: se usa solo desde ReporteService, después de _cargar_graficos().
+
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from servicios.reporte_service import COLOR_PRINCIPAL, COLOR_SECUNDARIO, COLOR_TERCERARIO, COLOR_BORDES
+
+# Estilo del PROCESO. Se aplica una sola vez, al importar este módulo (el
+# import es atómico) y antes del primer dibujo; ningún reporte lo cambia
+# después. Fuentes estándar del PDF (Helvetica): no se incrustan ni se
+# subsetean (ver pdf_tabla.py). Para medir el texto se usa la primera de
+# la lista que esté instalada.
+ESTILO_PROCESO = {
+    "pdf.use14corefonts": True,
+    "font.family": "sans-serif",
+    "font.sans-serif": ["Helvetica", "Arial", "DejaVu Sans"],
+    "font.weight": "medium",
+    "axes.labelweight": "medium",
+}
+rcParams.update(ESTILO_PROCESO)
+
+ESTILO_TITULO = {"fontsize": 18, "fontweight": "bold", "color": COLOR_PRINCIPAL}
+PALETA = [COLOR_PRINCIPAL, "#377eb8", "#4daf4a", "#984ea3", "#ff7f00",
+          "#a65628", "#f781bf", "#999999", "#66c2a5", "#e6ab02"]
+
+
+class Plantilla:
+    """ Estilo fijo de un tipo de gráfico. Solo lectura: se comparte entre hilos. """
+    __slots__ = ("tamano", "serie", "con_ejes")
+
+    def __init__(self, tamano, serie, con_ejes=True):
+        self.tamano = tamano
+        self.serie = serie          # argumentos de ax.plot / ax.bar / ax.pie
+        self.con_ejes = con_ejes    # grilla, bordes y etiquetas de los ejes
+
+    def nueva_figura(self, titulo):
+        """ Retorna (Figure, Axes) con el título y el estilo de la plantilla. """
+        figura = Figure(figsize=self.tamano, facecolor="white")
+        FigureCanvasAgg(figura)
+        ejes = figura.add_subplot()
+        ejes.set_title(titulo, pad=20, **ESTILO_TITULO)
+        if self.con_ejes:
+            ejes.set_facecolor("white")
+            ejes.grid(axis="y", color=COLOR_BORDES, linestyle="--", linewidth=0.8)
+            ejes.set_axisbelow(True)
+            for lado in ("top", "right"):
+                ejes.spines[lado].set_visible(False)
+            for lado in ("left", "bottom"):
+                ejes.spines[lado].set_color(COLOR_BORDES)
+            ejes.tick_params(colors=COLOR_SECUNDARIO, labelsize=11)
+        return figura, ejes
+
+
+LINEAS = Plantilla((12, 6), {"marker": "o", "markersize": 8, "linewidth": 3, "color": COLOR_PRINCIPAL})
+BARRAS = Plantilla((11, 6), {"color": COLOR_PRINCIPAL, "edgecolor": COLOR_SECUNDARIO, "linewidth": 0.6})
+TORTA = Plantilla((10, 8), {
+    "startangle": 90, "counterclock": False, "autopct": "%1.1f%%", "pctdistance": 0.78,
+    "wedgeprops": {"edgecolor": "white", "linewidth": 1.5},
+    "textprops": {"fontsize": 10, "color": COLOR_SECUNDARIO},
+}, con_ejes=False)
+
+
+def _etiqueta_y(ejes, texto):
+    ejes.set_ylabel(texto, fontsize=12, color=COLOR_SECUNDARIO)
+
+
+def grafico_lineas(titulo, etiquetas, valores, etiqueta_y):
+    """ Una serie de valores enteros (ej. cantidad de alquileres) por período. """
+    figura, ejes = LINEAS.nueva_figura(titulo)
+    ejes.plot(etiquetas, valores, **LINEAS.serie)
+    ejes.fill_between(range(len(valores)), valores, color=COLOR_TERCERARIO)
+    ejes.set_ylim(bottom=0)
+    ejes.yaxis.set_major_locator(MaxNLocator(integer=True))
+    _etiqueta_y(ejes, etiqueta_y)
+    return figura
+
+
+def grafico_barras(titulo, etiquetas, valores, etiqueta_y, formato="{:,.0f}"):
+    """ Una barra por etiqueta, con su valor (según 'formato') arriba. """
+    figura, ejes = BARRAS.nueva_figura(titulo)
+    barras = ejes.bar(etiquetas, valores, **BARRAS.serie)
+    ejes.bar_label(barras, labels=[formato.format(v) if v else "" for v in valores],
+                   padding=3, fontsize=9, color=COLOR_SECUNDARIO)
+    ejes.margins(y=0.1)
+    _etiqueta_y(ejes, etiqueta_y)
+    return figura
+
+
+def grafico_torta(titulo, etiquetas, valores):
+    """ Porciones con su porcentaje; los colores salen de PALETA (en orden). """
+    figura, ejes = TORTA.nueva_figura(titulo)
+    colores = [PALETA[i % len(PALETA)] for i in range(len(valores))]
+    _, _, porcentajes = ejes.pie(valores, labels=etiquetas, colors=colores, **TORTA.serie)
+    for texto in porcentajes:
+        texto.set(color="white", fontweight="bold")
+    ejes.set_aspect("equal")
+    return figura
+
+
+def guardar_pdf(figura, ruta):
+    """ Guarda la figura como PDF de una página (recortado a su contenido). """
+    figura.savefig(ruta, format="pdf", bbox_inches="tight", facecolor="white")
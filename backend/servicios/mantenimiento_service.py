@@ -1,6 +1,7 @@
 # --- Archivo: servicios/mantenimiento_service.py ---
 
 from Crud.mantenimiento_crud import MantenimientoCRUD
+import indice_ocupacion
 from clases.mantenimiento import Mantenimiento
 from servicios.vehiculo_service import VehiculoService # Usamos el servicio de Vehiculo
 from datetime import date
@@ -53,6 +54,7 @@ class MantenimientoService:
 
             # 4. Guardar y retornar el objeto recién creado
             nuevo_id = self.dao.crear_mantenimiento(mantenimiento)
+            indice_ocupacion.ocupacion_modificada(patente)
             return self.dao.buscar_por_id(nuevo_id)
 
         except (ValueError, TypeError) as e: 
@@ -71,6 +73,26 @@ class MantenimientoService:
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al listar mantenimientos: {e}")
 
+    def listar_pagina(self, opciones):
+        """
+        Lista una página de mantenimientos (paginación por cursor, filtros y orden).
+        Retorna: (lista de objetos Mantenimiento, cursor siguiente o None).
+        Levanta: DatosInvalidosError si el filtro, el orden o el cursor no son válidos.
+        """
+        try:
+            return self.dao.listar_pagina(**opciones)
+        except ValueError as e:
+            raise DatosInvalidosError(str(e))
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar mantenimientos: {e}")
+
+    def iterar(self):
+        """ Retorna: Un generador de mantenimientos, leídos de a lotes (para streaming). """
+        try:
+            return self.dao.iterar()
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar mantenimientos: {e}")
+
     def buscar_mantenimiento(self, id_mantenimiento):
         """
         Busca un mantenimiento por ID.
@@ -118,6 +140,7 @@ class MantenimientoService:
 
             # 3. Guardamos
             self.dao.actualizar_mantenimiento(mantenimiento)
+            indice_ocupacion.ocupacion_modificada(mantenimiento.vehiculo.patente)
             return mantenimiento
 
         except (ValueError, TypeError) as e:
@@ -131,9 +154,10 @@ class MantenimientoService:
         Elimina un mantenimiento.
         Retorna: True si fue exitoso.
         """
-        self.buscar_mantenimiento(id_mantenimiento) # Asegura que existe
+        mantenimiento = self.buscar_mantenimiento(id_mantenimiento) # Asegura que existe
         try:
             self.dao.eliminar_mantenimiento(id_mantenimiento)
+            indice_ocupacion.ocupacion_modificada(mantenimiento.vehiculo.patente)
             return True
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al eliminar mantenimiento: {e}")
\ No newline at end of file
@@ -0,0 +1,161 @@
+# --- Archivo: servicios/pdf_tabla.py ---
+#
+# Tablas largas en PDF, de a páginas.
+# La "plantilla" de la página (título, encabezado, anchos de columna, estilos,
+# grilla y un texto por celda) se arma UNA sola vez; para cada página solo se
+# cambia el texto de las celdas y se guarda. No usa ax.table: cada Cell
+# recalcula su posición y su caja en cada dibujo, y eso era lo que más
+# tardaba. Las filas llegan de a una (de un generador, por ejemplo) y en
+# memoria solo está la página actual: el tiempo
+# crece lineal con la cantidad de filas y la memoria no crece.
+#
+#   with EscritorTablaPDF(ruta, "TÍTULO", ["Col 1", "Col 2"]) as tabla:
+#       tabla.agregar_filas(generador_de_filas)
+#
+# Importa matplotlib: se usa solo desde ReporteService, después de _cargar_graficos().
+
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from matplotlib.backends.backend_pdf import PdfPages
+from servicios.reporte_service import COLOR_PRINCIPAL, COLOR_SECUNDARIO, COLOR_TERCERARIO, COLOR_BORDES
+# Fuentes estándar del PDF (Helvetica): no se incrustan ni se subsetean, y
+# escribir cada celda cuesta mucho menos que con una fuente TrueType.
+# Las configura graficos.py una sola vez por proceso (sin rc_context por
+# página, que cambiaba rcParams globales mientras otro hilo dibujaba).
+from servicios.graficos import ESTILO_TITULO
+
+A4_HORIZONTAL = (11.7, 8.3)
+FILAS_POR_PAGINA = 30
+
+
+class EscritorTablaPDF:
+    """ Escribe una tabla en un PDF de varias páginas, con el encabezado repetido en cada una. """
+
+    def __init__(self, ruta, titulo, columnas, anchos=None, filas_por_pagina=FILAS_POR_PAGINA,
+                 tamano=A4_HORIZONTAL):
+        if not columnas:
+            raise ValueError("La tabla necesita al menos una columna.")
+        if filas_por_pagina < 1:
+            raise ValueError("filas_por_pagina debe ser mayor a 0.")
+        self.ruta = ruta
+        self.titulo = titulo
+        self.columnas = list(columnas)
+        self.anchos = anchos
+        self.filas_por_pagina = filas_por_pagina
+        self.tamano = tamano
+        self.paginas = 0
+        self.filas = 0
+        self._pagina = []      # filas de la página en curso (como texto)
+        self._pdf = None
+        self._figura = None
+        self._celdas = None    # textos[fila][columna] de la plantilla
+        self._pie = None
+        self._bordes = None
+        self._sombras = None
+        self._grilla = None
+        self._filas_grilla = None
+
+    # --- Uso como context manager ---
+    def __enter__(self):
+        self._pdf = PdfPages(self.ruta)
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        try:
+            if tipo_exc is None:
+                self.cerrar_pagina()
+                if self.paginas == 0:
+                    self._escribir_pagina()  # tabla vacía: al menos el encabezado
+        finally:
+            self._pdf.close()
+        return False
+
+    # --- Filas ---
+    def agregar(self, fila):
+        if len(fila) != len(self.columnas):
+            raise ValueError(f"Se esperaban {len(self.columnas)} valores por fila, llegaron {len(fila)}.")
+        self._pagina.append(["" if valor is None else str(valor) for valor in fila])
+        self.filas += 1
+        if len(self._pagina) == self.filas_por_pagina:
+            self.cerrar_pagina()
+
+    def agregar_filas(self, filas):
+        for fila in filas:
+            self.agregar(fila)
+
+    def cerrar_pagina(self):
+        """ Escribe la página en curso (si tiene filas). """
+        if self._pagina:
+            self._escribir_pagina()
+            self._pagina = []
+
+    # --- Plantilla y páginas ---
+    def _calcular_anchos(self):
+        # Proporcional al texto más largo de cada columna en la PRIMERA página
+        # (encabezado incluido); después quedan fijos para todo el documento.
+        largos = [len(c) for c in self.columnas]
+        for fila in self._pagina:
+            largos = [max(largo, len(valor)) for largo, valor in zip(largos, fila)]
+        total = sum(largos)
+        return [largo / total for largo in largos]
+
+    def _armar_plantilla(self):
+        # Figure directa (sin pyplot): no pasa por el estado global de matplotlib.
+        # Coordenadas de los ejes: x de 0 a 1 (ancho de la tabla), y = número
+        # de fila (0 = encabezado), creciendo hacia abajo.
+        n = self.filas_por_pagina
+        figura = Figure(figsize=self.tamano, facecolor="white")
+        ejes = figura.add_axes([0.04, 0.08, 0.92, 0.80])
+        ejes.set_xlim(0, 1)
+        ejes.set_ylim(n + 1, 0)
+        ejes.axis("off")
+
+        anchos = self.anchos or self._calcular_anchos()
+        total = sum(anchos)
+        bordes = [0.0]
+        for ancho in anchos:
+            bordes.append(bordes[-1] + ancho / total)
+        centros = [(izq + der) / 2 for izq, der in zip(bordes, bordes[1:])]
+        self._bordes = bordes
+
+        # (Estilos: encabezado y filas pares sombreadas, como la tabla original)
+        ejes.add_patch(Rectangle((0, 0), 1, 1, facecolor=COLOR_PRINCIPAL, linewidth=0))
+        self._sombras = [(fila, ejes.add_patch(Rectangle((0, fila), 1, 1, facecolor=COLOR_TERCERARIO, linewidth=0)))
+                         for fila in range(2, n + 1, 2)]
+        self._grilla = ejes.add_collection(LineCollection([], colors=COLOR_BORDES, linewidths=0.8))
+
+        figura.text(0.5, 0.93, self.titulo, ha="center", **ESTILO_TITULO)
+        self._pie = figura.text(0.5, 0.03, "", ha="center", fontsize=8, color=COLOR_SECUNDARIO)
+        for x, columna in zip(centros, self.columnas):
+            ejes.text(x, 0.5, columna, ha="center", va="center", fontsize=9,
+                      color="white", fontweight="bold")
+        # Un texto por (fila, columna): en cada página solo cambia el contenido
+        self._celdas = [[ejes.text(x, fila + 0.5, "", ha="center", va="center", fontsize=9)
+                         for x in centros]
+                        for fila in range(1, n + 1)]
+        self._filas_grilla = None
+        self._figura = figura
+
+    def _dibujar_grilla(self, filas):
+        """ Líneas de la tabla para 'filas' filas de datos (solo cambia en la última página). """
+        if filas == self._filas_grilla:
+            return
+        horizontales = [[(0, y), (1, y)] for y in range(filas + 2)]
+        verticales = [[(x, 0), (x, filas + 1)] for x in self._bordes]
+        self._grilla.set_segments(horizontales + verticales)
+        for fila, sombra in self._sombras:
+            sombra.set_visible(fila <= filas)
+        self._filas_grilla = filas
+
+    def _escribir_pagina(self):
+        if self._figura is None:
+            self._armar_plantilla()
+        for i, celdas_fila in enumerate(self._celdas):
+            valores = self._pagina[i] if i < len(self._pagina) else None
+            for j, celda in enumerate(celdas_fila):
+                celda.set_text(valores[j] if valores is not None else "")
+        self._dibujar_grilla(len(self._pagina))
+        self.paginas += 1
+        self._pie.set_text(f"Página {self.paginas}")
+        self._pdf.savefig(self._figura, facecolor="white")
@@ -1,12 +1,14 @@
 # --- Archivo: servicios/reporte_service.py ---
 
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-from matplotlib import rcParams
-from datetime import datetime
+from datetime import date, datetime
+import functools
+import inspect
+import itertools
+import threading
+import time
+import uuid
+import almacen_reportes
+import cache_reportes
 from servicios.alquiler_service import AlquilerService
 from servicios.vehiculo_service import VehiculoService
 from servicios.excepciones import RecursoNoEncontradoError, ErrorDeAplicacion, DatosInvalidosError
@@ -14,20 +16,139 @@ from servicios.excepciones import RecursoNoEncontradoError, ErrorDeAplicacion, D
 # --- ¡NUEVO! Importamos 'os' para manejar carpetas ---
 import os
 
-# Configuración de Matplotlib
-rcParams["font.family"] = "sans-serif"
-rcParams["font.sans-serif"] = ["Arial", "Helvetica", "DejaVu Sans"]
+# matplotlib se importa con el PRIMER reporte que se dibuja (ver
+# _cargar_graficos): cuesta casi un segundo y la mayoría de los procesos
+# (o de los pedidos, si el reporte sale del caché) no dibujan nada.
+# Los gráficos se arman sin pyplot (ver servicios/graficos.py): cada reporte
+# usa su propia Figure y varios hilos pueden dibujar a la vez.
+graficos = None
+_graficos_lock = threading.Lock()
+
+
+def _cargar_graficos():
+    global graficos
+    if graficos is not None:
+        return
+    with _graficos_lock:
+        if graficos is None:
+            from servicios import graficos as modulo
+            graficos = modulo
+
+
 COLOR_PRINCIPAL = "#e41a1c"
 COLOR_SECUNDARIO = "#4d4d4d" 
 COLOR_TERCERARIO = "#f2f2f2"
 COLOR_BORDES = "#cccccc"
 
+MESES = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
+
+
+# tipo de reporte -> (método sin caché, tablas que lee, firma).
+# Lo arma el decorador _cacheado; lo usan los trabajos en segundo plano.
+REPORTES = {}
+
+
+# --- Tipos de los parámetros que llegan por JSON (POST /reportes/jobs) ---
+# Cada uno retorna el valor ya convertido o levanta DatosInvalidosError: un
+# parámetro mal tipado es un 400 al encolar, no un 500 dentro del pool.
+def _entero(nombre, valor, minimo=None):
+    if isinstance(valor, bool):
+        valor = None
+    elif isinstance(valor, str) and valor.strip().lstrip("-").isdigit():
+        valor = int(valor)
+    if not isinstance(valor, int):
+        raise DatosInvalidosError(f"'{nombre}' debe ser un número entero.")
+    if minimo is not None and valor < minimo:
+        raise DatosInvalidosError(f"'{nombre}' debe ser mayor o igual a {minimo}.")
+    return valor
+
+
+def _opcion(nombre, valor, opciones):
+    """ Una de 'opciones' (sin distinguir mayúsculas), tal como está escrita ahí. """
+    for opcion in opciones:
+        if isinstance(valor, str) and valor.lower() == opcion.lower():
+            return opcion
+    raise DatosInvalidosError(f"'{nombre}' inválido. Opciones: {', '.join(opciones)}.")
+
+
+def _fecha(nombre, valor):
+    try:
+        return date.fromisoformat(valor).isoformat()
+    except (TypeError, ValueError):
+        raise DatosInvalidosError(f"'{nombre}' debe ser una fecha AAAA-MM-DD.")
+
+
+# nombre del parámetro -> conversión (None se deja pasar: es el valor por defecto)
+_TIPOS_PARAMETROS = {
+    "cliente_id": lambda n, v: _entero(n, v, minimo=1),
+    "anio": _entero,
+    "limite": lambda n, v: _entero(n, v, minimo=1),
+    "formato": lambda n, v: _opcion(n, v, ("pdf", "excel")),
+    "frecuencia": lambda n, v: _opcion(n, v, ("M", "Q")),
+    "desde": _fecha,
+    "hasta": _fecha,
+}
+
+
+def parametros_reporte(tipo, parametros):
+    """
+    Valida 'parametros' (dict) contra la firma del reporte 'tipo' y los
+    retorna completos (con los valores por defecto y cada uno con su tipo,
+    ver _TIPOS_PARAMETROS), tal como los usa el caché.
+    Levanta: DatosInvalidosError si el tipo no existe, sobran/faltan
+    parámetros o alguno no tiene el tipo esperado.
+    """
+    if tipo not in REPORTES:
+        raise DatosInvalidosError(f"Tipo de reporte desconocido: '{tipo}'. Opciones: {', '.join(sorted(REPORTES))}.")
+    _, _, firma = REPORTES[tipo]
+    try:
+        argumentos = firma.bind(None, **parametros)
+    except TypeError as e:
+        raise DatosInvalidosError(f"Parámetros inválidos para '{tipo}': {e}")
+    argumentos.apply_defaults()
+    return {k: (v if v is None else _TIPOS_PARAMETROS[k](k, v))
+            for k, v in argumentos.arguments.items() if k != "self"}
+
+
+def _cacheado(tipo, *tablas):
+    """
+    Decorador: si ya se generó el mismo reporte (mismos parámetros) y las
+    'tablas' que lee no cambiaron, devuelve la URL del PDF existente.
+    Cada reporte que sí se dibuja queda anotado en almacen_reportes.
+    """
+    def decorador(metodo):
+        firma = inspect.signature(metodo)
+
+        def parametros_de(self, args, kwargs):
+            argumentos = firma.bind(self, *args, **kwargs)
+            argumentos.apply_defaults()
+            return {k: v for k, v in argumentos.arguments.items() if k != "self"}
+
+        @functools.wraps(metodo)
+        def generar(self, *args, **kwargs):
+            # Sin caché: dibuja y registra (parámetros, tamaño, tiempo de render)
+            inicio = time.perf_counter()
+            url = metodo(self, *args, **kwargs)
+            almacen_reportes.registrar(url, tipo, parametros_de(self, args, kwargs),
+                                       time.perf_counter() - inicio)
+            return url
+
+        REPORTES[tipo] = (generar, tablas, firma)
+
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            return cache_reportes.obtener_o_generar(
+                tipo, parametros_de(self, args, kwargs), tablas, lambda: generar(self, *args, **kwargs))
+        return envoltura
+    return decorador
+
+
 class ReporteService:
     
     # --- ¡NUEVO! Definimos las carpetas de salida ---
     # Asume que 'static' está al mismo nivel que tu 'app.py'
     STATIC_DIR = 'static' 
-    REPORTES_DIR = os.path.join(STATIC_DIR, 'reportes')
+    REPORTES_DIR = almacen_reportes.CARPETA
 
     def __init__(self):
         """Inicializa los servicios necesarios."""
@@ -49,10 +170,12 @@ class ReporteService:
         except ErrorDeAplicacion as e:
             raise Exception(f"Error al obtener alquileres: {e}") # Re-lanza para el controlador
 
-    def _generar_ruta_reporte(self, nombre_base):
+    def _generar_ruta_reporte(self, nombre_base, extension="pdf"):
         """Helper para crear una ruta de archivo única y una URL web."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nombre_archivo = f"{nombre_base}_{timestamp}.pdf"
+        # Sufijo al azar: dos hilos que dibujan el mismo reporte en el mismo
+        # segundo no escriben sobre el mismo archivo.
+        nombre_archivo = f"{nombre_base}_{timestamp}_{uuid.uuid4().hex[:8]}.{extension}"
         
         # Ruta completa del sistema para guardar el archivo
         ruta_completa_os = os.path.join(self.REPORTES_DIR, nombre_archivo)
@@ -64,196 +187,151 @@ class ReporteService:
         return ruta_completa_os, url_web
 
     # Reporte de alquileres por cliente
+    @_cacheado("alquileres_por_cliente", "ALQUILER", "VEHICULO")
     def generar_reporte_alquileres_por_cliente(self, cliente_id: int, formato: str = "pdf"):
-        # 1. Obtener datos (forma POO)
-        alquileres_obj_list = self.alquiler_service.buscar_por_cliente(cliente_id)
-
-        if not alquileres_obj_list:
+        # 1. Obtener datos (forma POO), de a lotes: nunca está la lista completa en memoria
+        alquileres = self.alquiler_service.iterar(cliente_id)
+        primero = next(alquileres, None)
+        if primero is None:
             raise RecursoNoEncontradoError(f"No se encontraron alquileres para el cliente con ID {cliente_id}.")
 
-        # 2. "Aplanar" los objetos para el DataFrame
-        data_para_df = []
-        for alq in alquileres_obj_list:
-            data_para_df.append({
-                "ID Alquiler": alq.id_alquiler,
-                "Fecha Inicio": alq.fecha_inicio.strftime("%d/%m/%Y"),
-                "Fecha Fin": alq.fecha_fin.strftime("%d/%m/%Y"),
-                "Costo Total ($)": alq.costo_total,
-                "Fecha Registro": alq.fecha_registro.strftime("%d/%m/%Y"),
-                "ID Empleado": alq.empleado.id_empleado,
-                "Patente Vehículo": alq.vehiculo.patente,
-                "Vehículo": f"{alq.vehiculo.marca} {alq.vehiculo.modelo}",
-                "ID Cliente": alq.cliente.id_cliente
-            })
-        
-        df = pd.DataFrame(data_para_df)
-        
-        # (Aseguramos el orden de columnas deseado)
-        columnas_ordenadas = [
-            "ID Alquiler", "Fecha Inicio", "Fecha Fin", "Patente Vehículo", 
-            "Vehículo", "Costo Total ($)", "ID Empleado", "Fecha Registro"
-        ]
-        df = df[columnas_ordenadas]
-
-        # 3. Exportar PDF
-        if formato.lower() == "pdf":
-            ruta_guardar, url_retorno = self._generar_ruta_reporte(f"alquileres_cliente_{cliente_id}")
-            
-            fig, ax = plt.subplots(figsize=(11.7, 8.3)) # Tamaño A4 horizontal
-            fig.patch.set_facecolor("white")
-            ax.axis("off")
-
-            fig.text(0.5, 0.93, f"REPORTE DE ALQUILERES - CLIENTE {cliente_id}",
-                     ha="center", fontsize=18, color=COLOR_PRINCIPAL, fontweight="bold")
-            
-            # (Tu lógica de tabla Matplotlib)
-            tabla = ax.table(cellText=df.values, colLabels=df.columns,
-                             cellLoc="center", loc="center")
-            tabla.auto_set_font_size(False)
-            tabla.set_fontsize(9)
-            tabla.scale(1, 1.2)
-            
-            # (Estilos de celda)
-            for (row, _), cell in tabla.get_celld().items():
-                 if row == 0:
-                     cell.set_facecolor(COLOR_PRINCIPAL)
-                     cell.set_text_props(color="white", fontweight="bold")
-                 elif row % 2 == 0:
-                     cell.set_facecolor(COLOR_TERCERARIO)
-                 cell.set_edgecolor(COLOR_BORDES)
-
-            with PdfPages(ruta_guardar) as pdf:
-               pdf.savefig(fig, bbox_inches="tight", facecolor="white")
-            plt.close(fig)
-            
-            return url_retorno # Devolvemos la URL web
-        else:
-            raise DatosInvalidosError("Formato no soportado. Use 'pdf'.")
+        formato = formato.lower()
+        if formato not in ("pdf", "excel"):
+            raise DatosInvalidosError("Formato no soportado. Use 'pdf' o 'excel'.")
+        filas = (self._fila_alquiler(alq) for alq in itertools.chain([primero], alquileres))
+
+        # 2a. Exportar Excel: se escribe de a lotes (ver servicios/escritores_tabla.py)
+        if formato == "excel":
+            from servicios.escritores_tabla import generar_xlsx
+            ruta_guardar, url_retorno = self._generar_ruta_reporte(f"alquileres_cliente_{cliente_id}", "xlsx")
+            lotes = iter(lambda: list(itertools.islice(filas, 500)), [])
+            with open(ruta_guardar, "wb") as archivo:
+                for parte in generar_xlsx(self.COLUMNAS_ALQUILERES, lotes, "Alquileres"):
+                    archivo.write(parte)
+            return url_retorno
+
+        # 2b. Exportar PDF: tabla de varias páginas (ver servicios/pdf_tabla.py)
+        _cargar_graficos()
+        from servicios.pdf_tabla import EscritorTablaPDF
+        ruta_guardar, url_retorno = self._generar_ruta_reporte(f"alquileres_cliente_{cliente_id}")
+        with EscritorTablaPDF(ruta_guardar, f"REPORTE DE ALQUILERES - CLIENTE {cliente_id}",
+                              self.COLUMNAS_ALQUILERES) as tabla:
+            tabla.agregar_filas(filas)
+        return url_retorno # Devolvemos la URL web
+
+    # (Orden de las columnas de la tabla de alquileres)
+    COLUMNAS_ALQUILERES = [
+        "ID Alquiler", "Fecha Inicio", "Fecha Fin", "Patente Vehículo",
+        "Vehículo", "Costo Total ($)", "ID Empleado", "Fecha Registro"
+    ]
+
+    @staticmethod
+    def _fila_alquiler(alq):
+        """ "Aplana" un objeto Alquiler a una fila de COLUMNAS_ALQUILERES. """
+        return (
+            alq.id_alquiler,
+            alq.fecha_inicio.strftime("%d/%m/%Y"),
+            alq.fecha_fin.strftime("%d/%m/%Y"),
+            alq.vehiculo.patente,
+            f"{alq.vehiculo.marca} {alq.vehiculo.modelo}",
+            alq.costo_total,
+            alq.empleado.id_empleado,
+            alq.fecha_registro.strftime("%d/%m/%Y"),
+        )
 
 
     # Reporte alquileres por periodo
+    @_cacheado("alquileres_por_periodo", "ALQUILER")
     def generar_reporte_alquileres_por_periodo(self, frecuencia="M", anio=None):
         if anio is None:
             anio = datetime.now().year
         elif anio > datetime.now().year:
             raise DatosInvalidosError("Año inválido. Debe ser igual o anterior al actual.")
         
-        alquileres_obj_list = self._get_alquileres_list()
-        
-        data_para_df = [{"fecha_inicio": alq.fecha_inicio, "id_alquiler": alq.id_alquiler} 
-                        for alq in alquileres_obj_list]
-        df = pd.DataFrame(data_para_df)
-        
-        df["fecha_inicio"] = pd.to_datetime(df["fecha_inicio"])
-        df = df[df["fecha_inicio"].dt.year == anio]
-
-        if df.empty:
-            raise RecursoNoEncontradoError(f"No hay alquileres registrados en {anio}.")
-
-        # (Tu lógica de groupby)
         if frecuencia.upper() == "M":
-             conteo = df.groupby(df["fecha_inicio"].dt.month)["id_alquiler"].count().reindex(range(1, 13), fill_value=0)
-             etiquetas_x = ["Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
+             etiquetas_x = MESES
              titulo_freq = "Mensual"
         elif frecuencia.upper() == "Q":
-             df["trimestre"] = df["fecha_inicio"].dt.to_period("Q")
-             conteo = df.groupby(df["trimestre"])["id_alquiler"].count().reindex([f'{anio}Q1', f'{anio}Q2', f'{anio}Q3', f'{anio}Q4'], fill_value=0)
              etiquetas_x = ["Q1", "Q2", "Q3", "Q4"]
              titulo_freq = "Trimestral"
         else:
              raise DatosInvalidosError("Frecuencia inválida. Use 'M' o 'Q'.")
 
-        # (Tu lógica de Matplotlib)
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.plot(etiquetas_x, conteo.values, marker="o", linewidth=3, color=COLOR_PRINCIPAL)
-        ax.set_title(f"ALQUILERES POR PERÍODO ({titulo_freq}) - {anio}", fontsize=18, color=COLOR_PRINCIPAL, pad=20)
-        # ... (más estilos)
+        # El GROUP BY se hace en SQLite: solo vuelven los 12 (o 4) valores del año
+        resumen = self.alquiler_service.resumen_por_periodo(anio, trimestral=(titulo_freq == "Trimestral"))
+        if not resumen:
+            raise RecursoNoEncontradoError(f"No hay alquileres registrados en {anio}.")
+        conteo = [resumen.get(periodo, (0, 0))[0] for periodo in range(1, len(etiquetas_x) + 1)]
+
+        # Gráfico de líneas (plantilla compartida, ver servicios/graficos.py)
+        _cargar_graficos()
+        figura = graficos.grafico_lineas(f"ALQUILERES POR PERÍODO ({titulo_freq}) - {anio}",
+                                         etiquetas_x, conteo, "Cantidad de alquileres")
         
         # Guardar PDF y devolver URL web
         ruta_guardar, url_retorno = self._generar_ruta_reporte(f"alquileres_periodo_{titulo_freq.lower()}_{anio}")
-        with PdfPages(ruta_guardar) as pdf:
-           pdf.savefig(fig, bbox_inches="tight", facecolor="white")
-        plt.close(fig)
+        graficos.guardar_pdf(figura, ruta_guardar)
         return url_retorno
 
 
     # Reporte de facturación mensual
+    @_cacheado("facturacion_mensual", "ALQUILER")
     def generar_reporte_facturacion_mensual(self, anio):
         if anio > datetime.now().year:
             raise DatosInvalidosError("Año inválido. Debe ser igual o anterior al actual.")
 
-        alquileres_obj_list = self._get_alquileres_list()
-        
-        data_para_df = [{"fecha_inicio": alq.fecha_inicio, "costo_total": alq.costo_total} 
-                        for alq in alquileres_obj_list]
-        df = pd.DataFrame(data_para_df)
-
-        df["fecha_inicio"] = pd.to_datetime(df["fecha_inicio"])
-        df = df[df["fecha_inicio"].dt.year == anio]
-
-        if df.empty:
+        # El GROUP BY se hace en SQLite: solo vuelven los 12 totales del año
+        resumen = self.alquiler_service.resumen_por_periodo(anio)
+        if not resumen:
             raise RecursoNoEncontradoError(f"No se registraron alquileres durante {anio}.")
 
-        facturacion = df.groupby(df["fecha_inicio"].dt.month)["costo_total"].sum().reindex(range(1, 13), fill_value=0)
+        facturacion = [resumen.get(mes, (0, 0))[1] for mes in range(1, 13)]
 
-        # (Tu lógica de Matplotlib para gráfico de barras)
-        fig, ax = plt.subplots(figsize=(11, 6))
-        # ... (barras, etiquetas, etc.)
-        ax.set_title(f"FACTURACIÓN MENSUAL DE ALQUILERES - {anio}", fontsize=18, color=COLOR_PRINCIPAL, fontweight="bold")
-        # ...
+        # Gráfico de barras (plantilla compartida, ver servicios/graficos.py)
+        _cargar_graficos()
+        figura = graficos.grafico_barras(f"FACTURACIÓN MENSUAL DE ALQUILERES - {anio}",
+                                         MESES, facturacion, "Facturación ($)", "$ {:,.0f}")
         
         # Guardar PDF y devolver URL web
         ruta_guardar, url_retorno = self._generar_ruta_reporte(f"facturacion_mensual_{anio}")
-        with PdfPages(ruta_guardar) as pdf:
-           pdf.savefig(fig, bbox_inches="tight", facecolor="white")
-        plt.close(fig)
+        graficos.guardar_pdf(figura, ruta_guardar)
         return url_retorno
 
 
     # Reporte de vehículos más alquilados
-    def generar_reporte_vehiculos_mas_alquilados(self, limite=None):
-        
-        alquileres_obj_list = self._get_alquileres_list()
+    @_cacheado("vehiculos_mas_alquilados", "ALQUILER", "VEHICULO")
+    def generar_reporte_vehiculos_mas_alquilados(self, limite=None, desde=None, hasta=None):
         
-        # Acceso POO limpio
-        patentes = [alq.vehiculo.patente for alq in alquileres_obj_list]
-        conteo = pd.Series(patentes).value_counts().reset_index()
-        conteo.columns = ["patente", "cantidad"]
-
-        vehiculos_info = []
-        for _, fila in conteo.iterrows():
-            patente, cantidad = fila["patente"], fila["cantidad"]
-            try:
-                vehiculo = self.vehiculo_service.buscar_vehiculo(patente)
-                nombre = f"{vehiculo.marca} {vehiculo.modelo}\n({patente})" # Usamos \n para mejor layout en gráfico
-            except RecursoNoEncontradoError:
-                nombre = f"Desconocido ({patente})"
-            vehiculos_info.append({"Vehículo": nombre, "Cantidad": cantidad})
+        # Ranking (y "Otros") en UNA consulta agrupada: no se cargan los alquileres
+        for nombre, valor in (("desde", desde), ("hasta", hasta)):
+            if valor is not None:
+                try:
+                    date.fromisoformat(valor)
+                except (TypeError, ValueError):
+                    raise DatosInvalidosError(f"'{nombre}' debe ser una fecha AAAA-MM-DD.")
+        ranking = self.alquiler_service.ranking_vehiculos(limite, desde, hasta)
+        if not ranking:
+            raise RecursoNoEncontradoError("No se encontraron alquileres en el sistema.")
 
-        df = pd.DataFrame(vehiculos_info).sort_values(by="Cantidad", ascending=False)
-        
-        if limite:
-            # Agrupar los "Otros"
-            if len(df) > limite:
-                df_top = df.head(limite - 1)
-                df_otros = pd.DataFrame({
-                    "Vehículo": [f"Otros ({len(df) - limite + 1})"],
-                    "Cantidad": [df.iloc[limite-1:]["Cantidad"].sum()]
-                })
-                df = pd.concat([df_top, df_otros], ignore_index=True)
+        nombres, cantidades = [], []
+        for patente, marca, modelo, cantidad, otros in ranking:
+            if otros:
+                nombre = f"Otros ({otros})"
+            elif marca is None:
+                nombre = f"Desconocido ({patente})"
             else:
-                df = df.head(limite)
+                nombre = f"{marca} {modelo}\n({patente})" # Usamos \n para mejor layout en gráfico
+            nombres.append(nombre)
+            cantidades.append(cantidad)
 
-        # (Tu lógica de Matplotlib para gráfico de torta)
-        fig, ax = plt.subplots(figsize=(10, 8))
-        # ... (ax.pie, etc.)
-        ax.set_title(f"VEHÍCULOS MÁS ALQUILADOS (Top {limite})" if limite else "VEHÍCULOS MÁS ALQUILADOS", 
-                     fontsize=18, fontweight="bold", color=COLOR_PRINCIPAL, pad=20)
-        # ...
+        # Gráfico de torta (plantilla compartida, ver servicios/graficos.py)
+        _cargar_graficos()
+        titulo = f"VEHÍCULOS MÁS ALQUILADOS (Top {limite})" if limite else "VEHÍCULOS MÁS ALQUILADOS"
+        if desde or hasta:
+            titulo += f"\n{desde or 'inicio'} a {hasta or 'hoy'}"
+        figura = graficos.grafico_torta(titulo, nombres, cantidades)
 
         # Guardar PDF y devolver URL web
         ruta_guardar, url_retorno = self._generar_ruta_reporte(f"vehiculos_top{limite}" if limite else "vehiculos_todos")
-        with PdfPages(ruta_guardar) as pdf:
-           pdf.savefig(fig, bbox_inches="tight", facecolor="white")
-        plt.close(fig)
+        graficos.guardar_pdf(figura, ruta_guardar)
         return url_retorno
\ No newline at end of file
@@ -3,13 +3,15 @@
 from datetime import date
 from clases.reserva import Reserva
 from Crud.reserva_crud import ReservaCRUD
+import indice_ocupacion
 # ¡Usamos los SERVICIOS, no los DAOs!
 from servicios.cliente_service import ClienteService
 from servicios.vehiculo_service import VehiculoService
 from servicios.excepciones import (
     ErrorDeAplicacion, 
     RecursoNoEncontradoError, 
-    DatosInvalidosError
+    DatosInvalidosError,
+    ErrorDeLogicaDeNegocio
 )
 
 class ReservaService:
@@ -38,8 +40,6 @@ class ReservaService:
             if patente:
                 # El servicio ya levanta RecursoNoEncontradoError
                 vehiculo = self.vehiculo_service.buscar_vehiculo(patente)
-                # (Aquí iría la LÓGICA DE NEGOCIO:
-                # Ej: chequear si 'vehiculo' está disponible en esas fechas)
 
             # 3. Validar y convertir datos crudos
             fecha_inicio_str = datos.get('fecha_inicio_deseada')
@@ -57,8 +57,14 @@ class ReservaService:
                 vehiculo=vehiculo # Pasamos el objeto Vehiculo (o None)
             )
             
-            # 5. Guardar y retornar el objeto recién creado
-            nuevo_id = self.reserva_dao.crear_reserva(reserva)
+            # 5. Guardar SOLO si el vehículo no tiene alquileres, mantenimientos
+            # ni otras reservas en esas fechas (chequeo + INSERT en una sentencia)
+            nuevo_id = self.reserva_dao.crear_si_libre(reserva)
+            if nuevo_id is None:
+                raise ErrorDeLogicaDeNegocio(
+                    f"El vehículo {patente} no está disponible entre "
+                    f"{reserva.fecha_inicio_deseada} y {reserva.fecha_fin_deseada}.")
+            indice_ocupacion.ocupacion_modificada(patente)
             return self.reserva_dao.buscar_por_id(nuevo_id)
 
         except (ValueError, TypeError) as e: 
@@ -75,6 +81,26 @@ class ReservaService:
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al listar reservas: {e}")
 
+    def listar_pagina(self, opciones):
+        """
+        Lista una página de reservas (paginación por cursor, filtros y orden).
+        Retorna: (lista de objetos Reserva, cursor siguiente o None).
+        Levanta: DatosInvalidosError si el filtro, el orden o el cursor no son válidos.
+        """
+        try:
+            return self.reserva_dao.listar_pagina(**opciones)
+        except ValueError as e:
+            raise DatosInvalidosError(str(e))
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar reservas: {e}")
+
+    def iterar(self):
+        """ Retorna: Un generador de reservas, leídos de a lotes (para streaming). """
+        try:
+            return self.reserva_dao.iterar()
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar reservas: {e}")
+
     def buscar_reserva(self, id_reserva):
         """
         Busca una reserva por ID.
@@ -94,6 +120,7 @@ class ReservaService:
         try:
             # 1. Buscamos el objeto existente
             reserva = self.buscar_reserva(id_reserva)
+            patente_anterior = reserva.vehiculo.patente if reserva.vehiculo else None
 
             # 2. Actualizamos campos
             if 'fecha_inicio_deseada' in datos:
@@ -114,8 +141,13 @@ class ReservaService:
             if reserva.fecha_inicio_deseada > reserva.fecha_fin_deseada:
                 raise DatosInvalidosError("La fecha de inicio no puede ser posterior a la de fin.")
 
-            # 5. Guardamos
-            self.reserva_dao.actualizar_reserva(reserva)
+            # 5. Guardamos, con el mismo chequeo de fechas que al crear
+            if not self.reserva_dao.actualizar_si_libre(reserva):
+                raise ErrorDeLogicaDeNegocio(
+                    f"El vehículo {reserva.vehiculo.patente} no está disponible entre "
+                    f"{reserva.fecha_inicio_deseada} y {reserva.fecha_fin_deseada}.")
+            indice_ocupacion.ocupacion_modificada(
+                patente_anterior, reserva.vehiculo.patente if reserva.vehiculo else None)
             return reserva
 
         except (ValueError, TypeError) as e:
@@ -124,12 +156,85 @@ class ReservaService:
             if isinstance(e, ErrorDeAplicacion): raise e
             raise ErrorDeAplicacion(f"Error al actualizar reserva: {e}")
 
+    def verificar_reservas(self, lista_datos):
+        """
+        Chequea muchas reservas candidatas SIN guardarlas.
+        Cada elemento trae 'patente', 'fecha_inicio_deseada', 'fecha_fin_deseada'
+        y, si es una reserva que se va a modificar, su 'id_reserva'.
+        Los choques con ALQUILER, MANTENIMIENTO y RESERVA salen de una sola
+        consulta por lote; los choques entre las mismas candidatas, de un
+        recorrido por patente (tipo "candidata", id = su índice).
+        Retorna: {"resultados": [{"indice", "disponible", "conflictos"}, ...],
+                  "errores": [{"indice": i, "error": "..."}, ...]}
+        Levanta: DatosInvalidosError si no se recibe una lista con datos.
+        """
+        if not isinstance(lista_datos, list) or not lista_datos:
+            raise DatosInvalidosError("Se esperaba una lista de reservas no vacía.")
+
+        candidatas, indices, errores = [], [], []
+        for indice, datos in enumerate(lista_datos):
+            try:
+                patente = datos.get('patente')
+                if not patente or not isinstance(patente, str):
+                    raise ValueError("La patente no puede estar vacía.")
+                desde = date.fromisoformat(datos['fecha_inicio_deseada'])
+                hasta = date.fromisoformat(datos['fecha_fin_deseada'])
+                if desde > hasta:
+                    raise ValueError("La fecha de inicio no puede ser posterior a la de fin.")
+                id_reserva = datos.get('id_reserva')
+                if id_reserva is not None and not isinstance(id_reserva, int):
+                    raise ValueError("El 'id_reserva' debe ser un entero.")
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                errores.append((indice, f"Datos inválidos: {e}"))
+                continue
+            candidatas.append((patente.strip().upper(), desde.isoformat(), hasta.isoformat(), id_reserva))
+            indices.append(indice)
+
+        try:
+            existentes = self.vehiculo_service.dao.buscar_por_patentes({c[0] for c in candidatas})
+            conflictos = self.reserva_dao.conflictos(candidatas)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al verificar reservas: {e}")
+
+        # Choques entre candidatas: por patente, ordenadas por inicio; cada una
+        # se compara solo con las siguientes que empiezan antes de que termine.
+        por_patente = {}
+        for posicion, (patente, desde, _, _) in enumerate(candidatas):
+            por_patente.setdefault(patente, []).append((desde, posicion))
+        for grupo in por_patente.values():
+            grupo.sort()
+            for k, (_, a) in enumerate(grupo):
+                for desde_b, b in grupo[k + 1:]:
+                    if desde_b > candidatas[a][2]:
+                        break
+                    conflictos[a].append(("candidata", indices[b], desde_b, candidatas[b][2]))
+                    conflictos[b].append(("candidata", indices[a], candidatas[a][1], candidatas[a][2]))
+
+        resultados = []
+        for posicion, (patente, _, _, _) in enumerate(candidatas):
+            if patente not in existentes:
+                errores.append((indices[posicion], f"Vehículo con patente {patente} no encontrado."))
+                continue
+            lista = sorted(conflictos[posicion], key=lambda c: (c[2], c[0]))
+            resultados.append({
+                "indice": indices[posicion],
+                "disponible": not lista,
+                "conflictos": [{"tipo": tipo.lower(), "id": clave, "inicio": inicio, "fin": fin}
+                               for tipo, clave, inicio, fin in lista],
+            })
+        return {
+            "resultados": resultados,
+            "errores": [{"indice": i, "error": m} for i, m in sorted(errores)],
+        }
+
     def eliminar_reserva(self, id_reserva):
         """ Elimina una reserva. Retorna True. """
         # 1. Aseguramos que existe
-        self.buscar_reserva(id_reserva) 
+        reserva = self.buscar_reserva(id_reserva)
         try:
             self.reserva_dao.eliminar_reserva(id_reserva)
+            if reserva.vehiculo:
+                indice_ocupacion.ocupacion_modificada(reserva.vehiculo.patente)
             return True
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al eliminar reserva: {e}")
\ No newline at end of file
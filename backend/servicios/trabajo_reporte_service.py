@@ -0,0 +1,267 @@
+# --- Archivo: servicios/trabajo_reporte_service.py ---
+#
+# Reportes en segundo plano.
+#   POST /reportes/jobs      -> encolar(): guarda el trabajo y lo manda al pool
+#   GET  /reportes/jobs/<id> -> consultar(): estado y, al terminar, la URL del PDF
+# Los PDFs se dibujan en un pool ACOTADO de procesos (matplotlib usa CPU y no
+# libera el GIL), así los hilos del servidor web nunca esperan al render.
+# El estado de cada trabajo vive en la tabla TRABAJO_REPORTE: si el servidor
+# se reinicia, los trabajos que quedaron a medias se vuelven a encolar con
+# el uso de la API (ver reanudar_pendientes()).
+# Con varios procesos web, cada uno "late" sobre los trabajos que tiene en
+# curso (renueva actualizado_en): solo se reanudan los que dejaron de latir,
+# nunca los que otro proceso vivo está dibujando.
+#
+# Configuración por variables de entorno:
+#   REPORTES_PROCESOS     procesos del pool (por defecto 2)
+#   REPORTES_EN_COLA      máximo de trabajos sin terminar (por defecto 50)
+#   REPORTES_LATIDO       segundos entre latidos (por defecto 15)
+#   REPORTES_VENCIMIENTO  segundos sin latir para dar un trabajo por abandonado (por defecto 60)
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import cache_reportes
+import conexion
+from conexion import ConexionDB
+from Crud.trabajo_reporte_crud import TrabajoReporteCRUD
+from clases.trabajo_reporte import TrabajoReporte, EN_PROCESO, TERMINADO, ERROR
+from servicios.reporte_service import REPORTES, parametros_reporte
+from .excepciones import (
+    ErrorDeAplicacion,
+    RecursoNoEncontradoError,
+    DatosInvalidosError,
+    ErrorDeLogicaDeNegocio,
+)
+
+logger = logging.getLogger(__name__)
+
+PROCESOS = int(os.environ.get("REPORTES_PROCESOS", 2))
+MAXIMO_EN_COLA = int(os.environ.get("REPORTES_EN_COLA", 50))
+LATIDO = float(os.environ.get("REPORTES_LATIDO", 15))
+VENCIMIENTO = float(os.environ.get("REPORTES_VENCIMIENTO", 60))
+
+
+# --- Lo que corre DENTRO de cada proceso del pool ---
+_servicio_del_proceso = None
+
+
+def _iniciar_proceso(ruta_bd):
+    # El proceso hijo arranca de cero ("spawn"): apuntamos a la misma base.
+    conexion.DB_PATH = ruta_bd
+
+
+def _renderizar(id_trabajo, tipo, parametros):
+    """ Dibuja el reporte y retorna su URL. Las excepciones vuelven al proceso padre. """
+    global _servicio_del_proceso
+    from servicios.reporte_service import ReporteService
+    if _servicio_del_proceso is None:
+        _servicio_del_proceso = ReporteService()
+    try:
+        TrabajoReporteCRUD().actualizar_estado(id_trabajo, EN_PROCESO)
+        # Sin pasar por el caché: lo consulta y lo llena el proceso padre,
+        # que es el que ve las escrituras (versiones de datos).
+        metodo, _, _ = REPORTES[tipo]
+        return metodo(_servicio_del_proceso, **parametros)
+    finally:
+        ConexionDB.liberar()
+
+
+class TrabajoReporteService:
+    def __init__(self, procesos=PROCESOS, maximo_en_cola=MAXIMO_EN_COLA,
+                 latido=LATIDO, vencimiento=VENCIMIENTO):
+        self.dao = TrabajoReporteCRUD()
+        self.procesos = procesos
+        self.maximo_en_cola = maximo_en_cola
+        self.latido = latido
+        self.vencimiento = vencimiento
+        self._pool = None
+        self._lock = threading.Lock()
+        self._en_curso = set()  # ids enviados al pool que todavía no terminaron
+        self._ultima_revision = None  # time.monotonic() del último reanudar_pendientes()
+        self._latiendo = None   # hilo que renueva actualizado_en de _en_curso
+        self._parar = threading.Event()
+
+    def _obtener_pool(self):
+        # El pool se crea con el primer trabajo (arrancar procesos no es gratis).
+        # "spawn" y no "fork": el hijo no hereda las conexiones sqlite ni los
+        # hilos del servidor.
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.procesos,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_iniciar_proceso,
+                    initargs=(conexion.DB_PATH,))
+                self._parar.clear()
+                self._latiendo = threading.Thread(target=self._latir, name="latido-reportes", daemon=True)
+                self._latiendo.start()
+            return self._pool
+
+    def _latir(self):
+        # Mientras haya pool: cada 'latido' segundos renueva los trabajos en
+        # curso de ESTE proceso (incluidos los que esperan lugar en el pool).
+        while not self._parar.wait(self.latido):
+            with self._lock:
+                ids = list(self._en_curso)
+            if not ids:
+                continue
+            try:
+                self.dao.latir(ids)
+            except Exception as e:
+                logger.error("No se pudo renovar el latido de los reportes.", extra={"error": str(e)})
+            finally:
+                ConexionDB.liberar()
+
+    def encolar(self, tipo, parametros=None):
+        """
+        Crea un trabajo para el reporte 'tipo' y lo manda al pool.
+        Si el mismo reporte ya está en el caché, el trabajo nace terminado.
+        Retorna: El objeto TrabajoReporte.
+        Levanta: DatosInvalidosError, ErrorDeLogicaDeNegocio (cola llena).
+        """
+        self._reanudar_si_corresponde()
+        parametros = parametros_reporte(tipo, parametros or {})
+        trabajo = TrabajoReporte(uuid.uuid4().hex, tipo, parametros,
+                                 datetime.now().isoformat(timespec="seconds"))
+        # El lugar en la cola se chequea y se ocupa en el mismo bloque: dos
+        # pedidos simultáneos no pueden pasar los dos con un solo lugar libre.
+        with self._lock:
+            if len(self._en_curso) >= self.maximo_en_cola:
+                raise ErrorDeLogicaDeNegocio(
+                    f"Hay {len(self._en_curso)} reportes en cola. Intente nuevamente en unos segundos.")
+            self._en_curso.add(trabajo.id_trabajo)
+
+        try:
+            _, tablas, _ = REPORTES[tipo]
+            clave, versiones = cache_reportes.clave_reporte(tipo, parametros, tablas)
+            url = cache_reportes.buscar(clave)
+            if url is not None:
+                trabajo.estado, trabajo.url = TERMINADO, url
+            self.dao.crear_trabajo(trabajo)
+        except Exception as e:
+            self._liberar(trabajo.id_trabajo)
+            raise ErrorDeAplicacion(f"Error al encolar el reporte: {e}")
+
+        if url is None:
+            self._enviar(trabajo, clave, versiones)
+        else:
+            self._liberar(trabajo.id_trabajo)
+        return trabajo
+
+    def _liberar(self, id_trabajo):
+        with self._lock:
+            self._en_curso.discard(id_trabajo)
+
+    def _enviar(self, trabajo, clave, versiones):
+        # El lugar en _en_curso ya lo ocupó quien llama (encolar o reanudar_pendientes)
+        try:
+            futuro = self._obtener_pool().submit(_renderizar, trabajo.id_trabajo, trabajo.tipo, trabajo.parametros)
+        except Exception as e:
+            self._terminar(trabajo.id_trabajo, error=f"No se pudo iniciar el reporte: {e}", codigo_error=500)
+            return
+        futuro.add_done_callback(
+            lambda f: self._al_terminar(trabajo.id_trabajo, clave, versiones, f))
+
+    def _al_terminar(self, id_trabajo, clave, versiones, futuro):
+        # Corre en un hilo del ProcessPoolExecutor (en el proceso padre).
+        try:
+            url = futuro.result()
+        except DatosInvalidosError as e:
+            self._terminar(id_trabajo, error=str(e), codigo_error=400)
+        except RecursoNoEncontradoError as e:
+            self._terminar(id_trabajo, error=str(e), codigo_error=404)
+        except Exception as e:
+            logger.error("Error generando reporte en segundo plano.", extra={"id_trabajo": id_trabajo, "error": str(e)})
+            self._terminar(id_trabajo, error=f"Error del servidor al generar reporte: {e}", codigo_error=500)
+        else:
+            cache_reportes.guardar(clave, versiones, url)
+            self._terminar(id_trabajo, url=url)
+        finally:
+            ConexionDB.liberar()
+
+    def _terminar(self, id_trabajo, url=None, error=None, codigo_error=None):
+        try:
+            self.dao.actualizar_estado(id_trabajo, ERROR if error else TERMINADO,
+                                       url=url, error=error, codigo_error=codigo_error)
+        except Exception as e:
+            logger.error("No se pudo guardar el estado del trabajo.", extra={"id_trabajo": id_trabajo, "error": str(e)})
+        finally:
+            self._liberar(id_trabajo)
+
+    def consultar(self, id_trabajo):
+        """
+        Retorna: El objeto TrabajoReporte (estado, y URL o error si terminó).
+        Levanta: RecursoNoEncontradoError si no existe.
+        """
+        self._reanudar_si_corresponde()
+        try:
+            trabajo = self.dao.buscar_por_id(id_trabajo)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al consultar el trabajo: {e}")
+        if not trabajo:
+            raise RecursoNoEncontradoError(f"Trabajo de reporte {id_trabajo} no encontrado.")
+        return trabajo
+
+    def _reanudar_si_corresponde(self):
+        # Se hace con el uso de la API de trabajos, no al importar: así no lo
+        # repiten el proceso del "reloader" de Flask ni los hijos del pool
+        # ("spawn" vuelve a importar el módulo principal). Como mucho una vez
+        # por latido: un trabajo recién abandonado tarda 'vencimiento' en vencer.
+        ahora = time.monotonic()
+        with self._lock:
+            if self._ultima_revision is not None and ahora - self._ultima_revision < self.latido:
+                return
+            self._ultima_revision = ahora
+        self.reanudar_pendientes()
+
+    def reanudar_pendientes(self):
+        """
+        Vuelve a encolar los trabajos que quedaron sin terminar y que ningún
+        proceso vivo tiene en curso: los que no latieron en 'vencimiento'
+        segundos (ej. se reinició o se cayó el servidor que los tenía).
+        Retorna cuántos.
+        Cada trabajo se reclama antes en la base (ver TrabajoReporteCRUD.reclamar):
+        si varios procesos del servidor lo ven vencido a la vez, lo reanuda uno solo.
+        """
+        vencidos_antes_de = (datetime.now() - timedelta(seconds=self.vencimiento)).isoformat(timespec="seconds")
+        try:
+            pendientes = self.dao.buscar_abandonados(vencidos_antes_de)
+        except Exception as e:
+            logger.error("No se pudieron leer los trabajos pendientes.", extra={"error": str(e)})
+            return 0
+        reanudados = 0
+        for trabajo in pendientes:
+            with self._lock:
+                if trabajo.id_trabajo in self._en_curso:
+                    continue
+                self._en_curso.add(trabajo.id_trabajo)
+            try:
+                reclamado = self.dao.reclamar(trabajo)
+            except Exception as e:
+                logger.error("No se pudo reclamar el trabajo.", extra={"id_trabajo": trabajo.id_trabajo, "error": str(e)})
+                reclamado = False
+            if not reclamado:
+                self._liberar(trabajo.id_trabajo)
+                continue
+            _, tablas, _ = REPORTES.get(trabajo.tipo, (None, (), None))
+            clave, versiones = cache_reportes.clave_reporte(trabajo.tipo, trabajo.parametros, tablas)
+            self._enviar(trabajo, clave, versiones)
+            reanudados += 1
+        if reanudados:
+            logger.info(f"Se reanudaron {reanudados} reportes pendientes.")
+        return reanudados
+
+    def cerrar(self):
+        """ Espera a que terminen los reportes en curso y cierra el pool. """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        self._parar.set()
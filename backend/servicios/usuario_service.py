@@ -54,6 +54,19 @@ class UsuarioService:
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al listar usuarios: {e}")
 
+    def listar_pagina(self, opciones):
+        """
+        Lista una página de usuarios (paginación por cursor, filtros y orden).
+        Retorna: (lista de objetos Usuario, cursor siguiente o None).
+        Levanta: DatosInvalidosError si el filtro, el orden o el cursor no son válidos.
+        """
+        try:
+            return self.dao.listar_pagina(**opciones)
+        except ValueError as e:
+            raise DatosInvalidosError(str(e))
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar usuarios: {e}")
+
     def buscar_usuario(self, id_usuario: int):
         """
         Busca un usuario por ID.
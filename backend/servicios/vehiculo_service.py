@@ -1,7 +1,13 @@
 # --- Archivo: servicios/vehiculo_service.py ---
 
+import copy
+import math
+from datetime import date
+
+import indice_ocupacion
 from Crud.vehiculo_crud import VehiculoCRUD
 from clases.vehiculo import Vehiculo
+from cache_reportes import datos_modificados
 # Importamos las excepciones que usaremos
 from servicios.excepciones import (
     ErrorDeAplicacion, 
@@ -13,6 +19,18 @@ class VehiculoService:
     def __init__(self):
         self.dao = VehiculoCRUD()
 
+    def _vehiculo_desde_datos(self, datos):
+        """ Arma (y valida) un objeto Vehiculo a partir de un dict del request. """
+        # La validación de la patente ocurre aquí, en el constructor
+        return Vehiculo(
+            patente=datos.get('patente'),
+            marca=datos.get('marca'),
+            modelo=datos.get('modelo'),
+            anio=int(datos.get('anio')),
+            precio_diario=float(datos.get('precio_diario')),
+            estado=datos.get('estado', 'Disponible')
+        )
+
     def crear_vehiculo(self, datos):
         """
         Crea un nuevo vehículo.
@@ -20,18 +38,11 @@ class VehiculoService:
         Levanta: DatosInvalidosError, ErrorDeAplicacion.
         """
         try:
-            # La validación de la patente ocurre aquí, en el constructor
-            vehiculo = Vehiculo(
-                patente=datos.get('patente'),
-                marca=datos.get('marca'),
-                modelo=datos.get('modelo'),
-                anio=int(datos.get('anio')),
-                precio_diario=float(datos.get('precio_diario')),
-                estado=datos.get('estado', 'Disponible')
-            )
+            vehiculo = self._vehiculo_desde_datos(datos)
             
             # El DAO retorna la patente
             patente_creada = self.dao.crear_vehiculo(vehiculo)
+            datos_modificados("VEHICULO")
             
             # Retornamos el objeto completo
             return self.dao.buscar_por_id(patente_creada)
@@ -43,6 +54,92 @@ class VehiculoService:
             # Captura errores del DAO (ej. patente duplicada)
             raise ErrorDeAplicacion(f"Error al crear vehículo: {e}")
 
+    def crear_vehiculos_lote(self, lista_datos):
+        """
+        Crea muchos vehículos en UNA transacción.
+        Las filas inválidas o duplicadas no cortan el lote: se reportan por índice.
+        Retorna: {"creados": n, "errores": [{"indice": i, "error": "..."}, ...]}
+        Levanta: DatosInvalidosError si no se recibe una lista con datos.
+        """
+        if not isinstance(lista_datos, list) or not lista_datos:
+            raise DatosInvalidosError("Se esperaba una lista de vehículos no vacía.")
+
+        vehiculos, indices, errores = [], [], []
+        for indice, datos in enumerate(lista_datos):
+            try:
+                vehiculos.append(self._vehiculo_desde_datos(datos))
+                indices.append(indice)
+            except (ValueError, TypeError, AttributeError) as e:
+                errores.append((indice, f"Datos inválidos: {e}"))
+
+        try:
+            creados, errores_bd = self.dao.crear_vehiculos_lote(vehiculos)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al crear vehículos: {e}")
+        if creados:
+            datos_modificados("VEHICULO")
+
+        errores += [(indices[i], mensaje) for i, mensaje in errores_bd]
+        return {
+            "creados": creados,
+            "errores": [{"indice": i, "error": m} for i, m in sorted(errores)],
+        }
+
+    def actualizar_vehiculos_lote(self, lista_datos):
+        """
+        Actualiza muchos vehículos en UNA transacción.
+        Cada elemento debe traer la 'patente' y los campos a cambiar.
+        Retorna: {"actualizados": n, "errores": [{"indice": i, "error": "..."}, ...]}
+        Levanta: DatosInvalidosError si no se recibe una lista con datos.
+        """
+        if not isinstance(lista_datos, list) or not lista_datos:
+            raise DatosInvalidosError("Se esperaba una lista de vehículos no vacía.")
+
+        errores = []
+        patentes = []
+        for indice, datos in enumerate(lista_datos):
+            patente = datos.get('patente') if isinstance(datos, dict) else None
+            if not patente or not isinstance(patente, str):
+                errores.append((indice, "La patente no puede estar vacía."))
+                patentes.append(None)
+            else:
+                patentes.append(patente.strip().upper())
+
+        try:
+            existentes = self.dao.buscar_por_patentes({p for p in patentes if p})
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al actualizar vehículos: {e}")
+
+        vehiculos, indices = [], []
+        for indice, (patente, datos) in enumerate(zip(patentes, lista_datos)):
+            if patente is None:
+                continue
+            if patente not in existentes:
+                errores.append((indice, f"Vehículo con patente {patente} no encontrado."))
+                continue
+            # Copia: si una fila falla a mitad de camino no "ensucia" a otra con la misma patente
+            vehiculo = copy.copy(existentes[patente])
+            try:
+                self._aplicar_cambios(vehiculo, datos)
+            except (ValueError, TypeError, AttributeError) as e:
+                errores.append((indice, f"Datos de actualización inválidos: {e}"))
+                continue
+            vehiculos.append(vehiculo)
+            indices.append(indice)
+
+        try:
+            actualizados, errores_bd = self.dao.actualizar_vehiculos_lote(vehiculos)
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al actualizar vehículos: {e}")
+        if actualizados:
+            datos_modificados("VEHICULO")
+
+        errores += [(indices[i], mensaje) for i, mensaje in errores_bd]
+        return {
+            "actualizados": actualizados,
+            "errores": [{"indice": i, "error": m} for i, m in sorted(errores)],
+        }
+
     def buscar_vehiculo(self, patente: str):
         """
         Busca un vehículo por patente.
@@ -66,6 +163,74 @@ class VehiculoService:
         except Exception as e:
             raise ErrorDeAplicacion(f"Error al listar vehículos: {e}")
 
+    @staticmethod
+    def _precio_de_filtro(valor, nombre):
+        """ '45.5' -> 45.5; None o '' -> None (sin filtro). Levanta DatosInvalidosError si no es un número. """
+        if valor is None or valor == "":
+            return None
+        try:
+            precio = float(valor)
+        except (TypeError, ValueError):
+            precio = None
+        if precio is None or not math.isfinite(precio):
+            raise DatosInvalidosError(f"'{nombre}' debe ser un número.")
+        return precio
+
+    def listar_disponibles(self, desde, hasta, marca=None, precio_min=None, precio_max=None, id_cliente=None):
+        """
+        Vehículos sin alquileres, reservas ni mantenimientos entre 'desde' y
+        'hasta' (ISO, inclusive), con filtros opcionales de marca y precio diario.
+        Con 'id_cliente', las reservas de ese cliente no cuentan: son los
+        vehículos que ese cliente puede alquilar (ver AlquilerCRUD._sql_ocupado).
+        (Los períodos ocupados salen de indice_ocupacion, no de 'estado')
+        Retorna: Una lista de objetos Vehiculo.
+        Levanta: DatosInvalidosError si faltan las fechas o si las fechas, los
+                 precios o el cliente son inválidos.
+        """
+        if not desde or not hasta:
+            raise DatosInvalidosError("Los parámetros 'desde' y 'hasta' son obligatorios.")
+        try:
+            desde, hasta = date.fromisoformat(desde), date.fromisoformat(hasta)
+        except (TypeError, ValueError):
+            raise DatosInvalidosError("'desde' y 'hasta' deben ser fechas AAAA-MM-DD.")
+        if desde > hasta:
+            raise DatosInvalidosError("'desde' no puede ser posterior a 'hasta'.")
+        precio_min = self._precio_de_filtro(precio_min, "precio_min")
+        precio_max = self._precio_de_filtro(precio_max, "precio_max")
+        if id_cliente is not None and id_cliente != "":
+            try:
+                id_cliente = int(id_cliente)
+            except (TypeError, ValueError):
+                raise DatosInvalidosError("'id_cliente' debe ser un número entero.")
+        else:
+            id_cliente = None
+        try:
+            vehiculos = self.dao.buscar_por_filtros(marca, precio_min, precio_max)
+            libres = set(indice_ocupacion.libres([v.patente for v in vehiculos], desde, hasta, id_cliente))
+            return [v for v in vehiculos if v.patente in libres]
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al buscar vehículos disponibles: {e}")
+
+    def listar_pagina(self, opciones):
+        """
+        Lista una página de vehículos (paginación por cursor, filtros y orden).
+        Retorna: (lista de objetos Vehiculo, cursor siguiente o None).
+        Levanta: DatosInvalidosError si el filtro, el orden o el cursor no son válidos.
+        """
+        try:
+            return self.dao.listar_pagina(**opciones)
+        except ValueError as e:
+            raise DatosInvalidosError(str(e))
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar vehículos: {e}")
+
+    def iterar(self):
+        """ Retorna: Un generador de vehículos, leídos de a lotes (para streaming). """
+        try:
+            return self.dao.iterar()
+        except Exception as e:
+            raise ErrorDeAplicacion(f"Error al listar vehículos: {e}")
+
     def actualizar_vehiculo(self, patente, nuevos_datos):
         """
         Actualiza un vehículo.
@@ -77,20 +242,11 @@ class VehiculoService:
             vehiculo = self.buscar_vehiculo(patente)
 
             # 2. ¡NO USAR setattr! Actualizamos campos controlados.
-            # Esto respeta el Encapsulamiento.
-            if 'marca' in nuevos_datos:
-                vehiculo.marca = nuevos_datos['marca'].strip()
-            if 'modelo' in nuevos_datos:
-                vehiculo.modelo = nuevos_datos['modelo'].strip()
-            if 'anio' in nuevos_datos:
-                vehiculo.anio = int(nuevos_datos['anio'])
-            if 'precio_diario' in nuevos_datos:
-                vehiculo.precio_diario = float(nuevos_datos['precio_diario'])
-            if 'estado' in nuevos_datos:
-                vehiculo.estado = nuevos_datos['estado'].strip()
+            self._aplicar_cambios(vehiculo, nuevos_datos)
 
             # 3. Guardamos el objeto modificado
             self.dao.actualizar_vehiculo(vehiculo)
+            datos_modificados("VEHICULO")
             return vehiculo # Retornamos el objeto actualizado
         
         except (ValueError, TypeError) as e:
@@ -99,6 +255,19 @@ class VehiculoService:
             if isinstance(e, ErrorDeAplicacion): raise e
             raise ErrorDeAplicacion(f"Error al actualizar vehículo: {e}")
 
+    def _aplicar_cambios(self, vehiculo, nuevos_datos):
+        """ Copia al objeto SOLO los campos permitidos (respeta el Encapsulamiento). """
+        if 'marca' in nuevos_datos:
+            vehiculo.marca = nuevos_datos['marca'].strip()
+        if 'modelo' in nuevos_datos:
+            vehiculo.modelo = nuevos_datos['modelo'].strip()
+        if 'anio' in nuevos_datos:
+            vehiculo.anio = int(nuevos_datos['anio'])
+        if 'precio_diario' in nuevos_datos:
+            vehiculo.precio_diario = float(nuevos_datos['precio_diario'])
+        if 'estado' in nuevos_datos:
+            vehiculo.estado = nuevos_datos['estado'].strip()
+
     def eliminar_vehiculo(self, patente):
         """
         Elimina un vehículo.
@@ -111,6 +280,7 @@ class VehiculoService:
             
             # 2. Eliminamos
             self.dao.eliminar_vehiculo(patente)
+            datos_modificados("VEHICULO")
             return True
         except Exception as e:
             # (El DAO podría levantar un error de FK si el auto está en un alquiler)
@@ -9,12 +9,13 @@ const RegistroAlquiler = ({ apiBaseUrl }) => {
     id_empleado: '',
     fecha_inicio: '',
     fecha_fin: '',
-    costo_total: 0.0,
   });
   // ... (tus otros estados: vehiculos, clientes, empleados, mensaje, esError)
   const [vehiculos, setVehiculos] = useState([]);
   const [clientes, setClientes] = useState([]);
   const [empleados, setEmpleados] = useState([]);
+  // El costo lo calcula el backend (POST /cotizaciones): acá solo se muestra
+  const [cotizacion, setCotizacion] = useState(null);
   const [mensaje, setMensaje] = useState('');
   const [esError, setEsError] = useState(false);
 
@@ -41,11 +42,73 @@ const RegistroAlquiler = ({ apiBaseUrl }) => {
       }
     };
 
-    fetchData('vehiculos', setVehiculos);
     fetchData('clientes', setClientes);
     fetchData('empleados', setEmpleados);
   }, [apiBaseUrl]);
 
+  // Los vehículos se piden recién con las dos fechas: solo los libres en ese
+  // rango (GET /vehiculos/disponibles), no la flota entera. Con el cliente
+  // elegido también aparecen los que ESE cliente tiene reservados.
+  useEffect(() => {
+    const { fecha_inicio, fecha_fin, id_cliente } = datos;
+    if (!fecha_inicio || !fecha_fin || fecha_inicio > fecha_fin) {
+      setVehiculos([]);
+      return;
+    }
+    let vigente = true; // descarta respuestas de fechas anteriores
+    const fetchDisponibles = async () => {
+      try {
+        const params = new URLSearchParams({ desde: fecha_inicio, hasta: fecha_fin });
+        if (id_cliente) params.append('id_cliente', id_cliente);
+        const response = await fetch(`${apiBaseUrl}/vehiculos/disponibles?${params}`);
+        const data = await response.json();
+        if (!response.ok) {
+          throw new Error(data.error || 'Error cargando vehículos disponibles');
+        }
+        if (!vigente) return;
+        setVehiculos(data);
+        // Si el vehículo elegido ya no está libre en las nuevas fechas, se quita
+        setDatos(prev => (data.some(v => v.patente === prev.patente) ? prev : { ...prev, patente: '' }));
+      } catch (error) {
+        if (!vigente) return;
+        console.error('Error cargando vehículos disponibles:', error);
+        setMensaje(`Error cargando vehículos disponibles: ${error.message}`);
+        setEsError(true);
+      }
+    };
+    fetchDisponibles();
+    return () => { vigente = false; };
+  }, [apiBaseUrl, datos.fecha_inicio, datos.fecha_fin, datos.id_cliente]);
+
+
+  // Cotización del vehículo elegido en esas fechas
+  useEffect(() => {
+    const { patente, fecha_inicio, fecha_fin } = datos;
+    setCotizacion(null);
+    if (!patente || !fecha_inicio || !fecha_fin || fecha_inicio > fecha_fin) return;
+    let vigente = true;
+    const fetchCotizacion = async () => {
+      try {
+        const response = await fetch(`${apiBaseUrl}/cotizaciones`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify([{ patente, fecha_inicio, fecha_fin }]),
+        });
+        const data = await response.json();
+        if (!response.ok || !data.cotizaciones.length) {
+          throw new Error(data.error || (data.errores[0] && data.errores[0].error) || 'Error al cotizar');
+        }
+        if (vigente) setCotizacion(data.cotizaciones[0]);
+      } catch (error) {
+        if (!vigente) return;
+        console.error('Error al cotizar:', error);
+        setMensaje(`Error al cotizar: ${error.message}`);
+        setEsError(true);
+      }
+    };
+    fetchCotizacion();
+    return () => { vigente = false; };
+  }, [apiBaseUrl, datos.patente, datos.fecha_inicio, datos.fecha_fin]);
 
   const handleChange = (e) => {
     setDatos({ ...datos, [e.target.name]: e.target.value });
@@ -74,7 +137,7 @@ const RegistroAlquiler = ({ apiBaseUrl }) => {
       setMensaje(`¡Alquiler registrado con ID: ${result.id_alquiler}!`);
       setDatos({
         id_cliente: '', patente: '', id_empleado: '',
-        fecha_inicio: '', fecha_fin: '', costo_total: 0.0
+        fecha_inicio: '', fecha_fin: ''
       });
 
     } catch (error) {
@@ -113,15 +176,23 @@ const RegistroAlquiler = ({ apiBaseUrl }) => {
         </select>
 
         <label>Vehículo (Patente):</label>
-        <select name="patente" onChange={handleChange} required value={datos.patente}>
-          <option value="">Seleccione Vehículo Disponible</option>
-          {vehiculos
-            .filter(v => v.estado.toLowerCase() === 'disponible')
-            .map(v => (
-              <option key={v.patente} value={v.patente}>
-                {v.marca} {v.modelo} ({v.patente})
-              </option>
-            ))}
+        <select
+          name="patente"
+          onChange={handleChange}
+          required
+          value={datos.patente}
+          disabled={!datos.fecha_inicio || !datos.fecha_fin}
+        >
+          <option value="">
+            {datos.fecha_inicio && datos.fecha_fin
+              ? 'Seleccione Vehículo Disponible'
+              : 'Elija primero las fechas'}
+          </option>
+          {vehiculos.map(v => (
+            <option key={v.patente} value={v.patente}>
+              {v.marca} {v.modelo} ({v.patente})
+            </option>
+          ))}
         </select>
 
         {/* --- ¡CAMBIO: VALIDACIÓN DE FECHA EN FRONTEND! --- */}
@@ -147,7 +218,14 @@ const RegistroAlquiler = ({ apiBaseUrl }) => {
         {/* ------------------------------------- */}
         
         <label>Costo Total:</label>
-        <input type="number" name="costo_total" onChange={handleChange} required value={datos.costo_total} min="0" step="0.01" />
+        <input
+          type="text"
+          readOnly
+          value={cotizacion
+            ? `$${cotizacion.costo_total.toFixed(2)} (${cotizacion.dias} días x $${cotizacion.precio_diario.toFixed(2)})`
+            : ''}
+          placeholder="Se calcula al elegir vehículo y fechas"
+        />
 
         <button type="submit">Registrar Alquiler</button>
       </form>
@@ -11,39 +11,55 @@ const Reportes = ({ apiBaseUrl }) => {
   // Estado para guardar el link del último reporte
   const [linkReporte, setLinkReporte] = useState('');
 
-  // Función para manejar el "fetch"
-  const fetchReporte = async (endpoint) => {
+  // Cada cuánto se pregunta por el estado del reporte (ms)
+  const INTERVALO_CONSULTA = 1000;
+  const esperar = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  // El backend genera el PDF en segundo plano (POST /reportes/jobs) y
+  // nosotros consultamos el estado del trabajo hasta que termina.
+  const fetchReporte = async (tipo, parametros) => {
     setMensaje('Generando reporte...');
     setEsError(false);
     setLinkReporte(''); // Limpiamos el link anterior
-    
-    const url = `${apiBaseUrl}${endpoint}`;
-    
+
     try {
-      const response = await fetch(url);
-      const data = await response.json(); // Leemos JSON (sea éxito o error)
+      const response = await fetch(`${apiBaseUrl}/reportes/jobs`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ tipo, parametros }),
+      });
+      let trabajo = await response.json(); // Leemos JSON (sea éxito o error)
 
       // Manejo de errores POO
       if (!response.ok) {
-        // El backend envió 4xx/5xx. 'data' es {"error": "..."}
-        throw new Error(data.error || `Error ${response.status}`);
+        // El backend envió 4xx/5xx. 'trabajo' es {"error": "..."}
+        throw new Error(trabajo.error || `Error ${response.status}`);
       }
 
-      // Éxito: 'data' es {"mensaje": "...", "ruta_archivo": "static/reportes/..."}
-      
-      setMensaje(data.mensaje || "Reporte generado con éxito.");
+      // 'estado': pendiente -> en_proceso -> terminado | error
+      while (trabajo.estado === 'pendiente' || trabajo.estado === 'en_proceso') {
+        await esperar(INTERVALO_CONSULTA);
+        const respEstado = await fetch(`${apiBaseUrl}/reportes/jobs/${trabajo.id_trabajo}`);
+        trabajo = await respEstado.json();
+        if (!respEstado.ok) {
+          throw new Error(trabajo.error || `Error ${respEstado.status}`);
+        }
+      }
+
+      if (trabajo.estado === 'error') {
+        throw new Error(trabajo.error || 'No se pudo generar el reporte.');
+      }
+
+      setMensaje("Reporte generado con éxito.");
       setEsError(false);
-      
-      // ==========================================
-      // ¡alquileres por vehiculo usaba ruta_archivo, pero vehiculos mas alquilados usaba path entonces habia conflictos
-      // ==========================================
-      const key = data.ruta_archivo ? "ruta_archivo" : "path";
-      const urlReporte = `${apiBaseUrl}/${data[key]}`;
-      setLinkReporte(urlReporte); 
+
+      // Se descarga por la ruta del backend (ETag/caché), no por el archivo estático
+      const urlReporte = `${apiBaseUrl}/${trabajo.descarga}`;
+      setLinkReporte(urlReporte);
 
       // Abrir el PDF en una nueva pestaña
       window.open(urlReporte, '_blank');
-      
+
     } catch (error) {
       setMensaje(`Error: ${error.message}`);
       setEsError(true);
@@ -60,16 +76,16 @@ const Reportes = ({ apiBaseUrl }) => {
           setEsError(true);
           return;
         }
-        fetchReporte(`/reportes/cliente/${idCliente}`); 
+        fetchReporte('alquileres_por_cliente', { cliente_id: Number(idCliente) });
         break;
         
       case 'vehiculos_mas_alquilados':
-        fetchReporte('/reportes/vehiculos_mas_alquilados'); 
+        fetchReporte('vehiculos_mas_alquilados', {});
         break;
         
       case 'facturacion_mensual':
         // Asume el año actual, como en tu backend
-        fetchReporte(`/reportes/facturacion_mensual?anio=${new Date().getFullYear()}`); 
+        fetchReporte('facturacion_mensual', { anio: new Date().getFullYear() });
         break;
         
       default: